@@ -5,7 +5,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordBearer # Ajout de l'import pour le schéma OAuth2
 
 # Import des modèles de données
-from app.base_de_donnees.modeles import DoctorEnDB, MedicalStructureEnDB, UserEnDB
+from app.base_de_donnees.modeles import (
+    DoctorProximite, DoctorsProximiteLot, MedicalStructureProximite, MedicalStructuresProximiteLot,
+    RechercheProximiteLot, UserEnDB
+)
 
 # Import des dépendances (services injectés)
 from app.dependances.injection import get_gestionnaire_geolocalisation, get_gestionnaire_authentification
@@ -63,14 +66,15 @@ async def get_patient_or_doctor_or_admin(
 
 @geolocalisation_router.get(
     "/doctors/nearby",
-    response_model=List[DoctorEnDB],
+    response_model=List[DoctorProximite],
     summary="Rechercher des médecins à proximité",
-    description="Recherche et retourne une liste de médecins situés dans un rayon spécifié autour de coordonnées GPS données. Accessible par les patients, médecins et administrateurs."
+    description="Recherche et retourne une liste de médecins situés dans un rayon spécifié autour de coordonnées GPS données, du plus proche au plus éloigné, avec leur distance en kilomètres. Accessible par les patients, médecins et administrateurs."
 )
 async def search_nearby_doctors(
-    latitude: float = Query(..., description="Latitude du point central pour la recherche."),
-    longitude: float = Query(..., description="Longitude du point central pour la recherche."),
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude du point central pour la recherche."),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude du point central pour la recherche."),
     rayon_km: Optional[float] = Query(None, gt=0, description="Rayon de recherche en kilomètres. Si non spécifié, utilise la valeur par défaut configurée."),
+    limite: Optional[int] = Query(None, gt=0, le=500, description="Nombre maximal de résultats (les plus proches dans le rayon)."),
     geo_manager: GestionnaireGeolocalisation = Depends(get_gestionnaire_geolocalisation),
     current_user: UserEnDB = Depends(get_patient_or_doctor_or_admin) # Vérifie l'autorisation
 ):
@@ -78,18 +82,19 @@ async def search_nearby_doctors(
     Recherche les médecins à proximité.
     """
     logger.info(f"Recherche de médecins à proximité de ({latitude}, {longitude}) avec rayon {rayon_km} km par utilisateur {current_user.id}.")
-    return await geo_manager.rechercher_medecins_proximite(latitude, longitude, rayon_km)
+    return await geo_manager.rechercher_medecins_proximite(latitude, longitude, rayon_km, limite)
 
 @geolocalisation_router.get(
     "/medical-structures/nearby",
-    response_model=List[MedicalStructureEnDB],
+    response_model=List[MedicalStructureProximite],
     summary="Rechercher des structures médicales à proximité",
-    description="Recherche et retourne une liste de structures médicales (cliniques, hôpitaux, etc.) situées dans un rayon spécifié autour de coordonnées GPS données. Accessible par les patients, médecins et administrateurs."
+    description="Recherche et retourne une liste de structures médicales (cliniques, hôpitaux, etc.) situées dans un rayon spécifié autour de coordonnées GPS données, de la plus proche à la plus éloignée, avec leur distance en kilomètres. Accessible par les patients, médecins et administrateurs."
 )
 async def search_nearby_medical_structures(
-    latitude: float = Query(..., description="Latitude du point central pour la recherche."),
-    longitude: float = Query(..., description="Longitude du point central pour la recherche."),
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude du point central pour la recherche."),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude du point central pour la recherche."),
     rayon_km: Optional[float] = Query(None, gt=0, description="Rayon de recherche en kilomètres. Si non spécifié, utilise la valeur par défaut configurée."),
+    limite: Optional[int] = Query(None, gt=0, le=500, description="Nombre maximal de résultats (les plus proches dans le rayon)."),
     geo_manager: GestionnaireGeolocalisation = Depends(get_gestionnaire_geolocalisation),
     current_user: UserEnDB = Depends(get_patient_or_doctor_or_admin) # Vérifie l'autorisation
 ):
@@ -97,4 +102,38 @@ async def search_nearby_medical_structures(
     Recherche les structures médicales à proximité.
     """
     logger.info(f"Recherche de structures médicales à proximité de ({latitude}, {longitude}) avec rayon {rayon_km} km par utilisateur {current_user.id}.")
-    return await geo_manager.rechercher_structures_medicales_proximite(latitude, longitude, rayon_km)
+    return await geo_manager.rechercher_structures_medicales_proximite(latitude, longitude, rayon_km, limite)
+
+@geolocalisation_router.post(
+    "/doctors/nearby/batch",
+    response_model=List[DoctorsProximiteLot],
+    summary="Rechercher des médecins à proximité de plusieurs positions",
+    description="Retourne, pour chaque origine fournie, les médecins les plus proches dans le rayon (du plus proche au plus éloigné, avec leur distance en kilomètres). Accessible par les patients, médecins et administrateurs."
+)
+async def search_nearby_doctors_batch(
+    recherche: RechercheProximiteLot,
+    geo_manager: GestionnaireGeolocalisation = Depends(get_gestionnaire_geolocalisation),
+    current_user: UserEnDB = Depends(get_patient_or_doctor_or_admin)
+):
+    """
+    Recherche les médecins à proximité de plusieurs positions en une requête.
+    """
+    logger.info(f"Recherche de médecins à proximité par lot ({len(recherche.origines)} origines) par utilisateur {current_user.id}.")
+    return await geo_manager.rechercher_medecins_proximite_lot(recherche.origines, recherche.rayon_km, recherche.limite)
+
+@geolocalisation_router.post(
+    "/medical-structures/nearby/batch",
+    response_model=List[MedicalStructuresProximiteLot],
+    summary="Rechercher des structures médicales à proximité de plusieurs positions",
+    description="Retourne, pour chaque origine fournie, les structures médicales les plus proches dans le rayon (de la plus proche à la plus éloignée, avec leur distance en kilomètres). Accessible par les patients, médecins et administrateurs."
+)
+async def search_nearby_medical_structures_batch(
+    recherche: RechercheProximiteLot,
+    geo_manager: GestionnaireGeolocalisation = Depends(get_gestionnaire_geolocalisation),
+    current_user: UserEnDB = Depends(get_patient_or_doctor_or_admin)
+):
+    """
+    Recherche les structures médicales à proximité de plusieurs positions en une requête.
+    """
+    logger.info(f"Recherche de structures médicales à proximité par lot ({len(recherche.origines)} origines) par utilisateur {current_user.id}.")
+    return await geo_manager.rechercher_structures_medicales_proximite_lot(recherche.origines, recherche.rayon_km, recherche.limite)
@@ -49,8 +49,7 @@ def obtenir_connexion_db():
     try:
         yield conn
     finally:
-        if conn and conn.is_connected():
-            conn.close()
+        conn.close()
 
 # --- Endpoints pour la gestion des patients ---
 
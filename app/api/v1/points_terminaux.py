@@ -1,8 +1,9 @@
+import json
 import logging
 import uuid
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 import os
 
@@ -13,13 +14,30 @@ from app.base_de_donnees.modeles import (
     MaladieSymptomeLienCreer, MaladieSymptomeLienEnDB
 )
 from app.dependances.injection import (
+    get_acces_donnees_async,
+    get_journal_evenements,
     get_moteur_diagnostic,
     get_gestionnaire_connaissances,
-    get_gestionnaire_contexte
+    get_gestionnaire_contexte,
+    get_gestionnaire_geolocalisation,
+    get_gestionnaire_rendezvous,
+    get_executeur_vocal,
+    get_gestionnaire_vocal,
+    get_integrateur_llm
 )
 from app.services.moteur_diagnostic import MoteurDiagnostic
 from app.services.gestionnaire_connaissances import GestionnaireConnaissances
 from app.services.gestionnaire_contexte import GestionnaireContexte
+from app.services.journal_evenements import JournalEvenementsDiffere
+from app.services.gestionnaire_geolocalisation import GestionnaireGeolocalisation
+from app.services.gestionnaire_rendezvous import GestionnaireRendezvous
+from app.services.executeur_vocal import ExecuteurVocal
+from app.services.gestionnaire_vocal import GestionnaireVocal
+from app.services.integrateur_llm import IntegrateurLLM
+from app.api.v1.teleassistance import manager as gestionnaire_connexions_teleassistance
+from app.base_de_donnees.connexion import obtenir_statistiques_pool
+from app.configuration.intergiciels import obtenir_statistiques_requetes_sql
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +82,59 @@ async def chat_with_ai(
         logger.error(f"Erreur inattendue lors de la conversation IA: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Une erreur est survenue lors du traitement de votre demande.")
 
+def _evenement_sse(evenement: Dict[str, Any]) -> str:
+    """Formate un événement de MoteurDiagnostic.traiter_demande_utilisateur_flux en événement Server-Sent Events."""
+    donnees = {cle: valeur for cle, valeur in evenement.items() if cle != "type"}
+    return f"event: {evenement['type']}\ndata: {json.dumps(donnees, ensure_ascii=False)}\n\n"
+
+@router.post("/chat/stream", summary="Engager une conversation avec l'IA, réponse diffusée au fil de la génération (SSE)")
+async def chat_with_ai_stream(
+    id_session: str,
+    message_utilisateur: Optional[str] = None,
+    audio_file: Optional[UploadFile] = File(None),
+    moteur_diagnostic: MoteurDiagnostic = Depends(get_moteur_diagnostic),
+):
+    """
+    Comme /chat/, mais la réponse est un flux text/event-stream :
+    USER_TRANSCRIPTION (entrée audio), AI_PARTIAL (fragment 'delta' de la réponse) au fil de la
+    génération, puis AI_RESPONSE (réponse complète et chemin audio) ou AI_ERROR.
+    Les erreurs de validation et de transcription sont renvoyées avec leur code HTTP, avant le flux.
+    """
+    logger.info(f"Requête /chat/stream reçue pour la session {id_session}")
+
+    evenements = moteur_diagnostic.traiter_demande_utilisateur_flux(
+        id_session=id_session,
+        message_utilisateur=message_utilisateur,
+        audio_file_upload=audio_file
+    )
+    try:
+        premier_evenement = await evenements.__anext__()
+    except HTTPException as e:
+        logger.error(f"HTTPException lors de la conversation IA (flux): {e.detail}", exc_info=True)
+        raise e
+    except Exception as e:
+        logger.error(f"Erreur inattendue lors de la conversation IA (flux): {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Une erreur est survenue lors du traitement de votre demande.")
+
+    async def diffuser():
+        yield _evenement_sse(premier_evenement)
+        try:
+            async for evenement in evenements:
+                yield _evenement_sse(evenement)
+        except Exception as e:
+            logger.error(f"Erreur pendant la diffusion de la réponse IA pour la session {id_session}: {e}", exc_info=True)
+            detail = e.detail if isinstance(e, HTTPException) else "Une erreur est survenue lors du traitement de votre demande."
+            yield _evenement_sse({"type": "AI_ERROR", "detail": detail})
+        finally:
+            # Client déconnecté avant la fin : arrête la génération (et la synthèse) en cours
+            await evenements.aclose()
+
+    return StreamingResponse(
+        diffuser(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/audio_response/{filename}", summary="Récupérer un fichier audio de réponse de l'IA")
 async def get_audio_response(filename: str):
     audio_responses_dir = "audio_reponses"
@@ -83,7 +154,7 @@ async def get_conversation_history(
 ):
     logger.info(f"Requête d'historique de conversation pour la session {id_session}")
     try:
-        history = await gestionnaire_contexte.lire_logs_conversation_par_session(id_session)
+        history = await gestionnaire_contexte.obtenir_historique_conversation(id_session)
         if not history:
             logger.warning(f"Aucun historique trouvé pour la session {id_session}.")
             return []
@@ -226,3 +297,75 @@ async def add_maladie_symptome_lien(
     except Exception as e:
         logger.error(f"Erreur lors de l'ajout du lien maladie-symptôme: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
+
+@router.get("/metriques/pool_db", response_model=Dict[str, Any], summary="Obtenir les métriques du pool de connexions à la base de données")
+async def get_metriques_pool_db():
+    return obtenir_statistiques_pool()
+
+@router.get("/metriques/acces_db", response_model=Dict[str, Any], summary="Obtenir les métriques de l'exécuteur des requêtes SQL asynchrones")
+async def get_metriques_acces_db(
+    acces_donnees: AccesDonneesAsync = Depends(get_acces_donnees_async),
+):
+    return acces_donnees.obtenir_statistiques()
+
+@router.get("/metriques/requetes_sql", response_model=Dict[str, Any], summary="Obtenir le nombre de requêtes SQL par point de terminaison")
+async def get_metriques_requetes_sql():
+    return obtenir_statistiques_requetes_sql()
+
+@router.get("/metriques/contexte", response_model=Dict[str, Any], summary="Obtenir les métriques du cache des contextes de conversation")
+async def get_metriques_contexte(
+    gestionnaire_contexte: GestionnaireContexte = Depends(get_gestionnaire_contexte),
+):
+    return gestionnaire_contexte.obtenir_statistiques_cache()
+
+@router.get("/metriques/journal_evenements", response_model=Dict[str, Any], summary="Obtenir les métriques du journal différé des événements système")
+async def get_metriques_journal_evenements(
+    journal_evenements: JournalEvenementsDiffere = Depends(get_journal_evenements),
+):
+    return journal_evenements.obtenir_statistiques()
+
+@router.get("/metriques/geolocalisation", response_model=Dict[str, Any], summary="Obtenir les métriques des index spatiaux de géolocalisation")
+async def get_metriques_geolocalisation(
+    gestionnaire_geolocalisation: GestionnaireGeolocalisation = Depends(get_gestionnaire_geolocalisation),
+):
+    return gestionnaire_geolocalisation.obtenir_statistiques_index()
+
+@router.get("/metriques/calendrier_rendez_vous", response_model=Dict[str, Any], summary="Obtenir les métriques du cache des calendriers des médecins")
+async def get_metriques_calendrier_rendez_vous(
+    gestionnaire_rendezvous: GestionnaireRendezvous = Depends(get_gestionnaire_rendezvous),
+):
+    return gestionnaire_rendezvous.obtenir_statistiques_calendrier()
+
+@router.get("/metriques/teleassistance_audio", response_model=Dict[str, Any], summary="Obtenir l'occupation mémoire des tampons audio de téléassistance")
+async def get_metriques_teleassistance_audio():
+    return gestionnaire_connexions_teleassistance.obtenir_statistiques()
+
+@router.get("/metriques/executeur_vocal", response_model=Dict[str, Any], summary="Obtenir la profondeur de file et les durées des traitements vocaux")
+async def get_metriques_executeur_vocal(
+    executeur_vocal: ExecuteurVocal = Depends(get_executeur_vocal),
+):
+    return executeur_vocal.obtenir_statistiques()
+
+@router.get("/metriques/cache_audio_tts", response_model=Dict[str, Any], summary="Obtenir les métriques du cache des réponses audio synthétisées")
+async def get_metriques_cache_audio_tts(
+    gestionnaire_vocal: GestionnaireVocal = Depends(get_gestionnaire_vocal),
+):
+    return gestionnaire_vocal.obtenir_statistiques_cache_audio()
+
+@router.get("/metriques/cache_nlu", response_model=Dict[str, Any], summary="Obtenir les métriques du cache des analyses NLU du LLM")
+async def get_metriques_cache_nlu(
+    integrateur_llm: IntegrateurLLM = Depends(get_integrateur_llm),
+):
+    return integrateur_llm.obtenir_statistiques_cache_nlu()
+
+@router.get("/metriques/classifieur_intentions", response_model=Dict[str, Any], summary="Obtenir les métriques de la classification locale des intentions")
+async def get_metriques_classifieur_intentions(
+    integrateur_llm: IntegrateurLLM = Depends(get_integrateur_llm),
+):
+    return integrateur_llm.obtenir_statistiques_classifieur_local()
+
+@router.get("/metriques/passerelle_llm", response_model=Dict[str, Any], summary="Obtenir la profondeur de file, l'état des disjoncteurs et les latences des appels au LLM")
+async def get_metriques_passerelle_llm(
+    integrateur_llm: IntegrateurLLM = Depends(get_integrateur_llm),
+):
+    return integrateur_llm.obtenir_statistiques_passerelle()
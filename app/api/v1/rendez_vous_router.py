@@ -1,12 +1,12 @@
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, date
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.security import OAuth2PasswordBearer
 
 # Import des modèles de données
-from app.base_de_donnees.modeles import AppointmentCreer, AppointmentEnDB, UserEnDB
+from app.base_de_donnees.modeles import AppointmentCreer, AppointmentEnDB, CreneauMedecinProximite, UserEnDB
 
 # Import des dépendances (services injectés)
 from app.dependances.injection import (
@@ -73,7 +73,7 @@ async def verifier_acces_rendezvous(
             )
     elif current_user.role == "medecin":
         doctor_profile = await medecin_manager.obtenir_profil_medecin_par_user_id(current_user.id)
-        if not doctor_profile or doctor_profile.id != appointment.doctor_id:
+        if not doctor_profile or doctor_profile.id != appointment.medecin_id:
             logger.warning(f"Accès refusé: Médecin ID {current_user.id} tente d'accéder au rendez-vous {appointment_id} qui ne lui est pas attribué.")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -115,7 +115,7 @@ async def create_appointment(
             )
     elif current_user.role == "medecin":
         doctor_profile = await medecin_manager.obtenir_profil_medecin_par_user_id(current_user.id)
-        if not doctor_profile or doctor_profile.id != appointment_data.doctor_id:
+        if not doctor_profile or doctor_profile.id != appointment_data.medecin_id:
             logger.warning(f"Accès refusé: Médecin ID {current_user.id} tente de créer un rendez-vous pour un autre médecin.")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -128,8 +128,32 @@ async def create_appointment(
             detail="Vous n'avez pas les autorisations nécessaires pour créer un rendez-vous."
         )
 
-    logger.info(f"Tentative de création de rendez-vous pour patient {appointment_data.patient_id} avec médecin {appointment_data.doctor_id}.")
-    return await rendezvous_manager.creer_rendezvous(appointment_data)
+    logger.info(f"Tentative de création de rendez-vous pour patient {appointment_data.patient_id} avec médecin {appointment_data.medecin_id}.")
+    return await rendezvous_manager.prendre_rendezvous(appointment_data)
+
+# Déclaré avant "/{appointment_id}" pour ne pas être capturé par cette route.
+@rendez_vous_router.get(
+    "/earliest-slots",
+    response_model=List[CreneauMedecinProximite],
+    summary="Premiers créneaux disponibles à proximité",
+    description="Retourne les premiers créneaux libres, tous médecins confondus, parmi les médecins d'une spécialité situés dans un rayon donné. Accessible par tout utilisateur authentifié."
+)
+async def get_earliest_slots(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    specialite: Optional[str] = Query(None, description="Spécialité recherchée (ex: cardiologie)"),
+    rayon_km: Optional[float] = Query(None, gt=0, description="Rayon de recherche en kilomètres (valeur configurée par défaut)"),
+    date_debut: Optional[date] = Query(None, description="Premier jour de la recherche (aujourd'hui par défaut)"),
+    date_fin: Optional[date] = Query(None, description="Dernier jour de la recherche (inclus)"),
+    duree_min: int = Query(30, ge=5, le=480, description="Durée des créneaux en minutes"),
+    limite: int = Query(10, ge=1, le=100, description="Nombre maximal de créneaux retournés"),
+    rendezvous_manager: GestionnaireRendezvous = Depends(get_gestionnaire_rendezvous),
+    current_user: UserEnDB = Depends(get_utilisateur_authentifie)
+):
+    logger.info(f"Recherche des premiers créneaux ({specialite}) autour de ({latitude}, {longitude}).")
+    return await rendezvous_manager.rechercher_premiers_creneaux(
+        specialite, latitude, longitude, rayon_km, date_debut, date_fin, duree_min, limite
+    )
 
 @rendez_vous_router.get(
     "/{appointment_id}",
@@ -209,6 +233,23 @@ async def get_appointments_by_doctor(
     logger.info(f"Récupération des rendez-vous pour médecin ID: {doctor_id}.")
     return await rendezvous_manager.obtenir_rendezvous_par_medecin(doctor_id, limit, offset)
 
+@rendez_vous_router.get(
+    "/doctor/{doctor_id}/availability",
+    response_model=List[Dict[str, str]],
+    summary="Obtenir les créneaux disponibles d'un médecin",
+    description="Calcule les créneaux libres d'un médecin sur une plage de dates, selon ses horaires de travail et ses rendez-vous. Accessible par tout utilisateur authentifié."
+)
+async def get_doctor_availability(
+    doctor_id: int,
+    date_debut: date = Query(..., description="Premier jour de la recherche"),
+    date_fin: Optional[date] = Query(None, description="Dernier jour de la recherche (inclus, par défaut date_debut)"),
+    duree_min: int = Query(30, ge=5, le=480, description="Durée des créneaux en minutes"),
+    rendezvous_manager: GestionnaireRendezvous = Depends(get_gestionnaire_rendezvous),
+    current_user: UserEnDB = Depends(get_utilisateur_authentifie)
+):
+    logger.info(f"Recherche des disponibilités du médecin ID: {doctor_id} du {date_debut} au {date_fin or date_debut}.")
+    return await rendezvous_manager.rechercher_disponibilites_medecin(doctor_id, date_debut, duree_min, date_fin)
+
 @rendez_vous_router.put(
     "/{appointment_id}",
     response_model=AppointmentEnDB,
@@ -258,7 +299,7 @@ async def delete_appointment(
 
     if current_user.role == "medecin":
         doctor_profile = await medecin_manager.obtenir_profil_medecin_par_user_id(current_user.id)
-        if not doctor_profile or doctor_profile.id != appointment_check.doctor_id:
+        if not doctor_profile or doctor_profile.id != appointment_check.medecin_id:
             logger.warning(f"Accès refusé: Médecin ID {current_user.id} tente de supprimer un rendez-vous qui ne lui est pas attribué.")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -7,11 +7,15 @@ import json
 import asyncio
 from pydub import AudioSegment
 from starlette.websockets import WebSocketState # NOUVEAU: Importer WebSocketState
-from typing import Dict, Any
+from typing import AsyncGenerator, Dict, Any, Optional
 
 # Importer le Moteur de Diagnostic et le Gestionnaire de Contexte (juste les types pour les annotations)
 from app.services.moteur_diagnostic import MoteurDiagnostic
 from app.services.gestionnaire_contexte import GestionnaireContexte
+from app.services.tampon_audio import TamponAudio
+from app.services.detecteur_activite_vocale import DetecteurActiviteVocale
+from app.services.gestionnaire_vocal import FluxTranscription
+from app.configuration.parametres import parametres
 
 # Importer les dépendances depuis le nouveau module de dépendances
 from app.dependances import get_moteur_diagnostic, get_gestionnaire_contexte
@@ -30,28 +34,58 @@ AUDIO_RESPONSES_DIR = "audio_reponses"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(AUDIO_RESPONSES_DIR, exist_ok=True)
 
-# Paramètres pour la détection de silence (ajustez si nécessaire)
-SILENCE_DURATION_MS = 1500  # Millisecondes de silence pour déclencher le traitement (temps sans nouveau chunk audio)
-CHECK_INTERVAL_MS = 500 # Fréquence à laquelle le backend vérifie le tampon audio pour le silence
+# Message de fin d'appel (texte fixe, synthétisé à l'avance dans le cache audio)
+MESSAGE_FIN_APPEL = "Au revoir ! Merci d'avoir utilisé le service de téléassistance."
+
+# Paramètres pour la détection de silence (voir TELEASSISTANCE_SILENCE_MS et TELEASSISTANCE_VAD_*)
+SILENCE_DURATION_MS = parametres.TELEASSISTANCE_SILENCE_MS  # Millisecondes sans nouveau chunk audio avant le traitement
+MAX_UTTERANCE_MS = parametres.TELEASSISTANCE_MAX_UTTERANCE_MS  # Durée maximale d'un énoncé sur un flux continu
+
+
+def url_audio_reponse(chemin: Optional[str]) -> Optional[str]:
+    """URL publique (/audio_reponses/) d'un fichier de réponse audio, None si la synthèse a échoué."""
+    return f"/audio_reponses/{os.path.basename(chemin)}" if chemin else None
+
 
 class ConnectionManager:
     """Gère les connexions WebSocket actives et leurs états de conversation."""
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.audio_buffers: Dict[str, bytes] = {}
+        self.audio_buffers: Dict[str, TamponAudio] = {}
         self.processing_tasks: Dict[str, asyncio.Task] = {}
         self.last_audio_activity_time: Dict[str, float] = {} # Temps de la dernière activité audio (réception de chunk)
         self.processing_lock: Dict[str, asyncio.Lock] = {} # Verrou pour éviter les traitements concurrents
+        self.silence_timers: Dict[str, asyncio.TimerHandle] = {} # Minuteur de fin de silence, réarmé à chaque chunk
+        self.debuts_enonce: Dict[str, float] = {} # Réception du premier chunk de l'énoncé en tampon
+        self.detecteurs_vad: Dict[str, DetecteurActiviteVocale] = {}
+        self.flux_transcription: Dict[str, FluxTranscription] = {} # Transcription incrémentale de l'énoncé en cours (PCM)
+        # Chunks à transmettre à la transcription incrémentale, dans l'ordre, par une seule tâche par session
+        self.files_flux: Dict[str, asyncio.Queue] = {}
+        self.taches_flux: Dict[str, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
         self.active_connections[session_id] = websocket
-        self.audio_buffers[session_id] = b""
+        self.audio_buffers[session_id] = TamponAudio(parametres.TELEASSISTANCE_AUDIO_MAX_BYTES)
         self.last_audio_activity_time[session_id] = asyncio.get_event_loop().time()
         self.processing_lock[session_id] = asyncio.Lock() # Initialiser le verrou
+        if parametres.TELEASSISTANCE_VAD_ENABLED and parametres.TELEASSISTANCE_AUDIO_FORMAT == "pcm":
+            self.detecteurs_vad[session_id] = DetecteurActiviteVocale(
+                frequence_echantillonnage=parametres.TELEASSISTANCE_PCM_SAMPLE_RATE,
+                seuil_db=parametres.TELEASSISTANCE_VAD_THRESHOLD_DB,
+                silence_fin_ms=parametres.TELEASSISTANCE_VAD_SILENCE_MS
+            )
         logger.info(f"Connexion WebSocket acceptée pour la session: {session_id}")
 
     def disconnect(self, session_id: str):
+        self.annuler_minuteur_silence(session_id)
+        self.detecteurs_vad.pop(session_id, None)
+        self.debuts_enonce.pop(session_id, None)
+        self.flux_transcription.pop(session_id, None)
+        self.files_flux.pop(session_id, None)
+        tache_flux = self.taches_flux.pop(session_id, None)
+        if tache_flux is not None:
+            tache_flux.cancel()
         if session_id in self.active_connections:
             del self.active_connections[session_id]
         if session_id in self.audio_buffers:
@@ -76,13 +110,131 @@ class ConnectionManager:
                 logger.error(f"[{session_id}] Erreur lors de l'envoi JSON: {e}")
                 # Ne pas déconnecter ici, laisser le main loop ou le finally le faire
 
-    async def process_accumulated_audio(self, session_id: str, moteur_diagnostic: MoteurDiagnostic):
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        """Occupation mémoire des tampons audio, par session et au total."""
+        sessions = {session_id: tampon.obtenir_statistiques() for session_id, tampon in self.audio_buffers.items()}
+        for session_id, detecteur in self.detecteurs_vad.items():
+            if session_id in sessions:
+                sessions[session_id]["vad"] = detecteur.obtenir_statistiques()
+        return {
+            "sessions_actives": len(self.active_connections),
+            "octets_en_tampon": sum(stats["octets_en_tampon"] for stats in sessions.values()),
+            "taille_max_tampon": parametres.TELEASSISTANCE_AUDIO_MAX_BYTES,
+            "sessions": sessions,
+        }
+
+    def extraire_audio(self, session_id: str) -> bytes:
+        """Assemble les chunks accumulés, vide le tampon et remet à zéro la détection d'énoncé."""
+        if session_id in self.detecteurs_vad:
+            self.detecteurs_vad[session_id].reinitialiser()
+        return self.audio_buffers[session_id].vider()
+
+    async def transmettre_flux(self, session_id: str, flux: FluxTranscription, audio_chunk: bytes):
+        """Transmet un chunk à la transcription incrémentale et envoie la transcription partielle au frontend."""
+        partiel = await flux.accepter(audio_chunk)
+        if partiel and session_id in self.active_connections:
+            await self.send_json(session_id, {"type": "USER_PARTIAL", "transcription": partiel, "id_session": session_id})
+
+    def mettre_en_file_flux(self, session_id: str, flux: FluxTranscription, audio_chunk: Optional[bytes], futur: Optional[asyncio.Future] = None):
+        """
+        Ajoute à la file de la session un chunk à transmettre à 'flux', ou (audio_chunk None) la fin
+        de l'énoncé, dont le texte final est placé dans 'futur'. La tâche de la file est créée au besoin.
+        """
+        file = self.files_flux.get(session_id)
+        if file is None:
+            file = self.files_flux[session_id] = asyncio.Queue()
+            self.taches_flux[session_id] = asyncio.create_task(self.consommer_file_flux(session_id, file))
+        file.put_nowait((flux, audio_chunk, futur))
+
+    async def consommer_file_flux(self, session_id: str, file: asyncio.Queue):
+        """Tâche unique de la session : transmet les chunks dans leur ordre d'arrivée, puis termine chaque énoncé."""
+        try:
+            while True:
+                flux, audio_chunk, futur = await file.get()
+                if audio_chunk is not None:
+                    try:
+                        await self.transmettre_flux(session_id, flux, audio_chunk)
+                    except Exception as e:
+                        logger.error(f"[{session_id}] Erreur lors de l'envoi de la transcription partielle: {e}", exc_info=True)
+                    continue
+                if futur.done():  # traitement de l'énoncé déjà annulé
+                    continue
+                try:
+                    transcription = await flux.terminer()
+                except Exception as e:
+                    if not futur.done():
+                        futur.set_exception(e)
+                else:
+                    if not futur.done():
+                        futur.set_result(transcription)
+        finally:
+            # Session fermée : les traitements qui attendent la fin d'un énoncé ne restent pas bloqués
+            while not file.empty():
+                _, _, futur = file.get_nowait()
+                if futur is not None:
+                    futur.cancel()
+
+    async def terminer_flux(self, session_id: str, flux: FluxTranscription) -> Optional[str]:
+        """Texte final de l'énoncé transcrit au fil de l'eau, une fois transmis tous ses chunks en file."""
+        if session_id not in self.taches_flux:
+            return await flux.terminer()
+        futur = asyncio.get_running_loop().create_future()
+        self.mettre_en_file_flux(session_id, flux, None, futur)
+        return await futur
+
+    async def relayer_reponse(
+        self,
+        session_id: str,
+        evenements: AsyncGenerator[Dict[str, Any], None],
+        transcription: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Traite immédiatement l'audio accumulé, utilisé par la tâche de fond et par END_CALL.
+        Relaie au frontend les événements de MoteurDiagnostic.traiter_demande_utilisateur_flux :
+        transcription de l'utilisateur (USER_TRANSCRIPTION), fragments de la réponse au fil de la
+        génération (AI_PARTIAL), segments audio phrase par phrase dans l'ordre (AI_AUDIO_SEGMENT),
+        puis réponse complète (AI_RESPONSE). Les chemins audio sont ceux servis par /audio_reponses/.
+        'transcription' est celle d'un énoncé déjà transcrit au fil de l'eau. Retourne la réponse complète.
+        """
+        response_data: Dict[str, Any] = {}
+        if transcription and session_id in self.active_connections:
+            await self.send_json(session_id, {"type": "USER_TRANSCRIPTION", "transcription": transcription, "id_session": session_id})
+        try:
+            async for evenement in evenements:
+                evenement["id_session"] = session_id
+                if evenement["type"] == "AI_AUDIO_SEGMENT":
+                    evenement["chemin_audio"] = url_audio_reponse(evenement["chemin_audio"])
+                elif evenement["type"] == "AI_RESPONSE":
+                    evenement["chemin_audio_reponse_ia"] = url_audio_reponse(evenement["chemin_audio_reponse_ia"])
+                    if "segments_audio" in evenement:
+                        evenement["segments_audio"] = [url_audio_reponse(chemin) for chemin in evenement["segments_audio"]]
+                    if transcription:
+                        evenement["transcription_utilisateur"] = transcription
+                    response_data = evenement
+                if session_id in self.active_connections:
+                    await self.send_json(session_id, evenement)
+        finally:
+            await evenements.aclose()
+        if response_data:
+            logger.info(f"[{session_id}] Réponse IA envoyée via WebSocket.")
+        return response_data
+
+    async def process_accumulated_audio(
+        self,
+        session_id: str,
+        moteur_diagnostic: MoteurDiagnostic,
+        audio: Optional[bytes] = None,
+        flux: Optional[FluxTranscription] = None
+    ):
+        """
+        Traite l'audio d'un énoncé : 'audio' s'il est fourni (extrait au déclenchement),
+        sinon l'audio accumulé (END_CALL). Si l'énoncé a été transcrit au fil de l'eau ('flux'),
+        le texte final du flux est utilisé ; sinon l'audio complet est transcrit.
         """
         async with self.processing_lock[session_id]: # Assurer qu'un seul traitement à la fois
-            audio_to_process = self.audio_buffers[session_id]
-            self.audio_buffers[session_id] = b"" # Vider le tampon
+            if audio is None:
+                audio = self.extraire_audio(session_id)
+                flux = self.flux_transcription.pop(session_id, None)
+            audio_to_process = audio
 
             if not audio_to_process:
                 logger.debug(f"[{session_id}] Pas d'audio à traiter.")
@@ -90,54 +242,35 @@ class ConnectionManager:
 
             logger.info(f"[{session_id}] Traitement de {len(audio_to_process)} bytes d'audio accumulé.")
 
-            temp_audio_filename = f"user_audio_{session_id}_{uuid.uuid4().hex}.webm"
-            temp_audio_path = os.path.join(UPLOAD_DIR, temp_audio_filename)
-
             try:
-                with open(temp_audio_path, "wb") as f:
-                    f.write(audio_to_process)
-                logger.info(f"[{session_id}] Audio accumulé sauvegardé temporairement: {temp_audio_path}")
-
                 # Envoyer un signal au frontend que l'IA est en train de réfléchir
                 if session_id in self.active_connections: # Vérifier si la connexion est toujours active avant d'envoyer
                     await self.send_json(session_id, {"type": "AI_THINKING", "id_session": session_id})
                     logger.info(f"[{session_id}] Signal AI_THINKING envoyé.")
 
-                # Traiter la demande de l'utilisateur (transcription et réponse IA)
-                response_data = await moteur_diagnostic.traiter_demande_utilisateur(
-                    id_session=session_id,
-                    message_utilisateur=None,
-                    chemin_audio_utilisateur=temp_audio_path
-                )
+                transcription_flux = await self.terminer_flux(session_id, flux) if flux is not None else None
+                if transcription_flux:
+                    evenements = moteur_diagnostic.traiter_demande_utilisateur_flux(
+                        id_session=session_id,
+                        message_utilisateur=transcription_flux,
+                        audio_par_phrase=parametres.TTS_PIPELINE_ENABLED
+                    )
+                else:
+                    # Traiter la demande de l'utilisateur (transcription en mémoire et réponse IA)
+                    evenements = moteur_diagnostic.traiter_demande_utilisateur_flux(
+                        id_session=session_id,
+                        message_utilisateur=None,
+                        audio_octets=audio_to_process,
+                        format_audio=parametres.TELEASSISTANCE_AUDIO_FORMAT,
+                        audio_par_phrase=parametres.TTS_PIPELINE_ENABLED
+                    )
+                response_data = await self.relayer_reponse(session_id, evenements, transcription_flux)
 
                 # NOUVEAU LOGGING POUR DEBUG L'AUDIO
                 logger.info(f"[{session_id}] Réponse MoteurDiagnostic brute: {response_data}")
-                if "chemin_audio_reponse_ia" in response_data:
-                    logger.info(f"[{session_id}] Chemin audio réponse IA reçu: {response_data['chemin_audio_reponse_ia']}")
-                else:
+                if not response_data.get("chemin_audio_reponse_ia") and not any(response_data.get("segments_audio") or []):
                     logger.warning(f"[{session_id}] Pas de 'chemin_audio_reponse_ia' dans la réponse du MoteurDiagnostic. Vérifier le service TTS.")
 
-
-                # Envoyer la transcription de l'utilisateur au frontend
-                user_transcription = response_data.get("transcription_utilisateur", "")
-                if user_transcription and session_id in self.active_connections:
-                    await self.send_json(session_id, {"type": "USER_TRANSCRIPTION", "transcription": user_transcription, "id_session": session_id})
-                    logger.info(f"[{session_id}] Transcription utilisateur envoyée: '{user_transcription}'")
-
-                if os.path.exists(temp_audio_path):
-                    os.remove(temp_audio_path)
-                    logger.info(f"[{session_id}] Fichier audio utilisateur temporaire supprimé: {temp_audio_path}")
-
-                if response_data.get("chemin_audio_reponse_ia"):
-                    response_data["chemin_audio_reponse_ia"] = f"/audio_reponses/{os.path.basename(response_data['chemin_audio_reponse_ia'])}"
-                
-                # Ajouter le type de message pour que le frontend sache que c'est une réponse de l'IA
-                response_data["type"] = "AI_RESPONSE" 
-
-                if session_id in self.active_connections:
-                    await self.send_json(session_id, response_data)
-                    logger.info(f"[{session_id}] Réponse IA envoyée via WebSocket.")
-
             except Exception as e:
                 logger.error(f"[{session_id}] Erreur lors du traitement de l'audio accumulé: {e}", exc_info=True)
                 if session_id in self.active_connections:
@@ -148,19 +281,73 @@ class ConnectionManager:
             finally:
                 pass
 
-    async def handle_audio_processing_task(self, session_id: str, moteur_diagnostic: MoteurDiagnostic):
+    def annuler_minuteur_silence(self, session_id: str):
+        minuteur = self.silence_timers.pop(session_id, None)
+        if minuteur is not None:
+            minuteur.cancel()
+
+    def armer_minuteur_silence(self, session_id: str, moteur_diagnostic: MoteurDiagnostic):
+        """(Ré)arme le minuteur qui déclenche le traitement exactement SILENCE_DURATION_MS après le dernier chunk."""
+        self.annuler_minuteur_silence(session_id)
+        self.silence_timers[session_id] = asyncio.get_running_loop().call_later(
+            SILENCE_DURATION_MS / 1000.0, self.declencher_traitement, session_id, moteur_diagnostic
+        )
+
+    def declencher_traitement(self, session_id: str, moteur_diagnostic: MoteurDiagnostic):
+        """Lance le traitement de l'audio accumulé en tâche de fond (fin de silence ou fin d'énoncé détectée)."""
+        self.annuler_minuteur_silence(session_id)
+        if session_id not in self.active_connections or not self.audio_buffers.get(session_id):
+            return
+        # L'énoncé est extrait tout de suite : les chunks suivants forment le prochain énoncé,
+        # même si le traitement précédent occupe encore le verrou de la session.
+        self.processing_tasks[session_id] = asyncio.create_task(
+            self.process_accumulated_audio(
+                session_id, moteur_diagnostic, self.extraire_audio(session_id), self.flux_transcription.pop(session_id, None)
+            )
+        )
+
+    def recevoir_audio(self, session_id: str, audio_chunk: bytes, moteur_diagnostic: MoteurDiagnostic):
         """
-        Tâche en arrière-plan pour surveiller l'audio et déclencher le traitement après silence.
+        Ajoute un chunk au tampon de la session. Le traitement part dès que la détection
+        d'activité vocale (si active) signale une fin d'énoncé, sinon à l'expiration du
+        minuteur de silence, réarmé à chaque chunk. Sur un flux continu sans fin d'énoncé
+        détectée (bruit, parole ininterrompue), l'audio accumulé part aussi au traitement quand
+        le chunk ne tient plus dans le tampon ou que l'énoncé dépasse MAX_UTTERANCE_MS.
         """
-        while session_id in manager.active_connections:
-            await asyncio.sleep(CHECK_INTERVAL_MS / 1000.0)
-
-            current_time_in_task = asyncio.get_event_loop().time()
-            
-            if session_id in manager.audio_buffers and manager.audio_buffers[session_id] and \
-               (current_time_in_task - manager.last_audio_activity_time[session_id]) * 1000 >= SILENCE_DURATION_MS:
-                
-                await self.process_accumulated_audio(session_id, moteur_diagnostic)
+        maintenant = asyncio.get_running_loop().time()
+        tampon = self.audio_buffers[session_id]
+        detecteur = self.detecteurs_vad.get(session_id)
+        fin_enonce = detecteur is not None and detecteur.traiter(audio_chunk)
+        avant_parole = detecteur is not None and not fin_enonce and not detecteur.parole_en_cours
+        if avant_parole:
+            # Flux PCM continu : le silence qui précède la parole n'est pas conservé
+            tampon.vider()
+            self.flux_transcription.pop(session_id, None)
+        if tampon and len(tampon) + len(audio_chunk) > tampon.taille_max_octets:
+            logger.warning(f"[{session_id}] Tampon audio plein ({tampon.taille_max_octets} octets) : traitement sans attendre la fin de l'énoncé.")
+            self.declencher_traitement(session_id, moteur_diagnostic)
+        elif tampon and maintenant - self.debuts_enonce[session_id] >= MAX_UTTERANCE_MS / 1000.0:
+            logger.info(f"[{session_id}] Énoncé de plus de {MAX_UTTERANCE_MS} ms : traitement sans attendre la fin de l'énoncé.")
+            self.declencher_traitement(session_id, moteur_diagnostic)
+        if not tampon:
+            self.debuts_enonce[session_id] = maintenant
+        if tampon.ajouter(audio_chunk):
+            gestionnaire_vocal = moteur_diagnostic.gestionnaire_vocal
+            if not avant_parole and parametres.TELEASSISTANCE_AUDIO_FORMAT == "pcm" and gestionnaire_vocal.streaming:
+                flux = self.flux_transcription.get(session_id)
+                if flux is None:
+                    flux = self.flux_transcription[session_id] = gestionnaire_vocal.ouvrir_flux_transcription(parametres.TELEASSISTANCE_PCM_SAMPLE_RATE)
+                self.mettre_en_file_flux(session_id, flux, audio_chunk)
+        else:
+            logger.warning(f"[{session_id}] Chunk audio de {len(audio_chunk)} octets ignoré : plus grand que le tampon ({tampon.taille_max_octets} octets).")
+        self.last_audio_activity_time[session_id] = maintenant
+        logger.debug(f"[{session_id}] Reçu un chunk audio. Taille accumulée: {len(tampon)} bytes.")
+
+        if fin_enonce:
+            logger.debug(f"[{session_id}] Fin d'énoncé détectée dans le signal.")
+            self.declencher_traitement(session_id, moteur_diagnostic)
+        else:
+            self.armer_minuteur_silence(session_id, moteur_diagnostic)
 
 
 manager = ConnectionManager()
@@ -174,25 +361,17 @@ async def websocket_teleassistance_endpoint(
     """
     Point de terminaison WebSocket pour la téléassistance en temps réel.
     Reçoit des chunks audio, les traite, et renvoie des réponses textuelles et audio.
+    En PCM avec un moteur STT incrémental, des transcriptions partielles (USER_PARTIAL) sont envoyées pendant l'énoncé.
     """
     session_id = str(uuid.uuid4()) # Générer un ID de session unique pour le WebSocket
     await manager.connect(websocket, session_id)
-    
-    # Démarrer la tâche de traitement en arrière-plan pour cette session
-    manager.processing_tasks[session_id] = asyncio.create_task(
-        manager.handle_audio_processing_task(session_id, moteur_diagnostic)
-    )
 
     try:
         while True:
             data = await websocket.receive()
-            current_time = asyncio.get_event_loop().time() # Définir current_time ici
 
             if "bytes" in data:
-                audio_chunk = data["bytes"]
-                manager.audio_buffers[session_id] += audio_chunk
-                manager.last_audio_activity_time[session_id] = current_time
-                logger.debug(f"[{session_id}] Reçu un chunk audio. Taille accumulée: {len(manager.audio_buffers[session_id])} bytes.")
+                manager.recevoir_audio(session_id, data["bytes"], moteur_diagnostic)
 
             elif "text" in data:
                 message_content = json.loads(data["text"])
@@ -209,19 +388,14 @@ async def websocket_teleassistance_endpoint(
                             await manager.send_json(session_id, {"type": "AI_THINKING", "id_session": session_id})
                             logger.info(f"[{session_id}] Signal AI_THINKING envoyé pour message texte.")
 
-                        response_data = await moteur_diagnostic.traiter_demande_utilisateur(
-                            id_session=session_id,
-                            message_utilisateur=message_value,
-                            chemin_audio_utilisateur=None
+                        await manager.relayer_reponse(
+                            session_id,
+                            moteur_diagnostic.traiter_demande_utilisateur_flux(
+                                id_session=session_id,
+                                message_utilisateur=message_value,
+                                audio_par_phrase=parametres.TTS_PIPELINE_ENABLED
+                            )
                         )
-                        if response_data.get("chemin_audio_reponse_ia"):
-                            response_data["chemin_audio_reponse_ia"] = f"/audio_reponses/{os.path.basename(response_data['chemin_audio_reponse_ia'])}"
-                        
-                        response_data["type"] = "AI_RESPONSE" # Ajouter le type de message
-
-                        if session_id in manager.active_connections:
-                            await manager.send_json(session_id, response_data)
-                            logger.info(f"[{session_id}] Réponse IA pour message texte envoyée via WebSocket.")
                     except Exception as e:
                         logger.error(f"[{session_id}] Erreur lors du traitement du message texte via WebSocket: {e}", exc_info=True)
                         if session_id in manager.active_connections:
@@ -232,11 +406,8 @@ async def websocket_teleassistance_endpoint(
                 
                 elif message_type == "END_CALL":
                     logger.info(f"[{session_id}] Signal END_CALL reçu. Préparation à la fermeture.")
-                    # Annuler la tâche de traitement en arrière-plan pour cette session
-                    if session_id in manager.processing_tasks and not manager.processing_tasks[session_id].done():
-                        manager.processing_tasks[session_id].cancel()
-                        del manager.processing_tasks[session_id]
-                        logger.info(f"[{session_id}] Tâche de traitement en arrière-plan annulée.")
+                    # Désarmer le minuteur de silence : l'audio restant est traité ci-dessous
+                    manager.annuler_minuteur_silence(session_id)
 
                     # Traiter l'audio restant immédiatement et attendre sa complétion
                     if manager.audio_buffers[session_id]:
@@ -244,9 +415,14 @@ async def websocket_teleassistance_endpoint(
                         # Appeler directement la fonction de traitement, en attendant qu'elle finisse
                         await manager.process_accumulated_audio(session_id, moteur_diagnostic)
                     
-                    # Envoyer le message de confirmation de fin d'appel
+                    # Envoyer le message de confirmation de fin d'appel, avec son audio (servi par le cache audio)
                     # Cette fonction send_json vérifiera si la connexion est toujours active.
-                    await manager.send_json(session_id, {"type": "END_CALL_CONFIRM", "reponse_ia": "Au revoir ! Merci d'avoir utilisé le service de téléassistance.", "intention_detectee": "fin_appel", "recommandation_triage": "fin_appel", "id_session": session_id})
+                    chemin_audio_fin = await moteur_diagnostic.gestionnaire_vocal.generer_audio_depuis_texte(MESSAGE_FIN_APPEL)
+                    await manager.send_json(session_id, {
+                        "type": "END_CALL_CONFIRM", "reponse_ia": MESSAGE_FIN_APPEL,
+                        "chemin_audio_reponse_ia": url_audio_reponse(chemin_audio_fin),
+                        "intention_detectee": "fin_appel", "recommandation_triage": "fin_appel", "id_session": session_id
+                    })
                     logger.info(f"[{session_id}] Message END_CALL_CONFIRM envoyé (tentative).")
                     
                     # Sortir de la boucle pour laisser le bloc finally gérer la déconnexion.
@@ -0,0 +1,65 @@
+# app/base_de_donnees/acces_async.py
+import functools
+import logging
+from typing import Any, Callable, Dict
+
+from app.base_de_donnees import crud
+from app.base_de_donnees.connexion import get_db_connection
+from app.utilitaires.executeur_borne import ExecuteurBorne
+
+logger = logging.getLogger(__name__)
+
+
+class AccesDonneesAsync:
+    """
+    Chemin d'accès asynchrone à la couche CRUD.
+    Les fonctions synchrones de crud.py (pilote mysql.connector bloquant) sont exécutées
+    dans un pool de threads de taille fixe, chacune avec une connexion empruntée au pool
+    de connexions, afin de ne jamais bloquer la boucle d'événements.
+
+    Toute fonction de crud est accessible directement, sans le paramètre 'conn' :
+        patient = await acces_donnees.lire_patient_par_id(patient_id)
+    Pour plusieurs requêtes sur la même connexion (même transaction) :
+        resultat = await acces_donnees.executer_transaction(fonction, *args)
+    où 'fonction' reçoit la connexion en premier argument.
+    """
+    def __init__(self, nb_workers: int):
+        self._executeur = ExecuteurBorne(nb_workers, "acces_db")
+        logger.info(f"AccesDonneesAsync initialisé avec {nb_workers} threads.")
+
+    def __getattr__(self, nom: str) -> Callable[..., Any]:
+        fonction_crud = getattr(crud, nom)
+
+        async def appel(*args, **kwargs):
+            return await self.executer_transaction(fonction_crud, *args, **kwargs)
+        appel.__name__ = nom
+        return appel
+
+    @staticmethod
+    def _executer_avec_connexion(fonction: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Exécuté dans un thread du pool : emprunte une connexion, appelle la fonction, restitue la connexion."""
+        conn = get_db_connection()
+        if conn is None:
+            raise ConnectionError("Impossible d'obtenir une connexion à la base de données.")
+        try:
+            return fonction(conn, *args, **kwargs)
+        finally:
+            conn.close()
+
+    async def executer_transaction(self, fonction: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Exécute fonction(conn, *args, **kwargs) dans le pool de threads et attend son résultat.
+        Le contexte (contextvars) de l'appelant est propagé au thread ; une requête abandonnée
+        par l'appelant avant d'avoir obtenu un thread n'est jamais exécutée.
+        """
+        appel = functools.partial(self._executer_avec_connexion, fonction, args, kwargs)
+        return await self._executeur.executer(getattr(fonction, "__name__", "transaction"), appel)
+
+    def fermer(self):
+        """Attend la fin des requêtes en cours puis arrête le pool de threads."""
+        self._executeur.fermer(attendre=True)
+        logger.info("AccesDonneesAsync arrêté.")
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        """Retourne la profondeur de file et les durées d'exécution des requêtes, par fonction."""
+        return self._executeur.obtenir_statistiques()
@@ -1,9 +1,15 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errors
 import os
+import time
 import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from app.configuration.parametres import parametres
+from app.base_de_donnees.migrations import appliquer_migrations
 
 logger = logging.getLogger(__name__)
 
@@ -16,20 +22,326 @@ DB_CONFIG = {
     'port': parametres.DB_PORT,
 }
 
+# Bornes (en millisecondes) de l'histogramme des temps d'attente lors de l'emprunt d'une connexion
+SEAUX_HISTOGRAMME_ATTENTE_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolEpuiseError(Exception):
+    """Levée lorsqu'aucune connexion n'a pu être obtenue du pool avant l'expiration du délai d'attente."""
+    pass
+
+
+class CompteurRequetesSQL:
+    """Nombre de requêtes SQL exécutées pendant le traitement d'une requête HTTP."""
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.nombre = 0
+
+    def incrementer(self):
+        with self._verrou:
+            self.nombre += 1
+
+
+# Compteur de la requête HTTP en cours. L'objet (mutable) est partagé avec les threads
+# de AccesDonneesAsync, qui s'exécutent dans une copie du contexte de l'appelant.
+compteur_requetes_sql: ContextVar[Optional[CompteurRequetesSQL]] = ContextVar("compteur_requetes_sql", default=None)
+
+
+class CurseurCompte:
+    """Enveloppe un curseur MySQL et compte chaque execute()/executemany() dans le compteur courant."""
+    def __init__(self, curseur: Any):
+        self._curseur = curseur
+
+    def __getattr__(self, nom: str) -> Any:
+        return getattr(self._curseur, nom)
+
+    def __iter__(self):
+        return iter(self._curseur)
+
+    def execute(self, *args, **kwargs):
+        compteur = compteur_requetes_sql.get()
+        if compteur is not None:
+            compteur.incrementer()
+        return self._curseur.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        compteur = compteur_requetes_sql.get()
+        if compteur is not None:
+            compteur.incrementer()
+        return self._curseur.executemany(*args, **kwargs)
+
+
+class ConnexionPoolee:
+    """
+    Enveloppe une connexion MySQL empruntée au pool.
+    Toutes les méthodes sont déléguées à la connexion réelle, sauf close()
+    qui restitue la connexion au pool au lieu de la fermer. Après close(), l'enveloppe
+    ne référence plus la connexion (déjà prêtée à un autre emprunteur) : tout usage lève
+    une erreur au lieu d'agir sur la transaction d'un autre.
+    """
+    def __init__(self, pool: "PoolConnexions", connexion: Any):
+        self._pool = pool
+        self._connexion = connexion
+
+    def _connexion_empruntee(self) -> Any:
+        if self._connexion is None:
+            raise errors.OperationalError("Connexion déjà restituée au pool.")
+        return self._connexion
+
+    def __getattr__(self, nom: str) -> Any:
+        return getattr(self._connexion_empruntee(), nom)
+
+    def cursor(self, *args, **kwargs) -> CurseurCompte:
+        return CurseurCompte(self._connexion_empruntee().cursor(*args, **kwargs))
+
+    def close(self):
+        connexion, self._connexion = self._connexion, None
+        if connexion is not None:
+            self._pool.restituer(connexion)
+
+
+class PoolConnexions:
+    """
+    Pool borné de connexions MySQL.
+    - 'taille' connexions sont conservées ouvertes entre deux emprunts ;
+    - jusqu'à 'debordement_max' connexions supplémentaires peuvent être ouvertes en pointe,
+      elles sont fermées dès leur restitution ;
+    - chaque connexion est vérifiée (ping) à l'emprunt et recyclée lorsqu'elle est restée
+      inactive ou ouverte trop longtemps ;
+    - les emprunts au-delà de la capacité attendent au plus 'delai_attente_s' secondes ;
+    - après fermer(), les emprunts sont refusés et les connexions restituées sont fermées.
+    """
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        taille: int,
+        debordement_max: int,
+        delai_attente_s: float,
+        recyclage_s: float
+    ):
+        self._config = config
+        self._taille = taille
+        self._debordement_max = debordement_max
+        self._delai_attente_s = delai_attente_s
+        self._recyclage_s = recyclage_s
+        self._condition = threading.Condition()
+        self._ferme = False
+        # Connexions inactives : (connexion, horodatage_creation, horodatage_restitution)
+        self._inactives: Deque[Tuple[Any, float, float]] = deque()
+        # Horodatage de création de chaque connexion ouverte, indexé par id(connexion)
+        self._creations: Dict[int, float] = {}
+        self._nb_ouvertes = 0
+        self._nb_empruntees = 0
+        self._nb_en_attente = 0
+        self._total_emprunts = 0
+        self._total_creations = 0
+        self._total_recyclages = 0
+        self._total_echecs_verification = 0
+        self._total_delais_depasses = 0
+        self._cumul_attente_ms = 0.0
+        self._histogramme_attente: List[int] = [0] * (len(SEAUX_HISTOGRAMME_ATTENTE_MS) + 1)
+
+    def _ouvrir_connexion(self) -> Any:
+        connexion = mysql.connector.connect(**self._config)
+        with self._condition:
+            self._creations[id(connexion)] = time.monotonic()
+            self._total_creations += 1
+        logger.debug("Nouvelle connexion MySQL ouverte pour le pool.")
+        return connexion
+
+    def _fermer_connexion(self, connexion: Any):
+        with self._condition:
+            self._creations.pop(id(connexion), None)
+        try:
+            connexion.close()
+        except Error as e:
+            logger.debug(f"Erreur ignorée lors de la fermeture d'une connexion du pool : {e}")
+
+    def _enregistrer_attente(self, attente_ms: float):
+        # Appelé sous self._condition
+        self._cumul_attente_ms += attente_ms
+        for index, borne in enumerate(SEAUX_HISTOGRAMME_ATTENTE_MS):
+            if attente_ms <= borne:
+                self._histogramme_attente[index] += 1
+                return
+        self._histogramme_attente[-1] += 1
+
+    def emprunter(self) -> ConnexionPoolee:
+        """Emprunte une connexion saine au pool, en l'ouvrant si nécessaire."""
+        debut = time.monotonic()
+        echeance = debut + self._delai_attente_s
+        a_creer = False
+        connexion_inactive = None
+        with self._condition:
+            while True:
+                if self._ferme:
+                    raise PoolEpuiseError("Le pool de connexions est fermé.")
+                if self._inactives:
+                    # LIFO : on réutilise la connexion la plus récemment restituée (la plus « chaude »)
+                    connexion_inactive = self._inactives.pop()
+                    break
+                if self._nb_ouvertes < self._taille + self._debordement_max:
+                    self._nb_ouvertes += 1
+                    a_creer = True
+                    break
+                restant = echeance - time.monotonic()
+                if restant <= 0:
+                    self._total_delais_depasses += 1
+                    raise PoolEpuiseError(
+                        f"Aucune connexion disponible après {self._delai_attente_s}s "
+                        f"({self._nb_empruntees} empruntées, {self._nb_en_attente} en attente)."
+                    )
+                self._nb_en_attente += 1
+                try:
+                    self._condition.wait(restant)
+                finally:
+                    self._nb_en_attente -= 1
+            self._nb_empruntees += 1
+            self._total_emprunts += 1
+            self._enregistrer_attente((time.monotonic() - debut) * 1000)
+
+        try:
+            if a_creer:
+                connexion = self._ouvrir_connexion()
+            else:
+                connexion = self._verifier_connexion(*connexion_inactive)
+        except Exception:
+            # L'ouverture a échoué : libérer la place réservée et réveiller un éventuel emprunteur en attente
+            with self._condition:
+                self._nb_ouvertes -= 1
+                self._nb_empruntees -= 1
+                self._condition.notify()
+            raise
+        return ConnexionPoolee(self, connexion)
+
+    def _verifier_connexion(self, connexion: Any, horodatage_creation: float, horodatage_restitution: float) -> Any:
+        """Recycle une connexion trop ancienne ou inactive depuis trop longtemps, puis vérifie qu'elle répond."""
+        maintenant = time.monotonic()
+        if self._recyclage_s > 0 and (
+            maintenant - horodatage_creation > self._recyclage_s
+            or maintenant - horodatage_restitution > self._recyclage_s
+        ):
+            logger.debug("Connexion MySQL recyclée (durée de vie ou inactivité dépassée).")
+            with self._condition:
+                self._total_recyclages += 1
+            self._fermer_connexion(connexion)
+            return self._ouvrir_connexion()
+        if not connexion.is_connected():
+            logger.warning("Connexion MySQL du pool invalide à l'emprunt ; remplacement.")
+            with self._condition:
+                self._total_echecs_verification += 1
+            self._fermer_connexion(connexion)
+            return self._ouvrir_connexion()
+        return connexion
+
+    def restituer(self, connexion: Any):
+        """Remet une connexion à disposition, ou la ferme si elle relève du débordement."""
+        garder = False
+        try:
+            # Termine la transaction éventuellement ouverte par des lectures afin que
+            # l'emprunteur suivant ne travaille pas sur un instantané périmé.
+            connexion.rollback()
+            garder = True
+        except Error as e:
+            logger.warning(f"Connexion MySQL défaillante à la restitution, elle sera fermée : {e}")
+
+        with self._condition:
+            self._nb_empruntees -= 1
+            horodatage_creation = self._creations.get(id(connexion), time.monotonic())
+            if garder and not self._ferme and len(self._inactives) < self._taille:
+                self._inactives.append((connexion, horodatage_creation, time.monotonic()))
+                self._condition.notify()
+                return
+            self._nb_ouvertes -= 1
+            self._condition.notify()
+        self._fermer_connexion(connexion)
+
+    def fermer(self):
+        """
+        Ferme toutes les connexions inactives du pool. Les connexions encore empruntées
+        seront fermées à leur restitution, et les emprunteurs en attente sont refusés.
+        """
+        with self._condition:
+            self._ferme = True
+            inactives = list(self._inactives)
+            self._inactives.clear()
+            self._nb_ouvertes -= len(inactives)
+            self._condition.notify_all()
+        for connexion, _, _ in inactives:
+            self._fermer_connexion(connexion)
+        logger.info(f"Pool de connexions MySQL fermé ({len(inactives)} connexions inactives fermées).")
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        """Retourne un instantané des métriques du pool."""
+        with self._condition:
+            seaux = {f"<={borne}ms": self._histogramme_attente[i] for i, borne in enumerate(SEAUX_HISTOGRAMME_ATTENTE_MS)}
+            seaux[f">{SEAUX_HISTOGRAMME_ATTENTE_MS[-1]}ms"] = self._histogramme_attente[-1]
+            return {
+                "taille": self._taille,
+                "debordement_max": self._debordement_max,
+                "ouvertes": self._nb_ouvertes,
+                "empruntees": self._nb_empruntees,
+                "inactives": len(self._inactives),
+                "en_attente": self._nb_en_attente,
+                "total_emprunts": self._total_emprunts,
+                "total_creations": self._total_creations,
+                "total_recyclages": self._total_recyclages,
+                "total_echecs_verification": self._total_echecs_verification,
+                "total_delais_depasses": self._total_delais_depasses,
+                "attente_moyenne_ms": round(self._cumul_attente_ms / self._total_emprunts, 3) if self._total_emprunts else 0.0,
+                "histogramme_attente_ms": seaux,
+            }
+
+
+_pool_connexions: Optional[PoolConnexions] = None
+_verrou_creation_pool = threading.Lock()
+
+def creer_pool_connexions() -> PoolConnexions:
+    """Crée le pool de connexions global s'il n'existe pas encore et le retourne."""
+    global _pool_connexions
+    if _pool_connexions is None:
+        with _verrou_creation_pool:
+            if _pool_connexions is None:
+                _pool_connexions = PoolConnexions(
+                    DB_CONFIG,
+                    taille=parametres.DB_POOL_SIZE,
+                    debordement_max=parametres.DB_MAX_OVERFLOW,
+                    delai_attente_s=parametres.DB_POOL_TIMEOUT,
+                    recyclage_s=parametres.DB_POOL_RECYCLE
+                )
+                logger.info(f"Pool de connexions MySQL créé (taille={parametres.DB_POOL_SIZE}, débordement={parametres.DB_MAX_OVERFLOW}).")
+    return _pool_connexions
+
 def get_db_connection():
-    """Établit et retourne une connexion à la base de données MySQL."""
+    """
+    Emprunte une connexion MySQL au pool global.
+    La connexion doit être restituée avec conn.close() (ou close_db_connection).
+    """
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        if connection.is_connected():
-            logger.debug("Connexion à la base de données MySQL réussie.")
-        else:
-            logger.error("Connexion à la base de données MySQL échouée.")
-            return None
+        connection = creer_pool_connexions().emprunter()
+        logger.debug("Connexion MySQL empruntée au pool.")
+    except PoolEpuiseError as e:
+        logger.error(f"Pool de connexions MySQL épuisé : {e}")
+        return None
     except Error as e:
         logger.error(f"Erreur lors de la connexion à MySQL : {e}", exc_info=True)
         return None
     return connection
 
+def close_db_connection(connection):
+    """Restitue une connexion empruntée au pool."""
+    if connection:
+        connection.close()
+
+def fermer_pool_connexions():
+    """Ferme les connexions inactives du pool global (arrêt de l'application)."""
+    if _pool_connexions is not None:
+        _pool_connexions.fermer()
+
+def obtenir_statistiques_pool() -> Dict[str, Any]:
+    """Retourne les métriques du pool global (emprunts en cours, attentes, histogramme des temps d'attente)."""
+    return creer_pool_connexions().obtenir_statistiques()
+
 def init_db():
     """
     Initialise la base de données MySQL en exécutant le schéma SQL.
@@ -58,6 +370,8 @@ def init_db():
 
         # Reconnexion à la base de données spécifique
         conn = get_db_connection()
+        if conn is None:
+            raise ConnectionError("Aucune connexion disponible dans le pool.")
         cursor = conn.cursor()
 
         schema_file_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
@@ -82,6 +396,10 @@ def init_db():
 
         conn.commit()
         logger.info("Base de données initialisée avec le schéma SQL.")
+
+        migrations_appliquees = appliquer_migrations(conn)
+        if migrations_appliquees:
+            logger.info(f"Migrations appliquées : {', '.join(migrations_appliquees)}")
     except ConnectionError:
         logger.critical("Impossible d'établir une connexion à MySQL pour l'initialisation de la base de données.")
     except Error as e:
@@ -91,7 +409,6 @@ def init_db():
     except FileNotFoundError as e:
         logger.error(f"Erreur: {e}")
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
+        if conn:
             conn.close()
             logger.debug("Connexion MySQL fermée après initialisation.")
@@ -1,33 +1,68 @@
 # app/base_de_donnees/crud.py
 import sqlite3 # Garder pour compatibilité si des fonctions l'utilisent encore, mais pour MySQL, ce n'est plus pertinent
 import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from mysql import connector as mysql 
 
 # Import de la nouvelle fonction de connexion MySQL
 from app.base_de_donnees.connexion import get_db_connection # <-- MODIFIÉ
+from app.utilitaires.geographie import parser_coordonnees_gps
 
 from app.base_de_donnees.modeles import (
     UserCreer, UserEnDB, PatientCreer, PatientEnDB, MedecinCreer, MedecinEnDB,
     StructureMedicaleCreer, StructureMedicaleEnDB, ContexteConversationBase,
     ContexteConversationEnDB, LogConversationCreer, LogConversationEnDB,
-    RendezVousCreer, RendezVousEnDB
+    RendezVousCreer, RendezVousEnDB,
+    MaladieCreer, MaladieEnDB, SymptomeCreer, SymptomeEnDB,
+    MaladieSymptomeLienCreer, MaladieSymptomeLienEnDB
 )
+
+def _horodatage_actuel() -> datetime:
+    """
+    Horodatage envoyé explicitement dans les INSERT/UPDATE à la place de CURRENT_TIMESTAMP,
+    afin de construire le modèle retourné sans relire la ligne (précision TIMESTAMP : la seconde).
+    """
+    return datetime.now().replace(microsecond=0)
+
+def _colonnes_position(coordonnees_gps: Optional[str]) -> Dict[str, Optional[float]]:
+    """Colonnes numériques 'latitude' / 'longitude' dérivées de 'coordonnees_gps' (NULL si invalides)."""
+    coordonnees = parser_coordonnees_gps(coordonnees_gps)
+    if coordonnees is None:
+        return {"latitude": None, "longitude": None}
+    return {"latitude": coordonnees[0], "longitude": coordonnees[1]}
+
+def _clause_zone(latitude_min: float, latitude_max: float, plages_longitude: List[Tuple[float, float]]) -> Tuple[str, List[float]]:
+    """Clause WHERE d'une boîte englobante (voir utilitaires.geographie.boite_englobante)."""
+    valeurs = [latitude_min, latitude_max]
+    conditions_longitude = []
+    for longitude_min, longitude_max in plages_longitude:
+        conditions_longitude.append("longitude BETWEEN %s AND %s")
+        valeurs.extend([longitude_min, longitude_max])
+    return f"latitude BETWEEN %s AND %s AND ({' OR '.join(conditions_longitude)})", valeurs
+
 # --- Opérations CRUD pour les utilisateurs ---
 def creer_user(conn: Any, user: UserCreer) -> Optional[UserEnDB]: # Type conn Any pour flexibilité
     """Crée un nouvel utilisateur dans la base de données."""
     cursor = conn.cursor()
     try:
+        date_creation = _horodatage_actuel()
         query = """
-        INSERT INTO users (firebase_uid, email, role)
-        VALUES (%s, %s, %s)
+        INSERT INTO users (firebase_uid, email, role, est_actif, date_creation)
+        VALUES (%s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (user.firebase_uid, user.email, user.role))
+        cursor.execute(query, (user.firebase_uid, user.email, user.role, 1, date_creation))
         conn.commit()
         user_id = cursor.lastrowid
         if user_id:
-            return lire_user_par_id(conn, user_id)
+            return UserEnDB(
+                id=user_id,
+                firebase_uid=user.firebase_uid,
+                email=user.email,
+                role=user.role,
+                est_actif=True,
+                date_creation=date_creation
+            )
         return None
     except mysql.connector.Error as e: # Utiliser l'erreur spécifique à mysql.connector
         if "Duplicate entry" in str(e) and "for key 'users.email'" in str(e):
@@ -111,29 +146,38 @@ def lire_user_par_firebase_uid(conn: Any, firebase_uid: str) -> Optional[UserEnD
         )
     return None
 
-def mettre_a_jour_user(conn: Any, user_id: int, updates: Dict[str, Any]) -> Optional[UserEnDB]:
-    """Met à jour les informations d'un utilisateur."""
+def mettre_a_jour_user(conn: Any, user_id: int, updates: Dict[str, Any], existant: Optional[UserEnDB] = None) -> Optional[UserEnDB]:
+    """
+    Met à jour les informations d'un utilisateur.
+    Si 'existant' (l'utilisateur déjà lu par l'appelant) est fourni, le modèle retourné
+    est construit à partir de celui-ci et des valeurs écrites, sans relecture.
+    """
     cursor = conn.cursor()
     try:
         set_clauses = []
         values = []
+        champs_appliques = {}
         for key, value in updates.items():
             if key in ["date_creation", "firebase_uid", "email", "id"]: # Ces champs ne devraient pas être mis à jour ici
                 continue
             if key == "est_actif":
                 values.append(int(value)) # Convertir bool en int pour MySQL BOOLEAN
+                champs_appliques[key] = bool(value)
             else:
                 values.append(value)
+                champs_appliques[key] = value
             set_clauses.append(f"{key} = %s")
 
         if not set_clauses:
-            return lire_user_par_id(conn, user_id)
+            return existant if existant is not None else lire_user_par_id(conn, user_id)
 
         query = f"UPDATE users SET {', '.join(set_clauses)} WHERE id = %s"
         values.append(user_id)
         
         cursor.execute(query, tuple(values))
         conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=champs_appliques)
         return lire_user_par_id(conn, user_id)
     except mysql.connector.Error as e:
         conn.rollback()
@@ -179,7 +223,7 @@ def creer_patient(conn: Any, patient: PatientCreer) -> Optional[PatientEnDB]:
         conn.commit()
         patient_id = cursor.lastrowid
         if patient_id:
-            return lire_patient_par_id(conn, patient_id)
+            return PatientEnDB(id=patient_id, **patient.model_dump())
         return None
     except mysql.connector.Error as e:
         conn.rollback()
@@ -218,8 +262,11 @@ def lire_patient_par_user_id(conn: Any, user_id: int) -> Optional[PatientEnDB]:
         )
     return None
 
-def mettre_a_jour_patient(conn: Any, patient_id: int, updates: Dict[str, Any]) -> Optional[PatientEnDB]:
-    """Met à jour les informations d'un patient."""
+def mettre_a_jour_patient(conn: Any, patient_id: int, updates: Dict[str, Any], existant: Optional[PatientEnDB] = None) -> Optional[PatientEnDB]:
+    """
+    Met à jour les informations d'un patient.
+    Si 'existant' est fourni, le modèle retourné est construit sans relecture.
+    """
     cursor = conn.cursor()
     try:
         set_clauses = []
@@ -229,13 +276,15 @@ def mettre_a_jour_patient(conn: Any, patient_id: int, updates: Dict[str, Any]) -
             values.append(value)
 
         if not set_clauses:
-            return lire_patient_par_id(conn, patient_id)
+            return existant if existant is not None else lire_patient_par_id(conn, patient_id)
 
         query = f"UPDATE patients SET {', '.join(set_clauses)} WHERE id = %s"
         values.append(patient_id)
         
         cursor.execute(query, tuple(values))
         conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=updates)
         return lire_patient_par_id(conn, patient_id)
     except mysql.connector.Error as e:
         conn.rollback()
@@ -264,22 +313,47 @@ def supprimer_patient(conn: Any, patient_id: int) -> bool:
         cursor.close()
 
 # --- Opérations CRUD pour les médecins ---
+COLONNES_MEDECIN = "id, user_id, nom, prenom, specialite, numero_licence, adresse_cabinet, telephone_cabinet, coordonnees_gps, disponibilites_json"
+
+def _charger_dict_json(valeur: Any) -> Optional[Dict[str, Any]]:
+    """Convertit une colonne JSON (chaîne, bytes ou dictionnaire déjà décodé) en dictionnaire Python."""
+    if valeur is None:
+        return None
+    if isinstance(valeur, bytes):
+        valeur = valeur.decode('utf-8')
+    if isinstance(valeur, str):
+        try:
+            valeur = json.loads(valeur)
+        except json.JSONDecodeError:
+            return None
+    return valeur if isinstance(valeur, dict) else None
+
+def _ligne_vers_medecin(row: Dict[str, Any]) -> MedecinEnDB:
+    return MedecinEnDB(
+        id=row['id'], user_id=row['user_id'], nom=row['nom'], prenom=row['prenom'], specialite=row['specialite'],
+        numero_licence=row['numero_licence'], adresse_cabinet=row['adresse_cabinet'], telephone_cabinet=row['telephone_cabinet'],
+        coordonnees_gps=row['coordonnees_gps'], disponibilites_json=_charger_dict_json(row['disponibilites_json'])
+    )
+
 def creer_medecin(conn: Any, medecin: MedecinCreer) -> Optional[MedecinEnDB]:
     """Crée un nouveau profil médecin."""
     cursor = conn.cursor()
     try:
         query = """
-        INSERT INTO medecins (user_id, nom, prenom, specialite, numero_licence, adresse_cabinet, telephone_cabinet)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO medecins (user_id, nom, prenom, specialite, numero_licence, adresse_cabinet, telephone_cabinet, coordonnees_gps, latitude, longitude, disponibilites_json)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
+        position = _colonnes_position(medecin.coordonnees_gps)
+        disponibilites = json.dumps(medecin.disponibilites_json) if medecin.disponibilites_json is not None else None
         cursor.execute(
             query,
-            (medecin.user_id, medecin.nom, medecin.prenom, medecin.specialite, medecin.numero_licence, medecin.adresse_cabinet, medecin.telephone_cabinet)
+            (medecin.user_id, medecin.nom, medecin.prenom, medecin.specialite, medecin.numero_licence, medecin.adresse_cabinet, medecin.telephone_cabinet, medecin.coordonnees_gps,
+             position["latitude"], position["longitude"], disponibilites)
         )
         conn.commit()
         medecin_id = cursor.lastrowid
         if medecin_id:
-            return lire_medecin_par_id(conn, medecin_id)
+            return MedecinEnDB(id=medecin_id, **medecin.model_dump())
         return None
     except mysql.connector.Error as e:
         conn.rollback()
@@ -295,49 +369,72 @@ def creer_medecin(conn: Any, medecin: MedecinCreer) -> Optional[MedecinEnDB]:
 def lire_medecin_par_id(conn: Any, medecin_id: int) -> Optional[MedecinEnDB]:
     """Lit un profil médecin par son ID."""
     cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, user_id, nom, prenom, specialite, numero_licence, adresse_cabinet, telephone_cabinet FROM medecins WHERE id = %s"
+    query = f"SELECT {COLONNES_MEDECIN} FROM medecins WHERE id = %s"
     cursor.execute(query, (medecin_id,))
     row = cursor.fetchone()
     cursor.close()
     if row:
-        return MedecinEnDB(
-            id=row['id'], user_id=row['user_id'], nom=row['nom'], prenom=row['prenom'], specialite=row['specialite'],
-            numero_licence=row['numero_licence'], adresse_cabinet=row['adresse_cabinet'], telephone_cabinet=row['telephone_cabinet']
-        )
+        return _ligne_vers_medecin(row)
     return None
 
 def lire_medecin_par_user_id(conn: Any, user_id: int) -> Optional[MedecinEnDB]:
     """Lit un profil médecin par l'ID de l'utilisateur associé."""
     cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, user_id, nom, prenom, specialite, numero_licence, adresse_cabinet, telephone_cabinet FROM medecins WHERE user_id = %s"
+    query = f"SELECT {COLONNES_MEDECIN} FROM medecins WHERE user_id = %s"
     cursor.execute(query, (user_id,))
     row = cursor.fetchone()
     cursor.close()
     if row:
-        return MedecinEnDB(
-            id=row['id'], user_id=row['user_id'], nom=row['nom'], prenom=row['prenom'], specialite=row['specialite'],
-            numero_licence=row['numero_licence'], adresse_cabinet=row['adresse_cabinet'], telephone_cabinet=row['telephone_cabinet']
-        )
+        return _ligne_vers_medecin(row)
     return None
 
-def mettre_a_jour_medecin(conn: Any, medecin_id: int, updates: Dict[str, Any]) -> Optional[MedecinEnDB]:
-    """Met à jour les informations d'un médecin."""
+def lire_medecins_geolocalises(conn: Any) -> List[MedecinEnDB]:
+    """Lit tous les médecins ayant des coordonnées GPS (construction de l'index spatial)."""
+    cursor = conn.cursor(dictionary=True)
+    query = f"SELECT {COLONNES_MEDECIN} FROM medecins WHERE coordonnees_gps IS NOT NULL"
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    cursor.close()
+    return [_ligne_vers_medecin(row) for row in rows]
+
+def lire_medecins_dans_zone(conn: Any, latitude_min: float, latitude_max: float, plages_longitude: List[Tuple[float, float]]) -> List[MedecinEnDB]:
+    """Lit les médecins situés dans une boîte englobante (préfiltre des recherches de proximité)."""
+    clause, valeurs = _clause_zone(latitude_min, latitude_max, plages_longitude)
+    cursor = conn.cursor(dictionary=True)
+    query = f"SELECT {COLONNES_MEDECIN} FROM medecins WHERE {clause}"
+    cursor.execute(query, tuple(valeurs))
+    rows = cursor.fetchall()
+    cursor.close()
+    return [_ligne_vers_medecin(row) for row in rows]
+
+def mettre_a_jour_medecin(conn: Any, medecin_id: int, updates: Dict[str, Any], existant: Optional[MedecinEnDB] = None) -> Optional[MedecinEnDB]:
+    """
+    Met à jour les informations d'un médecin.
+    Si 'existant' est fourni, le modèle retourné est construit sans relecture.
+    """
     cursor = conn.cursor()
     try:
+        colonnes = dict(updates)
+        if "coordonnees_gps" in updates:
+            colonnes.update(_colonnes_position(updates["coordonnees_gps"]))
+        if colonnes.get("disponibilites_json") is not None:
+            colonnes["disponibilites_json"] = json.dumps(colonnes["disponibilites_json"])
         set_clauses = []
         values = []
-        for key, value in updates.items():
+        for key, value in colonnes.items():
             set_clauses.append(f"{key} = %s")
             values.append(value)
 
         if not set_clauses:
-            return lire_medecin_par_id(conn, medecin_id)
+            return existant if existant is not None else lire_medecin_par_id(conn, medecin_id)
 
         query = f"UPDATE medecins SET {', '.join(set_clauses)} WHERE id = %s"
         values.append(medecin_id)
         
         cursor.execute(query, tuple(values))
         conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=updates)
         return lire_medecin_par_id(conn, medecin_id)
     except mysql.connector.Error as e:
         conn.rollback()
@@ -373,17 +470,19 @@ def creer_structure_medicale(conn: Any, structure: StructureMedicaleCreer) -> Op
     cursor = conn.cursor()
     try:
         query = """
-        INSERT INTO structures_medicales (user_id, nom_structure, type_structure, adresse, telephone)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO structures_medicales (user_id, nom_structure, type_structure, adresse, telephone, coordonnees_gps, latitude, longitude)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
+        position = _colonnes_position(structure.coordonnees_gps)
         cursor.execute(
             query,
-            (structure.user_id, structure.nom_structure, structure.type_structure, structure.adresse, structure.telephone)
+            (structure.user_id, structure.nom_structure, structure.type_structure, structure.adresse, structure.telephone, structure.coordonnees_gps,
+             position["latitude"], position["longitude"])
         )
         conn.commit()
         structure_id = cursor.lastrowid
         if structure_id:
-            return lire_structure_medicale_par_id(conn, structure_id)
+            return StructureMedicaleEnDB(id=structure_id, **structure.model_dump())
         return None
     except mysql.connector.Error as e:
         conn.rollback()
@@ -397,49 +496,82 @@ def creer_structure_medicale(conn: Any, structure: StructureMedicaleCreer) -> Op
 def lire_structure_medicale_par_id(conn: Any, structure_id: int) -> Optional[StructureMedicaleEnDB]:
     """Lit un profil de structure médicale par son ID."""
     cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, user_id, nom_structure, type_structure, adresse, telephone FROM structures_medicales WHERE id = %s"
+    query = "SELECT id, user_id, nom_structure, type_structure, adresse, telephone, coordonnees_gps FROM structures_medicales WHERE id = %s"
     cursor.execute(query, (structure_id,))
     row = cursor.fetchone()
     cursor.close()
     if row:
         return StructureMedicaleEnDB(
             id=row['id'], user_id=row['user_id'], nom_structure=row['nom_structure'], type_structure=row['type_structure'],
-            adresse=row['adresse'], telephone=row['telephone']
+            adresse=row['adresse'], telephone=row['telephone'], coordonnees_gps=row['coordonnees_gps']
         )
     return None
 
 def lire_structure_medicale_par_user_id(conn: Any, user_id: int) -> Optional[StructureMedicaleEnDB]:
     """Lit un profil de structure médicale par l'ID de l'utilisateur associé."""
     cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, user_id, nom_structure, type_structure, adresse, telephone FROM structures_medicales WHERE user_id = %s"
+    query = "SELECT id, user_id, nom_structure, type_structure, adresse, telephone, coordonnees_gps FROM structures_medicales WHERE user_id = %s"
     cursor.execute(query, (user_id,))
     row = cursor.fetchone()
     cursor.close()
     if row:
         return StructureMedicaleEnDB(
             id=row['id'], user_id=row['user_id'], nom_structure=row['nom_structure'], type_structure=row['type_structure'],
-            adresse=row['adresse'], telephone=row['telephone']
+            adresse=row['adresse'], telephone=row['telephone'], coordonnees_gps=row['coordonnees_gps']
         )
     return None
 
-def mettre_a_jour_structure_medicale(conn: Any, structure_id: int, updates: Dict[str, Any]) -> Optional[StructureMedicaleEnDB]:
-    """Met à jour les informations d'une structure médicale."""
+def lire_structures_medicales_geolocalisees(conn: Any) -> List[StructureMedicaleEnDB]:
+    """Lit toutes les structures médicales ayant des coordonnées GPS (construction de l'index spatial)."""
+    cursor = conn.cursor(dictionary=True)
+    query = (
+        "SELECT id, user_id, nom_structure, type_structure, adresse, telephone, coordonnees_gps "
+        "FROM structures_medicales WHERE coordonnees_gps IS NOT NULL"
+    )
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    cursor.close()
+    return [StructureMedicaleEnDB(**row) for row in rows]
+
+def lire_structures_medicales_dans_zone(conn: Any, latitude_min: float, latitude_max: float, plages_longitude: List[Tuple[float, float]]) -> List[StructureMedicaleEnDB]:
+    """Lit les structures médicales situées dans une boîte englobante (préfiltre des recherches de proximité)."""
+    clause, valeurs = _clause_zone(latitude_min, latitude_max, plages_longitude)
+    cursor = conn.cursor(dictionary=True)
+    query = (
+        "SELECT id, user_id, nom_structure, type_structure, adresse, telephone, coordonnees_gps "
+        f"FROM structures_medicales WHERE {clause}"
+    )
+    cursor.execute(query, tuple(valeurs))
+    rows = cursor.fetchall()
+    cursor.close()
+    return [StructureMedicaleEnDB(**row) for row in rows]
+
+def mettre_a_jour_structure_medicale(conn: Any, structure_id: int, updates: Dict[str, Any], existant: Optional[StructureMedicaleEnDB] = None) -> Optional[StructureMedicaleEnDB]:
+    """
+    Met à jour les informations d'une structure médicale.
+    Si 'existant' est fourni, le modèle retourné est construit sans relecture.
+    """
     cursor = conn.cursor()
     try:
+        colonnes = dict(updates)
+        if "coordonnees_gps" in updates:
+            colonnes.update(_colonnes_position(updates["coordonnees_gps"]))
         set_clauses = []
         values = []
-        for key, value in updates.items():
+        for key, value in colonnes.items():
             set_clauses.append(f"{key} = %s")
             values.append(value)
 
         if not set_clauses:
-            return lire_structure_medicale_par_id(conn, structure_id)
+            return existant if existant is not None else lire_structure_medicale_par_id(conn, structure_id)
 
         query = f"UPDATE structures_medicales SET {', '.join(set_clauses)} WHERE id = %s"
         values.append(structure_id)
         
         cursor.execute(query, tuple(values))
         conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=updates)
         return lire_structure_medicale_par_id(conn, structure_id)
     except mysql.connector.Error as e:
         conn.rollback()
@@ -474,14 +606,21 @@ def creer_ou_mettre_a_jour_contexte_conversation(conn: Any, contexte: ContexteCo
     try:
         # MySQL utilise REPLACE INTO ou INSERT ... ON DUPLICATE KEY UPDATE
         # Pour le type JSON, il faut s'assurer que la chaîne JSON est valide.
+        # LAST_INSERT_ID(id) fait renvoyer l'id de la ligne existante par lastrowid en cas de mise à jour.
+        derniere_mise_a_jour = _horodatage_actuel()
         query = """
-        INSERT INTO contextes_conversation (id_session, historique_json)
-        VALUES (%s, %s)
-        ON DUPLICATE KEY UPDATE historique_json = VALUES(historique_json), derniere_mise_a_jour = CURRENT_TIMESTAMP
+        INSERT INTO contextes_conversation (id_session, historique_json, derniere_mise_a_jour)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id), historique_json = VALUES(historique_json), derniere_mise_a_jour = VALUES(derniere_mise_a_jour)
         """
-        cursor.execute(query, (contexte.id_session, contexte.historique_json))
+        cursor.execute(query, (contexte.id_session, contexte.historique_json, derniere_mise_a_jour))
         conn.commit()
-        return lire_contexte_conversation_par_session_id(conn, contexte.id_session)
+        return ContexteConversationEnDB(
+            id=cursor.lastrowid,
+            id_session=contexte.id_session,
+            historique_json=contexte.historique_json,
+            derniere_mise_a_jour=derniere_mise_a_jour
+        )
     except mysql.connector.Error as e:
         conn.rollback()
         raise Exception(f"Erreur lors de la création/mise à jour du contexte de conversation: {e}")
@@ -540,9 +679,10 @@ def ajouter_log_conversation(conn: Any, log: LogConversationCreer) -> LogConvers
     """Ajoute un log de conversation."""
     cursor = conn.cursor()
     try:
+        horodatage = _horodatage_actuel()
         query = """
-        INSERT INTO logs_conversation (id_session, role, message, type_message, donnees_structurees)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO logs_conversation (id_session, role, message, type_message, donnees_structurees, horodatage)
+        VALUES (%s, %s, %s, %s, %s, %s)
         """
         # Convertir les données structurées en JSON string si ce n'est pas déjà le cas
         donnees_structurees_json = log.donnees_structurees
@@ -551,12 +691,18 @@ def ajouter_log_conversation(conn: Any, log: LogConversationCreer) -> LogConvers
 
         cursor.execute(
             query,
-            (log.id_session, log.role, log.message, log.type_message, donnees_structurees_json)
+            (log.id_session, log.role, log.message, log.type_message, donnees_structurees_json, horodatage)
         )
         conn.commit()
-        log_id = cursor.lastrowid
-        # Récupérer le log fraîchement créé pour retourner le modèle complet
-        return lire_log_conversation_par_id(conn, log_id)
+        return LogConversationEnDB(
+            id=cursor.lastrowid,
+            id_session=log.id_session,
+            role=log.role,
+            message=log.message,
+            horodatage=horodatage,
+            type_message=log.type_message,
+            donnees_structurees=donnees_structurees_json
+        )
     except mysql.connector.Error as e:
         conn.rollback()
         raise Exception(f"Erreur lors de l'ajout du log de conversation: {e}")
@@ -566,6 +712,44 @@ def ajouter_log_conversation(conn: Any, log: LogConversationCreer) -> LogConvers
     finally:
         cursor.close()
 
+def ajouter_logs_conversation_en_lot(conn: Any, logs: List[Dict[str, Any]]) -> int:
+    """
+    Insère plusieurs logs de conversation en une seule requête INSERT multi-lignes.
+    Chaque log est un dictionnaire (id_session, role, message, type_message, donnees_structurees, horodatage).
+    Retourne le nombre de lignes insérées.
+    """
+    if not logs:
+        return 0
+    cursor = conn.cursor()
+    try:
+        query = """
+        INSERT INTO logs_conversation (id_session, role, message, type_message, donnees_structurees, horodatage)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        valeurs = []
+        for log in logs:
+            donnees_structurees_json = log.get('donnees_structurees')
+            if isinstance(donnees_structurees_json, dict):
+                donnees_structurees_json = json.dumps(donnees_structurees_json)
+            horodatage = log['horodatage']
+            if isinstance(horodatage, str):
+                horodatage = datetime.fromisoformat(horodatage)
+            valeurs.append(
+                (log['id_session'], log['role'], log['message'], log.get('type_message'), donnees_structurees_json, horodatage)
+            )
+        # mysql.connector réécrit executemany() d'un INSERT ... VALUES en une seule requête multi-lignes
+        cursor.executemany(query, valeurs)
+        conn.commit()
+        return cursor.rowcount
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de l'ajout d'un lot de {len(logs)} logs de conversation: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de l'ajout d'un lot de logs de conversation: {e}")
+    finally:
+        cursor.close()
+
 def lire_log_conversation_par_id(conn: Any, log_id: int) -> Optional[LogConversationEnDB]:
     """Lit un log de conversation par son ID."""
     cursor = conn.cursor(dictionary=True)
@@ -634,6 +818,29 @@ def lire_logs_conversation_par_session_id(conn: Any, id_session: str, limit: Opt
         )
     return results
 
+def lire_messages_utilisateur_logs_conversation(conn: Any, limite: int) -> List[Dict[str, Any]]:
+    """
+    Lit les 'limite' derniers messages des utilisateurs (role 'user'), avec leurs données structurées
+    désérialisées (None si absentes ou invalides). Sert à constituer le corpus du classifieur d'intentions.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        query = "SELECT id, message, donnees_structurees FROM logs_conversation WHERE role = 'user' ORDER BY id DESC LIMIT %s"
+        cursor.execute(query, (limite,))
+        messages = []
+        for row in cursor.fetchall():
+            donnees_structurees = row['donnees_structurees']
+            if isinstance(donnees_structurees, bytes):
+                donnees_structurees = donnees_structurees.decode('utf-8')
+            try:
+                donnees_structurees = json.loads(donnees_structurees) if donnees_structurees else None
+            except ValueError:
+                donnees_structurees = None
+            messages.append({"id": row['id'], "message": row['message'], "donnees_structurees": donnees_structurees})
+        return messages
+    finally:
+        cursor.close()
+
 def supprimer_logs_conversation_par_session_id(conn: Any, id_session: str) -> bool:
     """Supprime tous les logs de conversation pour un ID de session donné."""
     cursor = conn.cursor()
@@ -652,22 +859,41 @@ def supprimer_logs_conversation_par_session_id(conn: Any, id_session: str) -> bo
         cursor.close()
 
 # --- Opérations CRUD pour les rendez-vous ---
+COLONNES_RENDEZ_VOUS = "id, patient_id, medecin_id, structure_id, date_heure, duree_minutes, motif, statut"
+# Statuts d'un rendez-vous qui ne réserve plus de créneau
+STATUTS_RENDEZ_VOUS_LIBERES = ("annule", "annulé")
+# Durée maximale d'un rendez-vous (voir RendezVousBase.duree_minutes) : borne basse de la recherche par plage
+DUREE_MAX_RENDEZ_VOUS_MINUTES = 480
+
+def _ligne_vers_rendez_vous(row: Dict[str, Any]) -> RendezVousEnDB:
+    # Gérer la conversion de la date
+    date_heure = row['date_heure']
+    if isinstance(date_heure, bytes):
+        date_heure = date_heure.decode('utf-8')
+    if isinstance(date_heure, str):
+        date_heure = datetime.strptime(date_heure, '%Y-%m-%d %H:%M:%S')
+    return RendezVousEnDB(
+        id=row['id'], patient_id=row['patient_id'], medecin_id=row['medecin_id'], structure_id=row['structure_id'],
+        date_heure=date_heure, duree_minutes=row['duree_minutes'],
+        motif=row['motif'], statut=row['statut']
+    )
+
 def creer_rendez_vous(conn: Any, rdv: RendezVousCreer) -> Optional[RendezVousEnDB]:
     """Crée un nouveau rendez-vous."""
     cursor = conn.cursor()
     try:
         query = """
-        INSERT INTO rendez_vous (patient_id, medecin_id, structure_id, date_heure, motif, statut)
-        VALUES (%s, %s, %s, %s, %s, %s)
+        INSERT INTO rendez_vous (patient_id, medecin_id, structure_id, date_heure, duree_minutes, motif, statut)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
         cursor.execute(
             query,
-            (rdv.patient_id, rdv.medecin_id, rdv.structure_id, rdv.date_heure.strftime('%Y-%m-%d %H:%M:%S'), rdv.motif, rdv.statut)
+            (rdv.patient_id, rdv.medecin_id, rdv.structure_id, rdv.date_heure.strftime('%Y-%m-%d %H:%M:%S'), rdv.duree_minutes, rdv.motif, rdv.statut)
         )
         conn.commit()
         rdv_id = cursor.lastrowid
         if rdv_id:
-            return lire_rendez_vous_par_id(conn, rdv_id)
+            return RendezVousEnDB(id=rdv_id, **rdv.model_dump())
         return None
     except mysql.connector.Error as e:
         conn.rollback()
@@ -678,54 +904,200 @@ def creer_rendez_vous(conn: Any, rdv: RendezVousCreer) -> Optional[RendezVousEnD
     finally:
         cursor.close()
 
+def _creneau_medecin_pris(cursor: Any, medecin_id: int, debut: datetime, fin: datetime, exclure_id: Optional[int] = None) -> bool:
+    """
+    Indique si un rendez-vous non annulé du médecin (autre que 'exclure_id') chevauche [debut, fin).
+    Lecture verrouillante, à faire sous le verrou de la ligne du médecin : elle voit toujours
+    la dernière version validée des rendez-vous.
+    """
+    borne_basse = debut - timedelta(minutes=DUREE_MAX_RENDEZ_VOUS_MINUTES)
+    cursor.execute(
+        """
+        SELECT id FROM rendez_vous
+        WHERE medecin_id = %s AND date_heure < %s AND date_heure >= %s
+          AND date_heure + INTERVAL duree_minutes MINUTE > %s
+          AND statut NOT IN (%s, %s) AND id <> %s
+        LIMIT 1 FOR UPDATE
+        """,
+        (medecin_id, fin.strftime('%Y-%m-%d %H:%M:%S'), borne_basse.strftime('%Y-%m-%d %H:%M:%S'),
+         debut.strftime('%Y-%m-%d %H:%M:%S'), *STATUTS_RENDEZ_VOUS_LIBERES, exclure_id or 0)
+    )
+    return cursor.fetchone() is not None
+
+def reserver_rendez_vous(conn: Any, rdv: RendezVousCreer) -> Optional[RendezVousEnDB]:
+    """
+    Crée un rendez-vous si le créneau du médecin est libre, de façon atomique.
+    La ligne du médecin est verrouillée (SELECT ... FOR UPDATE) jusqu'à la fin de la transaction :
+    les réservations concurrentes d'un même médecin sont sérialisées, celles de médecins
+    différents restent parallèles. La vérification du chevauchement et l'insertion se font
+    dans la même transaction. Retourne None si le créneau est déjà pris.
+    """
+    debut = rdv.date_heure
+    fin = debut + timedelta(minutes=rdv.duree_minutes)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id FROM medecins WHERE id = %s FOR UPDATE", (rdv.medecin_id,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            raise ValueError(f"Médecin {rdv.medecin_id} introuvable.")
+
+        if _creneau_medecin_pris(cursor, rdv.medecin_id, debut, fin):
+            conn.rollback()
+            return None
+
+        cursor.execute(
+            """
+            INSERT INTO rendez_vous (patient_id, medecin_id, structure_id, date_heure, duree_minutes, motif, statut)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            (rdv.patient_id, rdv.medecin_id, rdv.structure_id, debut.strftime('%Y-%m-%d %H:%M:%S'), rdv.duree_minutes, rdv.motif, rdv.statut)
+        )
+        rdv_id = cursor.lastrowid
+        conn.commit()
+        return RendezVousEnDB(id=rdv_id, **rdv.model_dump())
+    except ValueError:
+        raise
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la réservation du rendez-vous: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la réservation du rendez-vous: {e}")
+    finally:
+        cursor.close()
+
+def modifier_creneau_rendez_vous(conn: Any, rdv_id: int, updates: Dict[str, Any]) -> Optional[RendezVousEnDB]:
+    """
+    Met à jour un rendez-vous dont le créneau change (date_heure, duree_minutes, medecin_id) ou
+    qui est réactivé (statut annulé -> actif), de façon atomique comme reserver_rendez_vous :
+    les lignes des médecins concernés (ancien et nouveau, dans l'ordre des id) sont verrouillées,
+    puis le chevauchement est vérifié en excluant le rendez-vous lui-même, puis la mise à jour
+    est faite dans la même transaction. Retourne None si le nouveau créneau est déjà pris ;
+    ValueError si le rendez-vous ou le médecin n'existe pas.
+    """
+    existant = lire_rendez_vous_par_id(conn, rdv_id)
+    if existant is None:
+        raise ValueError(f"Rendez-vous {rdv_id} introuvable.")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        medecin_id = updates.get("medecin_id", existant.medecin_id)
+        medecin_ids = sorted({existant.medecin_id, medecin_id})
+        # Médecins d'abord, comme reserver_rendez_vous, pour ne pas croiser les verrous
+        marqueurs = ", ".join(["%s"] * len(medecin_ids))
+        cursor.execute(f"SELECT id FROM medecins WHERE id IN ({marqueurs}) ORDER BY id FOR UPDATE", tuple(medecin_ids))
+        if medecin_id not in {ligne["id"] for ligne in cursor.fetchall()}:
+            conn.rollback()
+            raise ValueError(f"Médecin {medecin_id} introuvable.")
+
+        # Relecture sous verrou : le rendez-vous a pu changer depuis la première lecture
+        cursor.execute(f"SELECT {COLONNES_RENDEZ_VOUS} FROM rendez_vous WHERE id = %s FOR UPDATE", (rdv_id,))
+        ligne = cursor.fetchone()
+        if ligne is None:
+            conn.rollback()
+            raise ValueError(f"Rendez-vous {rdv_id} introuvable.")
+        existant = _ligne_vers_rendez_vous(ligne)
+        if existant.medecin_id not in medecin_ids:
+            # Rendez-vous réattribué entre la lecture et le verrou : traité comme un conflit
+            conn.rollback()
+            return None
+
+        modifie = existant.model_copy(update=updates)
+        if modifie.statut not in STATUTS_RENDEZ_VOUS_LIBERES:
+            fin = modifie.date_heure + timedelta(minutes=modifie.duree_minutes)
+            if _creneau_medecin_pris(cursor, modifie.medecin_id, modifie.date_heure, fin, exclure_id=rdv_id):
+                conn.rollback()
+                return None
+
+        set_clauses = []
+        values = []
+        for key, value in updates.items():
+            values.append(value.strftime('%Y-%m-%d %H:%M:%S') if key == "date_heure" else value)
+            set_clauses.append(f"{key} = %s")
+        if set_clauses:
+            cursor.execute(f"UPDATE rendez_vous SET {', '.join(set_clauses)} WHERE id = %s", (*values, rdv_id))
+        conn.commit()
+        return modifie
+    except ValueError:
+        raise
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la modification du créneau du rendez-vous {rdv_id}: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la modification du créneau du rendez-vous {rdv_id}: {e}")
+    finally:
+        cursor.close()
+
 def lire_rendez_vous_par_id(conn: Any, rdv_id: int) -> Optional[RendezVousEnDB]:
     """Lit un rendez-vous par son ID."""
     cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, patient_id, medecin_id, structure_id, date_heure, motif, statut FROM rendez_vous WHERE id = %s"
+    query = f"SELECT {COLONNES_RENDEZ_VOUS} FROM rendez_vous WHERE id = %s"
     cursor.execute(query, (rdv_id,))
     row = cursor.fetchone()
     cursor.close()
     if row:
-        # Gérer la conversion de la date
-        if isinstance(row['date_heure'], bytes):
-            row['date_heure'] = row['date_heure'].decode('utf-8')
-        if isinstance(row['date_heure'], str):
-            row['date_heure'] = datetime.strptime(row['date_heure'], '%Y-%m-%d %H:%M:%S')
-        
-        return RendezVousEnDB(
-            id=row['id'], patient_id=row['patient_id'], medecin_id=row['medecin_id'], structure_id=row['structure_id'],
-            date_heure=row['date_heure'],
-            motif=row['motif'], statut=row['statut']
-        )
+        return _ligne_vers_rendez_vous(row)
     return None
 
-def lire_rendez_vous_par_patient_id(conn: Any, patient_id: int) -> List[RendezVousEnDB]:
-    """Lit tous les rendez-vous pour un patient donné."""
+def lire_rendez_vous_par_patient_id(conn: Any, patient_id: int, limite: int = 100, decalage: int = 0) -> List[RendezVousEnDB]:
+    """Lit les rendez-vous d'un patient donné, du plus récent au plus ancien."""
     cursor = conn.cursor(dictionary=True)
-    query = "SELECT id, patient_id, medecin_id, structure_id, date_heure, motif, statut FROM rendez_vous WHERE patient_id = %s ORDER BY date_heure DESC"
-    cursor.execute(query, (patient_id,))
+    query = f"SELECT {COLONNES_RENDEZ_VOUS} FROM rendez_vous WHERE patient_id = %s ORDER BY date_heure DESC LIMIT %s OFFSET %s"
+    cursor.execute(query, (patient_id, limite, decalage))
     rows = cursor.fetchall()
     cursor.close()
-    
-    results = []
+    return [_ligne_vers_rendez_vous(row) for row in rows]
+
+def lire_rendez_vous_par_medecin_id(conn: Any, medecin_id: int, limite: int = 100, decalage: int = 0) -> List[RendezVousEnDB]:
+    """Lit les rendez-vous d'un médecin donné, du plus récent au plus ancien."""
+    cursor = conn.cursor(dictionary=True)
+    query = f"SELECT {COLONNES_RENDEZ_VOUS} FROM rendez_vous WHERE medecin_id = %s ORDER BY date_heure DESC LIMIT %s OFFSET %s"
+    cursor.execute(query, (medecin_id, limite, decalage))
+    rows = cursor.fetchall()
+    cursor.close()
+    return [_ligne_vers_rendez_vous(row) for row in rows]
+
+def lire_rendez_vous_par_medecin_entre(conn: Any, medecin_id: int, debut: datetime, fin: datetime) -> List[RendezVousEnDB]:
+    """
+    Lit les rendez-vous non annulés d'un médecin qui chevauchent l'intervalle [debut, fin),
+    triés par heure de début.
+    """
+    return lire_rendez_vous_par_medecins_entre(conn, [medecin_id], debut, fin).get(medecin_id, [])
+
+def lire_rendez_vous_par_medecins_entre(conn: Any, medecin_ids: List[int], debut: datetime, fin: datetime) -> Dict[int, List[RendezVousEnDB]]:
+    """
+    Lit en une requête les rendez-vous non annulés de plusieurs médecins qui chevauchent
+    l'intervalle [debut, fin), groupés par médecin et triés par heure de début.
+    """
+    if not medecin_ids:
+        return {}
+    cursor = conn.cursor(dictionary=True)
+    marqueurs = ", ".join(["%s"] * len(medecin_ids))
+    query = f"""
+    SELECT {COLONNES_RENDEZ_VOUS} FROM rendez_vous
+    WHERE medecin_id IN ({marqueurs}) AND date_heure < %s AND date_heure >= %s
+      AND date_heure + INTERVAL duree_minutes MINUTE > %s
+      AND statut NOT IN (%s, %s)
+    ORDER BY medecin_id, date_heure
+    """
+    borne_basse = debut - timedelta(minutes=DUREE_MAX_RENDEZ_VOUS_MINUTES)
+    cursor.execute(
+        query,
+        (*medecin_ids, fin.strftime('%Y-%m-%d %H:%M:%S'), borne_basse.strftime('%Y-%m-%d %H:%M:%S'),
+         debut.strftime('%Y-%m-%d %H:%M:%S'), *STATUTS_RENDEZ_VOUS_LIBERES)
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    rendez_vous: Dict[int, List[RendezVousEnDB]] = {}
     for row in rows:
-        # Gérer la conversion de la date
-        if isinstance(row['date_heure'], bytes):
-            row['date_heure'] = row['date_heure'].decode('utf-8')
-        if isinstance(row['date_heure'], str):
-            row['date_heure'] = datetime.strptime(row['date_heure'], '%Y-%m-%d %H:%M:%S')
-        
-        results.append(
-            RendezVousEnDB(
-                id=row['id'], patient_id=row['patient_id'], medecin_id=row['medecin_id'], structure_id=row['structure_id'],
-                date_heure=row['date_heure'],
-                motif=row['motif'], statut=row['statut']
-            )
-        )
-    return results
+        rendez_vous.setdefault(row['medecin_id'], []).append(_ligne_vers_rendez_vous(row))
+    return rendez_vous
 
-def mettre_a_jour_rendez_vous(conn: Any, rdv_id: int, updates: Dict[str, Any]) -> Optional[RendezVousEnDB]:
-    """Met à jour les informations d'un rendez-vous."""
+def mettre_a_jour_rendez_vous(conn: Any, rdv_id: int, updates: Dict[str, Any], existant: Optional[RendezVousEnDB] = None) -> Optional[RendezVousEnDB]:
+    """
+    Met à jour les informations d'un rendez-vous.
+    Si 'existant' est fourni, le modèle retourné est construit sans relecture.
+    """
     cursor = conn.cursor()
     try:
         set_clauses = []
@@ -738,13 +1110,15 @@ def mettre_a_jour_rendez_vous(conn: Any, rdv_id: int, updates: Dict[str, Any]) -
             set_clauses.append(f"{key} = %s")
 
         if not set_clauses:
-            return lire_rendez_vous_par_id(conn, rdv_id)
+            return existant if existant is not None else lire_rendez_vous_par_id(conn, rdv_id)
 
         query = f"UPDATE rendez_vous SET {', '.join(set_clauses)} WHERE id = %s"
         values.append(rdv_id)
         
         cursor.execute(query, tuple(values))
         conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=updates)
         return lire_rendez_vous_par_id(conn, rdv_id)
     except mysql.connector.Error as e:
         conn.rollback()
@@ -772,3 +1146,274 @@ def supprimer_rendez_vous(conn: Any, rdv_id: int) -> bool:
     finally:
         cursor.close()
 
+
+# --- Opérations CRUD pour la base de connaissances (maladies, symptômes, liens) ---
+COLONNES_MALADIE = "id, nom_fr, code_cim_10, description, gravite, prevalence, recommandation_triage, symptomes_courants_mots_cles, causes_mots_cles, facteurs_risque_mots_cles"
+COLONNES_SYMPTOME = "id, nom_fr, description, gravite_potentielle, mots_cles_associes"
+CHAMPS_LISTE_MALADIE = ("symptomes_courants_mots_cles", "causes_mots_cles", "facteurs_risque_mots_cles")
+
+def _charger_liste_json(valeur: Any) -> List[str]:
+    """Convertit une colonne JSON (chaîne, bytes ou liste déjà décodée) en liste Python."""
+    if valeur is None:
+        return []
+    if isinstance(valeur, bytes):
+        valeur = valeur.decode('utf-8')
+    if isinstance(valeur, str):
+        try:
+            valeur = json.loads(valeur)
+        except json.JSONDecodeError:
+            return [v.strip() for v in valeur.split(',') if v.strip()]
+    return list(valeur) if isinstance(valeur, (list, tuple)) else []
+
+def _ligne_vers_maladie(row: Dict[str, Any]) -> MaladieEnDB:
+    return MaladieEnDB(
+        id=row['id'], nom_fr=row['nom_fr'], code_cim_10=row['code_cim_10'], description=row['description'],
+        gravite=row['gravite'], prevalence=row['prevalence'], recommandation_triage=row['recommandation_triage'],
+        symptomes_courants_mots_cles=_charger_liste_json(row['symptomes_courants_mots_cles']),
+        causes_mots_cles=_charger_liste_json(row['causes_mots_cles']),
+        facteurs_risque_mots_cles=_charger_liste_json(row['facteurs_risque_mots_cles'])
+    )
+
+def _ligne_vers_symptome(row: Dict[str, Any]) -> SymptomeEnDB:
+    return SymptomeEnDB(
+        id=row['id'], nom_fr=row['nom_fr'], description=row['description'],
+        gravite_potentielle=row['gravite_potentielle'],
+        mots_cles_associes=_charger_liste_json(row['mots_cles_associes'])
+    )
+
+def creer_maladie(conn: Any, maladie: MaladieCreer) -> Optional[MaladieEnDB]:
+    """Crée une maladie. Retourne None si une maladie de même nom existe déjà."""
+    cursor = conn.cursor()
+    try:
+        query = """
+        INSERT IGNORE INTO maladies (nom_fr, code_cim_10, description, gravite, prevalence, recommandation_triage,
+                                     symptomes_courants_mots_cles, causes_mots_cles, facteurs_risque_mots_cles)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        cursor.execute(
+            query,
+            (maladie.nom_fr, maladie.code_cim_10, maladie.description, maladie.gravite, maladie.prevalence,
+             maladie.recommandation_triage, json.dumps(maladie.symptomes_courants_mots_cles, ensure_ascii=False),
+             json.dumps(maladie.causes_mots_cles, ensure_ascii=False), json.dumps(maladie.facteurs_risque_mots_cles, ensure_ascii=False))
+        )
+        conn.commit()
+        if cursor.rowcount == 0:
+            return None
+        return MaladieEnDB(id=cursor.lastrowid, **maladie.model_dump())
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la création de la maladie: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la création de la maladie: {e}")
+    finally:
+        cursor.close()
+
+def lire_maladie_par_id(conn: Any, maladie_id: int) -> Optional[MaladieEnDB]:
+    """Lit une maladie par son ID."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT {COLONNES_MALADIE} FROM maladies WHERE id = %s", (maladie_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    return _ligne_vers_maladie(row) if row else None
+
+def lire_maladie_par_nom(conn: Any, nom_fr: str) -> Optional[MaladieEnDB]:
+    """Lit une maladie par son nom français."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT {COLONNES_MALADIE} FROM maladies WHERE nom_fr = %s", (nom_fr,))
+    row = cursor.fetchone()
+    cursor.close()
+    return _ligne_vers_maladie(row) if row else None
+
+def lire_toutes_maladies(conn: Any, limite: Optional[int] = None) -> List[MaladieEnDB]:
+    """Lit toutes les maladies, avec une limite optionnelle."""
+    cursor = conn.cursor(dictionary=True)
+    query = f"SELECT {COLONNES_MALADIE} FROM maladies ORDER BY id"
+    params: tuple = ()
+    if limite is not None:
+        query += " LIMIT %s"
+        params = (limite,)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return [_ligne_vers_maladie(row) for row in rows]
+
+def mettre_a_jour_maladie(conn: Any, maladie_id: int, updates: Dict[str, Any], existant: Optional[MaladieEnDB] = None) -> Optional[MaladieEnDB]:
+    """
+    Met à jour les informations d'une maladie.
+    Si 'existant' est fourni, le modèle retourné est construit sans relecture.
+    """
+    cursor = conn.cursor()
+    try:
+        set_clauses = []
+        values = []
+        for key, value in updates.items():
+            if key in CHAMPS_LISTE_MALADIE:
+                values.append(json.dumps(value or [], ensure_ascii=False))
+            else:
+                values.append(value)
+            set_clauses.append(f"{key} = %s")
+
+        if not set_clauses:
+            return existant if existant is not None else lire_maladie_par_id(conn, maladie_id)
+
+        query = f"UPDATE maladies SET {', '.join(set_clauses)} WHERE id = %s"
+        values.append(maladie_id)
+
+        cursor.execute(query, tuple(values))
+        conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=updates)
+        return lire_maladie_par_id(conn, maladie_id)
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la mise à jour de la maladie {maladie_id}: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la mise à jour de la maladie {maladie_id}: {e}")
+    finally:
+        cursor.close()
+
+def creer_symptome(conn: Any, symptome: SymptomeCreer) -> Optional[SymptomeEnDB]:
+    """Crée un symptôme. Retourne None si un symptôme de même nom existe déjà."""
+    cursor = conn.cursor()
+    try:
+        query = """
+        INSERT IGNORE INTO symptomes (nom_fr, description, gravite_potentielle, mots_cles_associes)
+        VALUES (%s, %s, %s, %s)
+        """
+        cursor.execute(
+            query,
+            (symptome.nom_fr, symptome.description, symptome.gravite_potentielle,
+             json.dumps(symptome.mots_cles_associes, ensure_ascii=False))
+        )
+        conn.commit()
+        if cursor.rowcount == 0:
+            return None
+        return SymptomeEnDB(id=cursor.lastrowid, **symptome.model_dump())
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la création du symptôme: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la création du symptôme: {e}")
+    finally:
+        cursor.close()
+
+def lire_symptome_par_id(conn: Any, symptome_id: int) -> Optional[SymptomeEnDB]:
+    """Lit un symptôme par son ID."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT {COLONNES_SYMPTOME} FROM symptomes WHERE id = %s", (symptome_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    return _ligne_vers_symptome(row) if row else None
+
+def lire_symptome_par_nom(conn: Any, nom_fr: str) -> Optional[SymptomeEnDB]:
+    """Lit un symptôme par son nom français."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT {COLONNES_SYMPTOME} FROM symptomes WHERE nom_fr = %s", (nom_fr,))
+    row = cursor.fetchone()
+    cursor.close()
+    return _ligne_vers_symptome(row) if row else None
+
+def lire_tous_symptomes(conn: Any, limite: Optional[int] = None) -> List[SymptomeEnDB]:
+    """Lit tous les symptômes, avec une limite optionnelle."""
+    cursor = conn.cursor(dictionary=True)
+    query = f"SELECT {COLONNES_SYMPTOME} FROM symptomes ORDER BY id"
+    params: tuple = ()
+    if limite is not None:
+        query += " LIMIT %s"
+        params = (limite,)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return [_ligne_vers_symptome(row) for row in rows]
+
+def mettre_a_jour_symptome(conn: Any, symptome_id: int, updates: Dict[str, Any], existant: Optional[SymptomeEnDB] = None) -> Optional[SymptomeEnDB]:
+    """
+    Met à jour les informations d'un symptôme.
+    Si 'existant' est fourni, le modèle retourné est construit sans relecture.
+    """
+    cursor = conn.cursor()
+    try:
+        set_clauses = []
+        values = []
+        for key, value in updates.items():
+            if key == "mots_cles_associes":
+                values.append(json.dumps(value or [], ensure_ascii=False))
+            else:
+                values.append(value)
+            set_clauses.append(f"{key} = %s")
+
+        if not set_clauses:
+            return existant if existant is not None else lire_symptome_par_id(conn, symptome_id)
+
+        query = f"UPDATE symptomes SET {', '.join(set_clauses)} WHERE id = %s"
+        values.append(symptome_id)
+
+        cursor.execute(query, tuple(values))
+        conn.commit()
+        if existant is not None:
+            return existant.model_copy(update=updates)
+        return lire_symptome_par_id(conn, symptome_id)
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la mise à jour du symptôme {symptome_id}: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la mise à jour du symptôme {symptome_id}: {e}")
+    finally:
+        cursor.close()
+
+def creer_maladie_symptome_lien(conn: Any, lien: MaladieSymptomeLienCreer) -> Optional[MaladieSymptomeLienEnDB]:
+    """Crée un lien entre une maladie et un symptôme. Retourne None si le lien existe déjà."""
+    cursor = conn.cursor()
+    try:
+        query = """
+        INSERT IGNORE INTO maladie_symptome_liens (id_maladie, id_symptome, force_lien)
+        VALUES (%s, %s, %s)
+        """
+        cursor.execute(query, (lien.maladie_id, lien.symptome_id, lien.force_lien))
+        conn.commit()
+        if cursor.rowcount == 0:
+            return None
+        return MaladieSymptomeLienEnDB(id=cursor.lastrowid, **lien.model_dump())
+    except mysql.connector.Error as e:
+        conn.rollback()
+        raise Exception(f"Erreur lors de la création du lien maladie-symptôme: {e}")
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Erreur inattendue lors de la création du lien maladie-symptôme: {e}")
+    finally:
+        cursor.close()
+
+def lire_liens_par_maladie_id(conn: Any, maladie_id: int) -> List[MaladieSymptomeLienEnDB]:
+    """Lit les liens maladie-symptôme d'une maladie."""
+    cursor = conn.cursor(dictionary=True)
+    query = "SELECT id, id_maladie, id_symptome, force_lien FROM maladie_symptome_liens WHERE id_maladie = %s"
+    cursor.execute(query, (maladie_id,))
+    rows = cursor.fetchall()
+    cursor.close()
+    return [
+        MaladieSymptomeLienEnDB(id=row['id'], maladie_id=row['id_maladie'], symptome_id=row['id_symptome'], force_lien=row['force_lien'])
+        for row in rows
+    ]
+
+def lire_tous_liens_maladie_symptome(conn: Any) -> List[MaladieSymptomeLienEnDB]:
+    """Lit tous les liens maladie-symptôme (construction de l'index de recherche)."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT id, id_maladie, id_symptome, force_lien FROM maladie_symptome_liens ORDER BY id")
+    rows = cursor.fetchall()
+    cursor.close()
+    return [
+        MaladieSymptomeLienEnDB(id=row['id'], maladie_id=row['id_maladie'], symptome_id=row['id_symptome'], force_lien=row['force_lien'])
+        for row in rows
+    ]
+
+def lire_base_connaissances(conn: Any) -> Dict[str, List[Any]]:
+    """Lit maladies, symptômes et liens sur une même connexion (chargement initial des index en mémoire)."""
+    return {
+        "maladies": lire_toutes_maladies(conn),
+        "symptomes": lire_tous_symptomes(conn),
+        "liens": lire_tous_liens_maladie_symptome(conn),
+    }
@@ -0,0 +1,78 @@
+# app/base_de_donnees/migrations/__init__.py
+"""
+Migrations du schéma appliquées au démarrage, après schema.sql.
+
+Chaque migration est un module 'mNNN_<nom>.py' exposant DESCRIPTION et appliquer(conn).
+Les migrations sont appliquées une seule fois, dans l'ordre de leur numéro, et
+enregistrées dans la table schema_migrations.
+"""
+import importlib
+import logging
+import pkgutil
+from typing import Any, List, Set
+
+logger = logging.getLogger(__name__)
+
+
+def colonnes_table(cursor: Any, table: str) -> Set[str]:
+    """Colonnes d'une table de la base courante (ensemble vide si la table n'existe pas)."""
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def index_existe(cursor: Any, table: str, nom_index: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+        (table, nom_index)
+    )
+    return cursor.fetchone() is not None
+
+
+def lister_migrations() -> List[str]:
+    """Noms des modules de migration, dans l'ordre d'application."""
+    return sorted(
+        module.name for module in pkgutil.iter_modules(__path__)
+        if module.name.startswith("m") and module.name[1:4].isdigit()
+    )
+
+
+def appliquer_migrations(conn: Any) -> List[str]:
+    """Applique les migrations qui ne l'ont pas encore été ; retourne leurs noms."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(100) PRIMARY KEY,
+                description VARCHAR(255),
+                date_application TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        cursor.execute("SELECT version FROM schema_migrations")
+        deja_appliquees = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+    finally:
+        cursor.close()
+
+    appliquees = []
+    for nom in lister_migrations():
+        if nom in deja_appliquees:
+            continue
+        migration = importlib.import_module(f"{__name__}.{nom}")
+        logger.info(f"Application de la migration {nom} : {migration.DESCRIPTION}")
+        migration.appliquer(conn)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (nom, migration.DESCRIPTION)
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+        appliquees.append(nom)
+    return appliquees
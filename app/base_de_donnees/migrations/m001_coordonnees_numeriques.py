@@ -0,0 +1,72 @@
+# app/base_de_donnees/migrations/m001_coordonnees_numeriques.py
+"""
+Ajoute des colonnes numériques 'latitude' / 'longitude' (DOUBLE) et un index composite
+aux tables des médecins et des structures médicales, puis les renseigne à partir de la
+chaîne 'coordonnees_gps' ("latitude,longitude"), elle-même ajoutée si elle manque.
+Les coordonnées invalides ou hors limites restent à NULL.
+"""
+import logging
+from typing import Any, Set
+
+from app.base_de_donnees.migrations import colonnes_table, index_existe
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = "Colonnes latitude/longitude numériques et index pour les recherches de proximité"
+
+# Noms utilisés par crud.py et par schema.sql ; seules les tables existantes sont migrées.
+TABLES = ("medecins", "structures_medicales", "doctors", "medical_structures")
+
+# "lat,lon" avec espaces et signes éventuels
+MOTIF_COORDONNEES = r"^ *[-+]?[0-9]+(\.[0-9]+)? *, *[-+]?[0-9]+(\.[0-9]+)? *$"
+
+
+def ajouter_coordonnees_numeriques(cursor: Any, table: str, colonnes: Set[str]):
+    """
+    Ajoute à 'table' (de colonnes 'colonnes') celles qui manquent parmi coordonnees_gps, latitude
+    et longitude, l'index composite, puis renseigne latitude / longitude depuis coordonnees_gps.
+    """
+    if "coordonnees_gps" not in colonnes:
+        # crud.py écrit coordonnees_gps, latitude et longitude ensemble : aucune table n'est ignorée
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN coordonnees_gps VARCHAR(50) NULL")
+    if "latitude" not in colonnes:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN latitude DOUBLE NULL")
+    if "longitude" not in colonnes:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN longitude DOUBLE NULL")
+    nom_index = f"idx_{table}_latitude_longitude"
+    if not index_existe(cursor, table, nom_index):
+        cursor.execute(f"CREATE INDEX {nom_index} ON {table} (latitude, longitude)")
+
+    cursor.execute(
+        f"""
+        UPDATE {table}
+        SET latitude = CAST(TRIM(SUBSTRING_INDEX(coordonnees_gps, ',', 1)) AS DECIMAL(10,7)),
+            longitude = CAST(TRIM(SUBSTRING_INDEX(coordonnees_gps, ',', -1)) AS DECIMAL(10,7))
+        WHERE coordonnees_gps REGEXP %s
+        """,
+        (MOTIF_COORDONNEES,)
+    )
+    cursor.execute(
+        f"""
+        UPDATE {table} SET latitude = NULL, longitude = NULL
+        WHERE latitude NOT BETWEEN -90 AND 90 OR longitude NOT BETWEEN -180 AND 180
+        """
+    )
+
+
+def appliquer(conn: Any):
+    cursor = conn.cursor()
+    try:
+        for table in TABLES:
+            colonnes = colonnes_table(cursor, table)
+            if not colonnes:
+                # Table absente de cette base (noms de crud.py ou de schema.sql)
+                continue
+            ajouter_coordonnees_numeriques(cursor, table, colonnes)
+            conn.commit()
+            logger.info(f"Coordonnées numériques ajoutées et renseignées pour la table '{table}'.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
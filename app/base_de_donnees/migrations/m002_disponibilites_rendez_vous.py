@@ -0,0 +1,37 @@
+# app/base_de_donnees/migrations/m002_disponibilites_rendez_vous.py
+"""
+Prépare le calcul des disponibilités :
+- 'medecins.disponibilites_json' : horaires de travail par jour ({"lundi": ["09:00-12:00", "14:00-17:00"]}) ;
+- 'rendez_vous.duree_minutes' : durée de chaque rendez-vous (30 minutes pour les rendez-vous existants) ;
+- index (medecin_id, date_heure) pour lire les rendez-vous d'un médecin sur une plage de dates.
+"""
+import logging
+from typing import Any
+
+from app.base_de_donnees.migrations import colonnes_table, index_existe
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = "Horaires de travail des médecins, durée et index des rendez-vous"
+
+
+def appliquer(conn: Any):
+    cursor = conn.cursor()
+    try:
+        colonnes_medecins = colonnes_table(cursor, "medecins")
+        if colonnes_medecins and "disponibilites_json" not in colonnes_medecins:
+            cursor.execute("ALTER TABLE medecins ADD COLUMN disponibilites_json JSON NULL")
+
+        colonnes_rendez_vous = colonnes_table(cursor, "rendez_vous")
+        if colonnes_rendez_vous:
+            if "duree_minutes" not in colonnes_rendez_vous:
+                cursor.execute("ALTER TABLE rendez_vous ADD COLUMN duree_minutes INT NOT NULL DEFAULT 30")
+            if not index_existe(cursor, "rendez_vous", "idx_rendez_vous_medecin_date"):
+                cursor.execute("CREATE INDEX idx_rendez_vous_medecin_date ON rendez_vous (medecin_id, date_heure)")
+        conn.commit()
+        logger.info("Colonnes des disponibilités et des durées de rendez-vous vérifiées.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,32 @@
+# app/base_de_donnees/migrations/m003_coordonnees_gps.py
+"""
+Ajoute la colonne 'coordonnees_gps' ("latitude,longitude") aux tables 'medecins' et
+'structures_medicales' lorsqu'elle manque : crud.py la lit et l'écrit pour chaque médecin
+et chaque structure, alors que schema.sql ne la définit que sur 'doctors' / 'medical_structures'.
+"""
+import logging
+from typing import Any
+
+from app.base_de_donnees.migrations import colonnes_table
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = "Colonne coordonnees_gps des médecins et des structures médicales"
+
+TABLES = ("medecins", "structures_medicales")
+
+
+def appliquer(conn: Any):
+    cursor = conn.cursor()
+    try:
+        for table in TABLES:
+            colonnes = colonnes_table(cursor, table)
+            if colonnes and "coordonnees_gps" not in colonnes:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN coordonnees_gps VARCHAR(50) NULL")
+                logger.info(f"Colonne 'coordonnees_gps' ajoutée à la table '{table}'.")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,32 @@
+# app/base_de_donnees/migrations/m004_coordonnees_numeriques_manquantes.py
+"""
+Rattrapage de m001 : dans sa première version, m001 ignorait les tables sans 'coordonnees_gps',
+qui n'ont donc reçu ni 'latitude' / 'longitude' ni leur index, alors que crud.py y écrit ces
+colonnes à chaque création ou mise à jour. Complète les tables existantes auxquelles il en manque.
+"""
+import logging
+from typing import Any
+
+from app.base_de_donnees.migrations import colonnes_table
+from app.base_de_donnees.migrations.m001_coordonnees_numeriques import TABLES, ajouter_coordonnees_numeriques
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = "Colonnes latitude/longitude des tables ignorées par m001"
+
+
+def appliquer(conn: Any):
+    cursor = conn.cursor()
+    try:
+        for table in TABLES:
+            colonnes = colonnes_table(cursor, table)
+            if not colonnes or {"coordonnees_gps", "latitude", "longitude"} <= colonnes:
+                continue
+            ajouter_coordonnees_numeriques(cursor, table, colonnes)
+            conn.commit()
+            logger.info(f"Colonnes de coordonnées manquantes ajoutées à la table '{table}'.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -1,5 +1,5 @@
 # app/base_de_donnees/modeles.py
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field # <-- Ajout Field pour les descriptions
 
@@ -64,6 +64,8 @@ class MedecinBase(BaseModel):
     numero_licence: Optional[str] = None
     adresse_cabinet: Optional[str] = None
     telephone_cabinet: Optional[str] = None
+    coordonnees_gps: Optional[str] = None # "latitude,longitude"
+    disponibilites_json: Optional[Dict[str, List[str]]] = None # {"lundi": ["09:00-12:00", "14:00-17:00"]}
 
 
 class MedecinCreer(MedecinBase):
@@ -81,6 +83,7 @@ class StructureMedicaleBase(BaseModel):
     type_structure: Optional[str] = None
     adresse: Optional[str] = None
     telephone: Optional[str] = None
+    coordonnees_gps: Optional[str] = None # "latitude,longitude"
 
 class StructureMedicaleCreer(StructureMedicaleBase):
     user_id: int
@@ -191,6 +194,7 @@ class RendezVousBase(BaseModel):
     medecin_id: Optional[int] = None
     structure_id: Optional[int] = None
     date_heure: datetime
+    duree_minutes: int = Field(30, gt=0, le=480, description="Durée du rendez-vous en minutes")
     motif: Optional[str] = None
     statut: Optional[str] = 'planifie'
 
@@ -255,6 +259,8 @@ class DoctorBase(BaseModel):
     numero_licence: Optional[str] = None
     adresse_cabinet: Optional[str] = None
     telephone_cabinet: Optional[str] = None
+    coordonnees_gps: Optional[str] = None # "latitude,longitude"
+    disponibilites_json: Optional[Dict[str, List[str]]] = None # {"lundi": ["09:00-12:00", "14:00-17:00"]}
 
 class DoctorCreer(DoctorBase):
     user_id: int
@@ -265,6 +271,9 @@ class DoctorEnDB(DoctorBase):
     class Config:
         from_attributes = True
 
+class DoctorProximite(DoctorEnDB):
+    distance_km: float
+
 class DoctorMettreAJour(BaseModel):
     nom: Optional[str] = None
     prenom: Optional[str] = None
@@ -272,12 +281,15 @@ class DoctorMettreAJour(BaseModel):
     numero_licence: Optional[str] = None
     adresse_cabinet: Optional[str] = None
     telephone_cabinet: Optional[str] = None
+    coordonnees_gps: Optional[str] = None # "latitude,longitude"
+    disponibilites_json: Optional[Dict[str, List[str]]] = None # {"lundi": ["09:00-12:00", "14:00-17:00"]}
 
 class AppointmentBase(BaseModel):
     patient_id: int
     medecin_id: Optional[int] = None
     structure_id: Optional[int] = None
     date_heure: datetime
+    duree_minutes: int = Field(30, gt=0, le=480, description="Durée du rendez-vous en minutes")
     motif: Optional[str] = None
     statut: Optional[str] = 'planifie'
 
@@ -294,9 +306,15 @@ class AppointmentMettreAJour(BaseModel):
     medecin_id: Optional[int] = None
     structure_id: Optional[int] = None
     date_heure: Optional[datetime] = None
+    duree_minutes: Optional[int] = Field(None, gt=0, le=480)
     motif: Optional[str] = None
     statut: Optional[str] = None
 
+class CreneauMedecinProximite(BaseModel):
+    medecin: DoctorProximite
+    heure_debut: datetime
+    heure_fin: datetime
+
 class ConsultationModuleBase(BaseModel):
     patient_id: int
     medecin_id: int
@@ -317,6 +335,7 @@ class MedicalStructureBase(BaseModel):
     type_structure: Optional[str] = None
     adresse: Optional[str] = None
     telephone: Optional[str] = None
+    coordonnees_gps: Optional[str] = None # "latitude,longitude"
 
 class MedicalStructureCreer(MedicalStructureBase):
     user_id: int
@@ -327,11 +346,33 @@ class MedicalStructureEnDB(MedicalStructureBase):
     class Config:
         from_attributes = True
 
+class MedicalStructureProximite(MedicalStructureEnDB):
+    distance_km: float
+
+class OrigineRecherche(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    reference: Optional[str] = Field(None, description="Identifiant libre de l'origine (patient, intervention, ...)")
+
+class RechercheProximiteLot(BaseModel):
+    origines: List[OrigineRecherche] = Field(..., min_length=1)
+    rayon_km: Optional[float] = Field(None, gt=0, description="Rayon de recherche en kilomètres (valeur configurée par défaut).")
+    limite: int = Field(10, gt=0, le=100, description="Nombre maximal de résultats par origine.")
+
+class DoctorsProximiteLot(BaseModel):
+    origine: OrigineRecherche
+    medecins: List[DoctorProximite]
+
+class MedicalStructuresProximiteLot(BaseModel):
+    origine: OrigineRecherche
+    structures: List[MedicalStructureProximite]
+
 class MedicalStructureMettreAJour(BaseModel):
     nom_structure: Optional[str] = None
     type_structure: Optional[str] = None
     adresse: Optional[str] = None
     telephone: Optional[str] = None
+    coordonnees_gps: Optional[str] = None # "latitude,longitude"
 
 class ResourceBase(BaseModel):
     nom: str
@@ -1,10 +1,14 @@
 # app/configuration/intergiciels.py
 import logging
+import threading
+from typing import Any, Dict
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
+from app.base_de_donnees.connexion import CompteurRequetesSQL, compteur_requetes_sql
+
 # Récupérer le logger configuré (nous le configurerons plus en détail plus tard)
 logger = logging.getLogger("uvicorn.error") # Ou un logger plus spécifique si vous en créez un dans journalisation.py
 
@@ -31,4 +35,41 @@ async def journalisation_requetes(request: Request, call_next):
     logger.info(f"Requête entrante: {request.method} {request.url}")
     response = await call_next(request)
     logger.info(f"Requête sortante: {request.method} {request.url} - Statut: {response.status_code}")
-    return response
\ No newline at end of file
+    return response
+
+# Statistiques du nombre de requêtes SQL par point de terminaison ("METHODE /chemin/{param}")
+_statistiques_requetes_sql: Dict[str, Dict[str, int]] = {}
+_verrou_statistiques_sql = threading.Lock()
+
+async def comptage_requetes_sql(request: Request, call_next):
+    """
+    Intergiciel qui compte les requêtes SQL exécutées pendant le traitement de chaque requête HTTP.
+    Le total est renvoyé dans l'en-tête 'X-Requetes-SQL' et agrégé par point de terminaison.
+    """
+    compteur = CompteurRequetesSQL()
+    jeton = compteur_requetes_sql.set(compteur)
+    try:
+        response = await call_next(request)
+    finally:
+        compteur_requetes_sql.reset(jeton)
+
+    route = request.scope.get("route")
+    cle = f"{request.method} {getattr(route, 'path', request.url.path)}"
+    with _verrou_statistiques_sql:
+        stats = _statistiques_requetes_sql.setdefault(cle, {"appels": 0, "total_requetes_sql": 0, "max_requetes_sql": 0})
+        stats["appels"] += 1
+        stats["total_requetes_sql"] += compteur.nombre
+        stats["max_requetes_sql"] = max(stats["max_requetes_sql"], compteur.nombre)
+    response.headers["X-Requetes-SQL"] = str(compteur.nombre)
+    return response
+
+def obtenir_statistiques_requetes_sql() -> Dict[str, Dict[str, Any]]:
+    """Retourne, par point de terminaison, le nombre d'appels et de requêtes SQL (total, moyenne, maximum)."""
+    with _verrou_statistiques_sql:
+        return {
+            cle: {
+                **stats,
+                "moyenne_requetes_sql": round(stats["total_requetes_sql"] / stats["appels"], 2) if stats["appels"] else 0.0,
+            }
+            for cle, stats in _statistiques_requetes_sql.items()
+        }
@@ -22,6 +22,9 @@ class Parametres(BaseSettings):
     DB_PORT: int = Field(3306, description="Port de la base de données MySQL.")
     DB_POOL_SIZE: int = Field(10, description="Taille initiale du pool de connexions à la base de données.")
     DB_MAX_OVERFLOW: int = Field(20, description="Nombre maximal de connexions supplémentaires que le pool peut créer.")
+    DB_POOL_TIMEOUT: float = Field(30.0, description="Délai maximal (secondes) d'attente d'une connexion libre dans le pool.")
+    DB_EXECUTOR_WORKERS: int = Field(10, description="Nombre de threads dédiés à l'exécution des requêtes SQL hors de la boucle d'événements.")
+    DB_POOL_RECYCLE: int = Field(1800, description="Durée (secondes) au-delà de laquelle une connexion ancienne ou inactive est recyclée. 0 pour désactiver.")
 
     # --- Paramètres des APIs Externes (Firebase) ---
     FIREBASE_SERVICE_ACCOUNT_KEY_PATH: str = Field(..., description="Chemin vers le fichier JSON de la clé de compte de service Firebase.")
@@ -41,8 +44,75 @@ class Parametres(BaseSettings):
 
     # --- Paramètres Spécifiques à l'IA/Télémédecine ---
     DIAGNOSTIC_CONFIDENCE_THRESHOLD: float = Field(0.5, description="Seuil de confiance (0.0-1.0) pour que l'IA propose un pré-diagnostic.")
+    DIAGNOSTIC_SCORING_MODE: str = Field("pondere", description="Mode de score des maladies par symptômes : 'pondere' (force_lien), 'tfidf' ou 'bayesien' (prévalence et gravité).")
+    DIAGNOSTIC_TOP_K: int = Field(20, description="Nombre maximal de maladies retournées par une recherche par symptômes.")
     CONVERSATION_HISTORY_LIMIT: int = Field(10, description="Nombre maximal de messages à récupérer pour l'historique de conversation de l'IA.")
+    CONVERSATION_CACHE_SESSIONS: int = Field(1000, description="Nombre maximal de sessions actives dont le contexte de conversation est conservé en mémoire (LRU).")
     GEOLOCATION_SEARCH_RADIUS_KM: float = Field(10.0, description="Rayon de recherche en kilomètres pour les services de géolocalisation (médecins, structures).")
+    GEOLOCATION_SEARCH_MODE: str = Field("index", description="Recherche de proximité : 'index' (index spatial en mémoire) ou 'sql' (préfiltre par boîte englobante sur les colonnes latitude/longitude).")
+    GEOLOCATION_INDEX_REBUILD_THRESHOLD: int = Field(256, description="Nombre de positions ajoutées ou modifiées au-delà duquel l'index spatial (k-d tree) est reconstruit.")
+    APPOINTMENT_SEARCH_MAX_DAYS: int = Field(31, description="Nombre maximal de jours couverts par une recherche de disponibilités.")
+    APPOINTMENT_MULTI_SEARCH_MAX_DOCTORS: int = Field(50, description="Nombre maximal de médecins (les plus proches) examinés par une recherche de premiers créneaux.")
+    APPOINTMENT_CALENDAR_CACHE_DAYS: int = Field(20000, description="Nombre maximal de journées (médecin, jour) d'intervalles réservés conservées en mémoire (LRU).")
+    GEOLOCATION_BATCH_MAX_ORIGINS: int = Field(1000, description="Nombre maximal d'origines acceptées par une recherche de proximité par lot.")
+
+    # --- Téléassistance vocale (WebSocket) ---
+    TELEASSISTANCE_AUDIO_MAX_BYTES: int = Field(8 * 1024 * 1024, description="Taille maximale (octets) de l'audio accumulé par session avant traitement ; au-delà, l'audio accumulé est traité sans attendre la fin de l'énoncé.")
+    TELEASSISTANCE_AUDIO_FORMAT: str = Field("webm", description="Format du conteneur des chunks audio envoyés par le client (webm, ogg, wav...) ou 'pcm' (PCM 16 bits mono brut).")
+    TELEASSISTANCE_PCM_SAMPLE_RATE: int = Field(16000, description="Fréquence d'échantillonnage (Hz) de l'audio lorsque TELEASSISTANCE_AUDIO_FORMAT vaut 'pcm'.")
+    TELEASSISTANCE_SILENCE_MS: int = Field(1500, description="Durée (ms) sans nouveau chunk audio au-delà de laquelle l'audio accumulé est traité.")
+    TELEASSISTANCE_MAX_UTTERANCE_MS: int = Field(30000, description="Durée maximale (ms) d'un énoncé sur un flux audio continu ; au-delà, l'audio accumulé est traité sans attendre la fin de l'énoncé.")
+    TELEASSISTANCE_VAD_ENABLED: bool = Field(False, description="Active la détection de fin d'énoncé sur l'énergie du signal (format 'pcm' uniquement).")
+    TELEASSISTANCE_VAD_THRESHOLD_DB: float = Field(-45.0, description="Énergie minimale (dBFS) d'une trame de parole pour la détection d'activité vocale.")
+    TELEASSISTANCE_VAD_SILENCE_MS: int = Field(700, description="Durée (ms) de silence dans le signal qui termine un énoncé pour la détection d'activité vocale.")
+    VOICE_EXECUTOR_WORKERS: int = Field(4, description="Nombre de threads dédiés aux traitements vocaux bloquants (décodage ffmpeg, reconnaissance, synthèse).")
+    VOICE_EXECUTOR_MAX_QUEUE: int = Field(32, description="Nombre maximal de traitements vocaux en attente d'un thread ; au-delà, les demandes sont refusées.")
+    VOICE_JOB_TIMEOUT_S: float = Field(30.0, description="Délai maximal (secondes) d'un traitement vocal avant abandon.")
+    TTS_CACHE_ENABLED: bool = Field(True, description="Active le cache adressé par contenu des réponses audio synthétisées (AUDIO_RESPONSES_DIR).")
+    TTS_CACHE_MAX_BYTES: int = Field(200 * 1024 * 1024, description="Taille maximale (octets) des fichiers audio de AUDIO_RESPONSES_DIR ; au-delà, éviction des moins récemment utilisés.")
+    TTS_CACHE_PIN_S: float = Field(120.0, description="Durée (secondes) pendant laquelle un fichier audio remis à un client n'est pas évincé du cache, le temps de son téléchargement.")
+    TTS_PIPELINE_ENABLED: bool = Field(True, description="Téléassistance : synthèse vocale phrase par phrase pendant la génération de la réponse (segments audio envoyés dans l'ordre).")
+    TTS_PIPELINE_MAX_PARALLEL: int = Field(3, description="Nombre maximal de phrases d'une même réponse en cours de synthèse vocale simultanément.")
+    TTS_PIPELINE_MIN_CHARS: int = Field(20, description="Longueur minimale (caractères) d'un segment synthétisé ; les phrases plus courtes sont regroupées avec la suivante.")
+    STT_BACKEND: str = Field("google", description="Moteur de reconnaissance vocale : 'google' (service Google Web Speech) ou 'vosk' (hors ligne, CPU).")
+    STT_VOSK_MODEL_PATH: str = Field("modeles/vosk-model-small-fr-0.22", description="Répertoire du modèle Vosk utilisé lorsque STT_BACKEND vaut 'vosk'.")
+    STT_SAMPLE_RATE: int = Field(16000, description="Fréquence d'échantillonnage (Hz) de l'audio décodé transmis au moteur de reconnaissance vocale.")
+
+    # --- Cache des analyses NLU (IntegrateurLLM) ---
+    NLU_CACHE_ENABLED: bool = Field(True, description="Active le cache des analyses d'intention et d'entités du LLM.")
+    NLU_CACHE_MAX_ENTRIES: int = Field(2000, description="Nombre maximal de messages normalisés dont l'analyse NLU est conservée (LRU).")
+    NLU_CACHE_TTL_S: float = Field(86400.0, description="Durée de validité (secondes) d'une analyse NLU en cache.")
+    NLU_CACHE_INTENTS: str = Field("salutation,remerciement,autre_conversation,non_pertinent", description="Intentions mises en cache, séparées par des virgules ; les autres intentions sont toujours analysées par le LLM.")
+    NLU_LOCAL_ENABLED: bool = Field(True, description="Active la classification locale (règles + bayésien naïf) des intentions évidentes avant l'appel NLU au LLM.")
+    NLU_LOCAL_MODEL_PATH: str = Field("modeles/classifieur_intentions.json", description="Modèle bayésien naïf produit par scripts/entrainer_modeles_semantiques.py ; règles seules s'il est absent.")
+    NLU_LOCAL_CONFIDENCE_THRESHOLD: float = Field(0.95, description="Probabilité minimale du modèle local pour répondre sans appeler le LLM.")
+    NLU_LOCAL_INTENTS: str = Field("salutation,remerciement,non_pertinent", description="Intentions que la classification locale peut répondre, séparées par des virgules.")
+    NLU_CACHE_SIMILARITY_THRESHOLD: float = Field(0.0, description="Similarité cosinus (trigrammes de caractères) minimale pour servir un quasi-doublon aux mêmes mots (fautes de frappe près) ; 0 (défaut) désactive ce niveau.")
+
+    # --- Passerelle des appels au LLM (Gemini) ---
+    LLM_NLU_MAX_CONCURRENCY: int = Field(8, description="Nombre maximal d'appels simultanés au modèle NLU (model_nlu).")
+    LLM_CHAT_MAX_CONCURRENCY: int = Field(16, description="Nombre maximal d'appels simultanés au modèle de chat et de rapports (model_chat_and_reports).")
+    LLM_MAX_QUEUE: int = Field(64, description="Nombre maximal d'appels en attente d'une place, par modèle ; au-delà, l'appel est refusé immédiatement.")
+    LLM_NLU_DEADLINE_S: float = Field(10.0, description="Délai total (secondes) d'un appel NLU, attente et réessais compris.")
+    LLM_CHAT_DEADLINE_S: float = Field(60.0, description="Délai total (secondes) d'un appel de chat ou de rapport (flux entier pour une réponse en flux).")
+    LLM_MAX_ATTEMPTS: int = Field(3, description="Nombre maximal de tentatives d'un appel en cas d'erreur passagère (quota, surcharge, panne).")
+    LLM_RETRY_BASE_DELAY_S: float = Field(0.5, description="Délai de base (secondes) avant réessai, doublé à chaque tentative et tiré au hasard entre 0 et cette valeur.")
+    LLM_RETRY_MAX_DELAY_S: float = Field(4.0, description="Délai maximal (secondes) avant un réessai.")
+    LLM_RETRY_BUDGET_RATIO: float = Field(0.1, description="Budget global de réessais : jetons gagnés par appel (0.1 = au plus ~10 % de réessais).")
+    LLM_RETRY_BUDGET_MIN_PER_S: float = Field(1.0, description="Jetons de réessai ajoutés chaque seconde, pour les périodes de faible trafic.")
+    LLM_RETRY_BUDGET_MAX_TOKENS: float = Field(20.0, description="Nombre maximal de jetons de réessai accumulés.")
+    LLM_BREAKER_ERROR_RATE: float = Field(0.5, description="Part d'erreurs passagères sur la fenêtre qui ouvre le disjoncteur d'un modèle.")
+    LLM_BREAKER_MIN_CALLS: int = Field(20, description="Nombre minimal d'appels sur la fenêtre avant que le disjoncteur puisse s'ouvrir.")
+    LLM_BREAKER_WINDOW_S: float = Field(30.0, description="Fenêtre glissante (secondes) du calcul du taux d'erreurs du disjoncteur.")
+    LLM_BREAKER_OPEN_S: float = Field(15.0, description="Durée (secondes) pendant laquelle un disjoncteur ouvert refuse les appels avant un appel d'essai.")
+
+    # --- Journal différé des événements système (audit) ---
+    AUDIT_QUEUE_SIZE: int = Field(10000, description="Nombre maximal d'événements système en attente d'écriture en mémoire.")
+    AUDIT_BATCH_SIZE: int = Field(200, description="Nombre maximal d'événements écrits par requête INSERT multi-lignes.")
+    AUDIT_FLUSH_INTERVAL_S: float = Field(1.0, description="Délai maximal (secondes) avant l'écriture d'un lot incomplet.")
+    AUDIT_ENQUEUE_TIMEOUT_S: float = Field(0.05, description="Attente maximale (secondes) d'une place dans la file avant déversement sur disque.")
+    AUDIT_SPILL_FILE: str = Field("journaux/evenements_en_attente.jsonl", description="Fichier JSONL recevant les événements non écrits en base, rejoués au démarrage puis périodiquement.")
+    AUDIT_SPILL_REPLAY_INTERVAL_S: float = Field(60.0, description="Intervalle (secondes) entre deux rejeux du fichier de débordement pendant l'exécution.")
 
 # Crée une instance globale des paramètres pour faciliter l'accès
 parametres = Parametres()
@@ -67,6 +137,9 @@ if __name__ == "__main__":
     print(f"DB Port: {parametres.DB_PORT}")
     print(f"DB Pool Size: {parametres.DB_POOL_SIZE}")
     print(f"DB Max Overflow: {parametres.DB_MAX_OVERFLOW}")
+    print(f"DB Pool Timeout: {parametres.DB_POOL_TIMEOUT}")
+    print(f"DB Pool Recycle: {parametres.DB_POOL_RECYCLE}")
+    print(f"DB Executor Workers: {parametres.DB_EXECUTOR_WORKERS}")
     print(f"Firebase Service Account Key Path: {parametres.FIREBASE_SERVICE_ACCOUNT_KEY_PATH}")
     print(f"Google API Key (masquée): {parametres.GOOGLE_API_KEY[:5]}..." if parametres.GOOGLE_API_KEY else "<NON DÉFINIE>")
     print(f"API Key App (masquée): {parametres.API_KEY_APP[:5]}..." if parametres.API_KEY_APP else "<NON DÉFINIE>")
@@ -75,5 +148,38 @@ if __name__ == "__main__":
     print(f"Upload Dir: {parametres.UPLOAD_DIR}")
     print(f"Audio Responses Dir: {parametres.AUDIO_RESPONSES_DIR}")
     print(f"Diagnostic Confidence Threshold: {parametres.DIAGNOSTIC_CONFIDENCE_THRESHOLD}")
+    print(f"Diagnostic Scoring Mode: {parametres.DIAGNOSTIC_SCORING_MODE}")
     print(f"Conversation History Limit: {parametres.CONVERSATION_HISTORY_LIMIT}")
+    print(f"Conversation Cache Sessions: {parametres.CONVERSATION_CACHE_SESSIONS}")
+    print(f"Audit Queue Size: {parametres.AUDIT_QUEUE_SIZE}")
+    print(f"Audit Batch Size: {parametres.AUDIT_BATCH_SIZE}")
+    print(f"Audit Spill File: {parametres.AUDIT_SPILL_FILE}")
+    print(f"Audit Spill Replay Interval S: {parametres.AUDIT_SPILL_REPLAY_INTERVAL_S}")
     print(f"Geolocation Search Radius (KM): {parametres.GEOLOCATION_SEARCH_RADIUS_KM}")
+    print(f"Geolocation Search Mode: {parametres.GEOLOCATION_SEARCH_MODE}")
+    print(f"Geolocation Index Rebuild Threshold: {parametres.GEOLOCATION_INDEX_REBUILD_THRESHOLD}")
+    print(f"Appointment Search Max Days: {parametres.APPOINTMENT_SEARCH_MAX_DAYS}")
+    print(f"Appointment Multi Search Max Doctors: {parametres.APPOINTMENT_MULTI_SEARCH_MAX_DOCTORS}")
+    print(f"Appointment Calendar Cache Days: {parametres.APPOINTMENT_CALENDAR_CACHE_DAYS}")
+    print(f"Teleassistance Audio Max Bytes: {parametres.TELEASSISTANCE_AUDIO_MAX_BYTES}")
+    print(f"Teleassistance Audio Format: {parametres.TELEASSISTANCE_AUDIO_FORMAT}")
+    print(f"Teleassistance Silence Ms: {parametres.TELEASSISTANCE_SILENCE_MS}")
+    print(f"Teleassistance Max Utterance Ms: {parametres.TELEASSISTANCE_MAX_UTTERANCE_MS}")
+    print(f"Teleassistance VAD Enabled: {parametres.TELEASSISTANCE_VAD_ENABLED}")
+    print(f"Voice Executor Workers: {parametres.VOICE_EXECUTOR_WORKERS}")
+    print(f"Voice Executor Max Queue: {parametres.VOICE_EXECUTOR_MAX_QUEUE}")
+    print(f"Voice Job Timeout S: {parametres.VOICE_JOB_TIMEOUT_S}")
+    print(f"TTS Cache Enabled: {parametres.TTS_CACHE_ENABLED}")
+    print(f"TTS Cache Max Bytes: {parametres.TTS_CACHE_MAX_BYTES}")
+    print(f"TTS Cache Pin (s): {parametres.TTS_CACHE_PIN_S}")
+    print(f"TTS Pipeline Enabled: {parametres.TTS_PIPELINE_ENABLED}")
+    print(f"TTS Pipeline Max Parallel: {parametres.TTS_PIPELINE_MAX_PARALLEL}")
+    print(f"STT Backend: {parametres.STT_BACKEND}")
+    print(f"NLU Cache Enabled: {parametres.NLU_CACHE_ENABLED}")
+    print(f"NLU Cache Intents: {parametres.NLU_CACHE_INTENTS}")
+    print(f"NLU Local Enabled: {parametres.NLU_LOCAL_ENABLED}")
+    print(f"NLU Local Intents: {parametres.NLU_LOCAL_INTENTS}")
+    print(f"LLM NLU Max Concurrency: {parametres.LLM_NLU_MAX_CONCURRENCY}")
+    print(f"LLM Chat Max Concurrency: {parametres.LLM_CHAT_MAX_CONCURRENCY}")
+    print(f"LLM Max Attempts: {parametres.LLM_MAX_ATTEMPTS}")
+    print(f"Geolocation Batch Max Origins: {parametres.GEOLOCATION_BATCH_MAX_ORIGINS}")
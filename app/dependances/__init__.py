@@ -3,9 +3,12 @@
 # au lieu de 'app.dependances.injection'.
 
 from .injection import (
+    get_acces_donnees_async,
+    get_journal_evenements,
     get_integrateur_llm,
     get_gestionnaire_connaissances,
     get_gestionnaire_contexte,
+    get_executeur_vocal,
     get_gestionnaire_vocal,
     get_gestionnaire_authentification,
     get_gestionnaire_patient,
@@ -19,9 +22,12 @@ from .injection import (
 
 
 __all__ = [
+    "get_acces_donnees_async",
+    "get_journal_evenements",
     "get_integrateur_llm",
     "get_gestionnaire_connaissances",
     "get_gestionnaire_contexte",
+    "get_executeur_vocal",
     "get_gestionnaire_vocal",
     "get_gestionnaire_authentification",
     "get_gestionnaire_patient",
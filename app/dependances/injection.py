@@ -2,11 +2,19 @@
 import logging
 from typing import Optional
 
-# Import des services pour l'initialisation
-from app.services.integrateur_llm import IntegrateurLLM
+# Import de la couche d'accès asynchrone aux données et des services pour l'initialisation
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+from app.configuration.parametres import parametres
+from app.services.integrateur_llm import IntegrateurLLM, creer_passerelle_llm
+from app.services.cache_nlu import CacheNLU
+from app.services.classifieur_intentions import ClassifieurIntentionsLocal
 from app.services.gestionnaire_connaissances import GestionnaireConnaissances
 from app.services.gestionnaire_contexte import GestionnaireContexte
+from app.services.journal_evenements import JournalEvenementsDiffere
+from app.services.executeur_vocal import ExecuteurVocal
 from app.services.gestionnaire_vocal import GestionnaireVocal
+from app.services.cache_audio_tts import CacheAudioTTS
+from app.services.moteurs_stt import creer_moteur_stt
 from app.services.gestionnaire_authentification import GestionnaireAuthentification
 from app.services.gestionnaire_patient import GestionnairePatient
 from app.services.gestionnaire_medecin import GestionnaireMedecin
@@ -20,9 +28,12 @@ from fastapi import Depends
 logger = logging.getLogger(__name__)
 
 # Instances de services (singletons)
+_acces_donnees_async_instance: Optional[AccesDonneesAsync] = None
+_journal_evenements_instance: Optional[JournalEvenementsDiffere] = None
 _integrateur_llm_instance: Optional[IntegrateurLLM] = None
 _gestionnaire_connaissances_instance: Optional[GestionnaireConnaissances] = None
 _gestionnaire_contexte_instance: Optional[GestionnaireContexte] = None
+_executeur_vocal_instance: Optional[ExecuteurVocal] = None
 _gestionnaire_vocal_instance: Optional[GestionnaireVocal] = None
 _gestionnaire_authentification_instance: Optional[GestionnaireAuthentification] = None
 _gestionnaire_patient_instance: Optional[GestionnairePatient] = None
@@ -35,10 +46,56 @@ _moteur_diagnostic_instance: Optional[MoteurDiagnostic] = None
 
 
 # Fonctions d'initialisation (appelées dans le lifespan de FastAPI)
+async def init_acces_donnees_async_instance():
+    global _acces_donnees_async_instance
+    if _acces_donnees_async_instance is None:
+        _acces_donnees_async_instance = AccesDonneesAsync(nb_workers=parametres.DB_EXECUTOR_WORKERS)
+        logger.info("AccesDonneesAsync initialisé.")
+    else:
+        logger.debug("AccesDonneesAsync déjà initialisé.")
+
+async def _obtenir_acces_donnees_async() -> AccesDonneesAsync:
+    if _acces_donnees_async_instance is None:
+        logger.warning("AccesDonneesAsync non initialisé avant un service qui en dépend. Initialisation forcée.")
+        await init_acces_donnees_async_instance()
+    return _acces_donnees_async_instance
+
+async def init_journal_evenements_instance():
+    global _journal_evenements_instance
+    if _journal_evenements_instance is None:
+        _journal_evenements_instance = JournalEvenementsDiffere(
+            acces_donnees=await _obtenir_acces_donnees_async(),
+            taille_file=parametres.AUDIT_QUEUE_SIZE,
+            taille_lot=parametres.AUDIT_BATCH_SIZE,
+            delai_flush_s=parametres.AUDIT_FLUSH_INTERVAL_S,
+            delai_attente_s=parametres.AUDIT_ENQUEUE_TIMEOUT_S,
+            chemin_debordement=parametres.AUDIT_SPILL_FILE,
+            delai_rejeu_s=parametres.AUDIT_SPILL_REPLAY_INTERVAL_S
+        )
+        await _journal_evenements_instance.demarrer()
+        logger.info("JournalEvenementsDiffere initialisé.")
+    else:
+        logger.debug("JournalEvenementsDiffere déjà initialisé.")
+
 async def init_integrateur_llm_instance():
     global _integrateur_llm_instance
     if _integrateur_llm_instance is None:
-        _integrateur_llm_instance = IntegrateurLLM()
+        cache_nlu = CacheNLU(
+            capacite=parametres.NLU_CACHE_MAX_ENTRIES,
+            ttl_s=parametres.NLU_CACHE_TTL_S,
+            intentions=[intention.strip() for intention in parametres.NLU_CACHE_INTENTS.split(",") if intention.strip()],
+            seuil_similarite=parametres.NLU_CACHE_SIMILARITY_THRESHOLD or None
+        ) if parametres.NLU_CACHE_ENABLED else None
+        classifieur_local = ClassifieurIntentionsLocal.depuis_fichier(
+            parametres.NLU_LOCAL_MODEL_PATH,
+            seuil_confiance=parametres.NLU_LOCAL_CONFIDENCE_THRESHOLD,
+            intentions_rapides=[intention.strip() for intention in parametres.NLU_LOCAL_INTENTS.split(",") if intention.strip()]
+        ) if parametres.NLU_LOCAL_ENABLED else None
+        _integrateur_llm_instance = IntegrateurLLM(
+            cache_nlu=cache_nlu,
+            classifieur_local=classifieur_local,
+            passerelle=creer_passerelle_llm()
+        )
         logger.info("IntegrateurLLM initialisé.")
     else:
         logger.debug("IntegrateurLLM déjà initialisé.")
@@ -46,7 +103,14 @@ async def init_integrateur_llm_instance():
 async def init_gestionnaire_connaissances_instance():
     global _gestionnaire_connaissances_instance
     if _gestionnaire_connaissances_instance is None:
-        _gestionnaire_connaissances_instance = GestionnaireConnaissances()
+        _gestionnaire_connaissances_instance = GestionnaireConnaissances(
+            acces_donnees=await _obtenir_acces_donnees_async()
+        )
+        try:
+            await _gestionnaire_connaissances_instance.construire_index()
+        except Exception as e:
+            # L'index sera construit à la première recherche si la base est indisponible au démarrage.
+            logger.error(f"Construction de l'index des symptômes impossible au démarrage : {e}")
         logger.info("GestionnaireConnaissances initialisé.")
     else:
         logger.debug("GestionnaireConnaissances déjà initialisé.")
@@ -54,15 +118,51 @@ async def init_gestionnaire_connaissances_instance():
 async def init_gestionnaire_contexte_instance():
     global _gestionnaire_contexte_instance
     if _gestionnaire_contexte_instance is None:
-        _gestionnaire_contexte_instance = GestionnaireContexte()
+        if _journal_evenements_instance is None:
+            logger.warning("JournalEvenementsDiffere non initialisé avant GestionnaireContexte. Tentative d'initialisation.")
+            await init_journal_evenements_instance()
+        _gestionnaire_contexte_instance = GestionnaireContexte(
+            acces_donnees=await _obtenir_acces_donnees_async(),
+            journal_evenements=_journal_evenements_instance
+        )
         logger.info("GestionnaireContexte initialisé.")
     else:
         logger.debug("GestionnaireContexte déjà initialisé.")
 
+async def init_executeur_vocal_instance():
+    global _executeur_vocal_instance
+    if _executeur_vocal_instance is None:
+        _executeur_vocal_instance = ExecuteurVocal(
+            nb_workers=parametres.VOICE_EXECUTOR_WORKERS,
+            taille_file_max=parametres.VOICE_EXECUTOR_MAX_QUEUE,
+            delai_max_s=parametres.VOICE_JOB_TIMEOUT_S
+        )
+        logger.info("ExecuteurVocal initialisé.")
+    else:
+        logger.debug("ExecuteurVocal déjà initialisé.")
+
 async def init_gestionnaire_vocal_instance():
     global _gestionnaire_vocal_instance
     if _gestionnaire_vocal_instance is None:
-        _gestionnaire_vocal_instance = GestionnaireVocal()
+        if _executeur_vocal_instance is None:
+            logger.warning("ExecuteurVocal non initialisé avant GestionnaireVocal. Tentative d'initialisation.")
+            await init_executeur_vocal_instance()
+        moteur_stt = creer_moteur_stt(
+            parametres.STT_BACKEND,
+            chemin_modele=parametres.STT_VOSK_MODEL_PATH,
+            delai_s=parametres.VOICE_JOB_TIMEOUT_S
+        )
+        cache_audio = CacheAudioTTS(
+            repertoire=parametres.AUDIO_RESPONSES_DIR,
+            taille_max_octets=parametres.TTS_CACHE_MAX_BYTES,
+            duree_protection_s=parametres.TTS_CACHE_PIN_S
+        ) if parametres.TTS_CACHE_ENABLED else None
+        _gestionnaire_vocal_instance = GestionnaireVocal(
+            executeur=_executeur_vocal_instance,
+            moteur_stt=moteur_stt,
+            cache_audio=cache_audio
+        )
+        await _gestionnaire_vocal_instance.charger_moteur_stt()
         logger.info("GestionnaireVocal initialisé.")
     else:
         logger.debug("GestionnaireVocal déjà initialisé.")
@@ -74,6 +174,7 @@ async def init_gestionnaire_authentification_instance():
             logger.warning("GestionnaireContexte non initialisé avant GestionnaireAuthentification. Tentative d'initialisation.")
             await init_gestionnaire_contexte_instance()
         _gestionnaire_authentification_instance = GestionnaireAuthentification(
+            acces_donnees=await _obtenir_acces_donnees_async(),
             gestionnaire_contexte=_gestionnaire_contexte_instance
         )
         logger.info("GestionnaireAuthentification initialisé.")
@@ -131,6 +232,7 @@ async def init_gestionnaire_patient_instance():
                      f"MoteurDiag={_moteur_diagnostic_instance is not None}")
 
         _gestionnaire_patient_instance = GestionnairePatient(
+            acces_donnees=await _obtenir_acces_donnees_async(),
             integrateur_llm=_integrateur_llm_instance,
             gestionnaire_contexte=_gestionnaire_contexte_instance,
             moteur_diagnostic=_moteur_diagnostic_instance
@@ -156,6 +258,9 @@ async def init_gestionnaire_medecin_instance():
         if _gestionnaire_connaissances_instance is None:
             logger.warning("GestionnaireConnaissances est None lors de l'initialisation de GestionnaireMedecin. Initialisation forcée.")
             await init_gestionnaire_connaissances_instance()
+        if _gestionnaire_geolocalisation_instance is None:
+            logger.warning("GestionnaireGeolocalisation est None lors de l'initialisation de GestionnaireMedecin. Initialisation forcée.")
+            await init_gestionnaire_geolocalisation_instance()
 
         # Log l'état des instances juste avant la création de GestionnaireMedecin
         logger.debug(f"État des dépendances pour GestionnaireMedecin: "
@@ -165,10 +270,12 @@ async def init_gestionnaire_medecin_instance():
                      f"Connaissances={_gestionnaire_connaissances_instance is not None}")
 
         _gestionnaire_medecin_instance = GestionnaireMedecin(
+            acces_donnees=await _obtenir_acces_donnees_async(),
             integrateur_llm=_integrateur_llm_instance,
             gestionnaire_contexte=_gestionnaire_contexte_instance,
             moteur_diagnostic=_moteur_diagnostic_instance,
-            gestionnaire_connaissances=_gestionnaire_connaissances_instance
+            gestionnaire_connaissances=_gestionnaire_connaissances_instance,
+            gestionnaire_geolocalisation=_gestionnaire_geolocalisation_instance
         )
         logger.info("GestionnaireMedecin initialisé.")
     else:
@@ -184,6 +291,9 @@ async def init_gestionnaire_structure_medicale_instance():
         if _gestionnaire_contexte_instance is None:
             logger.warning("GestionnaireContexte est None lors de l'initialisation de GestionnaireStructureMedicale. Initialisation forcée.")
             await init_gestionnaire_contexte_instance()
+        if _gestionnaire_geolocalisation_instance is None:
+            logger.warning("GestionnaireGeolocalisation est None lors de l'initialisation de GestionnaireStructureMedicale. Initialisation forcée.")
+            await init_gestionnaire_geolocalisation_instance()
         
         # Log l'état des instances juste avant la création de GestionnaireStructureMedicale
         logger.debug(f"État des dépendances pour GestionnaireStructureMedicale: "
@@ -191,8 +301,10 @@ async def init_gestionnaire_structure_medicale_instance():
                      f"Contexte={_gestionnaire_contexte_instance is not None}")
 
         _gestionnaire_structure_medicale_instance = GestionnaireStructureMedicale(
+            acces_donnees=await _obtenir_acces_donnees_async(),
             integrateur_llm=_integrateur_llm_instance,
-            gestionnaire_contexte=_gestionnaire_contexte_instance
+            gestionnaire_contexte=_gestionnaire_contexte_instance,
+            gestionnaire_geolocalisation=_gestionnaire_geolocalisation_instance
         )
         logger.info("GestionnaireStructureMedicale initialisé.")
     else:
@@ -205,13 +317,19 @@ async def init_gestionnaire_rendezvous_instance():
         if _gestionnaire_contexte_instance is None:
             logger.warning("GestionnaireContexte est None lors de l'initialisation de GestionnaireRendezvous. Initialisation forcée.")
             await init_gestionnaire_contexte_instance()
+        if _gestionnaire_geolocalisation_instance is None:
+            logger.warning("GestionnaireGeolocalisation est None lors de l'initialisation de GestionnaireRendezvous. Initialisation forcée.")
+            await init_gestionnaire_geolocalisation_instance()
         
         # Log l'état des instances juste avant la création de GestionnaireRendezvous
         logger.debug(f"État des dépendances pour GestionnaireRendezvous: "
-                     f"Contexte={_gestionnaire_contexte_instance is not None}")
+                     f"Contexte={_gestionnaire_contexte_instance is not None}, "
+                     f"Geolocalisation={_gestionnaire_geolocalisation_instance is not None}")
 
         _gestionnaire_rendezvous_instance = GestionnaireRendezvous(
-            gestionnaire_contexte=_gestionnaire_contexte_instance
+            acces_donnees=await _obtenir_acces_donnees_async(),
+            gestionnaire_contexte=_gestionnaire_contexte_instance,
+            gestionnaire_geolocalisation=_gestionnaire_geolocalisation_instance
         )
         logger.info("GestionnaireRendezvous initialisé.")
     else:
@@ -234,6 +352,7 @@ async def init_gestionnaire_telemedecine_instance():
                      f"Contexte={_gestionnaire_contexte_instance is not None}")
 
         _gestionnaire_telemedecine_instance = GestionnaireTelemedecine(
+            acces_donnees=await _obtenir_acces_donnees_async(),
             integrateur_llm=_integrateur_llm_instance,
             gestionnaire_contexte=_gestionnaire_contexte_instance
         )
@@ -244,13 +363,30 @@ async def init_gestionnaire_telemedecine_instance():
 async def init_gestionnaire_geolocalisation_instance():
     global _gestionnaire_geolocalisation_instance
     if _gestionnaire_geolocalisation_instance is None:
-        _gestionnaire_geolocalisation_instance = GestionnaireGeolocalisation()
+        _gestionnaire_geolocalisation_instance = GestionnaireGeolocalisation(
+            acces_donnees=await _obtenir_acces_donnees_async()
+        )
+        try:
+            await _gestionnaire_geolocalisation_instance.construire_index()
+        except Exception as e:
+            # Les index seront construits à la première recherche si la base est indisponible au démarrage.
+            logger.error(f"Construction des index spatiaux impossible au démarrage : {e}")
         logger.info("GestionnaireGeolocalisation initialisé.")
     else:
         logger.debug("GestionnaireGeolocalisation déjà initialisé.")
 
 
 # Fonctions pour récupérer les instances (utilisées par FastAPI.Depends)
+def get_acces_donnees_async() -> AccesDonneesAsync:
+    if _acces_donnees_async_instance is None:
+        raise Exception("AccesDonneesAsync n'est pas initialisé.")
+    return _acces_donnees_async_instance
+
+def get_journal_evenements() -> JournalEvenementsDiffere:
+    if _journal_evenements_instance is None:
+        raise Exception("JournalEvenementsDiffere n'est pas initialisé.")
+    return _journal_evenements_instance
+
 def get_integrateur_llm() -> IntegrateurLLM:
     if _integrateur_llm_instance is None:
         raise Exception("IntegrateurLLM n'est pas initialisé.")
@@ -266,6 +402,11 @@ def get_gestionnaire_contexte() -> GestionnaireContexte:
         raise Exception("GestionnaireContexte n'est pas initialisé.")
     return _gestionnaire_contexte_instance
 
+def get_executeur_vocal() -> ExecuteurVocal:
+    if _executeur_vocal_instance is None:
+        raise Exception("ExecuteurVocal n'est pas initialisé.")
+    return _executeur_vocal_instance
+
 def get_gestionnaire_vocal() -> GestionnaireVocal:
     if _gestionnaire_vocal_instance is None:
         raise Exception("GestionnaireVocal n'est pas initialisé.")
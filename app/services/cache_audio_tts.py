@@ -0,0 +1,127 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_AUDIO = ".mp3"
+
+
+class CacheAudioTTS:
+    """
+    Cache adressé par contenu des réponses audio synthétisées, stocké dans le répertoire
+    des réponses audio : le fichier de (texte, langue, voix) est 'tts_<sha256>.mp3', si bien
+    qu'une réponse déjà synthétisée est servie sans appel à gTTS.
+
+    La taille totale des fichiers .mp3 du répertoire est bornée à 'taille_max_octets' par
+    éviction LRU. Au démarrage, les fichiers présents (y compris les anciennes réponses
+    nommées par UUID) sont indexés du plus ancien au plus récent (date de modification),
+    les anciennes réponses non adressables sont donc évincées en premier.
+
+    Un fichier remis à un client (obtenir, enregistrer) n'est pas évincé pendant 'duree_protection_s'
+    secondes, le temps que le client le télécharge : les segments d'une réponse synthétisée phrase
+    par phrase sont lus les uns après les autres. La taille maximale peut alors être dépassée
+    temporairement ; l'éviction reprend à l'enregistrement suivant.
+    """
+    def __init__(self, repertoire: str, taille_max_octets: int, duree_protection_s: float = 0.0):
+        self.repertoire = repertoire
+        self.taille_max_octets = taille_max_octets
+        self.duree_protection_s = duree_protection_s
+        # nom de fichier -> (taille, dernière remise à un client (time.monotonic), None si jamais remis),
+        # du moins au plus récemment utilisé
+        self._fichiers: "OrderedDict[str, Tuple[int, Optional[float]]]" = OrderedDict()
+        self._nb_octets = 0
+        self._verrou = threading.Lock()
+        self._succes = 0
+        self._echecs = 0
+        self._evictions = 0
+        self._evictions_differees = 0
+        self._indexer()
+
+    @staticmethod
+    def cle(texte: str, language_code: str, voix: str) -> str:
+        return hashlib.sha256(f"{voix}\x00{language_code}\x00{texte.strip()}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _nom(cle: str) -> str:
+        return f"tts_{cle}{EXTENSION_AUDIO}"
+
+    def chemin(self, cle: str) -> str:
+        return os.path.join(self.repertoire, self._nom(cle))
+
+    def _indexer(self):
+        os.makedirs(self.repertoire, exist_ok=True)
+        entrees = []
+        for entree in os.scandir(self.repertoire):
+            if not entree.is_file():
+                continue
+            if entree.name.endswith(".part"):
+                # Synthèse interrompue par un arrêt du serveur
+                os.remove(entree.path)
+            elif entree.name.endswith(EXTENSION_AUDIO):
+                entrees.append(entree)
+        with self._verrou:
+            for entree in sorted(entrees, key=lambda e: e.stat().st_mtime):
+                taille = entree.stat().st_size
+                self._fichiers[entree.name] = (taille, None)
+                self._nb_octets += taille
+            self._evincer()
+        logger.info(f"CacheAudioTTS : {len(self._fichiers)} fichiers indexés ({self._nb_octets} octets) dans {self.repertoire}.")
+
+    def _evincer(self):
+        """Supprime les fichiers les moins récemment utilisés jusqu'à revenir sous la taille maximale (verrou tenu)."""
+        limite_protection = time.monotonic() - self.duree_protection_s
+        while self._nb_octets > self.taille_max_octets and self._fichiers:
+            nom, (taille, remis_a) = next(iter(self._fichiers.items()))
+            if remis_a is not None and remis_a > limite_protection:
+                # Les fichiers suivants ont été remis plus récemment encore : tous sont protégés
+                self._evictions_differees += 1
+                logger.debug(f"CacheAudioTTS : éviction différée, {nom} a été remis à un client il y a moins de {self.duree_protection_s} s.")
+                return
+            del self._fichiers[nom]
+            self._nb_octets -= taille
+            self._evictions += 1
+            try:
+                os.remove(os.path.join(self.repertoire, nom))
+            except OSError as e:
+                logger.warning(f"CacheAudioTTS : suppression de {nom} impossible: {e}")
+
+    def obtenir(self, cle: str) -> Optional[str]:
+        """Chemin du fichier audio déjà synthétisé pour 'cle', ou None."""
+        nom = self._nom(cle)
+        with self._verrou:
+            if nom not in self._fichiers:
+                self._echecs += 1
+                return None
+            self._fichiers[nom] = (self._fichiers[nom][0], time.monotonic())
+            self._fichiers.move_to_end(nom)
+            self._succes += 1
+        return os.path.join(self.repertoire, nom)
+
+    def enregistrer(self, cle: str):
+        """Indexe le fichier qui vient d'être écrit en chemin(cle), puis évince si nécessaire."""
+        nom = self._nom(cle)
+        taille = os.path.getsize(os.path.join(self.repertoire, nom))
+        with self._verrou:
+            self._nb_octets += taille - self._fichiers.pop(nom, (0, None))[0]
+            self._fichiers[nom] = (taille, time.monotonic())
+            self._evincer()
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        with self._verrou:
+            total = self._succes + self._echecs
+            return {
+                "fichiers": len(self._fichiers),
+                "octets": self._nb_octets,
+                "taille_max_octets": self.taille_max_octets,
+                "succes": self._succes,
+                "echecs": self._echecs,
+                "taux_succes": round(self._succes / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+                "evictions_differees": self._evictions_differees,
+                "duree_protection_s": self.duree_protection_s,
+            }
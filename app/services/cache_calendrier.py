@@ -0,0 +1,94 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.moteur_disponibilites import Intervalle
+
+logger = logging.getLogger(__name__)
+
+
+def jours_couverts(debut: datetime, fin: datetime) -> List[date]:
+    """Jours calendaires touchés par l'intervalle [debut, fin)."""
+    dernier = (fin - timedelta(microseconds=1)).date() if fin > debut else debut.date()
+    return [debut.date() + timedelta(days=i) for i in range((dernier - debut.date()).days + 1)]
+
+
+class CacheCalendrier:
+    """
+    Cache en mémoire (LRU) des intervalles réservés de chaque médecin, jour par jour :
+    (medecin_id, jour) -> intervalles [debut, fin) des rendez-vous non annulés touchant ce jour.
+
+    L'invalidation est faite par GestionnaireRendezvous à chaque création, modification,
+    annulation ou suppression, pour les seuls jours concernés. Un numéro de version par
+    médecin empêche qu'une lecture commencée avant une invalidation ne remette en cache
+    des données périmées : enregistrer() ignore les jours lus sous une version dépassée.
+    """
+    def __init__(self, capacite: int):
+        self._capacite = max(1, capacite)
+        self._jours: "OrderedDict[Tuple[int, date], Tuple[Intervalle, ...]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._verrou = threading.Lock()
+        self._succes = 0
+        self._echecs = 0
+        self._invalidations = 0
+
+    def version(self, medecin_id: int) -> int:
+        with self._verrou:
+            return self._versions.get(medecin_id, 0)
+
+    def obtenir(self, medecin_id: int, jours: Iterable[date]) -> Tuple[Dict[date, Tuple[Intervalle, ...]], List[date]]:
+        """Retourne les jours présents en cache et la liste des jours manquants."""
+        presents: Dict[date, Tuple[Intervalle, ...]] = {}
+        manquants: List[date] = []
+        with self._verrou:
+            for jour in jours:
+                cle = (medecin_id, jour)
+                intervalles = self._jours.get(cle)
+                if intervalles is None:
+                    manquants.append(jour)
+                    self._echecs += 1
+                else:
+                    self._jours.move_to_end(cle)
+                    presents[jour] = intervalles
+                    self._succes += 1
+        return presents, manquants
+
+    def enregistrer(self, medecin_id: int, version: int, jours: Dict[date, List[Intervalle]]):
+        """Met en cache les jours lus sous 'version' (voir version()), s'il n'y a pas eu d'invalidation depuis."""
+        with self._verrou:
+            if self._versions.get(medecin_id, 0) != version:
+                return
+            for jour, intervalles in jours.items():
+                self._jours[(medecin_id, jour)] = tuple(sorted(intervalles))
+                self._jours.move_to_end((medecin_id, jour))
+            while len(self._jours) > self._capacite:
+                self._jours.popitem(last=False)
+
+    def invalider(self, medecin_id: Optional[int], debut: datetime, fin: datetime):
+        """Retire du cache les jours du médecin touchés par l'intervalle [debut, fin)."""
+        if medecin_id is None:
+            return
+        with self._verrou:
+            self._versions[medecin_id] = self._versions.get(medecin_id, 0) + 1
+            for jour in jours_couverts(debut, fin):
+                self._jours.pop((medecin_id, jour), None)
+            self._invalidations += 1
+
+    def vider(self):
+        with self._verrou:
+            self._jours.clear()
+            self._versions = {medecin_id: version + 1 for medecin_id, version in self._versions.items()}
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        with self._verrou:
+            total = self._succes + self._echecs
+            return {
+                "jours_en_cache": len(self._jours),
+                "capacite": self._capacite,
+                "succes": self._succes,
+                "echecs": self._echecs,
+                "taux_succes": round(self._succes / total, 3) if total else 0.0,
+                "invalidations": self._invalidations,
+            }
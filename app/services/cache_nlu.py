@@ -0,0 +1,194 @@
+import copy
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.utilitaires.normalisation_symptomes import replier_unicode
+
+logger = logging.getLogger(__name__)
+
+# Dimension des vecteurs de n-grammes de caractères (hachage) du niveau « quasi-doublon »
+DIMENSION_EMBEDDING = 1024
+TAILLE_NGRAMME = 3
+# Longueur minimale d'un mot pour qu'une faute de frappe soit tolérée au niveau « quasi-doublon »
+LONGUEUR_MIN_VARIANTE = 4
+
+_SEPARATEURS = re.compile(r"[^a-z0-9]+")
+
+
+def normaliser_texte_nlu(texte: str) -> str:
+    """Clé du niveau exact : minuscules sans accents ni ponctuation, espaces réduits ('Bonjour !!' -> 'bonjour')."""
+    return " ".join(mot for mot in _SEPARATEURS.split(replier_unicode(texte)) if mot)
+
+
+def vecteur_ngrammes(texte_normalise: str, dimension: int = DIMENSION_EMBEDDING) -> np.ndarray:
+    """
+    Plongement local d'un texte normalisé : trigrammes de caractères hachés (crc32, stable
+    entre processus) dans 'dimension' composantes, vecteur de norme 1 (cosinus = produit scalaire).
+    """
+    vecteur = np.zeros(dimension, dtype=np.float32)
+    borne = f" {texte_normalise} "
+    for i in range(len(borne) - TAILLE_NGRAMME + 1):
+        vecteur[zlib.crc32(borne[i:i + TAILLE_NGRAMME].encode("utf-8")) % dimension] += 1.0
+    norme = float(np.linalg.norm(vecteur))
+    return vecteur / norme if norme else vecteur
+
+
+def variante_orthographique(mot: str, autre: str) -> bool:
+    """
+    Vrai si 'autre' est une faute de frappe de 'mot' : une insertion, une suppression, une
+    substitution ou une transposition, et seulement pour les mots d'au moins LONGUEUR_MIN_VARIANTE
+    caractères ("bonjuor" ~ "bonjour", mais "pas" ne varie pas en "par").
+    """
+    if min(len(mot), len(autre)) < LONGUEUR_MIN_VARIANTE or abs(len(mot) - len(autre)) > 1:
+        return False
+    debut = 0
+    while debut < min(len(mot), len(autre)) and mot[debut] == autre[debut]:
+        debut += 1
+    fin_mot, fin_autre = len(mot), len(autre)
+    while fin_mot > debut and fin_autre > debut and mot[fin_mot - 1] == autre[fin_autre - 1]:
+        fin_mot -= 1
+        fin_autre -= 1
+    ecart_mot, ecart_autre = mot[debut:fin_mot], autre[debut:fin_autre]
+    if len(ecart_mot) + len(ecart_autre) <= 1 or (len(ecart_mot) == 1 and len(ecart_autre) == 1):
+        return True
+    return len(ecart_mot) == 2 and ecart_mot == ecart_autre[::-1]
+
+
+def memes_mots(texte_normalise: str, autre_normalise: str) -> bool:
+    """
+    Vrai si deux textes normalisés ont les mêmes mots, à l'ordre, aux répétitions et aux
+    fautes de frappe près. Un mot ajouté ("pas", "mal", un symptôme) suffit à les distinguer.
+    """
+    mots, autres = set(texte_normalise.split()), set(autre_normalise.split())
+    en_plus, en_moins = mots - autres, autres - mots
+    return (all(any(variante_orthographique(mot, autre) for autre in autres) for mot in en_plus)
+            and all(any(variante_orthographique(mot, autre) for autre in mots) for mot in en_moins))
+
+
+class CacheNLU:
+    """
+    Cache à deux niveaux des analyses NLU (intention + entités) de IntegrateurLLM :
+      - niveau exact : texte normalisé (normaliser_texte_nlu) -> résultat ;
+      - niveau quasi-doublon (si 'seuil_similarite' est fourni) : le résultat du texte en cache
+        le plus proche (cosinus des vecteurs de trigrammes) si la similarité atteint le seuil et
+        que les deux textes ont les mêmes mots (memes_mots) : une négation ou un symptôme ajouté
+        à une formule de politesse change le sens malgré une similarité de plus de 0,9.
+
+    Seules les intentions de 'intentions' sont mises en cache : leurs résultats ne portent pas
+    d'entités propres au message (salutations, remerciements...). Les autres (symptômes,
+    maladies) passent toujours par le LLM. Éviction LRU au-delà de 'capacite' entrées et
+    expiration après 'ttl_s' secondes. Les résultats sont copiés à l'entrée et à la sortie.
+    """
+    def __init__(self, capacite: int, ttl_s: float, intentions: Iterable[str], seuil_similarite: Optional[float] = None):
+        self._capacite = max(1, capacite)
+        self._ttl_s = ttl_s
+        self.intentions = frozenset(intentions)
+        self._seuil_similarite = seuil_similarite
+        # texte normalisé -> (résultat, expiration (time.monotonic), ligne de la matrice des vecteurs)
+        self._entrees: "OrderedDict[str, Tuple[Dict[str, Any], float, Optional[int]]]" = OrderedDict()
+        self._vecteurs: Optional[np.ndarray] = None
+        if seuil_similarite is not None:
+            self._vecteurs = np.zeros((self._capacite, DIMENSION_EMBEDDING), dtype=np.float32)
+            self._cles_lignes: List[Optional[str]] = [None] * self._capacite
+            self._lignes_libres = list(range(self._capacite - 1, -1, -1))
+        self._verrou = threading.Lock()
+        self._succes_exacts = 0
+        self._succes_proches = 0
+        self._echecs = 0
+        self._non_cachables = 0
+        self._expirations = 0
+        self._evictions = 0
+
+    def _retirer(self, cle: str):
+        _, _, ligne = self._entrees.pop(cle)
+        if ligne is not None:
+            self._vecteurs[ligne] = 0.0
+            self._cles_lignes[ligne] = None
+            self._lignes_libres.append(ligne)
+
+    def _lire(self, cle: str) -> Optional[Dict[str, Any]]:
+        entree = self._entrees.get(cle)
+        if entree is None:
+            return None
+        if entree[1] < time.monotonic():
+            self._retirer(cle)
+            self._expirations += 1
+            return None
+        self._entrees.move_to_end(cle)
+        return entree[0]
+
+    def obtenir(self, texte: str) -> Optional[Dict[str, Any]]:
+        """Résultat NLU en cache pour 'texte' (exact, sinon quasi-doublon), ou None."""
+        cle = normaliser_texte_nlu(texte)
+        if not cle:
+            return None
+        with self._verrou:
+            resultat = self._lire(cle)
+            if resultat is not None:
+                self._succes_exacts += 1
+                return copy.deepcopy(resultat)
+            if self._vecteurs is not None and self._entrees:
+                similarites = self._vecteurs @ vecteur_ngrammes(cle)
+                ligne = int(np.argmax(similarites))
+                proche = self._cles_lignes[ligne]
+                if similarites[ligne] >= self._seuil_similarite and proche is not None and memes_mots(cle, proche):
+                    resultat = self._lire(proche)
+                    if resultat is not None:
+                        self._succes_proches += 1
+                        logger.debug(f"CacheNLU : '{cle}' servi par '{proche}' (similarité {similarites[ligne]:.3f}).")
+                        return copy.deepcopy(resultat)
+            self._echecs += 1
+        return None
+
+    def enregistrer(self, texte: str, resultat: Dict[str, Any]):
+        """Met en cache le résultat NLU de 'texte' si son intention fait partie des intentions cachables."""
+        if resultat.get("intention") not in self.intentions:
+            with self._verrou:
+                self._non_cachables += 1
+            return
+        cle = normaliser_texte_nlu(texte)
+        if not cle:
+            return
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+            while len(self._entrees) >= self._capacite:
+                self._retirer(next(iter(self._entrees)))
+                self._evictions += 1
+            ligne = None
+            if self._vecteurs is not None:
+                ligne = self._lignes_libres.pop()
+                self._vecteurs[ligne] = vecteur_ngrammes(cle)
+                self._cles_lignes[ligne] = cle
+            self._entrees[cle] = (copy.deepcopy(resultat), time.monotonic() + self._ttl_s, ligne)
+
+    def vider(self):
+        with self._verrou:
+            for cle in list(self._entrees):
+                self._retirer(cle)
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        with self._verrou:
+            succes = self._succes_exacts + self._succes_proches
+            total = succes + self._echecs
+            return {
+                "entrees": len(self._entrees),
+                "capacite": self._capacite,
+                "ttl_s": self._ttl_s,
+                "intentions": sorted(self.intentions),
+                "niveau_quasi_doublon": self._vecteurs is not None,
+                "succes_exacts": self._succes_exacts,
+                "succes_proches": self._succes_proches,
+                "echecs": self._echecs,
+                "taux_succes": round(succes / total, 4) if total else 0.0,
+                "non_cachables": self._non_cachables,
+                "expirations": self._expirations,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,194 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.cache_nlu import normaliser_texte_nlu
+from app.utilitaires.normalisation_symptomes import obtenir_normaliseur
+
+logger = logging.getLogger(__name__)
+
+# Au-delà de ce nombre de mots, un message n'est jamais traité par les règles
+MOTS_MAX_REGLES = 8
+
+# Mots sans portée propre, admis autour des formules de politesse ("merci beaucoup docteur")
+MOTS_NEUTRES = frozenset({
+    "a", "accord", "bien", "d", "doc", "docteur", "et", "je", "madame", "mille", "monsieur", "ok", "okay",
+    "te", "toi", "tous", "tout", "tres", "vous", "beaucoup", "infiniment", "encore", "bonne", "la",
+})
+
+# Règles par mots-clés : un message dont tous les mots appartiennent au vocabulaire des formules
+# de politesse (déclencheurs, compléments, MOTS_NEUTRES) reçoit la première intention dont il
+# contient un mot déclencheur. L'ordre compte : "merci, au revoir" est un remerciement.
+REGLES_INTENTIONS: Tuple[Tuple[str, frozenset, frozenset], ...] = (
+    ("remerciement", frozenset({"merci", "remercie", "thanks", "thank", "you"}), frozenset({"super", "parfait", "cool", "genial"})),
+    ("salutation", frozenset({"bonjour", "bonsoir", "salut", "hello", "coucou", "bjr", "slt", "hey", "allo", "revoir", "bientot", "adieu", "bye"}),
+     frozenset({"au", "journee", "soiree", "nuit", "comment", "allez", "vas", "ca", "va"})),
+)
+VOCABULAIRE_POLITESSE = MOTS_NEUTRES.union(*(declencheurs | complements for _, declencheurs, complements in REGLES_INTENTIONS))
+
+
+def caracteristiques(texte_normalise: str) -> List[str]:
+    """Mots et bigrammes de mots d'un texte normalisé (normaliser_texte_nlu)."""
+    mots = texte_normalise.split()
+    return mots + [f"{a}_{b}" for a, b in zip(mots, mots[1:])]
+
+
+class ClassifieurNaifBayes:
+    """
+    Bayésien naïf multinomial (lissage de Laplace) sur les mots et bigrammes des messages.
+    Entraîné hors ligne par scripts/entrainer_modeles_semantiques.py et sérialisé en JSON.
+    """
+    def __init__(self, log_priors: Dict[str, float], log_vraisemblances: Dict[str, Dict[str, float]], log_inconnus: Dict[str, float]):
+        self.log_priors = log_priors
+        self.log_vraisemblances = log_vraisemblances
+        self.log_inconnus = log_inconnus  # log P(caractéristique absente du vocabulaire de la classe | classe)
+
+    @classmethod
+    def entrainer(cls, exemples: Iterable[Tuple[str, str]], lissage: float = 1.0) -> "ClassifieurNaifBayes":
+        """Entraîne le modèle sur des couples (texte, intention)."""
+        nb_par_classe: Counter = Counter()
+        comptes: Dict[str, Counter] = defaultdict(Counter)
+        for texte, intention in exemples:
+            nb_par_classe[intention] += 1
+            comptes[intention].update(caracteristiques(normaliser_texte_nlu(texte)))
+        if not nb_par_classe:
+            raise ValueError("Aucun exemple d'entraînement.")
+        vocabulaire = set().union(*comptes.values())
+        total = sum(nb_par_classe.values())
+        log_priors, log_vraisemblances, log_inconnus = {}, {}, {}
+        for intention, nb in nb_par_classe.items():
+            denominateur = sum(comptes[intention].values()) + lissage * (len(vocabulaire) + 1)
+            log_priors[intention] = math.log(nb / total)
+            log_vraisemblances[intention] = {
+                terme: math.log((compte + lissage) / denominateur) for terme, compte in comptes[intention].items()
+            }
+            log_inconnus[intention] = math.log(lissage / denominateur)
+        return cls(log_priors, log_vraisemblances, log_inconnus)
+
+    def predire(self, texte_normalise: str) -> Tuple[str, float]:
+        """Intention la plus probable et sa probabilité a posteriori."""
+        termes = caracteristiques(texte_normalise)
+        scores = {}
+        for intention, log_prior in self.log_priors.items():
+            vraisemblances = self.log_vraisemblances[intention]
+            inconnu = self.log_inconnus[intention]
+            scores[intention] = log_prior + sum(vraisemblances.get(terme, inconnu) for terme in termes)
+        meilleure = max(scores, key=scores.get)
+        # Probabilité a posteriori normalisée (log-sum-exp)
+        somme = sum(math.exp(score - scores[meilleure]) for score in scores.values())
+        return meilleure, 1.0 / somme
+
+    def sauvegarder(self, chemin: str):
+        os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            json.dump({
+                "log_priors": self.log_priors,
+                "log_vraisemblances": self.log_vraisemblances,
+                "log_inconnus": self.log_inconnus,
+            }, fichier, ensure_ascii=False)
+
+    @classmethod
+    def charger(cls, chemin: str) -> "ClassifieurNaifBayes":
+        with open(chemin, encoding="utf-8") as fichier:
+            donnees = json.load(fichier)
+        return cls(donnees["log_priors"], donnees["log_vraisemblances"], donnees["log_inconnus"])
+
+
+class ClassifieurIntentionsLocal:
+    """
+    Classification locale des intentions évidentes, avant l'appel NLU au LLM :
+      1. règles par mots-clés (REGLES_INTENTIONS) pour les formules de politesse ;
+      2. modèle bayésien naïf (optionnel), retenu si sa probabilité atteint 'seuil_confiance'.
+
+    Seules les intentions de 'intentions_rapides' sont répondues localement, et jamais pour
+    un message qui mentionne un symptôme connu : tout le reste est escaladé au LLM.
+    """
+    def __init__(self, modele: Optional[ClassifieurNaifBayes], seuil_confiance: float, intentions_rapides: Iterable[str]):
+        self.modele = modele
+        self.seuil_confiance = seuil_confiance
+        self.intentions_rapides = frozenset(intentions_rapides)
+        self._verrou = threading.Lock()
+        self._par_source: Counter = Counter()
+        self._nb_escalades = 0
+        self._cumul_duree_ms = 0.0
+
+    @classmethod
+    def depuis_fichier(cls, chemin_modele: str, seuil_confiance: float, intentions_rapides: Iterable[str]) -> "ClassifieurIntentionsLocal":
+        """Charge le modèle entraîné s'il existe ; sinon, seules les règles sont utilisées."""
+        modele = None
+        if os.path.exists(chemin_modele):
+            try:
+                modele = ClassifieurNaifBayes.charger(chemin_modele)
+                logger.info(f"Classifieur d'intentions local chargé depuis {chemin_modele} ({len(modele.log_priors)} intentions).")
+            except Exception as e:
+                logger.error(f"Chargement du classifieur d'intentions {chemin_modele} impossible, règles seules: {e}", exc_info=True)
+        else:
+            logger.info(f"Aucun modèle d'intentions en {chemin_modele} : classification locale par règles seules.")
+        return cls(modele, seuil_confiance, intentions_rapides)
+
+    @staticmethod
+    def _regles(mots: List[str]) -> Optional[str]:
+        if len(mots) > MOTS_MAX_REGLES or not all(mot in VOCABULAIRE_POLITESSE for mot in mots):
+            return None
+        for intention, declencheurs, _ in REGLES_INTENTIONS:
+            if any(mot in declencheurs for mot in mots):
+                return intention
+        return None
+
+    @staticmethod
+    def _mentionne_symptome(mots: List[str]) -> bool:
+        normaliseur = obtenir_normaliseur()
+        return any(
+            normaliseur.symptomes_evoques(" ".join(mots[i:i + n]))
+            for n in (1, 2, 3) for i in range(len(mots) - n + 1)
+        )
+
+    def classer_detail(self, texte: str) -> Tuple[Optional[str], str, float]:
+        """(intention ou None si escaladée, source 'regles' | 'modele' | 'escalade', confiance)."""
+        mots = normaliser_texte_nlu(texte).split()
+        if not mots:
+            return None, "escalade", 0.0
+        intention = self._regles(mots)
+        if intention is not None and intention in self.intentions_rapides:
+            return intention, "regles", 1.0
+        if self.modele is None or self._mentionne_symptome(mots):
+            return None, "escalade", 0.0
+        intention, confiance = self.modele.predire(" ".join(mots))
+        if intention in self.intentions_rapides and confiance >= self.seuil_confiance:
+            return intention, "modele", confiance
+        return None, "escalade", confiance
+
+    def classer(self, texte: str) -> Optional[Dict[str, Any]]:
+        """Résultat NLU au format du LLM si l'intention est évidente, sinon None (appel au LLM)."""
+        debut = time.perf_counter()
+        intention, source, confiance = self.classer_detail(texte)
+        with self._verrou:
+            self._cumul_duree_ms += (time.perf_counter() - debut) * 1000
+            if intention is None:
+                self._nb_escalades += 1
+            else:
+                self._par_source[source] += 1
+        if intention is None:
+            return None
+        logger.debug(f"Intention '{intention}' classée localement ({source}, confiance {confiance:.3f}).")
+        return {"intention": intention, "symptomes": []}
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        with self._verrou:
+            nb_locaux = sum(self._par_source.values())
+            total = nb_locaux + self._nb_escalades
+            return {
+                "modele_charge": self.modele is not None,
+                "seuil_confiance": self.seuil_confiance,
+                "intentions_rapides": sorted(self.intentions_rapides),
+                "par_regles": self._par_source["regles"],
+                "par_modele": self._par_source["modele"],
+                "escalades": self._nb_escalades,
+                "taux_appels_evites": round(nb_locaux / total, 4) if total else 0.0,
+                "duree_moyenne_ms": round(self._cumul_duree_ms / total, 4) if total else 0.0,
+            }
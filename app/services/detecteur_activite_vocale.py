@@ -0,0 +1,98 @@
+import logging
+import math
+from collections import deque
+from typing import Any, Deque, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Énergie (dBFS) attribuée à une trame entièrement nulle
+ENERGIE_MIN_DB = -100.0
+# Marge au-dessus du bruit de fond estimé pour qu'une trame soit considérée comme de la parole
+MARGE_BRUIT_DB = 10.0
+# Le bruit de fond est le percentile PERCENTILE_BRUIT des énergies des trames des FENETRE_BRUIT_MS
+# dernières millisecondes, parole comprise : un bruit stationnaire plus fort que 'seuil_db' (ventilateur,
+# rue) devient le bruit de fond au lieu d'être pris pour de la parole sans fin.
+FENETRE_BRUIT_MS = 3000
+PERCENTILE_BRUIT = 10
+
+
+class DetecteurActiviteVocale:
+    """
+    Détection d'activité vocale par énergie sur de l'audio PCM 16 bits mono.
+
+    L'audio est découpé en trames de 'duree_trame_ms' ; une trame est de la parole si son
+    énergie dépasse à la fois 'seuil_db' et le bruit de fond estimé + MARGE_BRUIT_DB, le bruit
+    de fond étant le bas de la distribution des énergies récentes (voir FENETRE_BRUIT_MS).
+    La fin d'un énoncé est signalée après au moins 'parole_min_ms' de parole suivie de
+    'silence_fin_ms' de silence continu.
+    """
+    def __init__(
+        self,
+        frequence_echantillonnage: int = 16000,
+        duree_trame_ms: int = 20,
+        seuil_db: float = -45.0,
+        silence_fin_ms: int = 700,
+        parole_min_ms: int = 200
+    ):
+        self.octets_par_trame = int(frequence_echantillonnage * duree_trame_ms / 1000) * 2
+        self.seuil_db = seuil_db
+        self.trames_silence_fin = max(1, silence_fin_ms // duree_trame_ms)
+        self.trames_parole_min = max(1, parole_min_ms // duree_trame_ms)
+        self.bruit_fond_db = seuil_db - MARGE_BRUIT_DB
+        self._energies: Deque[float] = deque(maxlen=max(1, FENETRE_BRUIT_MS // duree_trame_ms))
+        self._trames_bruit_min = max(1, self._energies.maxlen // 4)  # en deçà : bruit de fond initial
+        self._reste = b""
+        self._trames_parole = 0
+        self._trames_silence = 0
+        self.nb_trames = 0
+        self.nb_fins_enonce = 0
+
+    @property
+    def parole_en_cours(self) -> bool:
+        """Vrai si de la parole a été détectée depuis la dernière fin d'énoncé."""
+        return self._trames_parole > 0
+
+    def _energie_db(self, trame: bytes) -> float:
+        echantillons = np.frombuffer(trame, dtype="<i2").astype(np.float32)
+        rms = math.sqrt(float(np.mean(echantillons * echantillons))) / 32768.0
+        return 20.0 * math.log10(rms) if rms > 0 else ENERGIE_MIN_DB
+
+    def traiter(self, pcm: bytes) -> bool:
+        """Analyse un chunk PCM ; retourne True si un énoncé vient de se terminer dans ce chunk."""
+        donnees = self._reste + pcm
+        nb_complet = len(donnees) - len(donnees) % self.octets_par_trame
+        self._reste = donnees[nb_complet:]
+        fin_enonce = False
+        for debut in range(0, nb_complet, self.octets_par_trame):
+            energie = self._energie_db(donnees[debut:debut + self.octets_par_trame])
+            self.nb_trames += 1
+            self._energies.append(energie)
+            if len(self._energies) >= self._trames_bruit_min:
+                self.bruit_fond_db = float(np.percentile(self._energies, PERCENTILE_BRUIT))
+            if energie > max(self.seuil_db, self.bruit_fond_db + MARGE_BRUIT_DB):
+                self._trames_parole += 1
+                self._trames_silence = 0
+                continue
+            self._trames_silence += 1
+            if self._trames_silence >= self.trames_silence_fin:
+                if self._trames_parole >= self.trames_parole_min:
+                    fin_enonce = True
+                    self.nb_fins_enonce += 1
+                # Un bruit bref isolé par un long silence n'est pas le début d'un énoncé
+                self._trames_parole = 0
+        return fin_enonce
+
+    def reinitialiser(self):
+        """Oublie l'énoncé en cours (après traitement du tampon), en gardant le bruit de fond estimé."""
+        self._reste = b""
+        self._trames_parole = 0
+        self._trames_silence = 0
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        return {
+            "trames": self.nb_trames,
+            "fins_enonce": self.nb_fins_enonce,
+            "bruit_fond_db": round(self.bruit_fond_db, 1),
+        }
@@ -0,0 +1,47 @@
+import functools
+import logging
+from typing import Any, Callable, Dict
+
+from app.utilitaires.executeur_borne import ExecuteurBorne, ExecuteurSatureError
+
+logger = logging.getLogger(__name__)
+
+
+class ExecuteurVocalSatureError(ExecuteurSatureError):
+    """Levée lorsque la file des tâches vocales a atteint sa taille maximale."""
+    pass
+
+
+class ExecuteurVocal:
+    """
+    Pool de threads borné pour les traitements vocaux bloquants (décodage ffmpeg,
+    reconnaissance vocale, synthèse gTTS), afin qu'un message vocal ne bloque jamais
+    la boucle d'événements ni les autres sessions.
+
+    - au plus 'nb_workers' tâches s'exécutent en même temps ;
+    - au plus 'taille_file_max' tâches attendent un thread : au-delà, ExecuteurVocalSatureError ;
+    - chaque tâche est abandonnée après 'delai_max_s' secondes (asyncio.TimeoutError pour l'appelant),
+      d'où l'intérêt de donner aussi un délai aux appels réseau eux-mêmes (voir ExecuteurBorne).
+    """
+    def __init__(self, nb_workers: int, taille_file_max: int, delai_max_s: float):
+        self.delai_max_s = delai_max_s
+        self._executeur = ExecuteurBorne(
+            nb_workers, "vocal", taille_file_max=taille_file_max, erreur_saturation=ExecuteurVocalSatureError
+        )
+        logger.info(f"ExecuteurVocal initialisé avec {nb_workers} threads (file max {taille_file_max}, délai {delai_max_s} s).")
+
+    async def executer(self, type_tache: str, fonction: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Exécute fonction(*args, **kwargs) dans le pool et attend son résultat au plus 'delai_max_s'.
+        'type_tache' ("stt", "tts", ...) sert uniquement aux métriques.
+        """
+        return await self._executeur.executer(type_tache, functools.partial(fonction, *args, **kwargs), self.delai_max_s)
+
+    def fermer(self):
+        """Arrête le pool sans attendre les tâches vocales en cours."""
+        self._executeur.fermer(attendre=False)
+        logger.info("ExecuteurVocal arrêté.")
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        """Retourne la profondeur de file, l'occupation et les durées par type de tâche."""
+        return {**self._executeur.obtenir_statistiques(), "delai_max_s": self.delai_max_s}
@@ -3,15 +3,13 @@ import logging
 import os
 from typing import Optional, Dict, Any
 from datetime import datetime
-import sqlite3
 
 import firebase_admin # <-- NOUVEL IMPORT
 from firebase_admin import credentials, auth # <-- NOUVEL IMPORT
 from fastapi import HTTPException, status, Request, Security # <-- AJOUTÉ Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials # <-- NOUVEL IMPORT
 
-from app.base_de_donnees.connexion import get_db_connection
-from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 from app.base_de_donnees.modeles import UserCreer, UserEnDB, UserRegisterRequest
 from app.configuration.parametres import parametres
 
@@ -45,11 +43,13 @@ oauth2_scheme = HTTPBearer()
 class GestionnaireAuthentification:
     def __init__(
         self,
+        acces_donnees: AccesDonneesAsync,
         gestionnaire_contexte: GestionnaireContexte,
         gestionnaire_patient: Optional[GestionnairePatient] = None,
         gestionnaire_medecin: Optional[GestionnaireMedecin] = None,
         gestionnaire_structure_medicale: Optional[GestionnaireStructureMedicale] = None
     ):
+        self.acces_donnees = acces_donnees
         self.gestionnaire_contexte = gestionnaire_contexte
         self.gestionnaire_patient = gestionnaire_patient
         self.gestionnaire_medecin = gestionnaire_medecin
@@ -61,9 +61,7 @@ class GestionnaireAuthentification:
         Crée un utilisateur dans Firebase Authentication et dans notre base de données.
         Utilisé pour l'enregistrement Email/Password.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             logger.info(f"Tentative d'enregistrement Firebase et DB pour l'email: {email} avec le rôle: {role}")
 
             # 1. Créer l'utilisateur dans Firebase Authentication
@@ -73,7 +71,7 @@ class GestionnaireAuthentification:
             logger.info(f"Utilisateur créé dans Firebase avec UID: {firebase_uid}")
 
             # 2. Vérifier si l'utilisateur existe déjà dans notre DB par email ou firebase_uid
-            existing_user_by_email = crud.lire_user_par_email(conn, email)
+            existing_user_by_email = await self.acces_donnees.lire_user_par_email(email)
             if existing_user_by_email:
                 if existing_user_by_email.firebase_uid == firebase_uid:
                     logger.warning(f"Utilisateur {email} (UID: {firebase_uid}) existe déjà dans la DB.")
@@ -88,7 +86,7 @@ class GestionnaireAuthentification:
                         detail="L'email est déjà enregistré avec un autre compte."
                     )
             
-            existing_user_by_uid = crud.lire_user_par_firebase_uid(conn, firebase_uid)
+            existing_user_by_uid = await self.acces_donnees.lire_user_par_firebase_uid(firebase_uid)
             if existing_user_by_uid:
                 logger.warning(f"Utilisateur UID {firebase_uid} existe déjà dans la DB (mais pas par email).")
                 # Cela ne devrait pas arriver si Firebase est la source unique
@@ -100,7 +98,7 @@ class GestionnaireAuthentification:
                 email=email,
                 role=role
             )
-            new_user = crud.creer_user(conn, user_data_to_create)
+            new_user = await self.acces_donnees.creer_user(user_data_to_create)
 
             if not new_user:
                 logger.error(f"Échec de la création de l'utilisateur dans la base de données pour {email} (UID: {firebase_uid}).")
@@ -112,7 +110,7 @@ class GestionnaireAuthentification:
                 )
 
             # 4. Créer le profil associé en fonction du rôle
-            await self._creer_profil_associe(new_user, conn)
+            await self._creer_profil_associe(new_user)
             
             await self.gestionnaire_contexte.ajouter_log_conversation(
                 id_session=f"user_registration_{new_user.id}",
@@ -137,11 +135,8 @@ class GestionnaireAuthentification:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Échec de l'enregistrement de l'utilisateur: {e}"
             )
-        finally:
-            if conn:
-                conn.close()
 
-    async def _creer_profil_associe(self, user: UserEnDB, conn: sqlite3.Connection):
+    async def _creer_profil_associe(self, user: UserEnDB):
         """Fonction interne pour créer le profil associé."""
         if user.role == "patient" and self.gestionnaire_patient:
             logger.info(f"Création du profil patient pour l'utilisateur ID: {user.id}")
@@ -211,16 +206,14 @@ class GestionnaireAuthentification:
             #     detail="Votre adresse email n'est pas vérifiée."
             # )
 
-        conn = None
         try:
-            conn = get_db_connection()
             # 2. Tenter de trouver l'utilisateur dans notre DB par firebase_uid
-            user = crud.lire_user_par_firebase_uid(conn, firebase_uid)
+            user = await self.acces_donnees.lire_user_par_firebase_uid(firebase_uid)
 
             if user:
                 # Si l'utilisateur existe, s'assurer que l'email est à jour
                 if user.email != email:
-                    crud.mettre_a_jour_user(conn, user.id, {"email": email})
+                    await self.acces_donnees.mettre_a_jour_user(user.id, {"email": email})
                     user.email = email # Mettre à jour l'objet UserEnDB retourné
                 if not user.est_actif:
                     raise HTTPException(
@@ -244,7 +237,7 @@ class GestionnaireAuthentification:
                     email=email,
                     role=default_role
                 )
-                new_user = crud.creer_user(conn, user_data_to_create)
+                new_user = await self.acces_donnees.creer_user(user_data_to_create)
 
                 if not new_user:
                     logger.error(f"Échec de la création de l'utilisateur DB pour UID: {firebase_uid}.")
@@ -254,7 +247,7 @@ class GestionnaireAuthentification:
                     )
                 
                 # Créer le profil associé
-                await self._creer_profil_associe(new_user, conn)
+                await self._creer_profil_associe(new_user)
 
                 await self.gestionnaire_contexte.ajouter_log_conversation(
                     id_session=f"firebase_sync_{new_user.id}",
@@ -273,7 +266,4 @@ class GestionnaireAuthentification:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Erreur interne lors de l'authentification: {e}"
             )
-        finally:
-            if conn:
-                conn.close()
 
@@ -3,13 +3,15 @@ import logging
 from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
 
-from app.base_de_donnees.connexion import get_db_connection
-from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 from app.base_de_donnees.modeles import (
     MaladieCreer, MaladieEnDB, MaladieMettreAJour, # <-- MaladieMettreAJour AJOUTÉ
     SymptomeCreer, SymptomeEnDB, SymptomeMettreAJour, # <-- SymptomeMettreAJour AJOUTÉ
     MaladieSymptomeLienCreer, MaladieSymptomeLienEnDB
 )
+from app.configuration.parametres import parametres
+from app.services.index_symptomes import IndexInverseSymptomes
+from app.services.moteur_scores_maladies import MODES_SCORE, MoteurScoresMaladies
 
 logger = logging.getLogger(__name__)
 
@@ -17,29 +19,40 @@ class GestionnaireConnaissances:
     """
     Gère la base de connaissances médicale, y compris les maladies, les symptômes
     et leurs relations, pour soutenir le moteur de diagnostic.
+    La recherche de maladies par symptômes s'appuie sur un index inversé en mémoire,
+    construit au démarrage et tenu à jour par les opérations d'écriture de ce gestionnaire.
     """
-    def __init__(self):
+    def __init__(self, acces_donnees: AccesDonneesAsync):
+        self.acces_donnees = acces_donnees
+        self.index_symptomes = IndexInverseSymptomes()
+        self.moteur_scores = MoteurScoresMaladies()
+        self._index_construit = False
         logger.info("GestionnaireConnaissances initialisé.")
 
+    async def construire_index(self):
+        """Charge maladies, symptômes et liens depuis la base et (re)construit l'index inversé."""
+        donnees = await self.acces_donnees.lire_base_connaissances()
+        self.index_symptomes.construire(donnees["maladies"], donnees["symptomes"], donnees["liens"])
+        self._index_construit = True
+
     async def ajouter_maladie(self, maladie_data: MaladieCreer) -> Optional[MaladieEnDB]:
         """Ajoute une nouvelle maladie à la base de connaissances."""
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si la maladie existe déjà par son nom français
-            existing_maladie = crud.lire_maladie_par_nom(conn, maladie_data.nom_fr)
+            existing_maladie = await self.acces_donnees.lire_maladie_par_nom(maladie_data.nom_fr)
             if existing_maladie:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=f"Une maladie avec le nom '{maladie_data.nom_fr}' existe déjà."
                 )
             
-            nouvelle_maladie = crud.creer_maladie(conn, maladie_data)
+            nouvelle_maladie = await self.acces_donnees.creer_maladie(maladie_data)
             if not nouvelle_maladie:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Échec de l'ajout de la maladie."
                 )
+            self.index_symptomes.indexer_maladie(nouvelle_maladie)
             logger.info(f"Maladie '{nouvelle_maladie.nom_fr}' ajoutée avec succès (ID: {nouvelle_maladie.id}).")
             return nouvelle_maladie
         except HTTPException:
@@ -47,16 +60,11 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout de la maladie '{maladie_data.nom_fr}': {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def obtenir_details_maladie(self, nom_maladie: str) -> Optional[MaladieEnDB]:
         """Récupère les détails d'une maladie par son nom français."""
-        conn = None
         try:
-            conn = get_db_connection()
-            maladie = crud.lire_maladie_par_nom(conn, nom_maladie)
+            maladie = await self.acces_donnees.lire_maladie_par_nom(nom_maladie)
             if not maladie:
                 logger.warning(f"Maladie '{nom_maladie}' non trouvée.")
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Maladie '{nom_maladie}' non trouvée.")
@@ -66,29 +74,24 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des détails de la maladie '{nom_maladie}': {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def mettre_a_jour_maladie(self, maladie_id: int, update_data: MaladieMettreAJour) -> Optional[MaladieEnDB]:
         """Met à jour les informations d'une maladie existante."""
-        conn = None
         try:
-            conn = get_db_connection()
-            existing_maladie = crud.lire_maladie_par_id(conn, maladie_id)
+            existing_maladie = await self.acces_donnees.lire_maladie_par_id(maladie_id)
             if not existing_maladie:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Maladie non trouvée.")
 
             # Convertir le modèle Pydantic en dictionnaire pour la fonction CRUD
             data_to_update = update_data.model_dump(exclude_unset=True)
             
-            success = crud.mettre_a_jour_maladie(conn, maladie_id, data_to_update)
-            if not success:
+            updated_maladie = await self.acces_donnees.mettre_a_jour_maladie(maladie_id, data_to_update, existant=existing_maladie)
+            if not updated_maladie:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Échec de la mise à jour de la maladie."
                 )
-            updated_maladie = crud.lire_maladie_par_id(conn, maladie_id)
+            self.index_symptomes.indexer_maladie(updated_maladie)
             logger.info(f"Maladie ID {maladie_id} mise à jour avec succès.")
             return updated_maladie
         except HTTPException:
@@ -96,28 +99,24 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour de la maladie ID {maladie_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def ajouter_symptome(self, symptome_data: SymptomeCreer) -> Optional[SymptomeEnDB]:
         """Ajoute un nouveau symptôme à la base de connaissances."""
-        conn = None
         try:
-            conn = get_db_connection()
-            existing_symptome = crud.lire_symptome_par_nom(conn, symptome_data.nom_fr)
+            existing_symptome = await self.acces_donnees.lire_symptome_par_nom(symptome_data.nom_fr)
             if existing_symptome:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=f"Un symptôme avec le nom '{symptome_data.nom_fr}' existe déjà."
                 )
             
-            nouveau_symptome = crud.creer_symptome(conn, symptome_data)
+            nouveau_symptome = await self.acces_donnees.creer_symptome(symptome_data)
             if not nouveau_symptome:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Échec de l'ajout du symptôme."
                 )
+            self.index_symptomes.indexer_symptome(nouveau_symptome)
             logger.info(f"Symptôme '{nouveau_symptome.nom_fr}' ajouté avec succès (ID: {nouveau_symptome.id}).")
             return nouveau_symptome
         except HTTPException:
@@ -125,16 +124,11 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout du symptôme '{symptome_data.nom_fr}': {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def obtenir_details_symptome(self, nom_symptome: str) -> Optional[SymptomeEnDB]:
         """Récupère les détails d'un symptôme par son nom français."""
-        conn = None
         try:
-            conn = get_db_connection()
-            symptome = crud.lire_symptome_par_nom(conn, nom_symptome)
+            symptome = await self.acces_donnees.lire_symptome_par_nom(nom_symptome)
             if not symptome:
                 logger.warning(f"Symptôme '{nom_symptome}' non trouvé.")
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Symptôme '{nom_symptome}' non trouvé.")
@@ -144,28 +138,23 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des détails du symptôme '{nom_symptome}': {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def mettre_a_jour_symptome(self, symptome_id: int, update_data: SymptomeMettreAJour) -> Optional[SymptomeEnDB]:
         """Met à jour les informations d'un symptôme existant."""
-        conn = None
         try:
-            conn = get_db_connection()
-            existing_symptome = crud.lire_symptome_par_id(conn, symptome_id)
+            existing_symptome = await self.acces_donnees.lire_symptome_par_id(symptome_id)
             if not existing_symptome:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Symptôme non trouvé.")
 
             data_to_update = update_data.model_dump(exclude_unset=True)
             
-            success = crud.mettre_a_jour_symptome(conn, symptome_id, data_to_update)
-            if not success:
+            updated_symptome = await self.acces_donnees.mettre_a_jour_symptome(symptome_id, data_to_update, existant=existing_symptome)
+            if not updated_symptome:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Échec de la mise à jour du symptôme."
                 )
-            updated_symptome = crud.lire_symptome_par_id(conn, symptome_id)
+            self.index_symptomes.indexer_symptome(updated_symptome)
             logger.info(f"Symptôme ID {symptome_id} mis à jour avec succès.")
             return updated_symptome
         except HTTPException:
@@ -173,58 +162,54 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du symptôme ID {symptome_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
 
-    async def rechercher_maladies_par_symptomes(self, symptomes: List[str]) -> List[Dict[str, Any]]:
+    async def rechercher_maladies_par_symptomes(
+        self,
+        symptomes: List[str],
+        mode: Optional[str] = None,
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Recherche les maladies pertinentes en fonction d'une liste de symptômes.
-        Retourne une liste de maladies avec un score de confiance.
+        Retourne une liste de maladies avec un score de confiance (0-100), triée par confiance décroissante.
+        'mode' : 'pondere' (force_lien), 'tfidf' ou 'bayesien' ; par défaut DIAGNOSTIC_SCORING_MODE.
+        'top_k' : nombre maximal de résultats ; par défaut DIAGNOSTIC_TOP_K.
         """
-        conn = None
+        mode = mode or parametres.DIAGNOSTIC_SCORING_MODE
+        if mode not in MODES_SCORE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Mode de score inconnu '{mode}'. Modes disponibles : {', '.join(MODES_SCORE)}."
+            )
         try:
-            conn = get_db_connection()
-            all_maladies = crud.lire_toutes_maladies(conn)
-            
+            if not self._index_construit:
+                await self.construire_index()
+            if self.moteur_scores.version != self.index_symptomes.version:
+                maladies, poids_termes = self.index_symptomes.exporter()
+                self.moteur_scores.construire(maladies, poids_termes, version=self.index_symptomes.version)
+
+            termes_requete = self.index_symptomes.termes_requete(symptomes)
             resultats_pertinents = []
-            for maladie in all_maladies:
-                symptomes_maladie_lower = [s.lower() for s in maladie.symptomes_courants_mots_cles]
-                symptomes_utilisateur_lower = [s.lower() for s in symptomes]
+            for maladie, confiance in self.moteur_scores.scorer(termes_requete.keys(), mode, top_k or parametres.DIAGNOSTIC_TOP_K):
+                termes_maladie = self.index_symptomes.termes_de_maladie(maladie.id)
+                resultats_pertinents.append({
+                    "maladie": maladie,
+                    "confiance": confiance,
+                    "symptomes_correspondants": [libelle for terme, libelle in termes_requete.items() if terme in termes_maladie]
+                })
 
-                # Calculer la correspondance des symptômes
-                symptomes_communs = set(symptomes_maladie_lower).intersection(set(symptomes_utilisateur_lower))
-                
-                if symptomes_communs:
-                    # Calcul simple de confiance basé sur le nombre de symptômes correspondants
-                    # par rapport au nombre total de symptômes de la maladie
-                    confiance = (len(symptomes_communs) / len(symptomes_maladie_lower)) * 100 if symptomes_maladie_lower else 0
-                    
-                    resultats_pertinents.append({
-                        "maladie": maladie,
-                        "confiance": confiance,
-                        "symptomes_correspondants": list(symptomes_communs)
-                    })
-            
-            # Trier par confiance décroissante
-            resultats_pertinents.sort(key=lambda x: x["confiance"], reverse=True)
             logger.info(f"Recherche de maladies par symptômes '{symptomes}': {len(resultats_pertinents)} résultats pertinents trouvés.")
             return resultats_pertinents
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de maladies par symptômes: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def lier_maladie_symptome(self, maladie_id: int, symptome_id: int, force_lien: Optional[float] = None) -> Optional[MaladieSymptomeLienEnDB]:
         """Crée un lien entre une maladie et un symptôme."""
-        conn = None
         try:
-            conn = get_db_connection()
-            maladie_exist = crud.lire_maladie_par_id(conn, maladie_id)
-            symptome_exist = crud.lire_symptome_par_id(conn, symptome_id)
+            maladie_exist = await self.acces_donnees.lire_maladie_par_id(maladie_id)
+            symptome_exist = await self.acces_donnees.lire_symptome_par_id(symptome_id)
             
             if not maladie_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Maladie ID {maladie_id} non trouvée.")
@@ -232,7 +217,7 @@ class GestionnaireConnaissances:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Symptôme ID {symptome_id} non trouvé.")
 
             # Vérifier si le lien existe déjà pour éviter les doublons
-            existing_links = crud.lire_liens_par_maladie_id(conn, maladie_id)
+            existing_links = await self.acces_donnees.lire_liens_par_maladie_id(maladie_id)
             for link in existing_links:
                 if link.symptome_id == symptome_id:
                     raise HTTPException(
@@ -241,13 +226,14 @@ class GestionnaireConnaissances:
                     )
 
             lien_data = MaladieSymptomeLienCreer(maladie_id=maladie_id, symptome_id=symptome_id, force_lien=force_lien)
-            nouveau_lien = crud.creer_maladie_symptome_lien(conn, lien_data)
+            nouveau_lien = await self.acces_donnees.creer_maladie_symptome_lien(lien_data)
             
             if not nouveau_lien:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Échec de la création du lien maladie-symptôme."
                 )
+            self.index_symptomes.indexer_lien(maladie_id, symptome_id, symptome_exist.nom_fr, force_lien)
             logger.info(f"Lien créé entre maladie {maladie_id} et symptôme {symptome_id} (ID: {nouveau_lien.id}).")
             return nouveau_lien
         except HTTPException:
@@ -255,7 +241,4 @@ class GestionnaireConnaissances:
         except Exception as e:
             logger.error(f"Erreur lors de la création du lien maladie-symptôme ({maladie_id}-{symptome_id}): {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
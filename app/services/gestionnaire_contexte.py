@@ -1,22 +1,85 @@
+import asyncio
 import logging
 import json
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Dict, Any
 from datetime import datetime
 
-from app.base_de_donnees.connexion import get_db_connection
-from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+from app.configuration.parametres import parametres
+from app.services.journal_evenements import JournalEvenementsDiffere
 from app.base_de_donnees.modeles import ContexteConversationBase, ContexteConversationEnDB, LogConversationCreer, LogConversationEnDB
 
 logger = logging.getLogger(__name__)
 
+class _FenetreSession:
+    """
+    Derniers messages d'une session (tampon circulaire) et verrou sérialisant ses écritures.
+    'ecrivains' compte les écritures qui détiennent ou attendent le verrou : tant qu'il n'est pas
+    nul, la fenêtre n'est pas évincée du cache (une fenêtre rechargée entre-temps aurait son
+    propre verrou et les deux écritures s'écraseraient en base).
+    """
+    def __init__(self, messages: List[Dict[str, str]], limite: int):
+        self.messages: Deque[Dict[str, str]] = deque(messages, maxlen=limite)
+        self.verrou = asyncio.Lock()
+        self.ecrivains = 0
+
+
 class GestionnaireContexte:
     """
     Gère le contexte de conversation et l'historique des interactions avec l'IA.
     Cela inclut le stockage et la récupération des logs de conversation.
+
+    Le contexte transmis à l'IA est une fenêtre glissante des CONVERSATION_HISTORY_LIMIT
+    derniers messages. Les fenêtres des sessions actives sont gardées en mémoire (cache LRU
+    de CONVERSATION_CACHE_SESSIONS sessions) ; une session absente du cache est rechargée
+    depuis contextes_conversation, jamais depuis l'historique complet des logs.
     """
-    def __init__(self):
+    def __init__(self, acces_donnees: AccesDonneesAsync, journal_evenements: Optional[JournalEvenementsDiffere] = None):
+        self.acces_donnees = acces_donnees
+        self.journal_evenements = journal_evenements
+        self._limite_historique = parametres.CONVERSATION_HISTORY_LIMIT
+        self._capacite_cache = parametres.CONVERSATION_CACHE_SESSIONS
+        self._fenetres: "OrderedDict[str, _FenetreSession]" = OrderedDict()
+        self._succes_cache = 0
+        self._echecs_cache = 0
         logger.info("GestionnaireContexte initialisé.")
 
+    async def _obtenir_fenetre(self, id_session: str) -> _FenetreSession:
+        """Retourne la fenêtre de la session depuis le cache, ou la charge depuis contextes_conversation."""
+        fenetre = self._fenetres.get(id_session)
+        if fenetre is not None:
+            self._fenetres.move_to_end(id_session)
+            self._succes_cache += 1
+            return fenetre
+
+        self._echecs_cache += 1
+        messages: List[Dict[str, str]] = []
+        contexte_db = await self.acces_donnees.lire_contexte_conversation_par_session_id(id_session)
+        if contexte_db and contexte_db.historique_json:
+            try:
+                messages = json.loads(contexte_db.historique_json)
+            except json.JSONDecodeError:
+                logger.warning(f"historique_json invalide pour la session {id_session}, contexte réinitialisé.")
+
+        # Une autre coroutine a pu charger la session pendant la lecture.
+        fenetre = self._fenetres.get(id_session)
+        if fenetre is None:
+            fenetre = _FenetreSession(messages, self._limite_historique)
+            self._fenetres[id_session] = fenetre
+            self._evincer()
+        else:
+            self._fenetres.move_to_end(id_session)
+        return fenetre
+
+    def _evincer(self):
+        """Évince les fenêtres les moins récemment utilisées au-delà de la capacité, sauf celles en cours d'écriture."""
+        excedent = len(self._fenetres) - self._capacite_cache
+        if excedent <= 0:
+            return
+        for id_session in [cle for cle, fenetre in self._fenetres.items() if fenetre.ecrivains == 0][:excedent]:
+            del self._fenetres[id_session]
+
     async def enregistrer_log_conversation(
         self,
         id_session: str,
@@ -29,10 +92,7 @@ class GestionnaireContexte:
         Enregistre un log de conversation dans la base de données.
         Crée ou met à jour le contexte de conversation associé.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            
             # Convertir les données structurées en JSON string si elles existent
             donnees_structurees_json = json.dumps(donnees_structurees) if donnees_structurees else None
 
@@ -45,75 +105,87 @@ class GestionnaireContexte:
             )
             
             # Ajouter le log de conversation
-            log_enregistre = crud.ajouter_log_conversation(conn, log_creer)
+            log_enregistre = await self.acces_donnees.ajouter_log_conversation(log_creer)
             logger.debug(f"Log de conversation enregistré pour session {id_session}, rôle {role}.")
 
-            # Mettre à jour le contexte de conversation (historique JSON)
-            # Récupérer l'historique actuel pour cette session
-            historique_complet = await self.obtenir_historique_conversation(id_session)
-            # Construire un historique simplifié pour le stockage dans le contexte
-            # Limiter la taille de l'historique pour éviter des champs trop grands
-            historique_pour_contexte = []
-            for entry in historique_complet[-10:]: # Garder les 10 derniers messages
-                historique_pour_contexte.append({
-                    "role": entry.role,
-                    "message": entry.message # Utilise le champ 'message' du modèle LogConversationEnDB
-                })
-            
-            contexte_json = json.dumps(historique_pour_contexte, ensure_ascii=False)
-
-            contexte_creer_ou_maj = ContexteConversationBase(
-                id_session=id_session,
-                historique_json=contexte_json
-            )
-            crud.creer_ou_mettre_a_jour_contexte_conversation(conn, contexte_creer_ou_maj)
+            # Mettre à jour le contexte de conversation (historique JSON) : le nouveau message est
+            # ajouté à la fenêtre de la session, le plus ancien en sort si la limite est atteinte.
+            # La fenêtre en mémoire n'est modifiée qu'une fois l'écriture en base réussie.
+            nouveau_message = {"role": role, "message": message}
+            fenetre = await self._obtenir_fenetre(id_session)
+            fenetre.ecrivains += 1
+            try:
+                async with fenetre.verrou:
+                    messages = deque(fenetre.messages, maxlen=fenetre.messages.maxlen)
+                    messages.append(nouveau_message)
+                    contexte_creer_ou_maj = ContexteConversationBase(
+                        id_session=id_session,
+                        historique_json=json.dumps(list(messages), ensure_ascii=False)
+                    )
+                    await self.acces_donnees.creer_ou_mettre_a_jour_contexte_conversation(contexte_creer_ou_maj)
+                    fenetre.messages.append(nouveau_message)
+            finally:
+                fenetre.ecrivains -= 1
             logger.debug(f"Contexte de conversation mis à jour pour session {id_session}.")
 
             return log_enregistre
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement du log de conversation ou de la mise à jour du contexte: {e}", exc_info=True)
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    async def ajouter_log_conversation(
+        self,
+        id_session: str,
+        role: str,
+        message: str,
+        type_message: str = 'evenement_systeme',
+        donnees_structurees: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Journalise un événement émis par les gestionnaires (création de profil, rendez-vous, ...).
+        Les événements système sont confiés au journal à écriture différée et ne coûtent
+        qu'une mise en file ; les autres types passent par enregistrer_log_conversation.
+        """
+        if type_message == 'evenement_systeme' and self.journal_evenements is not None:
+            await self.journal_evenements.publier(id_session, role, message, type_message, donnees_structurees)
+            return None
+        return await self.enregistrer_log_conversation(id_session, role, message, type_message, donnees_structurees)
 
     async def obtenir_historique_conversation(self, id_session: str) -> List[LogConversationEnDB]:
         """
         Récupère l'historique complet des logs de conversation pour une session donnée.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            logs = crud.lire_logs_conversation_par_session_id(conn, id_session)
+            logs = await self.acces_donnees.lire_logs_conversation_par_session_id(id_session)
             logger.debug(f"Historique de conversation récupéré pour session {id_session}: {len(logs)} entrées.")
             return logs
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'historique de conversation pour session {id_session}: {e}", exc_info=True)
             raise
-        finally:
-            if conn:
-                conn.close()
 
     async def obtenir_contexte_pour_ia(self, id_session: str) -> List[Dict[str, str]]:
         """
         Récupère l'historique de conversation formaté pour être utilisé par le LLM.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            contexte_db = crud.lire_contexte_conversation_par_session_id(conn, id_session)
-            if contexte_db and contexte_db.historique_json:
-                historique_llm = json.loads(contexte_db.historique_json)
-                logger.debug(f"Contexte pour IA récupéré pour session {id_session}: {len(historique_llm)} messages.")
-                return historique_llm
-            logger.debug(f"Aucun contexte pour IA trouvé pour session {id_session}.")
-            return []
+            fenetre = await self._obtenir_fenetre(id_session)
+            historique_llm = list(fenetre.messages)
+            logger.debug(f"Contexte pour IA récupéré pour session {id_session}: {len(historique_llm)} messages.")
+            return historique_llm
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du contexte pour IA pour session {id_session}: {e}", exc_info=True)
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    def obtenir_statistiques_cache(self) -> Dict[str, Any]:
+        """Retourne l'occupation et le taux de succès du cache des contextes de session."""
+        total = self._succes_cache + self._echecs_cache
+        return {
+            "sessions_en_cache": len(self._fenetres),
+            "capacite": self._capacite_cache,
+            "succes": self._succes_cache,
+            "echecs": self._echecs_cache,
+            "taux_succes": round(self._succes_cache / total, 3) if total else 0.0,
+        }
 
     async def obtenir_reponse_ia(self, id_session: str, message_utilisateur: str, user_id: int, user_role: str) -> str:
         """
@@ -1,4 +1,5 @@
 # app/services/gestionnaire_geolocalisation.py
+import asyncio
 import logging
 import math
 from typing import List, Dict, Any, Optional
@@ -6,37 +7,59 @@ from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
 
 # Import des modèles de données
-from app.base_de_donnees.modeles import DoctorEnDB, MedicalStructureEnDB
-# Import des fonctions CRUD
-from app.base_de_donnees import crud
+from app.base_de_donnees.modeles import (
+    DoctorEnDB, DoctorProximite, DoctorsProximiteLot,
+    MedicalStructureEnDB, MedicalStructureProximite, MedicalStructuresProximiteLot,
+    OrigineRecherche
+)
 # Import de la connexion à la base de données
-from app.base_de_donnees.connexion import get_db_connection
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 # Import des paramètres de configuration
 from app.configuration.parametres import parametres
+from app.services.index_spatial import IndexSpatial
+from app.utilitaires.geographie import boite_englobante, parser_coordonnees_gps
 
 logger = logging.getLogger(__name__)
 
+# 'index' : index spatiaux en mémoire ; 'sql' : préfiltre par boîte englobante sur les colonnes
+# latitude/longitude indexées, puis calcul exact de la distance sur les seules lignes retenues.
+MODES_RECHERCHE = ("index", "sql")
+
 class GestionnaireGeolocalisation:
     """
     Gère les fonctionnalités de géolocalisation, permettant de rechercher
     des médecins et des structures médicales par proximité.
+
+    En mode 'index', les médecins et structures géolocalisés sont tenus dans deux index
+    spatiaux en mémoire, construits au démarrage puis tenus à jour par GestionnaireMedecin et
+    GestionnaireStructureMedicale à chaque création ou mise à jour de profil.
+    En mode 'sql', chaque recherche lit uniquement les lignes de la boîte englobant le disque
+    de recherche, puis les affine par la distance de Haversine.
     """
 
-    def __init__(self):
+    def __init__(self, acces_donnees: AccesDonneesAsync):
+        self.acces_donnees = acces_donnees
+        self.mode_recherche = parametres.GEOLOCATION_SEARCH_MODE
+        if self.mode_recherche not in MODES_RECHERCHE:
+            logger.warning(f"Mode de recherche de proximité inconnu '{self.mode_recherche}', utilisation de 'index'.")
+            self.mode_recherche = "index"
+        seuil = parametres.GEOLOCATION_INDEX_REBUILD_THRESHOLD
+        self.index_medecins = IndexSpatial("medecins", seuil_reconstruction=seuil)
+        self.index_structures = IndexSpatial("structures_medicales", seuil_reconstruction=seuil)
+        self._index_construits = False
+        self._verrou_construction = asyncio.Lock()
         logger.info("GestionnaireGeolocalisation initialisé.")
 
     def _parse_coordonnees_gps(self, coords_str: Optional[str]) -> Optional[Dict[str, float]]:
         """
         Parse une chaîne de coordonnées GPS "latitude,longitude" en un dictionnaire.
         """
-        if not coords_str:
-            return None
-        try:
-            latitude, longitude = map(float, coords_str.split(','))
-            return {"latitude": latitude, "longitude": longitude}
-        except ValueError:
-            logger.warning(f"Coordonnées GPS invalides: {coords_str}")
+        coordonnees = parser_coordonnees_gps(coords_str)
+        if coordonnees is None:
+            if coords_str:
+                logger.warning(f"Coordonnées GPS invalides: {coords_str}")
             return None
+        return {"latitude": coordonnees[0], "longitude": coordonnees[1]}
 
     def _calculer_distance_haversine(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
@@ -58,30 +81,85 @@ class GestionnaireGeolocalisation:
         distance = R * c
         return distance
 
-    async def rechercher_medecins_proximite(self, latitude: float, longitude: float, rayon_km: Optional[float] = None) -> List[DoctorEnDB]:
+    # --- Index spatiaux ---
+
+    def _indexer(self, index: IndexSpatial, identifiant: int, coordonnees_gps: Optional[str], objet: Any):
+        if self.mode_recherche != "index":
+            return
+        coordonnees = self._parse_coordonnees_gps(coordonnees_gps)
+        if coordonnees is None:
+            index.retirer(identifiant)
+        else:
+            index.indexer(identifiant, coordonnees["latitude"], coordonnees["longitude"], objet)
+
+    async def construire_index(self):
+        """(Re)construit les index spatiaux à partir de la base de données."""
+        if self.mode_recherche != "index":
+            return
+        async with self._verrou_construction:
+            medecins = await self.acces_donnees.lire_medecins_geolocalises()
+            structures = await self.acces_donnees.lire_structures_medicales_geolocalisees()
+            self.index_medecins.construire({
+                m.id: (c["latitude"], c["longitude"], m)
+                for m in medecins if (c := self._parse_coordonnees_gps(m.coordonnees_gps))
+            })
+            self.index_structures.construire({
+                s.id: (c["latitude"], c["longitude"], s)
+                for s in structures if (c := self._parse_coordonnees_gps(s.coordonnees_gps))
+            })
+            self._index_construits = True
+
+    async def _assurer_index(self):
+        if not self._index_construits:
+            await self.construire_index()
+
+    def indexer_medecin(self, medecin: DoctorEnDB):
+        """Ajoute ou met à jour un médecin dans l'index (retiré s'il n'a plus de coordonnées valides)."""
+        self._indexer(self.index_medecins, medecin.id, medecin.coordonnees_gps, medecin)
+
+    def indexer_structure_medicale(self, structure: MedicalStructureEnDB):
+        """Ajoute ou met à jour une structure médicale dans l'index (retirée si elle n'a plus de coordonnées valides)."""
+        self._indexer(self.index_structures, structure.id, structure.coordonnees_gps, structure)
+
+    def _rechercher_dans_index(self, index: IndexSpatial, latitude: float, longitude: float, rayon_km: float, limite: Optional[int]):
+        if limite is not None:
+            return index.rechercher_plus_proches(latitude, longitude, limite, rayon_km)
+        return index.rechercher_rayon(latitude, longitude, rayon_km)
+
+    async def _rechercher_par_zone(self, lecture_zone, latitude: float, longitude: float, rayon_km: float, limite: Optional[int]):
+        """Préfiltre SQL par boîte englobante, puis distance exacte et tri du plus proche au plus éloigné."""
+        latitude_min, latitude_max, plages_longitude = boite_englobante(latitude, longitude, rayon_km)
+        candidats = await lecture_zone(latitude_min, latitude_max, plages_longitude)
+        resultats = []
+        for candidat in candidats:
+            coords = self._parse_coordonnees_gps(candidat.coordonnees_gps)
+            if coords:
+                distance = self._calculer_distance_haversine(latitude, longitude, coords["latitude"], coords["longitude"])
+                if distance <= rayon_km:
+                    resultats.append((candidat, distance))
+        resultats.sort(key=lambda r: r[1])
+        return resultats[:limite] if limite is not None else resultats
+
+    async def rechercher_medecins_proximite(
+        self, latitude: float, longitude: float, rayon_km: Optional[float] = None, limite: Optional[int] = None
+    ) -> List[DoctorProximite]:
         """
-        Recherche les médecins à proximité des coordonnées GPS données.
+        Recherche les médecins à proximité des coordonnées GPS données, du plus proche au plus éloigné.
+        Si 'limite' est fourni, seuls les 'limite' plus proches dans le rayon sont retournés.
         """
         if rayon_km is None:
             rayon_km = parametres.GEOLOCATION_SEARCH_RADIUS_KM
 
-        conn = None
-        medecins_proches = []
         try:
-            conn = get_db_connection()
-            all_doctors = crud.lire_tous_doctors(conn, limit=10000) # Récupérer tous les médecins (optimisation à considérer pour très grande DB)
-            
-            for doctor in all_doctors:
-                doctor_coords = self._parse_coordonnees_gps(doctor.coordonnees_gps)
-                if doctor_coords:
-                    distance = self._calculer_distance_haversine(
-                        latitude, longitude, doctor_coords["latitude"], doctor_coords["longitude"]
-                    )
-                    if distance <= rayon_km:
-                        # Ajouter la distance au modèle DoctorEnDB si on veut la retourner
-                        # Pour l'instant, on se contente de filtrer
-                        medecins_proches.append(doctor)
-            
+            if self.mode_recherche == "sql":
+                resultats = await self._rechercher_par_zone(self.acces_donnees.lire_medecins_dans_zone, latitude, longitude, rayon_km, limite)
+            else:
+                await self._assurer_index()
+                resultats = self._rechercher_dans_index(self.index_medecins, latitude, longitude, rayon_km, limite)
+            medecins_proches = [
+                DoctorProximite(**medecin.model_dump(), distance_km=round(distance, 3))
+                for medecin, distance in resultats
+            ]
             logger.info(f"Recherche de médecins à proximité de ({latitude}, {longitude}) dans un rayon de {rayon_km} km. Trouvé: {len(medecins_proches)}.")
             return medecins_proches
         except Exception as e:
@@ -90,32 +168,27 @@ class GestionnaireGeolocalisation:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erreur interne du serveur lors de la recherche de médecins."
             )
-        finally:
-            if conn:
-                conn.close()
 
-    async def rechercher_structures_medicales_proximite(self, latitude: float, longitude: float, rayon_km: Optional[float] = None) -> List[MedicalStructureEnDB]:
+    async def rechercher_structures_medicales_proximite(
+        self, latitude: float, longitude: float, rayon_km: Optional[float] = None, limite: Optional[int] = None
+    ) -> List[MedicalStructureProximite]:
         """
-        Recherche les structures médicales à proximité des coordonnées GPS données.
+        Recherche les structures médicales à proximité des coordonnées GPS données, de la plus proche à la plus éloignée.
+        Si 'limite' est fourni, seules les 'limite' plus proches dans le rayon sont retournées.
         """
         if rayon_km is None:
             rayon_km = parametres.GEOLOCATION_SEARCH_RADIUS_KM
 
-        conn = None
-        structures_proches = []
         try:
-            conn = get_db_connection()
-            all_structures = crud.lire_toutes_medical_structures(conn, limit=10000) # Récupérer toutes les structures
-            
-            for structure in all_structures:
-                structure_coords = self._parse_coordonnees_gps(structure.coordonnees_gps)
-                if structure_coords:
-                    distance = self._calculer_distance_haversine(
-                        latitude, longitude, structure_coords["latitude"], structure_coords["longitude"]
-                    )
-                    if distance <= rayon_km:
-                        structures_proches.append(structure)
-            
+            if self.mode_recherche == "sql":
+                resultats = await self._rechercher_par_zone(self.acces_donnees.lire_structures_medicales_dans_zone, latitude, longitude, rayon_km, limite)
+            else:
+                await self._assurer_index()
+                resultats = self._rechercher_dans_index(self.index_structures, latitude, longitude, rayon_km, limite)
+            structures_proches = [
+                MedicalStructureProximite(**structure.model_dump(), distance_km=round(distance, 3))
+                for structure, distance in resultats
+            ]
             logger.info(f"Recherche de structures médicales à proximité de ({latitude}, {longitude}) dans un rayon de {rayon_km} km. Trouvé: {len(structures_proches)}.")
             return structures_proches
         except Exception as e:
@@ -124,6 +197,85 @@ class GestionnaireGeolocalisation:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erreur interne du serveur lors de la recherche de structures médicales."
             )
-        finally:
-            if conn:
-                conn.close()
+
+    # --- Recherches par lot (plusieurs origines) ---
+
+    def _verifier_lot(self, origines: List[OrigineRecherche]):
+        if len(origines) > parametres.GEOLOCATION_BATCH_MAX_ORIGINS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Trop d'origines : {parametres.GEOLOCATION_BATCH_MAX_ORIGINS} au maximum par recherche."
+            )
+
+    async def _rechercher_lot(self, index: IndexSpatial, lecture_zone, origines: List[OrigineRecherche], rayon_km: float, limite: int):
+        if self.mode_recherche == "sql":
+            return [
+                await self._rechercher_par_zone(lecture_zone, o.latitude, o.longitude, rayon_km, limite)
+                for o in origines
+            ]
+        await self._assurer_index()
+        return index.rechercher_plus_proches_lot([(o.latitude, o.longitude) for o in origines], limite, rayon_km)
+
+    async def rechercher_medecins_proximite_lot(
+        self, origines: List[OrigineRecherche], rayon_km: Optional[float] = None, limite: int = 10
+    ) -> List[DoctorsProximiteLot]:
+        """
+        Recherche, pour chaque origine, les 'limite' médecins les plus proches dans le rayon,
+        en un seul calcul de distances vectorisé sur l'ensemble des médecins indexés.
+        """
+        self._verifier_lot(origines)
+        if rayon_km is None:
+            rayon_km = parametres.GEOLOCATION_SEARCH_RADIUS_KM
+
+        try:
+            resultats = await self._rechercher_lot(self.index_medecins, self.acces_donnees.lire_medecins_dans_zone, origines, rayon_km, limite)
+            logger.info(f"Recherche de médecins à proximité par lot : {len(origines)} origines, rayon {rayon_km} km.")
+            return [
+                DoctorsProximiteLot(
+                    origine=origine,
+                    medecins=[DoctorProximite(**m.model_dump(), distance_km=round(d, 3)) for m, d in ligne]
+                )
+                for origine, ligne in zip(origines, resultats)
+            ]
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche de médecins à proximité par lot: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur interne du serveur lors de la recherche de médecins."
+            )
+
+    async def rechercher_structures_medicales_proximite_lot(
+        self, origines: List[OrigineRecherche], rayon_km: Optional[float] = None, limite: int = 10
+    ) -> List[MedicalStructuresProximiteLot]:
+        """
+        Recherche, pour chaque origine, les 'limite' structures médicales les plus proches dans le rayon,
+        en un seul calcul de distances vectorisé sur l'ensemble des structures indexées.
+        """
+        self._verifier_lot(origines)
+        if rayon_km is None:
+            rayon_km = parametres.GEOLOCATION_SEARCH_RADIUS_KM
+
+        try:
+            resultats = await self._rechercher_lot(self.index_structures, self.acces_donnees.lire_structures_medicales_dans_zone, origines, rayon_km, limite)
+            logger.info(f"Recherche de structures médicales à proximité par lot : {len(origines)} origines, rayon {rayon_km} km.")
+            return [
+                MedicalStructuresProximiteLot(
+                    origine=origine,
+                    structures=[MedicalStructureProximite(**s.model_dump(), distance_km=round(d, 3)) for s, d in ligne]
+                )
+                for origine, ligne in zip(origines, resultats)
+            ]
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche de structures médicales à proximité par lot: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur interne du serveur lors de la recherche de structures médicales."
+            )
+
+    def obtenir_statistiques_index(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode_recherche,
+            "construits": self._index_construits,
+            "medecins": self.index_medecins.obtenir_statistiques(),
+            "structures_medicales": self.index_structures.obtenir_statistiques(),
+        }
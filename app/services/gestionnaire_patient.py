@@ -5,8 +5,7 @@ from datetime import datetime, date
 
 from fastapi import HTTPException, status
 
-from app.base_de_donnees.connexion import get_db_connection
-from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 from app.base_de_donnees.modeles import (
     PatientCreer, PatientEnDB, PatientMettreAJour,
     HealthStatusLogCreer, WearableDataCreer, MedicalReportCreer, HealthStatusLogEnDB, WearableDataEnDB
@@ -26,10 +25,12 @@ class GestionnairePatient:
     """
     def __init__(
         self,
+        acces_donnees: AccesDonneesAsync,
         integrateur_llm: IntegrateurLLM,
         gestionnaire_contexte: GestionnaireContexte,
         moteur_diagnostic: MoteurDiagnostic
     ):
+        self.acces_donnees = acces_donnees
         self.integrateur_llm = integrateur_llm
         self.gestionnaire_contexte = gestionnaire_contexte
         self.moteur_diagnostic = moteur_diagnostic
@@ -40,11 +41,9 @@ class GestionnairePatient:
         Crée un profil patient de base pour un utilisateur donné.
         Cette fonction est appelée lors de l'enregistrement d'un utilisateur avec le rôle 'patient'.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si un profil patient existe déjà pour cet user_id
-            existing_patient = crud.lire_patient_par_user_id(conn, user_id)
+            existing_patient = await self.acces_donnees.lire_patient_par_user_id(user_id)
             if existing_patient:
                 logger.warning(f"Tentative de créer un profil patient pour user_id {user_id} qui existe déjà.")
                 raise HTTPException(
@@ -62,7 +61,7 @@ class GestionnairePatient:
                 sexe="Non spécifié" # Exemple de sexe par défaut
             )
             
-            nouveau_patient = crud.creer_patient(conn, patient_data)
+            nouveau_patient = await self.acces_donnees.creer_patient(patient_data)
             if nouveau_patient:
                 logger.info(f"Profil patient créé avec succès pour user_id: {user_id}, patient_id: {nouveau_patient.id}")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -81,19 +80,14 @@ class GestionnairePatient:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Une erreur interne est survenue lors de la création du profil patient."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def creer_profil_patient_avec_donnees(self, patient_data: PatientCreer) -> Optional[PatientEnDB]:
         """
         Crée un profil patient avec des données complètes fournies.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si un profil patient existe déjà pour cet user_id
-            existing_patient = crud.lire_patient_par_user_id(conn, patient_data.user_id)
+            existing_patient = await self.acces_donnees.lire_patient_par_user_id(patient_data.user_id)
             if existing_patient:
                 logger.warning(f"Tentative de créer un profil patient pour user_id {patient_data.user_id} qui existe déjà.")
                 raise HTTPException(
@@ -101,7 +95,7 @@ class GestionnairePatient:
                     detail="Un profil patient existe déjà pour cet utilisateur."
                 )
             
-            nouveau_patient = crud.creer_patient(conn, patient_data)
+            nouveau_patient = await self.acces_donnees.creer_patient(patient_data)
             if nouveau_patient:
                 logger.info(f"Profil patient créé avec succès pour user_id: {patient_data.user_id}, patient_id: {nouveau_patient.id}")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -120,28 +114,22 @@ class GestionnairePatient:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Une erreur interne est survenue lors de la création du profil patient."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def mettre_a_jour_profil_patient(self, patient_id: int, patient_update: PatientMettreAJour) -> Optional[PatientEnDB]:
         """
         Met à jour un profil patient existant.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si le patient existe
-            patient_exist = crud.lire_patient_par_id(conn, patient_id)
+            patient_exist = await self.acces_donnees.lire_patient_par_id(patient_id)
             if not patient_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profil patient non trouvé.")
 
             # Convertir le modèle Pydantic en dictionnaire pour la fonction CRUD
             update_data = patient_update.model_dump(exclude_unset=True)
             
-            succes = crud.mettre_a_jour_patient(conn, patient_id, update_data)
-            if succes:
-                patient_mis_a_jour = crud.lire_patient_par_id(conn, patient_id)
+            patient_mis_a_jour = await self.acces_donnees.mettre_a_jour_patient(patient_id, update_data, existant=patient_exist)
+            if patient_mis_a_jour:
                 logger.info(f"Profil patient ID {patient_id} mis à jour avec succès.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
                     id_session=f"patient_update_{patient_id}",
@@ -157,26 +145,21 @@ class GestionnairePatient:
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du profil patient {patient_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def enregistrer_journal_sante(self, patient_id: int, log_data: HealthStatusLogCreer) -> Optional[HealthStatusLogEnDB]:
         """
         Enregistre un nouveau journal de santé pour un patient.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si le patient existe
-            patient_exist = crud.lire_patient_par_id(conn, patient_id)
+            patient_exist = await self.acces_donnees.lire_patient_par_id(patient_id)
             if not patient_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient non trouvé.")
             
             # Assurez-vous que le patient_id dans log_data correspond à celui de l'URL
             log_data.patient_id = patient_id
 
-            nouveau_log = crud.creer_health_status_log(conn, log_data)
+            nouveau_log = await self.acces_donnees.creer_health_status_log(log_data)
             if nouveau_log:
                 logger.info(f"Journal de santé créé pour patient ID {patient_id}, log ID: {nouveau_log.id}")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -192,26 +175,21 @@ class GestionnairePatient:
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement du journal de santé pour patient {patient_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def enregistrer_donnees_wearable(self, patient_id: int, data: WearableDataCreer) -> Optional[WearableDataEnDB]:
         """
         Enregistre de nouvelles données d'appareil connecté pour un patient.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si le patient existe
-            patient_exist = crud.lire_patient_par_id(conn, patient_id)
+            patient_exist = await self.acces_donnees.lire_patient_par_id(patient_id)
             if not patient_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient non trouvé.")
             
             # Assurez-vous que le patient_id dans data correspond à celui de l'URL
             data.patient_id = patient_id
 
-            nouvelles_donnees = crud.creer_wearable_data(conn, data)
+            nouvelles_donnees = await self.acces_donnees.creer_wearable_data(data)
             if nouvelles_donnees:
                 logger.info(f"Données wearable enregistrées pour patient ID {patient_id}, data ID: {nouvelles_donnees.id}")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -227,23 +205,18 @@ class GestionnairePatient:
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement des données wearable pour patient {patient_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def lancer_diagnostic_patient(self, patient_id: int, symptomes: List[str]) -> Dict[str, Any]:
         """
         Lance un diagnostic pour un patient donné en utilisant le moteur de diagnostic.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            patient = crud.lire_patient_par_id(conn, patient_id)
+            patient = await self.acces_donnees.lire_patient_par_id(patient_id)
             if not patient:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient non trouvé.")
 
             # Récupérer les logs de conversation récents du patient pour le contexte
-            logs_conversation = crud.lire_logs_conversation_par_session(conn, f"conversation_{patient_id}", limit=10)
+            logs_conversation = await self.acces_donnees.lire_logs_conversation_par_session(f"conversation_{patient_id}", limit=10)
             historique_contexte = [log.message for log in logs_conversation]
 
             # Appeler le moteur de diagnostic
@@ -261,7 +234,4 @@ class GestionnairePatient:
         except Exception as e:
             logger.error(f"Erreur lors du lancement du diagnostic pour patient {patient_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne lors du diagnostic: {e}")
-        finally:
-            if conn:
-                conn.close()
 
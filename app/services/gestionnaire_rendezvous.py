@@ -1,22 +1,33 @@
 # app/services/gestionnaire_rendezvous.py
+import heapq
+import itertools
 import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime, date, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, date, time, timedelta
 
 from fastapi import HTTPException, status
 
-from app.base_de_donnees.connexion import get_db_connection
-from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+from app.base_de_donnees.crud import STATUTS_RENDEZ_VOUS_LIBERES
 from app.base_de_donnees.modeles import (
     AppointmentCreer, AppointmentEnDB, AppointmentMettreAJour,
-    DoctorEnDB, PatientEnDB
+    CreneauMedecinProximite, DoctorEnDB, PatientEnDB, RendezVousCreer, RendezVousEnDB
 )
 
+from app.configuration.parametres import parametres
+from app.services.cache_calendrier import CacheCalendrier, jours_couverts
+from app.services.moteur_disponibilites import Intervalle, fusionner_intervalles, generer_creneaux, parser_horaires
+from app.utilitaires.normalisation_symptomes import replier_unicode
+
 # Import pour le typage uniquement
 from app.services.gestionnaire_contexte import GestionnaireContexte
+from app.services.gestionnaire_geolocalisation import GestionnaireGeolocalisation
 
 logger = logging.getLogger(__name__)
 
+# Champs dont la modification déplace le créneau réservé
+CHAMPS_CRENEAU = ("date_heure", "duree_minutes", "medecin_id")
+
 class GestionnaireRendezvous:
     """
     Gère les opérations métier liées aux rendez-vous, y compris la création,
@@ -24,82 +35,144 @@ class GestionnaireRendezvous:
     """
     def __init__(
         self,
-        gestionnaire_contexte: GestionnaireContexte
+        acces_donnees: AccesDonneesAsync,
+        gestionnaire_contexte: GestionnaireContexte,
+        gestionnaire_geolocalisation: Optional[GestionnaireGeolocalisation] = None
     ):
+        self.acces_donnees = acces_donnees
         self.gestionnaire_contexte = gestionnaire_contexte
+        self.gestionnaire_geolocalisation = gestionnaire_geolocalisation
+        self.cache_calendrier = CacheCalendrier(parametres.APPOINTMENT_CALENDAR_CACHE_DAYS)
         logger.info("GestionnaireRendezvous initialisé.")
 
     async def prendre_rendezvous(self, appointment_data: AppointmentCreer) -> Optional[AppointmentEnDB]:
         """
         Permet à un patient de prendre un rendez-vous avec un médecin.
-        Vérifie la disponibilité.
+        La vérification de disponibilité et la création se font en une seule transaction
+        (crud.reserver_rendez_vous) : deux demandes simultanées pour le même créneau ne
+        peuvent pas aboutir toutes les deux, la seconde reçoit une erreur 409.
         """
-        conn = None
+        if appointment_data.medecin_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Le médecin du rendez-vous est obligatoire.")
         try:
-            conn = get_db_connection()
             # 1. Vérifier l'existence du patient et du médecin
-            patient_exist = crud.lire_patient_par_id(conn, appointment_data.patient_id)
+            patient_exist = await self.acces_donnees.lire_patient_par_id(appointment_data.patient_id)
             if not patient_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient non trouvé.")
             
-            doctor_exist = crud.lire_medecin_par_id(conn, appointment_data.doctor_id)
+            doctor_exist = await self.acces_donnees.lire_medecin_par_id(appointment_data.medecin_id)
             if not doctor_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Médecin non trouvé.")
 
-            # 2. Vérifier la disponibilité du médecin pour la plage horaire
-            # Convertir les dates/heures en objets datetime si elles ne le sont pas déjà
-            start_time_dt = datetime.fromisoformat(appointment_data.heure_debut)
-            end_time_dt = datetime.fromisoformat(appointment_data.heure_fin)
-
-            is_available = crud.verifier_disponibilite_medecin(
-                conn, 
-                appointment_data.doctor_id, 
-                start_time_dt, 
-                end_time_dt
-            )
-            
-            if not is_available:
+            # 2. Réserver le créneau : vérification et insertion sous verrou du médecin
+            rendez_vous = await self.acces_donnees.reserver_rendez_vous(RendezVousCreer(**appointment_data.model_dump()))
+            if rendez_vous is None:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Le médecin n'est pas disponible à cette heure. Veuillez choisir un autre créneau."
                 )
 
-            # 3. Créer le rendez-vous
-            nouveau_rendezvous = crud.creer_rendezvous(conn, appointment_data)
-            if nouveau_rendezvous:
-                logger.info(f"Rendez-vous créé avec succès (ID: {nouveau_rendezvous.id}) pour patient {nouveau_rendezvous.patient_id} et médecin {nouveau_rendezvous.doctor_id}.")
-                await self.gestionnaire_contexte.ajouter_log_conversation(
-                    id_session=f"appointment_creation_{nouveau_rendezvous.id}",
-                    role="system",
-                    message=f"Rendez-vous créé pour patient {nouveau_rendezvous.patient_id} avec médecin {nouveau_rendezvous.doctor_id}.",
-                    type_message="evenement_systeme",
-                    donnees_structurees={"event": "appointment_created", "appointment_id": nouveau_rendezvous.id, "patient_id": nouveau_rendezvous.patient_id, "doctor_id": nouveau_rendezvous.doctor_id, "heure_debut": nouveau_rendezvous.heure_debut}
-                )
+            nouveau_rendezvous = AppointmentEnDB(**rendez_vous.model_dump())
+            self._invalider_calendrier(nouveau_rendezvous)
+            logger.info(f"Rendez-vous créé avec succès (ID: {nouveau_rendezvous.id}) pour patient {nouveau_rendezvous.patient_id} et médecin {nouveau_rendezvous.medecin_id}.")
+            await self.gestionnaire_contexte.ajouter_log_conversation(
+                id_session=f"appointment_creation_{nouveau_rendezvous.id}",
+                role="system",
+                message=f"Rendez-vous créé pour patient {nouveau_rendezvous.patient_id} avec médecin {nouveau_rendezvous.medecin_id}.",
+                type_message="evenement_systeme",
+                donnees_structurees={"event": "appointment_created", "appointment_id": nouveau_rendezvous.id, "patient_id": nouveau_rendezvous.patient_id, "doctor_id": nouveau_rendezvous.medecin_id, "heure_debut": nouveau_rendezvous.date_heure.isoformat()}
+            )
             return nouveau_rendezvous
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Erreur lors de la prise de rendez-vous: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
+
+    async def obtenir_rendezvous_par_id(self, appointment_id: int) -> Optional[AppointmentEnDB]:
+        rendez_vous = await self.acces_donnees.lire_rendez_vous_par_id(appointment_id)
+        return AppointmentEnDB(**rendez_vous.model_dump()) if rendez_vous else None
+
+    async def obtenir_rendezvous_par_patient(self, patient_id: int, limit: int = 100, offset: int = 0) -> List[AppointmentEnDB]:
+        rendez_vous = await self.acces_donnees.lire_rendez_vous_par_patient_id(patient_id, limit, offset)
+        return [AppointmentEnDB(**rdv.model_dump()) for rdv in rendez_vous]
+
+    async def obtenir_rendezvous_par_medecin(self, doctor_id: int, limit: int = 100, offset: int = 0) -> List[AppointmentEnDB]:
+        rendez_vous = await self.acces_donnees.lire_rendez_vous_par_medecin_id(doctor_id, limit, offset)
+        return [AppointmentEnDB(**rdv.model_dump()) for rdv in rendez_vous]
+
+    def _invalider_calendrier(self, rendez_vous: AppointmentEnDB):
+        """Retire du cache des calendriers les jours occupés par ce rendez-vous."""
+        self.cache_calendrier.invalider(
+            rendez_vous.medecin_id,
+            rendez_vous.date_heure,
+            rendez_vous.date_heure + timedelta(minutes=rendez_vous.duree_minutes)
+        )
+
+    async def _appliquer_modifications(self, appointment_id: int, modifications: Dict[str, Any], existant: RendezVousEnDB) -> Optional[RendezVousEnDB]:
+        """
+        Applique les modifications d'un rendez-vous. Un changement de créneau ou une réactivation
+        (statut annulé -> actif) passe par crud.modifier_creneau_rendez_vous (verrou du médecin et
+        vérification du chevauchement) : 409 si le créneau est déjà pris.
+        """
+        reactivation = (
+            "statut" in modifications
+            and existant.statut in STATUTS_RENDEZ_VOUS_LIBERES
+            and modifications["statut"] not in STATUTS_RENDEZ_VOUS_LIBERES
+        )
+        if not reactivation and not any(champ in modifications for champ in CHAMPS_CRENEAU):
+            return await self.acces_donnees.mettre_a_jour_rendez_vous(appointment_id, modifications, existant)
+        try:
+            rendez_vous = await self.acces_donnees.modifier_creneau_rendez_vous(appointment_id, modifications)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        if rendez_vous is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Le médecin n'est pas disponible à cette heure. Veuillez choisir un autre créneau."
+            )
+        return rendez_vous
+
+    async def mettre_a_jour_rendezvous(self, appointment_id: int, update_data: Dict[str, Any]) -> Optional[AppointmentEnDB]:
+        """
+        Met à jour un rendez-vous. Un nouveau créneau est vérifié sous verrou du médecin (409 s'il
+        est pris). Les jours de l'ancien et du nouveau créneau sont invalidés dans le cache des calendriers.
+        """
+        try:
+            modifications = AppointmentMettreAJour(**update_data).model_dump(exclude_unset=True)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        try:
+            rendezvous_exist = await self.acces_donnees.lire_rendez_vous_par_id(appointment_id)
+            if not rendezvous_exist:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rendez-vous non trouvé.")
+
+            rendezvous_mis_a_jour = await self._appliquer_modifications(appointment_id, modifications, rendezvous_exist)
+            if rendezvous_mis_a_jour is None:
+                return None
+            self._invalider_calendrier(rendezvous_exist)
+            self._invalider_calendrier(rendezvous_mis_a_jour)
+            logger.info(f"Rendez-vous ID {appointment_id} mis à jour : {list(modifications)}.")
+            return AppointmentEnDB(**rendezvous_mis_a_jour.model_dump())
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour du rendez-vous {appointment_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
 
     async def mettre_a_jour_statut_rendezvous(self, appointment_id: int, nouveau_statut: str) -> Optional[AppointmentEnDB]:
         """
         Met à jour le statut d'un rendez-vous.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            rendezvous_exist = crud.lire_rendezvous_par_id(conn, appointment_id)
+            rendezvous_exist = await self.acces_donnees.lire_rendez_vous_par_id(appointment_id)
             if not rendezvous_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rendez-vous non trouvé.")
             
             update_data = {"statut": nouveau_statut}
-            succes = crud.mettre_a_jour_rendezvous(conn, appointment_id, update_data)
-            if succes:
-                rendezvous_mis_a_jour = crud.lire_rendezvous_par_id(conn, appointment_id)
+            rendezvous_mis_a_jour = await self._appliquer_modifications(appointment_id, update_data, rendezvous_exist)
+            if rendezvous_mis_a_jour:
+                self._invalider_calendrier(rendezvous_mis_a_jour)
                 logger.info(f"Statut du rendez-vous ID {appointment_id} mis à jour à '{nouveau_statut}'.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
                     id_session=f"appointment_update_{appointment_id}",
@@ -108,79 +181,176 @@ class GestionnaireRendezvous:
                     type_message="evenement_systeme",
                     donnees_structurees={"event": "appointment_status_updated", "appointment_id": appointment_id, "new_status": nouveau_statut}
                 )
-                return rendezvous_mis_a_jour
+                return AppointmentEnDB(**rendezvous_mis_a_jour.model_dump())
             return None
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du statut du rendez-vous {appointment_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
-    async def annuler_rendezvous(self, appointment_id: int) -> bool:
+    async def annuler_rendezvous(self, appointment_id: int) -> Optional[AppointmentEnDB]:
         """
         Annule un rendez-vous en mettant son statut à 'annulé'.
         """
-        return await self.mettre_a_jour_statut_rendezvous(appointment_id, "annulé") is not None
+        return await self.mettre_a_jour_statut_rendezvous(appointment_id, "annulé")
+
+    async def supprimer_rendezvous(self, appointment_id: int) -> bool:
+        """Supprime un rendez-vous et libère son créneau dans le cache des calendriers."""
+        try:
+            rendezvous_exist = await self.acces_donnees.lire_rendez_vous_par_id(appointment_id)
+            if not rendezvous_exist:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rendez-vous non trouvé.")
+            supprime = await self.acces_donnees.supprimer_rendez_vous(appointment_id)
+            self._invalider_calendrier(rendezvous_exist)
+            logger.info(f"Rendez-vous ID {appointment_id} supprimé.")
+            return supprime
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la suppression du rendez-vous {appointment_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
+
+    async def _intervalles_occupes(self, medecin_ids: List[int], date_debut: date, date_fin: date) -> Dict[int, List[Intervalle]]:
+        """
+        Intervalles réservés (triés et fusionnés) de chaque médecin du 'date_debut' au 'date_fin'.
+        Les jours absents du cache des calendriers sont lus en une seule requête pour tous les
+        médecins, puis mis en cache jour par jour.
+        """
+        jours = [date_debut + timedelta(days=i) for i in range((date_fin - date_debut).days + 1)]
+        occupes: Dict[int, List[Intervalle]] = {}
+        a_lire: Dict[int, Tuple[int, List[date]]] = {}
+        for medecin_id in medecin_ids:
+            version = self.cache_calendrier.version(medecin_id)
+            presents, manquants = self.cache_calendrier.obtenir(medecin_id, jours)
+            occupes[medecin_id] = [intervalle for intervalles in presents.values() for intervalle in intervalles]
+            if manquants:
+                a_lire[medecin_id] = (version, manquants)
+
+        if a_lire:
+            premier_jour = min(manquants[0] for _, manquants in a_lire.values())
+            dernier_jour = max(manquants[-1] for _, manquants in a_lire.values())
+            rendez_vous = await self.acces_donnees.lire_rendez_vous_par_medecins_entre(
+                list(a_lire),
+                datetime.combine(premier_jour, time.min),
+                datetime.combine(dernier_jour + timedelta(days=1), time.min)
+            )
+            for medecin_id, (version, manquants) in a_lire.items():
+                par_jour: Dict[date, List[Intervalle]] = {jour: [] for jour in manquants}
+                for rdv in rendez_vous.get(medecin_id, []):
+                    intervalle = (rdv.date_heure, rdv.date_heure + timedelta(minutes=rdv.duree_minutes))
+                    for jour in jours_couverts(*intervalle):
+                        if jour in par_jour:
+                            par_jour[jour].append(intervalle)
+                self.cache_calendrier.enregistrer(medecin_id, version, par_jour)
+                occupes[medecin_id].extend(intervalle for intervalles in par_jour.values() for intervalle in intervalles)
+
+        return {medecin_id: fusionner_intervalles(intervalles) for medecin_id, intervalles in occupes.items()}
+
+    def obtenir_statistiques_calendrier(self) -> Dict[str, Any]:
+        """Retourne l'occupation et le taux de succès du cache des calendriers des médecins."""
+        return self.cache_calendrier.obtenir_statistiques()
+
+    def _verifier_plage_recherche(self, date_debut: date, date_fin: date):
+        if date_fin < date_debut:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="La date de fin précède la date de début.")
+        if (date_fin - date_debut).days >= parametres.APPOINTMENT_SEARCH_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La recherche de disponibilités est limitée à {parametres.APPOINTMENT_SEARCH_MAX_DAYS} jours."
+            )
 
-    async def rechercher_disponibilites_medecin(self, doctor_id: int, date_recherche: date, duree_min: int = 30) -> List[Dict[str, str]]:
+    async def rechercher_disponibilites_medecin(
+        self, doctor_id: int, date_recherche: date, duree_min: int = 30, date_fin: Optional[date] = None
+    ) -> List[Dict[str, str]]:
         """
-        Recherche les créneaux de disponibilité d'un médecin pour une date donnée.
+        Recherche les créneaux de disponibilité d'un médecin du 'date_recherche' au 'date_fin'
+        (inclus ; par défaut la seule date de recherche), selon ses horaires de travail
+        (disponibilites_json) et ses rendez-vous non annulés.
         Retourne une liste de créneaux disponibles.
         """
-        conn = None
+        date_fin = date_fin or date_recherche
+        self._verifier_plage_recherche(date_recherche, date_fin)
         try:
-            conn = get_db_connection()
-            doctor_exist = crud.lire_medecin_par_id(conn, doctor_id)
+            doctor_exist = await self.acces_donnees.lire_medecin_par_id(doctor_id)
             if not doctor_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Médecin non trouvé.")
 
-            # Récupérer tous les rendez-vous existants pour ce médecin à cette date
-            existing_appointments = crud.lire_rendezvous_par_medecin_et_date(conn, doctor_id, date_recherche)
-
-            # Définir les heures de travail par défaut du médecin (exemple: 9h-17h)
-            # Idéalement, ceci devrait venir du profil du médecin dans la DB
-            journee_debut = datetime.combine(date_recherche, datetime.min.time().replace(hour=9))
-            journee_fin = datetime.combine(date_recherche, datetime.min.time().replace(hour=17))
-
-            creneaux_disponibles = []
-            current_time = journee_debut
-
-            while current_time + timedelta(minutes=duree_min) <= journee_fin:
-                is_slot_free = True
-                for appt in existing_appointments:
-                    appt_start = datetime.fromisoformat(appt.heure_debut)
-                    appt_end = datetime.fromisoformat(appt.heure_fin)
-                    
-                    # Vérifier si le créneau actuel chevauche un rendez-vous existant
-                    if not (current_time + timedelta(minutes=duree_min) <= appt_start or current_time >= appt_end):
-                        is_slot_free = False
-                        # Avancer le temps au-delà du rendez-vous existant pour éviter les petits chevauchements
-                        current_time = appt_end
-                        break # Sortir de la boucle interne et vérifier le nouveau current_time
-
-                if is_slot_free:
-                    creneaux_disponibles.append({
-                        "heure_debut": current_time.isoformat(),
-                        "heure_fin": (current_time + timedelta(minutes=duree_min)).isoformat()
-                    })
-                    current_time += timedelta(minutes=duree_min)
-                # Si le slot n'était pas libre et current_time a été avancé, la boucle while le gérera.
-                # Si le slot n'était pas libre et current_time n'a pas été avancé (ex: chevauchement partiel),
-                # il faut avancer d'une petite unité pour re-vérifier.
-                else:
-                    current_time += timedelta(minutes=1)
-
-            logger.info(f"Recherche de disponibilités pour médecin {doctor_id} le {date_recherche}: {len(creneaux_disponibles)} créneaux trouvés.")
+            # Intervalles réservés de toute la plage (cache des calendriers, sinon une requête)
+            occupes = (await self._intervalles_occupes([doctor_id], date_recherche, date_fin))[doctor_id]
+            horaires = parser_horaires(doctor_exist.disponibilites_json)
+
+            creneaux_disponibles = [
+                {"heure_debut": debut.isoformat(), "heure_fin": fin.isoformat()}
+                for debut, fin in generer_creneaux(horaires, occupes, date_recherche, date_fin, duree_min)
+            ]
+
+            logger.info(f"Recherche de disponibilités pour médecin {doctor_id} du {date_recherche} au {date_fin}: {len(creneaux_disponibles)} créneaux trouvés.")
             return creneaux_disponibles
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de disponibilités pour le médecin {doctor_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    async def rechercher_premiers_creneaux(
+        self,
+        specialite: Optional[str],
+        latitude: float,
+        longitude: float,
+        rayon_km: Optional[float] = None,
+        date_debut: Optional[date] = None,
+        date_fin: Optional[date] = None,
+        duree_min: int = 30,
+        limite: int = 10
+    ) -> List[CreneauMedecinProximite]:
+        """
+        Recherche les 'limite' créneaux libres les plus proches dans le temps, tous médecins
+        confondus, parmi les médecins de la spécialité situés à moins de 'rayon_km'.
+
+        Les intervalles réservés des médecins candidats viennent du cache des calendriers
+        (les jours manquants sont lus en une requête) ; chaque médecin
+        fournit ensuite un générateur chronologique de créneaux, et heapq.merge fusionne ces
+        générateurs à la demande : seuls les créneaux effectivement retournés sont calculés.
+        À heure égale, le médecin le plus proche passe en premier.
+        """
+        if self.gestionnaire_geolocalisation is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service de géolocalisation non disponible.")
+        maintenant = datetime.now()
+        date_debut = date_debut or maintenant.date()
+        date_fin = date_fin or date_debut + timedelta(days=parametres.APPOINTMENT_SEARCH_MAX_DAYS - 1)
+        self._verifier_plage_recherche(date_debut, date_fin)
+
+        medecins = await self.gestionnaire_geolocalisation.rechercher_medecins_proximite(latitude, longitude, rayon_km)
+        if specialite:
+            specialite_recherchee = replier_unicode(specialite).strip()
+            medecins = [m for m in medecins if m.specialite and specialite_recherchee in replier_unicode(m.specialite)]
+        medecins = medecins[:parametres.APPOINTMENT_MULTI_SEARCH_MAX_DOCTORS]
+        if not medecins:
+            return []
+
+        try:
+            occupes_par_medecin = await self._intervalles_occupes([m.id for m in medecins], date_debut, date_fin)
+
+            def creneaux_du_medecin(rang: int, medecin):
+                horaires = parser_horaires(medecin.disponibilites_json)
+                occupes = occupes_par_medecin[medecin.id]
+                for debut, fin in generer_creneaux(horaires, occupes, date_debut, date_fin, duree_min, apres=maintenant):
+                    yield debut, rang, fin
+
+            # Les médecins sont triés par distance : le rang départage les créneaux simultanés.
+            flux = heapq.merge(*(creneaux_du_medecin(rang, medecin) for rang, medecin in enumerate(medecins)))
+            creneaux = [
+                CreneauMedecinProximite(medecin=medecins[rang], heure_debut=debut, heure_fin=fin)
+                for debut, rang, fin in itertools.islice(flux, limite)
+            ]
+            logger.info(
+                f"Recherche des premiers créneaux ({specialite or 'toutes spécialités'}) autour de ({latitude}, {longitude}) : "
+                f"{len(medecins)} médecins examinés, {len(creneaux)} créneaux retournés."
+            )
+            return creneaux
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche des premiers créneaux disponibles: {e}", exc_info=True)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
@@ -6,8 +6,7 @@ import json
 
 from fastapi import HTTPException, status
 
-from app.base_de_donnees.connexion import get_db_connection
-from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 from app.base_de_donnees.modeles import (
     MedicalStructureCreer, MedicalStructureEnDB, MedicalStructureMettreAJour,
     ResourceCreer, ResourceEnDB, StatisticReportCreer, StatisticReportEnDB
@@ -16,6 +15,7 @@ from app.base_de_donnees.modeles import (
 # Import pour le typage uniquement
 from app.services.integrateur_llm import IntegrateurLLM
 from app.services.gestionnaire_contexte import GestionnaireContexte
+from app.services.gestionnaire_geolocalisation import GestionnaireGeolocalisation
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +26,30 @@ class GestionnaireStructureMedicale:
     """
     def __init__(
         self,
+        acces_donnees: AccesDonneesAsync,
         integrateur_llm: IntegrateurLLM,
-        gestionnaire_contexte: GestionnaireContexte
+        gestionnaire_contexte: GestionnaireContexte,
+        gestionnaire_geolocalisation: Optional[GestionnaireGeolocalisation] = None
     ):
+        self.acces_donnees = acces_donnees
         self.integrateur_llm = integrateur_llm
         self.gestionnaire_contexte = gestionnaire_contexte
+        self.gestionnaire_geolocalisation = gestionnaire_geolocalisation
         logger.info("GestionnaireStructureMedicale initialisé.")
 
+    def _indexer_position(self, structure: MedicalStructureEnDB):
+        """Répercute la position du profil dans l'index spatial de la géolocalisation."""
+        if self.gestionnaire_geolocalisation is not None:
+            self.gestionnaire_geolocalisation.indexer_structure_medicale(structure)
+
     async def creer_profil_structure_medicale(self, user_id: int, nom_structure: str, type_structure: str, adresse: str) -> Optional[MedicalStructureEnDB]:
         """
         Crée un profil de structure médicale de base pour un utilisateur donné.
         Cette fonction est appelée lors de l'enregistrement d'un utilisateur avec le rôle 'structure_medicale'.
         """
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier si un profil existe déjà pour cet user_id
-            existing_structure = crud.lire_structure_medicale_par_user_id(conn, user_id)
+            existing_structure = await self.acces_donnees.lire_structure_medicale_par_user_id(user_id)
             if existing_structure:
                 logger.warning(f"Tentative de créer un profil structure médicale pour user_id {user_id} qui existe déjà.")
                 raise HTTPException(
@@ -58,8 +65,9 @@ class GestionnaireStructureMedicale:
                 adresse=adresse
             )
             
-            nouvelle_structure = crud.creer_structure_medicale(conn, structure_data)
+            nouvelle_structure = await self.acces_donnees.creer_structure_medicale(structure_data)
             if nouvelle_structure:
+                self._indexer_position(nouvelle_structure)
                 logger.info(f"Profil structure médicale créé avec succès pour user_id: {user_id}, structure_id: {nouvelle_structure.id}")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
                     id_session=f"structure_creation_{nouvelle_structure.id}",
@@ -77,18 +85,13 @@ class GestionnaireStructureMedicale:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Une erreur interne est survenue lors de la création du profil de structure médicale."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def creer_profil_structure_medicale_avec_donnees(self, structure_data: MedicalStructureCreer) -> Optional[MedicalStructureEnDB]:
         """
         Crée un profil de structure médicale avec des données complètes fournies.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            existing_structure = crud.lire_structure_medicale_par_user_id(conn, structure_data.user_id)
+            existing_structure = await self.acces_donnees.lire_structure_medicale_par_user_id(structure_data.user_id)
             if existing_structure:
                 logger.warning(f"Tentative de créer un profil structure médicale pour user_id {structure_data.user_id} qui existe déjà.")
                 raise HTTPException(
@@ -96,8 +99,9 @@ class GestionnaireStructureMedicale:
                     detail="Un profil de structure médicale existe déjà pour cet utilisateur."
                 )
             
-            nouvelle_structure = crud.creer_structure_medicale(conn, structure_data)
+            nouvelle_structure = await self.acces_donnees.creer_structure_medicale(structure_data)
             if nouvelle_structure:
+                self._indexer_position(nouvelle_structure)
                 logger.info(f"Profil structure médicale créé avec succès pour user_id: {structure_data.user_id}, structure_id: {nouvelle_structure.id}")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
                     id_session=f"structure_creation_{nouvelle_structure.id}",
@@ -115,26 +119,21 @@ class GestionnaireStructureMedicale:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Une erreur interne est survenue lors de la création du profil de structure médicale."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def mettre_a_jour_profil_structure_medicale(self, structure_id: int, structure_update: MedicalStructureMettreAJour) -> Optional[MedicalStructureEnDB]:
         """
         Met à jour un profil de structure médicale existant.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            structure_exist = crud.lire_structure_medicale_par_id(conn, structure_id)
+            structure_exist = await self.acces_donnees.lire_structure_medicale_par_id(structure_id)
             if not structure_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profil de structure médicale non trouvé.")
 
             update_data = structure_update.model_dump(exclude_unset=True)
             
-            succes = crud.mettre_a_jour_structure_medicale(conn, structure_id, update_data)
-            if succes:
-                structure_mise_a_jour = crud.lire_structure_medicale_par_id(conn, structure_id)
+            structure_mise_a_jour = await self.acces_donnees.mettre_a_jour_structure_medicale(structure_id, update_data, existant=structure_exist)
+            if structure_mise_a_jour:
+                self._indexer_position(structure_mise_a_jour)
                 logger.info(f"Profil structure médicale ID {structure_id} mis à jour avec succès.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
                     id_session=f"structure_update_{structure_id}",
@@ -150,22 +149,17 @@ class GestionnaireStructureMedicale:
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du profil structure médicale {structure_id}: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def creer_ressource(self, resource_data: ResourceCreer) -> Optional[ResourceEnDB]:
         """
         Crée une nouvelle ressource pour une structure médicale.
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            structure_exist = crud.lire_structure_medicale_par_id(conn, resource_data.structure_id)
+            structure_exist = await self.acces_donnees.lire_structure_medicale_par_id(resource_data.structure_id)
             if not structure_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Structure médicale associée non trouvée.")
 
-            nouvelle_ressource = crud.creer_resource(conn, resource_data)
+            nouvelle_ressource = await self.acces_donnees.creer_resource(resource_data)
             if nouvelle_ressource:
                 logger.info(f"Ressource '{nouvelle_ressource.nom_ressource}' créée pour la structure ID {nouvelle_ressource.structure_id}.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -181,19 +175,14 @@ class GestionnaireStructureMedicale:
         except Exception as e:
             logger.error(f"Erreur lors de la création de la ressource: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     async def generer_rapport_statistique(self, report_data: StatisticReportCreer) -> Optional[StatisticReportEnDB]:
         """
         Génère un rapport statistique pour une structure médicale.
         Le contenu du rapport est généré par l'IA (IntegrateurLLM).
         """
-        conn = None
         try:
-            conn = get_db_connection()
-            structure_exist = crud.lire_structure_medicale_par_id(conn, report_data.structure_id)
+            structure_exist = await self.acces_donnees.lire_structure_medicale_par_id(report_data.structure_id)
             if not structure_exist:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Structure médicale associée non trouvée.")
 
@@ -229,7 +218,7 @@ class GestionnaireStructureMedicale:
 
             report_data.donnees_json = generated_report_content # Assigner le contenu généré par l'IA
 
-            nouveau_rapport = crud.creer_statistic_report(conn, report_data)
+            nouveau_rapport = await self.acces_donnees.creer_statistic_report(report_data)
             if nouveau_rapport:
                 logger.info(f"Rapport statistique '{nouveau_rapport.type_rapport}' généré pour la structure ID {nouveau_rapport.structure_id}.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -245,7 +234,4 @@ class GestionnaireStructureMedicale:
         except Exception as e:
             logger.error(f"Erreur lors de la génération du rapport statistique: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur interne du serveur: {e}")
-        finally:
-            if conn:
-                conn.close()
 
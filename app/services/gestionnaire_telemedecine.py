@@ -11,9 +11,8 @@ from app.base_de_donnees.modeles import (
     AppointmentEnDB # Pour vérifier l'existence du rendez-vous lié
 )
 # Import des fonctions CRUD
-from app.base_de_donnees import crud
 # Import de la connexion à la base de données
-from app.base_de_donnees.connexion import get_db_connection
+from app.base_de_donnees.acces_async import AccesDonneesAsync
 
 # Import des services dépendants (pour l'injection)
 from app.services.integrateur_llm import IntegrateurLLM
@@ -29,20 +28,20 @@ class GestionnaireTelemedecine:
 
     def __init__(
         self,
+        acces_donnees: AccesDonneesAsync,
         integrateur_llm: IntegrateurLLM,
         gestionnaire_contexte: GestionnaireContexte
     ):
+        self.acces_donnees = acces_donnees
         self.integrateur_llm = integrateur_llm
         self.gestionnaire_contexte = gestionnaire_contexte
         logger.info("GestionnaireTelemedecine initialisé.")
 
     async def creer_session_teleconsultation(self, session_data: TeleconsultationSessionCreer) -> Optional[TeleconsultationSessionEnDB]:
         """Crée une nouvelle session de téléconsultation dans la base de données."""
-        conn = None
         try:
-            conn = get_db_connection()
             # Vérifier que le rendez-vous associé existe
-            appointment = crud.lire_appointment_par_id(conn, session_data.appointment_id)
+            appointment = await self.acces_donnees.lire_appointment_par_id(session_data.appointment_id)
             if not appointment:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -50,14 +49,14 @@ class GestionnaireTelemedecine:
                 )
             
             # Vérifier qu'il n'existe pas déjà une session pour ce rendez-vous
-            existing_session = crud.lire_teleconsultation_sessions_par_appointment(conn, session_data.appointment_id)
+            existing_session = await self.acces_donnees.lire_teleconsultation_sessions_par_appointment(session_data.appointment_id)
             if existing_session:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Une session de téléconsultation existe déjà pour ce rendez-vous."
                 )
 
-            new_session = crud.creer_teleconsultation_session(conn, session_data)
+            new_session = await self.acces_donnees.creer_teleconsultation_session(session_data)
             if new_session:
                 logger.info(f"Session de téléconsultation créée (ID: {new_session.id}) pour rendez-vous {session_data.appointment_id}.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -76,16 +75,11 @@ class GestionnaireTelemedecine:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erreur interne du serveur lors de la création de la session de téléconsultation."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def obtenir_session_teleconsultation_par_id(self, session_id: int) -> Optional[TeleconsultationSessionEnDB]:
         """Récupère une session de téléconsultation par son ID."""
-        conn = None
         try:
-            conn = get_db_connection()
-            session = crud.lire_teleconsultation_session_par_id(conn, session_id)
+            session = await self.acces_donnees.lire_teleconsultation_session_par_id(session_id)
             if not session:
                 logger.warning(f"Session de téléconsultation non trouvée pour l'ID: {session_id}.")
                 raise HTTPException(
@@ -101,16 +95,11 @@ class GestionnaireTelemedecine:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erreur interne du serveur lors de la récupération de la session de téléconsultation."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def mettre_a_jour_session_teleconsultation(self, session_id: int, update_data: Dict[str, Any]) -> Optional[TeleconsultationSessionEnDB]:
         """Met à jour une session de téléconsultation existante."""
-        conn = None
         try:
-            conn = get_db_connection()
-            existing_session = crud.lire_teleconsultation_session_par_id(conn, session_id)
+            existing_session = await self.acces_donnees.lire_teleconsultation_session_par_id(session_id)
             if not existing_session:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -126,7 +115,7 @@ class GestionnaireTelemedecine:
                 update_data['resume_ia'] = ia_summary
                 update_data['horodatage_fin'] = datetime.now() # Marquer la fin de session si transcription finale
 
-            updated_session = crud.mettre_a_jour_teleconsultation_session(conn, session_id, update_data)
+            updated_session = await self.acces_donnees.mettre_a_jour_teleconsultation_session(session_id, update_data)
             if updated_session:
                 logger.info(f"Session de téléconsultation ID {session_id} mise à jour.")
                 await self.gestionnaire_contexte.ajouter_log_conversation(
@@ -145,9 +134,6 @@ class GestionnaireTelemedecine:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erreur interne du serveur lors de la mise à jour de la session de téléconsultation."
             )
-        finally:
-            if conn:
-                conn.close()
 
     async def terminer_session_teleconsultation(self, session_id: int, transcription_texte: Optional[str] = None, notes_medecin: Optional[str] = None) -> Optional[TeleconsultationSessionEnDB]:
         """Termine une session de téléconsultation et génère un résumé IA si transcription fournie."""
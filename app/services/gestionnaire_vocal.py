@@ -1,32 +1,153 @@
+import asyncio
+import io
 import logging
 import os
-from typing import Dict, Any, Optional
-import speech_recognition as sr
+import uuid
+from typing import Dict, Any, Iterable, Optional
 from gtts import gTTS
 from pydub import AudioSegment # pip install pydub
 
 # Import parameters for configurable directories
 from app.configuration.parametres import parametres
+from app.services.cache_audio_tts import CacheAudioTTS
+from app.services.executeur_vocal import ExecuteurVocal, ExecuteurVocalSatureError
+from app.services.moteurs_stt import FluxSTT, MoteurSTT, MoteurSTTGoogle
 
 # Configure the logger
 logger = logging.getLogger(__name__)
 
+# Voix de synthèse (moteur et accent gTTS), partie de la clé du cache audio
+TLD_GTTS = "com"
+VOIX_TTS = f"gtts:{TLD_GTTS}"
+
+class FluxTranscription:
+    """
+    Transcription incrémentale d'un énoncé (téléassistance PCM) : chaque chunk est transmis au
+    moteur STT dans l'ExecuteurVocal, dans l'ordre d'arrivée (verrou FIFO par flux).
+    Si un chunk n'a pas pu être transmis (file pleine, délai dépassé), le flux est marqué
+    incomplet et terminer() retourne None : l'appelant retranscrit alors l'énoncé complet.
+    """
+    def __init__(self, gestionnaire: "GestionnaireVocal", frequence: int, language_code: str):
+        self._gestionnaire = gestionnaire
+        self._frequence = frequence
+        self._language_code = language_code
+        self._flux: Optional[FluxSTT] = None
+        self._verrou = asyncio.Lock()
+        self.incomplet = False
+        self.dernier_partiel = ""
+
+    def _accepter(self, pcm: bytes) -> Optional[str]:
+        if self._flux is None:
+            self._flux = self._gestionnaire.moteur_stt.creer_flux(self._frequence, self._language_code)
+        return self._flux.accepter(pcm)
+
+    def _terminer(self) -> Optional[str]:
+        return self._flux.terminer() if self._flux is not None else ""
+
+    async def accepter(self, pcm: bytes) -> Optional[str]:
+        """Transmet un chunk ; retourne la transcription partielle si elle a changé, sinon None."""
+        async with self._verrou:
+            if self.incomplet:
+                return None
+            try:
+                partiel = await self._gestionnaire.executeur.executer("stt_flux", self._accepter, pcm)
+            except (ExecuteurVocalSatureError, asyncio.TimeoutError) as e:
+                logger.warning(f"Chunk non transmis au moteur STT ({type(e).__name__}) : transcription incrémentale abandonnée pour cet énoncé.")
+                self.incomplet = True
+                return None
+            except Exception as e:
+                logger.error(f"Erreur du moteur STT en transcription incrémentale: {e}", exc_info=True)
+                self.incomplet = True
+                return None
+            if not partiel or partiel == self.dernier_partiel:
+                return None
+            self.dernier_partiel = partiel
+            return partiel
+
+    async def terminer(self) -> Optional[str]:
+        """Texte final de l'énoncé, après les chunks déjà transmis ; None si le flux est incomplet ou en erreur."""
+        async with self._verrou:
+            if self.incomplet:
+                return None
+            return await self._gestionnaire._executer("stt_flux", self._terminer)
+
+
 class GestionnaireVocal:
     """
-    Manages Speech-to-Text (STT) and Text-to-Speech (TTS) functionalities
-    using SpeechRecognition and gTTS libraries. These libraries can use
-    free services (like Google Web Speech API) but may have usage or
-    quality limitations compared to paid cloud services.
+    Manages Speech-to-Text (STT) and Text-to-Speech (TTS) functionalities.
+    La reconnaissance est déléguée à un MoteurSTT interchangeable (STT_BACKEND) : service
+    Google Web Speech par défaut, ou moteur hors ligne sur CPU (Vosk). La synthèse utilise gTTS.
+
+    Les appels bloquants (ffmpeg, reconnaissance, gTTS.save) sont exécutés dans
+    l'ExecuteurVocal (pool de threads borné) et jamais dans la boucle d'événements.
     """
 
-    def __init__(self):
-        logger.info("GestionnaireVocal initialized with SpeechRecognition and gTTS.")
-        self.recognizer = sr.Recognizer()
+    def __init__(self, executeur: ExecuteurVocal, moteur_stt: Optional[MoteurSTT] = None, cache_audio: Optional[CacheAudioTTS] = None):
+        self.executeur = executeur
+        self.moteur_stt = moteur_stt or MoteurSTTGoogle(delai_s=executeur.delai_max_s)
+        self.cache_audio = cache_audio
+        self._syntheses_en_cours: Dict[str, asyncio.Future] = {} # Une seule synthèse par clé à la fois
+        logger.info(f"GestionnaireVocal initialized with STT engine '{self.moteur_stt.nom}' and gTTS.")
+
+    @property
+    def streaming(self) -> bool:
+        """Vrai si le moteur STT produit des transcriptions partielles pendant l'énoncé."""
+        return self.moteur_stt.streaming
+
+    async def charger_moteur_stt(self):
+        """
+        Chargement à chaud du moteur STT au démarrage (hors ExecuteurVocal : le chargement d'un
+        modèle peut dépasser VOICE_JOB_TIMEOUT_S). En cas d'échec, repli sur le service Google.
+        """
+        try:
+            await asyncio.to_thread(self.moteur_stt.charger)
+            logger.info(f"Moteur STT '{self.moteur_stt.nom}' chargé.")
+        except Exception as e:
+            logger.error(f"Chargement du moteur STT '{self.moteur_stt.nom}' impossible, repli sur 'google': {e}", exc_info=True)
+            self.moteur_stt = MoteurSTTGoogle(delai_s=self.executeur.delai_max_s)
+
+    def ouvrir_flux_transcription(self, frequence: int, language_code: str = "fr-FR") -> FluxTranscription:
+        """Ouvre la transcription incrémentale d'un énoncé en PCM 16 bits mono à 'frequence' Hz."""
+        return FluxTranscription(self, frequence, language_code)
+
+    async def _executer(self, type_tache: str, fonction, *args) -> Any:
+        """Exécute une fonction bloquante dans l'ExecuteurVocal ; None si la file est pleine ou le délai dépassé."""
+        try:
+            return await self.executeur.executer(type_tache, fonction, *args)
+        except ExecuteurVocalSatureError as e:
+            logger.error(f"Traitement vocal '{type_tache}' refusé : {e}")
+        except asyncio.TimeoutError:
+            logger.error(f"Traitement vocal '{type_tache}' abandonné après {self.executeur.delai_max_s} s.")
+        return None
+
+    def _decoder_audio(self, source: Any, format_audio: Optional[str] = None) -> bytes:
+        """
+        Décode un fichier ou un flux (chemin ou objet fichier) en PCM 16 bits mono à STT_SAMPLE_RATE.
+        pydub transmet un objet fichier à ffmpeg par un pipe (stdin) : aucun fichier
+        temporaire n'est écrit, ni pour l'entrée ni pour une conversion WAV intermédiaire.
+        """
+        audio = AudioSegment.from_file(source, format=format_audio)
+        return audio.set_frame_rate(parametres.STT_SAMPLE_RATE).set_channels(1).set_sample_width(2).raw_data
+
+    def _transcrire(self, source: Any, format_audio: Optional[str], language_code: str) -> Optional[str]:
+        """Décodage puis reconnaissance par le moteur STT (bloquant, exécuté dans l'ExecuteurVocal)."""
+        try:
+            if format_audio == "pcm":
+                # PCM 16 bits mono brut : aucun décodage nécessaire
+                pcm, frequence = source, parametres.TELEASSISTANCE_PCM_SAMPLE_RATE
+            elif isinstance(source, bytes):
+                pcm, frequence = self._decoder_audio(io.BytesIO(source), format_audio), parametres.STT_SAMPLE_RATE
+            else:
+                pcm, frequence = self._decoder_audio(source, format_audio), parametres.STT_SAMPLE_RATE
+        except Exception as e:
+            logger.error(f"Erreur lors du décodage audio ({format_audio}): {e}", exc_info=True)
+            return None # Retourne None en cas d'erreur de conversion
+        return self.moteur_stt.transcrire(pcm, frequence, language_code)
 
     async def transcrire_audio_en_texte(self, chemin_audio: str, language_code: str = "fr-FR") -> Optional[str]:
         """
         Transcribes an audio file to text using SpeechRecognition.
-        Converts the input file to WAV if necessary.
+        The file is decoded in memory, whatever its format.
 
         Args:
             chemin_audio (str): The path to the audio file to transcribe.
@@ -39,77 +160,29 @@ class GestionnaireVocal:
             logger.error(f"Fichier audio non trouvé pour la transcription: {chemin_audio}")
             return None # Retourne None si le fichier n'existe pas
 
-        # Détermine si une conversion est nécessaire
-        # Le frontend envoie probablement du .webm, SpeechRecognition attend du .wav
-        _, file_extension = os.path.splitext(chemin_audio)
-        temp_wav_path = None
-        audio_to_process = chemin_audio
-
-        if file_extension.lower() != '.wav':
-            logger.debug(f"Conversion de {chemin_audio} en WAV pour SpeechRecognition.")
-            try:
-                # Crée un chemin temporaire pour le fichier WAV dans UPLOAD_DIR
-                temp_wav_filename = f"{os.path.basename(chemin_audio).split('.')[0]}.wav"
-                temp_wav_path = os.path.join(parametres.UPLOAD_DIR, temp_wav_filename)
-                
-                audio = AudioSegment.from_file(chemin_audio)
-                audio.export(temp_wav_path, format="wav")
-                audio_to_process = temp_wav_path
-                logger.debug(f"Fichier converti en WAV: {audio_to_process}")
-            except Exception as e:
-                logger.error(f"Erreur lors de la conversion audio de {chemin_audio} en WAV: {e}", exc_info=True)
-                return None # Retourne None en cas d'erreur de conversion
-
-        logger.debug(f"Démarrage de la transcription audio pour: {audio_to_process} (Langue: {language_code})")
-        try:
-            with sr.AudioFile(audio_to_process) as source:
-                self.recognizer.adjust_for_ambient_noise(source)
-                audio_data = self.recognizer.record(source)
-            
-            # NOUVEAU LOG POUR DIAGNOSTIC
-            logger.debug(f"Audio data size for recognition: {len(audio_data.frame_data)} bytes")
-
-            # Tente de transcrire l'audio
-            texte_transcrit = self.recognizer.recognize_google(audio_data, language=language_code)
-            logger.debug(f"Résultat brut de recognize_google: '{texte_transcrit}'") # NOUVEAU LOG
-
-            if not texte_transcrit:
-                logger.warning(f"Aucun texte n'a pu être transcrit à partir de: {audio_to_process}")
-                return "" # Retourne une chaîne vide si aucun texte n'a été transcrit
-
-            logger.info(f"Transcription terminée. Texte: '{texte_transcrit}'")
-            return texte_transcrit
-        except sr.UnknownValueError:
-            logger.warning(f"SpeechRecognition n'a pas pu comprendre l'audio dans: {audio_to_process}")
-            return "" # Retourne une chaîne vide si la parole n'est pas comprise
-        except sr.RequestError as e:
-            logger.error(f"Impossible de demander des résultats à SpeechRecognition (service indisponible ou limite atteinte): {e}", exc_info=True)
-            return None # Retourne None en cas d'erreur de requête de service
-        except Exception as e:
-            logger.error(f"Erreur inattendue lors de la transcription audio: {e}", exc_info=True)
-            return None # Retourne None en cas d'erreurs inattendues
-        finally:
-            # Nettoie le fichier WAV temporaire si une conversion a eu lieu
-            if temp_wav_path and os.path.exists(temp_wav_path):
-                os.remove(temp_wav_path)
-                logger.debug(f"Fichier WAV temporaire supprimé: {temp_wav_path}")
-
+        logger.debug(f"Démarrage de la transcription audio pour: {chemin_audio} (Langue: {language_code})")
+        return await self._executer("stt", self._transcrire, chemin_audio, None, language_code)
 
-    async def generer_audio_depuis_texte(self, texte: str, chemin_sortie: str, language_code: str = "fr") -> str:
+    async def transcrire_audio_octets(self, audio: bytes, format_audio: Optional[str] = "webm", language_code: str = "fr-FR") -> Optional[str]:
         """
-        Generates an audio file from text using gTTS.
+        Transcrit un enregistrement reçu en mémoire (WebSocket, upload) sans passer par le disque.
 
         Args:
-            texte (str): The text to convert to audio.
-            chemin_sortie (str): The path where the generated audio file will be saved (e.g., "response_ia.mp3").
-            language_code (str): The language code (e.g., "fr", "en").
+            audio (bytes): Le contenu encodé de l'enregistrement.
+            format_audio (Optional[str]): Le format du conteneur ("webm", "ogg", "wav", ...), "pcm" pour du PCM
+                16 bits mono brut (TELEASSISTANCE_PCM_SAMPLE_RATE), None pour le détecter.
+            language_code (str): The BCP-47 language code (e.g., "fr-FR", "en-US").
 
         Returns:
-            str: The path to the generated audio file.
+            Optional[str]: The transcribed text, or None if transcription failed.
         """
-        logger.debug(f"Démarrage de la génération audio pour le texte: '{texte[:50]}...' (Langue: {language_code})")
+        logger.debug(f"Démarrage de la transcription de {len(audio)} octets audio ({format_audio}, Langue: {language_code})")
+        return await self._executer("stt", self._transcrire, audio, format_audio, language_code)
+
+    def _generer_audio(self, texte: str, chemin_sortie: str, language_code: str) -> str:
+        """Synthèse gTTS et écriture du fichier (bloquant, exécuté dans l'ExecuteurVocal)."""
         try:
-            tts = gTTS(text=texte, lang=language_code, slow=False)
+            tts = gTTS(text=texte, lang=language_code, tld=TLD_GTTS, slow=False, timeout=self.executeur.delai_max_s)
 
             # S'assure que le répertoire de sortie existe (en utilisant AUDIO_RESPONSES_DIR configuré)
             repertoire_sortie = os.path.dirname(chemin_sortie)
@@ -117,8 +190,7 @@ class GestionnaireVocal:
                 repertoire_sortie = parametres.AUDIO_RESPONSES_DIR
                 chemin_sortie = os.path.join(repertoire_sortie, chemin_sortie)
 
-            if not os.path.exists(repertoire_sortie):
-                os.makedirs(repertoire_sortie)
+            os.makedirs(repertoire_sortie, exist_ok=True)
 
             tts.save(chemin_sortie)
             logger.info(f"Génération audio terminée. Fichier de sortie: {chemin_sortie}")
@@ -126,3 +198,66 @@ class GestionnaireVocal:
         except Exception as e:
             logger.error(f"Erreur lors de la génération audio avec gTTS: {e}", exc_info=True)
             return ""
+
+    def _generer_audio_en_cache(self, texte: str, chemin_cache: str, language_code: str) -> str:
+        """
+        Synthétise dans un fichier temporaire puis le renomme (atomique) : un fichier du cache
+        n'est jamais lu à moitié écrit, y compris par un autre processus du serveur.
+        """
+        chemin_temporaire = f"{chemin_cache}.{uuid.uuid4().hex}.part"
+        if not self._generer_audio(texte, chemin_temporaire, language_code):
+            return ""
+        os.replace(chemin_temporaire, chemin_cache)
+        return chemin_cache
+
+    async def _synthetiser_en_cache(self, cle: str, texte: str, language_code: str) -> str:
+        chemin = await self._executer("tts", self._generer_audio_en_cache, texte, self.cache_audio.chemin(cle), language_code)
+        if chemin:
+            self.cache_audio.enregistrer(cle)
+        return chemin or ""
+
+    async def generer_audio_depuis_texte(self, texte: str, chemin_sortie: Optional[str] = None, language_code: str = "fr") -> str:
+        """
+        Generates an audio file from text using gTTS.
+        Sans 'chemin_sortie', le fichier est pris dans le cache audio adressé par contenu
+        (texte, langue, voix) s'il y est déjà, sinon synthétisé une seule fois puis mis en cache.
+
+        Args:
+            texte (str): The text to convert to audio.
+            chemin_sortie (Optional[str]): Chemin imposé du fichier généré (pas de cache), par ex. "response_ia.mp3".
+            language_code (str): The language code (e.g., "fr", "en").
+
+        Returns:
+            str: The path to the generated audio file, or "" if generation failed.
+        """
+        if chemin_sortie is None and self.cache_audio is not None:
+            cle = CacheAudioTTS.cle(texte, language_code, VOIX_TTS)
+            chemin = self.cache_audio.obtenir(cle)
+            if chemin:
+                logger.debug(f"Réponse audio servie depuis le cache: {chemin}")
+                return chemin
+            synthese = self._syntheses_en_cours.get(cle)
+            if synthese is None:
+                synthese = self._syntheses_en_cours[cle] = asyncio.ensure_future(self._synthetiser_en_cache(cle, texte, language_code))
+                synthese.add_done_callback(lambda _: self._syntheses_en_cours.pop(cle, None))
+            # shield : l'annulation d'un appelant n'interrompt pas la synthèse partagée
+            return await asyncio.shield(synthese)
+
+        if chemin_sortie is None:
+            chemin_sortie = os.path.join(parametres.AUDIO_RESPONSES_DIR, f"ai_response_{uuid.uuid4().hex}.mp3")
+        logger.debug(f"Démarrage de la génération audio pour le texte: '{texte[:50]}...' (Langue: {language_code})")
+        return await self._executer("tts", self._generer_audio, texte, chemin_sortie, language_code) or ""
+
+    async def prechauffer_cache_audio(self, phrases: Iterable[str], language_code: str = "fr"):
+        """Synthétise à l'avance les phrases fixes (messages de repli, fin d'appel), une à la fois."""
+        if self.cache_audio is None:
+            return
+        nb_prets = 0
+        for phrase in phrases:
+            nb_prets += bool(await self.generer_audio_depuis_texte(phrase, language_code=language_code))
+        logger.info(f"Cache audio préchauffé : {nb_prets} phrase(s) disponible(s).")
+
+    def obtenir_statistiques_cache_audio(self) -> Dict[str, Any]:
+        if self.cache_audio is None:
+            return {"actif": False}
+        return {"actif": True, **self.cache_audio.obtenir_statistiques()}
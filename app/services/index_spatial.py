@@ -0,0 +1,229 @@
+import logging
+import math
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from app.utilitaires.geographie import RAYON_TERRE_KM
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de distances (origines x positions) calculées à la fois par la recherche par lot
+TAILLE_BLOC_DISTANCES = 4_000_000
+
+
+def _vecteur_unitaire(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+def _corde_depuis_km(distance_km: float) -> float:
+    """Longueur de la corde (sphère unité) correspondant à une distance sur le grand cercle."""
+    angle = min(distance_km / RAYON_TERRE_KM, math.pi)
+    return 2.0 * math.sin(angle / 2.0)
+
+
+def _km_depuis_corde(corde: float) -> float:
+    return 2.0 * RAYON_TERRE_KM * math.asin(min(corde / 2.0, 1.0))
+
+
+def distances_haversine_km(
+    latitudes_origines: np.ndarray,
+    longitudes_origines: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    cos_latitudes: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Matrice (origines x positions) des distances de Haversine en kilomètres.
+    Tous les angles sont en radians ; 'cos_latitudes' peut être fourni s'il est déjà calculé.
+    """
+    if cos_latitudes is None:
+        cos_latitudes = np.cos(latitudes)
+    dlat = latitudes[np.newaxis, :] - latitudes_origines[:, np.newaxis]
+    dlon = longitudes[np.newaxis, :] - longitudes_origines[:, np.newaxis]
+    a = np.sin(dlat * 0.5) ** 2
+    a += np.cos(latitudes_origines)[:, np.newaxis] * cos_latitudes[np.newaxis, :] * np.sin(dlon * 0.5) ** 2
+    return 2.0 * RAYON_TERRE_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class IndexSpatial:
+    """
+    Index spatial en mémoire d'objets géolocalisés (médecins, structures médicales).
+
+    Les positions sont projetées sur la sphère unité (x, y, z) et rangées dans un k-d tree :
+    la distance euclidienne (corde) y est une fonction croissante de la distance sur le grand
+    cercle, ce qui rend exactes les recherches par rayon et des k plus proches voisins.
+    Les ajouts et déplacements sont d'abord placés dans une petite zone tampon parcourue
+    linéairement ; l'arbre n'est reconstruit que lorsqu'elle dépasse 'seuil_reconstruction'.
+
+    Les recherches par lot (plusieurs origines) utilisent un tableau float64 des coordonnées,
+    mis en cache jusqu'à la prochaine modification, et un calcul vectorisé de Haversine.
+    """
+    def __init__(self, nom: str, seuil_reconstruction: int = 256):
+        self.nom = nom
+        self.seuil_reconstruction = max(1, seuil_reconstruction)
+        self._positions: Dict[int, Tuple[float, float, float]] = {}
+        self._coordonnees: Dict[int, Tuple[float, float]] = {}  # (latitude, longitude) en degrés
+        self._objets: Dict[int, Any] = {}
+        self._tableau: Optional[Tuple[List[int], np.ndarray, np.ndarray, np.ndarray]] = None
+        self._en_attente: Set[int] = set()  # IDs ajoutés, déplacés ou retirés depuis la dernière construction
+        self._ids_arbre = np.empty(0, dtype=np.int64)
+        self._arbre: Optional[cKDTree] = None
+        self.nb_reconstructions = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def construire(self, objets: Dict[int, Tuple[float, float, Any]]):
+        """(Re)construit entièrement l'index à partir de {id: (latitude, longitude, objet)}."""
+        self._positions = {}
+        self._coordonnees = {}
+        self._objets = {}
+        self._tableau = None
+        for identifiant, (latitude, longitude, objet) in objets.items():
+            self._positions[identifiant] = _vecteur_unitaire(latitude, longitude)
+            self._coordonnees[identifiant] = (latitude, longitude)
+            self._objets[identifiant] = objet
+        self._reconstruire()
+        logger.info(f"Index spatial '{self.nom}' construit : {len(self._positions)} positions.")
+
+    def _reconstruire(self):
+        self._ids_arbre = np.fromiter(self._positions.keys(), dtype=np.int64, count=len(self._positions))
+        if self._positions:
+            self._arbre = cKDTree(np.array(list(self._positions.values()), dtype=np.float64))
+        else:
+            self._arbre = None
+        self._en_attente.clear()
+        self.nb_reconstructions += 1
+
+    def _marquer(self, identifiant: int):
+        self._en_attente.add(identifiant)
+        if len(self._en_attente) > self.seuil_reconstruction:
+            self._reconstruire()
+
+    def indexer(self, identifiant: int, latitude: float, longitude: float, objet: Any):
+        """Ajoute un objet ou met à jour sa position et sa représentation."""
+        position = _vecteur_unitaire(latitude, longitude)
+        ancienne = self._positions.get(identifiant)
+        self._positions[identifiant] = position
+        self._coordonnees[identifiant] = (latitude, longitude)
+        self._objets[identifiant] = objet
+        if ancienne != position:
+            self._tableau = None
+            self._marquer(identifiant)
+
+    def retirer(self, identifiant: int):
+        """Retire un objet de l'index (coordonnées effacées ou profil supprimé)."""
+        if self._positions.pop(identifiant, None) is not None:
+            self._coordonnees.pop(identifiant, None)
+            self._objets.pop(identifiant, None)
+            self._tableau = None
+            self._marquer(identifiant)
+
+    def _distances_en_attente(self, point: np.ndarray, corde_max: float) -> List[Tuple[float, int]]:
+        resultats = []
+        for identifiant in self._en_attente:
+            position = self._positions.get(identifiant)
+            if position is None:
+                continue
+            corde = math.dist(point, position)
+            if corde <= corde_max:
+                resultats.append((corde, identifiant))
+        return resultats
+
+    def _resultats(self, candidats: List[Tuple[float, int]], limite: Optional[int]) -> List[Tuple[Any, float]]:
+        candidats.sort()
+        if limite is not None:
+            candidats = candidats[:limite]
+        return [(self._objets[identifiant], _km_depuis_corde(corde)) for corde, identifiant in candidats]
+
+    def rechercher_rayon(self, latitude: float, longitude: float, rayon_km: float, limite: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """Objets situés à moins de 'rayon_km', du plus proche au plus éloigné, avec leur distance en km."""
+        point = np.array(_vecteur_unitaire(latitude, longitude))
+        corde_max = _corde_depuis_km(rayon_km)
+        candidats = self._distances_en_attente(point, corde_max)
+        if self._arbre is not None:
+            indices = self._arbre.query_ball_point(point, corde_max)
+            if indices:
+                cordes = np.linalg.norm(self._arbre.data[indices] - point, axis=1)
+                for indice, corde in zip(indices, cordes.tolist()):
+                    identifiant = int(self._ids_arbre[indice])
+                    if identifiant not in self._en_attente:
+                        candidats.append((corde, identifiant))
+        return self._resultats(candidats, limite)
+
+    def rechercher_plus_proches(self, latitude: float, longitude: float, k: int, rayon_km: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """Les 'k' objets les plus proches (éventuellement bornés à 'rayon_km'), du plus proche au plus éloigné."""
+        if k <= 0:
+            return []
+        point = np.array(_vecteur_unitaire(latitude, longitude))
+        corde_max = _corde_depuis_km(rayon_km) if rayon_km is not None else 2.0
+        candidats = self._distances_en_attente(point, corde_max)
+        if self._arbre is not None:
+            # Les entrées périmées de l'arbre sont écartées : on en demande d'autant plus.
+            nb = min(k + len(self._en_attente), self._arbre.n)
+            cordes, indices = self._arbre.query(point, k=nb, distance_upper_bound=corde_max * (1 + 1e-12))
+            for corde, indice in zip(np.atleast_1d(cordes).tolist(), np.atleast_1d(indices).tolist()):
+                if indice >= self._arbre.n:
+                    break
+                identifiant = int(self._ids_arbre[indice])
+                if identifiant not in self._en_attente:
+                    candidats.append((corde, identifiant))
+        return self._resultats(candidats, k)
+
+    def _tableau_coordonnees(self) -> Tuple[List[int], np.ndarray, np.ndarray, np.ndarray]:
+        """IDs, latitudes, longitudes (radians) et cosinus des latitudes de toutes les positions."""
+        if self._tableau is None:
+            identifiants = list(self._coordonnees.keys())
+            radians = np.radians(np.array(list(self._coordonnees.values()), dtype=np.float64).reshape(-1, 2))
+            latitudes = np.ascontiguousarray(radians[:, 0])
+            longitudes = np.ascontiguousarray(radians[:, 1])
+            self._tableau = (identifiants, latitudes, longitudes, np.cos(latitudes))
+        return self._tableau
+
+    def rechercher_plus_proches_lot(
+        self, origines: Sequence[Tuple[float, float]], k: int, rayon_km: Optional[float] = None
+    ) -> List[List[Tuple[Any, float]]]:
+        """
+        Les 'k' objets les plus proches de chaque origine (latitude, longitude), éventuellement
+        bornés à 'rayon_km', du plus proche au plus éloigné. Les distances sont calculées par
+        blocs d'origines (TAILLE_BLOC_DISTANCES) puis seuls les k meilleurs sont triés.
+        """
+        if k <= 0 or not origines or not self._coordonnees:
+            return [[] for _ in origines]
+        identifiants, latitudes, longitudes, cos_latitudes = self._tableau_coordonnees()
+        nb_positions = len(identifiants)
+        k = min(k, nb_positions)
+        origines_rad = np.radians(np.asarray(origines, dtype=np.float64).reshape(-1, 2))
+        taille_bloc = max(1, TAILLE_BLOC_DISTANCES // nb_positions)
+
+        resultats: List[List[Tuple[Any, float]]] = []
+        for debut in range(0, len(origines_rad), taille_bloc):
+            bloc = origines_rad[debut:debut + taille_bloc]
+            distances = distances_haversine_km(bloc[:, 0], bloc[:, 1], latitudes, longitudes, cos_latitudes)
+            if k < nb_positions:
+                meilleurs = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                meilleurs = np.broadcast_to(np.arange(nb_positions), distances.shape)
+            distances_meilleurs = np.take_along_axis(distances, meilleurs, axis=1)
+            ordre = np.argsort(distances_meilleurs, axis=1, kind="stable")
+            meilleurs = np.take_along_axis(meilleurs, ordre, axis=1)
+            distances_meilleurs = np.take_along_axis(distances_meilleurs, ordre, axis=1)
+            for indices, distances_ligne in zip(meilleurs.tolist(), distances_meilleurs.tolist()):
+                ligne = []
+                for indice, distance in zip(indices, distances_ligne):
+                    if rayon_km is not None and distance > rayon_km:
+                        break
+                    ligne.append((self._objets[identifiants[indice]], distance))
+                resultats.append(ligne)
+        return resultats
+
+    def obtenir_statistiques(self) -> Dict[str, int]:
+        return {
+            "positions": len(self._positions),
+            "en_attente": len(self._en_attente),
+            "reconstructions": self.nb_reconstructions,
+        }
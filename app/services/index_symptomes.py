@@ -0,0 +1,146 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.base_de_donnees.modeles import MaladieEnDB, MaladieSymptomeLienEnDB, SymptomeEnDB
+from app.utilitaires.normalisation_symptomes import obtenir_normaliseur
+
+logger = logging.getLogger(__name__)
+
+
+def normaliser_terme(terme: str) -> str:
+    """
+    Clé d'index d'un nom ou mot-clé de symptôme : accents, pluriels et synonymes connus
+    sont ramenés à une même clé ("Fièvre", "fievres", "température élevée").
+    """
+    return obtenir_normaliseur().cle(terme)
+
+
+class IndexInverseSymptomes:
+    """
+    Index inversé symptôme normalisé -> IDs des maladies, tenu en mémoire.
+
+    Les symptômes d'une maladie sont l'union de ses 'symptomes_courants_mots_cles' et des
+    noms des symptômes qui lui sont liés dans maladie_symptome_liens. Pour chaque maladie,
+    l'index conserve ces termes avec leur poids (force_lien du lien, POIDS_PAR_DEFAUT pour
+    un mot-clé ou un lien sans force), ce qui permet de le mettre à jour par différence
+    lorsqu'une maladie, un lien ou le nom d'un symptôme change.
+    'version' est incrémentée à chaque modification (reconstruction des structures dérivées).
+    """
+    POIDS_PAR_DEFAUT = 1.0
+
+    def __init__(self):
+        self._reinitialiser()
+
+    def _reinitialiser(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._maladies: Dict[int, MaladieEnDB] = {}
+        self._termes_par_maladie: Dict[int, Dict[str, float]] = {}
+        self._symptomes_lies: Dict[int, Dict[int, Optional[float]]] = defaultdict(dict)  # maladie_id -> {symptome_id: force_lien}
+        self._maladies_liees: Dict[int, Set[int]] = defaultdict(set)  # symptome_id -> maladie_ids
+        self._noms_symptomes: Dict[int, str] = {}
+        self.version = 0
+
+    def construire(
+        self,
+        maladies: Iterable[MaladieEnDB],
+        symptomes: Iterable[SymptomeEnDB],
+        liens: Iterable[MaladieSymptomeLienEnDB]
+    ):
+        """(Re)construit entièrement l'index."""
+        self._reinitialiser()
+        for symptome in symptomes:
+            self._noms_symptomes[symptome.id] = normaliser_terme(symptome.nom_fr)
+        for lien in liens:
+            self._symptomes_lies[lien.maladie_id][lien.symptome_id] = lien.force_lien
+            self._maladies_liees[lien.symptome_id].add(lien.maladie_id)
+        for maladie in maladies:
+            self.indexer_maladie(maladie)
+        logger.info(
+            f"Index inversé des symptômes construit : {len(self._maladies)} maladies, {len(self._postings)} termes."
+        )
+
+    def _termes_de(self, maladie: MaladieEnDB) -> Dict[str, float]:
+        termes = {normaliser_terme(s): self.POIDS_PAR_DEFAUT for s in maladie.symptomes_courants_mots_cles if s and s.strip()}
+        for symptome_id, force_lien in self._symptomes_lies.get(maladie.id, {}).items():
+            nom = self._noms_symptomes.get(symptome_id)
+            if nom:
+                # Un lien explicite (avec sa force) prévaut sur le mot-clé de même nom
+                termes[nom] = force_lien if force_lien is not None else termes.get(nom, self.POIDS_PAR_DEFAUT)
+        return termes
+
+    def _reindexer(self, maladie_id: int):
+        maladie = self._maladies.get(maladie_id)
+        if maladie is None:
+            return
+        anciens = self._termes_par_maladie.get(maladie_id, {})
+        nouveaux = self._termes_de(maladie)
+        for terme in anciens.keys() - nouveaux.keys():
+            postings = self._postings.get(terme)
+            if postings is not None:
+                postings.discard(maladie_id)
+                if not postings:
+                    del self._postings[terme]
+        for terme in nouveaux.keys() - anciens.keys():
+            self._postings[terme].add(maladie_id)
+        self._termes_par_maladie[maladie_id] = nouveaux
+        self.version += 1
+
+    def indexer_maladie(self, maladie: MaladieEnDB):
+        """Ajoute une maladie à l'index ou met à jour ses termes."""
+        self._maladies[maladie.id] = maladie
+        self._reindexer(maladie.id)
+
+    def indexer_lien(self, maladie_id: int, symptome_id: int, nom_symptome: Optional[str] = None, force_lien: Optional[float] = None):
+        """Prend en compte un nouveau lien maladie-symptôme."""
+        if nom_symptome:
+            self._noms_symptomes[symptome_id] = normaliser_terme(nom_symptome)
+        self._symptomes_lies[maladie_id][symptome_id] = force_lien
+        self._maladies_liees[symptome_id].add(maladie_id)
+        self._reindexer(maladie_id)
+
+    def indexer_symptome(self, symptome: SymptomeEnDB):
+        """Prend en compte un symptôme nouveau ou renommé (réindexe les maladies qui y sont liées)."""
+        self._noms_symptomes[symptome.id] = normaliser_terme(symptome.nom_fr)
+        for maladie_id in self._maladies_liees.get(symptome.id, ()):
+            self._reindexer(maladie_id)
+
+    def rechercher(self, symptomes: Iterable[str]) -> List[Tuple[MaladieEnDB, List[str], int]]:
+        """
+        Retourne, pour chaque maladie partageant au moins un terme avec la requête :
+        (maladie, symptômes communs (noms normalisés), nombre total de termes de la maladie).
+        Le coût ne dépend que du nombre de termes de la requête et de la taille de leurs listes.
+        """
+        communs_par_maladie: Dict[int, List[str]] = defaultdict(list)
+        for terme, libelle in self.termes_requete(symptomes).items():
+            for maladie_id in self._postings.get(terme, ()):
+                communs_par_maladie[maladie_id].append(libelle)
+        return [
+            (self._maladies[maladie_id], communs, len(self._termes_par_maladie[maladie_id]))
+            for maladie_id, communs in communs_par_maladie.items()
+        ]
+
+    @staticmethod
+    def termes_requete(symptomes: Iterable[str]) -> Dict[str, str]:
+        """Clés d'index des symptômes d'une requête, associées à leur nom normalisé (sans doublon)."""
+        normaliseur = obtenir_normaliseur()
+        termes: Dict[str, str] = {}
+        for s in symptomes:
+            if s and s.strip():
+                termes.setdefault(normaliser_terme(s), normaliseur.normaliser(s))
+        return termes
+
+    def termes_de_maladie(self, maladie_id: int) -> Dict[str, float]:
+        """Termes indexés d'une maladie avec leur poids."""
+        return self._termes_par_maladie.get(maladie_id, {})
+
+    def exporter(self) -> Tuple[Dict[int, MaladieEnDB], Dict[int, Dict[str, float]]]:
+        """Maladies indexées et poids de leurs termes (construction de la matrice de scores)."""
+        return self._maladies, self._termes_par_maladie
+
+    def obtenir_statistiques(self) -> Dict[str, int]:
+        return {
+            "maladies": len(self._maladies),
+            "termes": len(self._postings),
+            "entrees": sum(len(p) for p in self._postings.values()),
+        }
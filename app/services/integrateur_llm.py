@@ -2,10 +2,14 @@
 import google.generativeai as genai
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncGenerator, Optional
 
 # Importer les paramètres de configuration pour la clé API
 from app.configuration.parametres import parametres
+from app.utilitaires.normalisation_symptomes import obtenir_normaliseur
+from app.services.cache_nlu import CacheNLU
+from app.services.classifieur_intentions import ClassifieurIntentionsLocal
+from app.services.passerelle_llm import BudgetReessais, Disjoncteur, PasserelleLLM
 
 # Configurer le logger pour ce module
 logger = logging.getLogger(__name__)
@@ -42,6 +46,12 @@ safety_settings = [
     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
 ]
 
+# Réponses de repli des échanges conversationnels (texte fixe, synthétisé à l'avance dans le cache audio)
+MESSAGE_REPLI_CLARIFICATION = "Pourriez-vous me donner plus de détails sur vos symptômes ?"
+MESSAGE_REPLI_INFORMATIF = "Je ne suis pas en mesure de fournir cette information pour le moment. Veuillez consulter un professionnel de la santé."
+MESSAGE_REPLI_CONVERSATIONNEL = "Bonjour ! Je suis là pour vous aider avec vos questions de santé. Comment puis-je vous assister ?"
+MESSAGES_REPLI = (MESSAGE_REPLI_CLARIFICATION, MESSAGE_REPLI_INFORMATIF, MESSAGE_REPLI_CONVERSATIONNEL)
+
 # Modèle Gemini pour la compréhension du langage naturel et l'extraction d'entités.
 model_nlu = genai.GenerativeModel(
     model_name="gemini-2.0-flash",
@@ -56,6 +66,63 @@ model_chat_and_reports = genai.GenerativeModel(
     safety_settings=safety_settings
 )
 
+
+def creer_passerelle_llm() -> PasserelleLLM:
+    """Passerelle des appels aux modèles Gemini, bornée selon les paramètres LLM_*."""
+    passerelle = PasserelleLLM(
+        taille_file_max=parametres.LLM_MAX_QUEUE,
+        nb_tentatives=parametres.LLM_MAX_ATTEMPTS,
+        delai_base_reessai_s=parametres.LLM_RETRY_BASE_DELAY_S,
+        delai_max_reessai_s=parametres.LLM_RETRY_MAX_DELAY_S,
+        budget_reessais=BudgetReessais(
+            ratio=parametres.LLM_RETRY_BUDGET_RATIO,
+            minimum_par_s=parametres.LLM_RETRY_BUDGET_MIN_PER_S,
+            plafond=parametres.LLM_RETRY_BUDGET_MAX_TOKENS
+        )
+    )
+    for nom, modele, limite, delai_s in (
+        ("model_nlu", model_nlu, parametres.LLM_NLU_MAX_CONCURRENCY, parametres.LLM_NLU_DEADLINE_S),
+        ("model_chat_and_reports", model_chat_and_reports, parametres.LLM_CHAT_MAX_CONCURRENCY, parametres.LLM_CHAT_DEADLINE_S),
+    ):
+        passerelle.ajouter_modele(nom, modele, limite, delai_s, Disjoncteur(
+            seuil_taux_erreur=parametres.LLM_BREAKER_ERROR_RATE,
+            nb_appels_min=parametres.LLM_BREAKER_MIN_CALLS,
+            fenetre_s=parametres.LLM_BREAKER_WINDOW_S,
+            duree_ouverture_s=parametres.LLM_BREAKER_OPEN_S
+        ))
+    return passerelle
+
+
+# Rôles des messages de l'historique de conversation -> rôles Gemini ('user' ou 'model')
+ROLES_MODELE = frozenset({"ai", "assistant", "model", "ia"})
+
+
+def convertir_historique(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convertit l'historique de session ({"role", "message"} ou {"role", "content"}) au format
+    'contents' de Gemini ; les messages consécutifs d'un même rôle sont regroupés.
+    """
+    contents: List[Dict[str, Any]] = []
+    for message in messages:
+        texte = message.get("message") or message.get("content") or ""
+        if not texte.strip():
+            continue
+        role = "model" if message.get("role") in ROLES_MODELE else "user"
+        if contents and contents[-1]["role"] == role:
+            contents[-1]["parts"].append(texte)
+        else:
+            contents.append({"role": role, "parts": [texte]})
+    return contents
+
+
+def _texte_fragment(fragment: Any) -> str:
+    """Texte d'un fragment de réponse en flux ; vide pour un fragment sans contenu (fin, filtrage)."""
+    try:
+        return fragment.text
+    except ValueError:
+        return ""
+
+
 class IntegrateurLLM:
     """
     Service d'intégration avec les Grands Modèles de Langage (LLM) comme Gemini.
@@ -63,15 +130,50 @@ class IntegrateurLLM:
     et de la génération de réponses conversationnelles et de rapports/résumés spécialisés.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache_nlu: Optional[CacheNLU] = None,
+        classifieur_local: Optional[ClassifieurIntentionsLocal] = None,
+        passerelle: Optional[PasserelleLLM] = None
+    ):
+        self.cache_nlu = cache_nlu
+        self.classifieur_local = classifieur_local
+        # Passerelle partagée (concurrence, délais, réessais, disjoncteur) ; une passerelle propre sinon (scripts)
+        self.passerelle = passerelle or creer_passerelle_llm()
         logger.info("Intégrateur LLM initialisé avec Gemini 2.0 Flash pour NLU, Chat et Rapports.")
 
+    def obtenir_statistiques_passerelle(self) -> Dict[str, Any]:
+        return self.passerelle.obtenir_statistiques()
+
+    def obtenir_statistiques_cache_nlu(self) -> Dict[str, Any]:
+        if self.cache_nlu is None:
+            return {"actif": False}
+        return {"actif": True, **self.cache_nlu.obtenir_statistiques()}
+
+    def obtenir_statistiques_classifieur_local(self) -> Dict[str, Any]:
+        if self.classifieur_local is None:
+            return {"actif": False}
+        return {"actif": True, **self.classifieur_local.obtenir_statistiques()}
+
     async def comprendre_intention_et_extraire_entites(self, texte_utilisateur: str) -> Dict[str, Any]:
         """
         Analyse le texte de l'utilisateur pour comprendre son intention principale
         et extraire toutes les entités médicales pertinentes.
         La réponse est structurée en JSON pour une analyse facile.
+        Les intentions évidentes sont classées localement, et les messages répétitifs
+        (salutations, remerciements...) servis par le cache NLU, sans appel au LLM.
         """
+        if self.classifieur_local is not None:
+            resultat_local = self.classifieur_local.classer(texte_utilisateur)
+            if resultat_local is not None:
+                return resultat_local
+
+        if self.cache_nlu is not None:
+            resultat_cache = self.cache_nlu.obtenir(texte_utilisateur)
+            if resultat_cache is not None:
+                logger.info(f"Analyse NLU servie par le cache: {json.dumps(resultat_cache, ensure_ascii=False)}")
+                return resultat_cache
+
         safe_texte_utilisateur = json.dumps(texte_utilisateur, ensure_ascii=False)
 
         prompt = f"""
@@ -118,7 +220,7 @@ class IntegrateurLLM:
 
         response_text = ""
         try:
-            response = await model_nlu.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_nlu", "comprendre_intention_et_extraire_entites", prompt)
             response_text = response.text.strip()
             
             # Amélioration de l'extraction JSON: recherche des délimiteurs { et }
@@ -143,7 +245,13 @@ class IntegrateurLLM:
                     raise ValueError("La réponse du LLM est vide ou ne contient pas de JSON valide.")
 
             resultat_parse = json.loads(clean_response_text)
+            # Ramener les symptômes extraits à leurs noms canoniques (accents, pluriels, synonymes)
+            if isinstance(resultat_parse.get("symptomes"), list):
+                resultat_parse["symptomes"] = obtenir_normaliseur().normaliser_liste(resultat_parse["symptomes"])
             logger.info(f"Analyse LLM (NLU) réussie: {json.dumps(resultat_parse, ensure_ascii=False)}")
+            if self.cache_nlu is not None:
+                # Les réponses de repli (erreurs ci-dessous) ne sont jamais mises en cache
+                self.cache_nlu.enregistrer(texte_utilisateur, resultat_parse)
             return resultat_parse
         except json.JSONDecodeError as e:
             logger.error(f"Erreur de décodage JSON de la réponse LLM (NLU): {e}. Réponse brute: {response_text}", exc_info=True)
@@ -175,11 +283,11 @@ class IntegrateurLLM:
         Question de clarification:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_clarification", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération de clarification par Gemini: {repr(e)}")
-            return "Pourriez-vous me donner plus de détails sur vos symptômes ?"
+            return MESSAGE_REPLI_CLARIFICATION
 
     async def generer_reponse_informative(self, requete_information: str, informations_base_de_connaissances: Optional[str] = None) -> str:
         """
@@ -198,11 +306,11 @@ class IntegrateurLLM:
         Réponse:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_reponse_informative", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération de réponse informative par Gemini: {repr(e)}")
-            return "Je ne suis pas en mesure de fournir cette information pour le moment. Veuillez consulter un professionnel de la santé."
+            return MESSAGE_REPLI_INFORMATIF
 
     async def generer_reponse_conversationnelle(self, intention: str, message_original: str, entites_extraites: Dict[str, Any]) -> str:
         """
@@ -233,11 +341,55 @@ class IntegrateurLLM:
         Réponse de l'IA:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt_base)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_reponse_conversationnelle", prompt_base)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération de réponse conversationnelle par Gemini: {repr(e)}")
-            return "Bonjour ! Je suis là pour vous aider avec vos questions de santé. Comment puis-je vous assister ?"
+            return MESSAGE_REPLI_CONVERSATIONNEL
+
+    # --- Réponse de chat (historique de session), complète ou en flux ---
+
+    async def generer_flux(
+        self,
+        contents: Any,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        methode: str = "generer_flux"
+    ) -> AsyncGenerator[str, None]:
+        """
+        Génère une réponse en flux (generate_content_async(stream=True)) et produit le texte au fil
+        de l'eau, fragment par fragment. 'contents' est un prompt ou un historique au format Gemini ;
+        'methode' nomme l'appel dans les métriques de la passerelle.
+        Les erreurs de l'API sont propagées : l'appelant choisit sa réponse de repli.
+        """
+        config = {}
+        if temperature is not None:
+            config["temperature"] = temperature
+        if max_tokens is not None:
+            config["max_output_tokens"] = max_tokens
+        flux = self.passerelle.generer_flux("model_chat_and_reports", methode, contents, generation_config=config or None)
+        try:
+            async for fragment in flux:
+                texte = _texte_fragment(fragment)
+                if texte:
+                    yield texte
+        finally:
+            # Flux abandonné par l'appelant : la place du modèle est rendue tout de suite
+            await flux.aclose()
+
+    async def generer_reponse_texte_flux(self, messages: List[Dict[str, Any]], temperature: float = 0.7, max_tokens: int = 500) -> AsyncGenerator[str, None]:
+        """Réponse de l'assistant à l'historique de conversation, produite en flux."""
+        flux = self.generer_flux(convertir_historique(messages), temperature=temperature, max_tokens=max_tokens, methode="generer_reponse_texte")
+        try:
+            async for texte in flux:
+                yield texte
+        finally:
+            await flux.aclose()
+
+    async def generer_reponse_texte(self, messages: List[Dict[str, Any]], temperature: float = 0.7, max_tokens: int = 500) -> str:
+        """Réponse complète de l'assistant à l'historique de conversation."""
+        fragments = [texte async for texte in self.generer_reponse_texte_flux(messages, temperature=temperature, max_tokens=max_tokens)]
+        return "".join(fragments).strip()
 
     # --- NOUVELLES MÉTHODES POUR LA TÉLÉMÉDECINE ---
 
@@ -260,7 +412,7 @@ class IntegrateurLLM:
         Résumé de l'état de santé:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_resume_sante", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du résumé de santé par Gemini: {repr(e)}")
@@ -285,7 +437,7 @@ class IntegrateurLLM:
         Planning de santé personnalisé:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_planning_sante", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du planning de santé par Gemini: {repr(e)}")
@@ -310,7 +462,7 @@ class IntegrateurLLM:
         Rapport Médical:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_rapport_medical", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du rapport médical par Gemini: {repr(e)}")
@@ -329,7 +481,7 @@ class IntegrateurLLM:
         Résumé:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_resume_concis", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du résumé concis par Gemini: {repr(e)}")
@@ -351,7 +503,7 @@ class IntegrateurLLM:
         Résumé de la téléconsultation:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_resume_teleconsultation", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du résumé de téléconsultation par Gemini: {repr(e)}")
@@ -376,7 +528,7 @@ class IntegrateurLLM:
         Rapport Statistique:
         """
         try:
-            response = await model_chat_and_reports.generate_content_async(prompt)
+            response = await self.passerelle.generer("model_chat_and_reports", "generer_rapport_statistique", prompt)
             return response.text.strip()
         except Exception as e:
             logger.error(f"Erreur lors de la génération du rapport statistique par Gemini: {repr(e)}")
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+
+logger = logging.getLogger(__name__)
+
+
+class JournalEvenementsDiffere:
+    """
+    Journal des événements système (audit) à écriture différée.
+
+    Les gestionnaires publient leurs événements dans une file bornée et reprennent la main
+    immédiatement ; une tâche de fond les écrit par lots (INSERT multi-lignes) dès que
+    'taille_lot' événements sont en attente ou que 'delai_flush_s' secondes se sont écoulées.
+
+    - Contre-pression : si la file est pleine, la publication attend au plus 'delai_attente_s'
+      secondes puis l'événement est déversé dans le fichier JSONL 'chemin_debordement'.
+    - Un lot dont l'écriture en base échoue est également déversé sur disque.
+    - Le fichier de débordement est rejoué au démarrage puis toutes les 'delai_rejeu_s' secondes
+      (retour de la base après une panne) ; la file est vidée à l'arrêt.
+    - Aucune erreur (sérialisation, base, disque) ne remonte à l'appelant ni n'arrête la tâche
+      d'écriture : un événement qui ne peut être ni écrit ni déversé est journalisé puis perdu.
+    """
+    def __init__(
+        self,
+        acces_donnees: AccesDonneesAsync,
+        taille_file: int,
+        taille_lot: int,
+        delai_flush_s: float,
+        delai_attente_s: float,
+        chemin_debordement: str,
+        delai_rejeu_s: float = 60.0
+    ):
+        self.acces_donnees = acces_donnees
+        self._file: asyncio.Queue = asyncio.Queue(maxsize=taille_file)
+        self._taille_lot = taille_lot
+        self._delai_flush_s = delai_flush_s
+        self._delai_attente_s = delai_attente_s
+        self._chemin_debordement = chemin_debordement
+        self._delai_rejeu_s = delai_rejeu_s
+        self._verrou_fichier = threading.Lock()
+        self._tache_flush: Optional[asyncio.Task] = None
+        self._arret_demande = False
+
+        self._total_publies = 0
+        self._total_ecrits = 0
+        self._total_lots = 0
+        self._total_deverses = 0
+        self._total_rejoues = 0
+        self._total_echecs_lots = 0
+        self._total_perdus = 0
+        self._cumul_duree_lot_ms = 0.0
+        logger.info(f"JournalEvenementsDiffere initialisé (file={taille_file}, lot={taille_lot}, flush={delai_flush_s}s).")
+
+    async def demarrer(self):
+        """Rejoue les événements déversés lors d'une exécution précédente puis lance la tâche d'écriture."""
+        await self._rejouer_debordement()
+        self._tache_flush = asyncio.create_task(self._boucle_flush())
+
+    async def publier(
+        self,
+        id_session: str,
+        role: str,
+        message: str,
+        type_message: str = 'evenement_systeme',
+        donnees_structurees: Optional[Dict[str, Any]] = None
+    ):
+        """Met un événement en file d'écriture. Ne lève pas d'exception : l'audit ne doit pas faire échouer la requête."""
+        try:
+            donnees_json = json.dumps(donnees_structurees) if donnees_structurees else None
+        except (TypeError, ValueError) as e:
+            logger.error(f"Données structurées non sérialisables pour l'événement '{type_message}' ({id_session}), ignorées : {e}")
+            donnees_json = None
+        evenement = {
+            "id_session": id_session,
+            "role": role,
+            "message": message,
+            "type_message": type_message,
+            "donnees_structurees": donnees_json,
+            "horodatage": datetime.now().replace(microsecond=0).isoformat(),
+        }
+        self._total_publies += 1
+        if self._arret_demande:
+            await self._deverser([evenement])
+            return
+        try:
+            self._file.put_nowait(evenement)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._file.put(evenement), timeout=self._delai_attente_s)
+            except asyncio.TimeoutError:
+                logger.warning("File du journal d'événements pleine, événement déversé sur disque.")
+                await self._deverser([evenement])
+
+    async def _boucle_flush(self):
+        """
+        Constitue des lots à partir de la file et les écrit, et rejoue périodiquement le fichier de
+        débordement ; à l'arrêt, vide la file avant de se terminer. Un lot en échec n'arrête pas la boucle.
+        """
+        prochain_rejeu = time.monotonic() + self._delai_rejeu_s
+        while not (self._arret_demande and self._file.empty()):
+            lot = []
+            echeance = time.monotonic() + self._delai_flush_s
+            while len(lot) < self._taille_lot:
+                if self._arret_demande and self._file.empty():
+                    break
+                restant = echeance - time.monotonic()
+                if restant <= 0:
+                    break
+                try:
+                    lot.append(await asyncio.wait_for(self._file.get(), timeout=restant))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                if lot:
+                    await self._ecrire_lot(lot)
+                if not self._arret_demande and time.monotonic() >= prochain_rejeu:
+                    prochain_rejeu = time.monotonic() + self._delai_rejeu_s
+                    await self._rejouer_debordement()
+            except Exception as e:
+                logger.error(f"Erreur inattendue de la tâche d'écriture du journal d'événements : {e}", exc_info=True)
+
+    def _vider_file(self) -> List[Dict[str, Any]]:
+        evenements = []
+        while not self._file.empty():
+            evenements.append(self._file.get_nowait())
+        return evenements
+
+    async def _ecrire_lot(self, lot: List[Dict[str, Any]]):
+        debut = time.perf_counter()
+        try:
+            await self.acces_donnees.executer_transaction(crud.ajouter_logs_conversation_en_lot, lot)
+            self._total_ecrits += len(lot)
+            self._total_lots += 1
+            self._cumul_duree_lot_ms += (time.perf_counter() - debut) * 1000
+        except Exception as e:
+            self._total_echecs_lots += 1
+            logger.error(f"Écriture d'un lot de {len(lot)} événements impossible, déversement sur disque : {e}")
+            await self._deverser(lot)
+
+    async def _deverser(self, evenements: List[Dict[str, Any]]):
+        """Ajoute les événements au fichier de débordement (une ligne JSON par événement) ; ne lève pas d'exception."""
+        try:
+            await asyncio.to_thread(self._ecrire_fichier_debordement, evenements)
+        except Exception as e:
+            self._total_perdus += len(evenements)
+            logger.error(f"Déversement de {len(evenements)} événements dans {self._chemin_debordement} impossible, événements perdus : {e}")
+            return
+        self._total_deverses += len(evenements)
+
+    def _ecrire_fichier_debordement(self, evenements: List[Dict[str, Any]]):
+        with self._verrou_fichier:
+            repertoire = os.path.dirname(self._chemin_debordement)
+            if repertoire:
+                os.makedirs(repertoire, exist_ok=True)
+            with open(self._chemin_debordement, "a", encoding="utf-8") as fichier:
+                for evenement in evenements:
+                    fichier.write(json.dumps(evenement, ensure_ascii=False) + "\n")
+                fichier.flush()
+                os.fsync(fichier.fileno())
+
+    def _lire_et_retirer_fichier_debordement(self) -> List[Dict[str, Any]]:
+        with self._verrou_fichier:
+            if not os.path.exists(self._chemin_debordement):
+                return []
+            evenements = []
+            with open(self._chemin_debordement, "r", encoding="utf-8") as fichier:
+                for numero, ligne in enumerate(fichier, start=1):
+                    ligne = ligne.strip()
+                    if not ligne:
+                        continue
+                    try:
+                        evenements.append(json.loads(ligne))
+                    except json.JSONDecodeError:
+                        logger.warning(f"Ligne {numero} illisible dans {self._chemin_debordement}, ignorée.")
+            os.remove(self._chemin_debordement)
+            return evenements
+
+    async def _rejouer_debordement(self):
+        """Écrit en base les événements du fichier de débordement ; un lot de nouveau en échec y retourne."""
+        try:
+            evenements = await asyncio.to_thread(self._lire_et_retirer_fichier_debordement)
+        except OSError as e:
+            logger.error(f"Lecture du fichier de débordement {self._chemin_debordement} impossible : {e}")
+            return
+        if not evenements:
+            return
+        logger.info(f"Rejeu de {len(evenements)} événements déversés sur disque.")
+        for i in range(0, len(evenements), self._taille_lot):
+            lot = evenements[i:i + self._taille_lot]
+            ecrits_avant = self._total_ecrits
+            await self._ecrire_lot(lot)
+            if self._total_ecrits > ecrits_avant:
+                self._total_rejoues += len(lot)
+
+    async def arreter(self):
+        """Attend que la tâche d'écriture ait vidé la file, puis écrit ce qui resterait (ou le déverse sur disque)."""
+        self._arret_demande = True
+        if self._tache_flush is not None:
+            await self._tache_flush
+            self._tache_flush = None
+        restants = self._vider_file()
+        for i in range(0, len(restants), self._taille_lot):
+            await self._ecrire_lot(restants[i:i + self._taille_lot])
+        logger.info(f"JournalEvenementsDiffere arrêté ({self._total_ecrits} événements écrits, {self._total_deverses} déversés).")
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        """Retourne la profondeur de file et les compteurs d'écriture du journal."""
+        return {
+            "en_file": self._file.qsize(),
+            "capacite_file": self._file.maxsize,
+            "total_publies": self._total_publies,
+            "total_ecrits": self._total_ecrits,
+            "total_lots": self._total_lots,
+            "total_echecs_lots": self._total_echecs_lots,
+            "total_deverses": self._total_deverses,
+            "total_rejoues": self._total_rejoues,
+            "total_perdus": self._total_perdus,
+            "duree_moyenne_lot_ms": round(self._cumul_duree_lot_ms / self._total_lots, 3) if self._total_lots else 0.0,
+        }
@@ -1,7 +1,8 @@
+import asyncio
 import logging
 import os
-import uuid
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Dict, Any, AsyncGenerator, Deque, List, Optional, Tuple
 from fastapi import HTTPException, status, UploadFile
 
 # Importation des services nécessaires
@@ -9,6 +10,9 @@ from app.services.integrateur_llm import IntegrateurLLM
 from app.services.gestionnaire_connaissances import GestionnaireConnaissances
 from app.services.gestionnaire_contexte import GestionnaireContexte
 from app.services.gestionnaire_vocal import GestionnaireVocal
+from app.services.passerelle_llm import PasserelleLLMIndisponibleError
+from app.configuration.parametres import parametres
+from app.utilitaires.decoupage_phrases import DecoupeurPhrases
 
 logger = logging.getLogger(__name__)
 
@@ -21,39 +25,34 @@ class MoteurDiagnostic:
         self.gestionnaire_vocal = gestionnaire_vocal
         logger.info("MoteurDiagnostic initialisé.")
 
-    async def traiter_demande_utilisateur(
+    async def _preparer_message_utilisateur(
         self,
         id_session: str,
-        message_utilisateur: Optional[str] = None,
-        audio_file_upload: Optional[UploadFile] = None, # Accepte l'objet UploadFile directement
-    ) -> Dict[str, Any]:
+        message_utilisateur: Optional[str],
+        audio_file_upload: Optional[UploadFile],
+        audio_octets: Optional[bytes],
+        format_audio: Optional[str],
+    ) -> Tuple[str, Optional[str]]:
         """
-        Traite la demande de l'utilisateur, qu'elle soit textuelle ou audio.
-        Gère la transcription, l'appel LLM, la synthèse vocale et le logging.
+        Retourne le message final de l'utilisateur et la transcription de son audio (None sans audio).
+        L'audio (upload ou octets) est décodé en mémoire, sans fichier temporaire.
         """
-        
-        chemin_audio_utilisateur = None
         transcription_utilisateur = None
         
         if audio_file_upload:
             logger.info(f"[{id_session}] Fichier audio reçu. Lecture des bytes...")
-            audio_bytes = await audio_file_upload.read()
+            audio_octets = await audio_file_upload.read()
             
-            if not audio_bytes:
+            if not audio_octets:
                 logger.error(f"[{id_session}] Le fichier audio fourni est vide après lecture.")
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Le fichier audio fourni est vide.")
-            
-            # Sauvegarder dans un fichier temporaire pour la transcription
-            temp_audio_filename = f"user_audio_{id_session}_{uuid.uuid4().hex}.webm"
-            chemin_audio_utilisateur = os.path.join("uploads", temp_audio_filename)
-            
-            try:
-                with open(chemin_audio_utilisateur, "wb") as f:
-                    f.write(audio_bytes)
-                logger.debug(f"[{id_session}] Fichier audio utilisateur temporaire sauvegardé: {chemin_audio_utilisateur}")
+            extension = os.path.splitext(audio_file_upload.filename or "")[1].lstrip(".").lower()
+            format_audio = extension or format_audio
 
+        if audio_octets:
+            try:
                 # Transcrire l'audio
-                transcription_result = await self.gestionnaire_vocal.transcrire_audio_en_texte(chemin_audio_utilisateur)
+                transcription_result = await self.gestionnaire_vocal.transcrire_audio_octets(audio_octets, format_audio)
                 
                 # NOUVEAU LOG POUR DIAGNOSTIC
                 logger.debug(f"[{id_session}] Résultat brut de la transcription: '{transcription_result}' (Type: {type(transcription_result)})")
@@ -63,18 +62,12 @@ class MoteurDiagnostic:
                     logger.info(f"[{id_session}] Transcription audio réussie: '{transcription_utilisateur}'")
                 else:
                     transcription_utilisateur = "" # Assurer que c'est une chaîne vide si la transcription échoue
-                    logger.warning(f"[{id_session}] La transcription audio n'a produit aucun texte pour : {chemin_audio_utilisateur}")
+                    logger.warning(f"[{id_session}] La transcription audio n'a produit aucun texte ({len(audio_octets)} octets).")
                     # Ne pas lever d'erreur ici, laisser la vérification finale gérer le cas où tout est vide.
 
             except Exception as e:
                 logger.error(f"[{id_session}] Erreur lors de la transcription audio: {e}", exc_info=True)
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur lors de la transcription audio.")
-            finally:
-                # Nettoyer le fichier audio temporaire après transcription
-                if os.path.exists(chemin_audio_utilisateur):
-                    os.remove(chemin_audio_utilisateur)
-                    logger.debug(f"[{id_session}] Fichier audio utilisateur temporaire supprimé après transcription: {chemin_audio_utilisateur}")
-                    chemin_audio_utilisateur = None # Réinitialiser pour éviter de le passer par erreur plus tard
 
         # Déterminer le message final de l'utilisateur à envoyer au LLM
         # Si message_utilisateur est fourni, il a priorité. Sinon, utiliser la transcription.
@@ -86,57 +79,185 @@ class MoteurDiagnostic:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Aucun message utilisateur ou enregistrement vocal fourni. Veuillez fournir du texte ou un enregistrement vocal.")
         
         logger.debug(f"[{id_session}] Message utilisateur final pour traitement: '{final_user_message}'")
+        return final_user_message, transcription_utilisateur
+
+    async def _synthetiser_phrase(self, id_session: str, phrase: str, limite: asyncio.Semaphore) -> Optional[str]:
+        async with limite:
+            try:
+                return await self.gestionnaire_vocal.generer_audio_depuis_texte(phrase) or None
+            except Exception as e:
+                logger.error(f"[{id_session}] Erreur de synthèse vocale d'un segment: {e}", exc_info=True)
+                return None
+
+    async def _generer_reponse_en_flux(
+        self,
+        id_session: str,
+        messages_pour_llm: List[Dict[str, Any]],
+        fragments: List[str],
+        audio_par_phrase: bool,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Produit les fragments de la réponse du LLM (AI_PARTIAL), ajoutés à 'fragments'. Avec 'audio_par_phrase',
+        chaque phrase complète part en synthèse vocale dès sa fin (TTS_PIPELINE_MAX_PARALLEL au plus en parallèle)
+        et les segments audio (AI_AUDIO_SEGMENT) sont produits dans l'ordre dès qu'ils sont prêts, sans attendre
+        la fin de la génération.
+        """
+        flux = self.integrateur_llm.generer_reponse_texte_flux(messages_pour_llm, temperature=0.7, max_tokens=500)
+        decoupeur = DecoupeurPhrases(parametres.TTS_PIPELINE_MIN_CHARS)
+        limite = asyncio.Semaphore(max(1, parametres.TTS_PIPELINE_MAX_PARALLEL))
+        segments: Deque[Tuple[str, asyncio.Future]] = deque()  # phrases en cours de synthèse, dans l'ordre
+        nb_segments = 0
+        prochain: Optional[asyncio.Future] = asyncio.ensure_future(flux.__anext__())
+        try:
+            while prochain is not None or segments:
+                attentes = {prochain} if prochain is not None else set()
+                if segments:
+                    attentes.add(segments[0][1])
+                await asyncio.wait(attentes, return_when=asyncio.FIRST_COMPLETED)
+
+                while segments and segments[0][1].done():
+                    phrase, synthese = segments.popleft()
+                    yield {"type": "AI_AUDIO_SEGMENT", "index": nb_segments, "texte": phrase, "chemin_audio": synthese.result()}
+                    nb_segments += 1
+
+                if prochain is None or not prochain.done():
+                    continue
+                try:
+                    delta = prochain.result()
+                except StopAsyncIteration:
+                    prochain = None
+                    phrases = [decoupeur.terminer()]
+                else:
+                    # Le fragment suivant est demandé avant de traiter celui-ci
+                    prochain = asyncio.ensure_future(flux.__anext__())
+                    fragments.append(delta)
+                    yield {"type": "AI_PARTIAL", "delta": delta}
+                    phrases = decoupeur.ajouter(delta)
+                if audio_par_phrase:
+                    for phrase in filter(None, phrases):
+                        segments.append((phrase, asyncio.ensure_future(self._synthetiser_phrase(id_session, phrase, limite))))
+        finally:
+            for _, synthese in segments:
+                synthese.cancel()
+            if prochain is not None:
+                prochain.cancel()
+                # Le flux ne peut être fermé qu'une fois sa lecture en cours terminée
+                await asyncio.gather(prochain, return_exceptions=True)
+            # Libère la place de la passerelle LLM et la requête HTTP sans attendre le ramasse-miettes
+            await flux.aclose()
 
-        # Log le message utilisateur
-        user_log_id = await self.gestionnaire_contexte.enregistrer_log_conversation(
+    async def traiter_demande_utilisateur_flux(
+        self,
+        id_session: str,
+        message_utilisateur: Optional[str] = None,
+        audio_file_upload: Optional[UploadFile] = None,
+        audio_octets: Optional[bytes] = None,
+        format_audio: Optional[str] = "webm",
+        audio_par_phrase: bool = False,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Traite la demande de l'utilisateur en produisant des événements au fil de l'eau :
+          - {"type": "USER_TRANSCRIPTION", "transcription"} dès que l'audio est transcrit ;
+          - {"type": "AI_PARTIAL", "delta"} pour chaque fragment de texte généré par le LLM ;
+          - avec 'audio_par_phrase', {"type": "AI_AUDIO_SEGMENT", "index", "texte", "chemin_audio"}
+            pour chaque phrase synthétisée pendant la génération, dans l'ordre des phrases ;
+          - {"type": "AI_RESPONSE", "reponse_ia", "chemin_audio_reponse_ia", "transcription_utilisateur",
+            "ai_message_db_id"} à la fin, après la synthèse vocale de la réponse complète
+            (avec 'audio_par_phrase' : pas d'audio complet, mais la liste "segments_audio").
+        Les erreurs de validation et de transcription sont levées (HTTPException) avant le premier événement.
+        """
+        final_user_message, transcription_utilisateur = await self._preparer_message_utilisateur(
+            id_session, message_utilisateur, audio_file_upload, audio_octets, format_audio
+        )
+        if transcription_utilisateur:
+            yield {"type": "USER_TRANSCRIPTION", "transcription": transcription_utilisateur}
+
+        # Log le message utilisateur (il entre aussi dans la fenêtre de contexte de la session)
+        user_log = await self.gestionnaire_contexte.enregistrer_log_conversation(
             id_session=id_session,
             role="user",
-            contenu=final_user_message
+            message=final_user_message
         )
-        logger.debug(f"Message utilisateur loggé (ID: {user_log_id}) pour session {id_session}.")
+        logger.debug(f"Message utilisateur loggé (ID: {user_log.id}) pour session {id_session}.")
 
-        # Obtenir l'historique de conversation pour le contexte du LLM
-        historique_conversation = await self.gestionnaire_contexte.lire_logs_conversation_par_session(id_session)
-        # Formater l'historique pour le LLM (liste de {"role": ..., "content": ...})
-        messages_pour_llm = [{"role": log.role, "content": log.contenu} for log in historique_conversation]
+        # Historique de conversation (fenêtre bornée de la session) pour le contexte du LLM
+        messages_pour_llm = await self.gestionnaire_contexte.obtenir_contexte_pour_ia(id_session)
 
-        # Appeler le LLM
-        llm_response_text = ""
+        # Appeler le LLM en flux (et synthétiser la réponse phrase par phrase en mode pipeline)
+        fragments: List[str] = []
+        segments_audio: List[Optional[str]] = []
+        reponse_en_flux = self._generer_reponse_en_flux(id_session, messages_pour_llm, fragments, audio_par_phrase)
         try:
-            llm_response_text = await self.integrateur_llm.generer_reponse_texte(
-                messages_pour_llm,
-                temperature=0.7,
-                max_tokens=500
-            )
+            async for evenement in reponse_en_flux:
+                if evenement["type"] == "AI_AUDIO_SEGMENT":
+                    segments_audio.append(evenement["chemin_audio"])
+                yield evenement
+            llm_response_text = "".join(fragments).strip()
             logger.info(f"[{id_session}] Réponse LLM reçue: '{llm_response_text}'")
+        except PasserelleLLMIndisponibleError as e:
+            logger.warning(f"[{id_session}] LLM indisponible: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="L'assistant est momentanément surchargé. Veuillez réessayer dans quelques instants.")
+        except asyncio.TimeoutError:
+            logger.error(f"[{id_session}] Délai dépassé pour la génération de la réponse LLM.")
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="La génération de la réponse de l'IA a pris trop de temps.")
         except Exception as e:
             logger.error(f"[{id_session}] Erreur lors de la génération de la réponse LLM: {e}", exc_info=True)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur lors de la génération de la réponse de l'IA.")
+        finally:
+            # Consommateur arrêté en cours de route (client déconnecté) : synthèses et flux LLM annulés tout de suite
+            await reponse_en_flux.aclose()
 
-        # Synthétiser la réponse audio
+        # Synthétiser la réponse audio (déjà faite par segments en mode pipeline)
         chemin_audio_reponse_ia = None
-        try:
-            audio_filename = f"ai_response_{id_session}_{uuid.uuid4().hex}.mp3"
-            chemin_audio_reponse_ia = os.path.join("audio_reponses", audio_filename)
-            await self.gestionnaire_vocal.synthetiser_texte_en_audio(llm_response_text, chemin_audio_reponse_ia)
-            logger.info(f"[{id_session}] Réponse IA synthétisée en audio: {chemin_audio_reponse_ia}")
-        except Exception as e:
-            logger.error(f"[{id_session}] Erreur de synthèse vocale: {e}", exc_info=True)
-            # Ne pas lever d'exception ici si l'audio n'est pas critique, mais logguer.
-            # L'application peut toujours renvoyer la réponse texte.
-            chemin_audio_reponse_ia = None # Assurez-vous qu'il est None si la synthèse échoue.
+        if not audio_par_phrase:
+            try:
+                # Fichier du cache audio (réponses identiques synthétisées une seule fois) ;
+                # chaîne vide si la synthèse a échoué, a expiré ou a été refusée (file vocale pleine)
+                chemin_audio_reponse_ia = await self.gestionnaire_vocal.generer_audio_depuis_texte(llm_response_text) or None
+                logger.info(f"[{id_session}] Réponse IA synthétisée en audio: {chemin_audio_reponse_ia}")
+            except Exception as e:
+                logger.error(f"[{id_session}] Erreur de synthèse vocale: {e}", exc_info=True)
+                # Ne pas lever d'exception ici si l'audio n'est pas critique, mais logguer.
+                # L'application peut toujours renvoyer la réponse texte.
+                chemin_audio_reponse_ia = None # Assurez-vous qu'il est None si la synthèse échoue.
 
         # Log la réponse de l'IA
-        ai_log_id = await self.gestionnaire_contexte.enregistrer_log_conversation(
+        ai_log = await self.gestionnaire_contexte.enregistrer_log_conversation(
             id_session=id_session,
             role="ai",
-            contenu=llm_response_text
+            message=llm_response_text,
+            type_message="reponse_ia"
         )
-        logger.debug(f"Réponse IA loggée (ID: {ai_log_id}) pour session {id_session}.")
+        logger.debug(f"Réponse IA loggée (ID: {ai_log.id}) pour session {id_session}.")
 
-        return {
+        reponse = {
+            "type": "AI_RESPONSE",
             "reponse_ia": llm_response_text,
             "chemin_audio_reponse_ia": chemin_audio_reponse_ia,
             "transcription_utilisateur": transcription_utilisateur, # Inclure la transcription pour l'affichage frontend
-            "ai_message_db_id": ai_log_id # Passer l'ID DB pour le feedback
+            "ai_message_db_id": ai_log.id # Passer l'ID DB pour le feedback
         }
+        if audio_par_phrase:
+            reponse["segments_audio"] = segments_audio
+        yield reponse
+
+    async def traiter_demande_utilisateur(
+        self,
+        id_session: str,
+        message_utilisateur: Optional[str] = None,
+        audio_file_upload: Optional[UploadFile] = None, # Accepte l'objet UploadFile directement
+        audio_octets: Optional[bytes] = None, # Audio déjà en mémoire (tampon WebSocket)
+        format_audio: Optional[str] = "webm",
+    ) -> Dict[str, Any]:
+        """
+        Traite la demande de l'utilisateur, qu'elle soit textuelle ou audio.
+        Gère la transcription, l'appel LLM, la synthèse vocale et le logging.
+        Retourne la réponse complète (dernier événement de traiter_demande_utilisateur_flux).
+        """
+        reponse: Dict[str, Any] = {}
+        async for evenement in self.traiter_demande_utilisateur_flux(
+            id_session, message_utilisateur, audio_file_upload, audio_octets, format_audio
+        ):
+            if evenement["type"] == "AI_RESPONSE":
+                reponse = {cle: valeur for cle, valeur in evenement.items() if cle != "type"}
+        return reponse
@@ -0,0 +1,123 @@
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+JOURS_SEMAINE = ("lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche")
+
+# Horaires appliqués chaque jour lorsqu'un médecin n'a pas renseigné 'disponibilites_json'
+PLAGES_PAR_DEFAUT = ("09:00-17:00",)
+
+Intervalle = Tuple[datetime, datetime]
+Horaires = Dict[int, List[Tuple[time, time]]]  # jour de la semaine (0 = lundi) -> plages triées et disjointes
+
+_MOTIF_HEURE = re.compile(r"^(\d{1,2})(?:[:h](\d{2})?)?$")
+
+
+def _parser_heure(texte: str) -> time:
+    """'09:00', '9:00', '9h30' ou '9h' -> time ; ValueError si le format est invalide."""
+    correspondance = _MOTIF_HEURE.match(texte.strip().lower())
+    if correspondance is None:
+        raise ValueError(f"Heure invalide : '{texte}'")
+    return time(int(correspondance.group(1)), int(correspondance.group(2) or 0))
+
+
+def _parser_plage(plage: str) -> Optional[Tuple[time, time]]:
+    """'09:00-12:30' -> (09:00, 12:30) ; None si la plage est invalide ou vide."""
+    try:
+        ouverture, fermeture = (_parser_heure(h) for h in plage.split("-"))
+    except (ValueError, AttributeError):
+        return None
+    return (ouverture, fermeture) if ouverture < fermeture else None
+
+
+def _fusionner_plages(plages: Iterable[Tuple[time, time]]) -> List[Tuple[time, time]]:
+    fusionnees: List[Tuple[time, time]] = []
+    for ouverture, fermeture in sorted(plages):
+        if fusionnees and ouverture <= fusionnees[-1][1]:
+            fusionnees[-1] = (fusionnees[-1][0], max(fusionnees[-1][1], fermeture))
+        else:
+            fusionnees.append((ouverture, fermeture))
+    return fusionnees
+
+
+def parser_horaires(disponibilites: Optional[Dict[str, Union[str, List[str]]]]) -> Horaires:
+    """
+    Convertit 'disponibilites_json' ({"lundi": ["09:00-12:00", "14:00-17:00"], "samedi": "09:00-12:00"})
+    en plages horaires par jour de la semaine. Un jour absent est un jour non travaillé ;
+    sans horaires renseignés, PLAGES_PAR_DEFAUT s'applique tous les jours.
+    """
+    if not disponibilites:
+        plages = [p for p in map(_parser_plage, PLAGES_PAR_DEFAUT) if p]
+        return {jour: list(plages) for jour in range(7)}
+
+    horaires: Horaires = {}
+    for cle, valeur in disponibilites.items():
+        nom_jour = str(cle).strip().lower()
+        if nom_jour not in JOURS_SEMAINE:
+            logger.warning(f"Jour inconnu dans les disponibilités : '{cle}'.")
+            continue
+        plages = []
+        for plage in ([valeur] if isinstance(valeur, str) else valeur or []):
+            plage_valide = _parser_plage(plage)
+            if plage_valide is None:
+                logger.warning(f"Plage horaire invalide ignorée pour {nom_jour} : '{plage}'.")
+            else:
+                plages.append(plage_valide)
+        if plages:
+            horaires[JOURS_SEMAINE.index(nom_jour)] = _fusionner_plages(plages)
+    return horaires
+
+
+def fusionner_intervalles(intervalles: Iterable[Intervalle]) -> List[Intervalle]:
+    """Trie les intervalles occupés et fusionne ceux qui se chevauchent ou se touchent (O(n log n))."""
+    fusionnes: List[Intervalle] = []
+    for debut, fin in sorted(intervalles):
+        if fusionnes and debut <= fusionnes[-1][1]:
+            if fin > fusionnes[-1][1]:
+                fusionnes[-1] = (fusionnes[-1][0], fin)
+        else:
+            fusionnes.append((debut, fin))
+    return fusionnes
+
+
+def generer_creneaux(
+    horaires: Horaires,
+    occupes: List[Intervalle],
+    date_debut: date,
+    date_fin: date,
+    duree_min: int,
+    apres: Optional[datetime] = None
+) -> Iterator[Intervalle]:
+    """
+    Génère, dans l'ordre chronologique, les créneaux libres de 'duree_min' minutes entre
+    'date_debut' et 'date_fin' (incluses), dans les plages horaires et hors des intervalles
+    'occupes' (triés et disjoints, voir fusionner_intervalles). Dans chaque intervalle libre,
+    les créneaux se suivent à partir de son début. 'apres' exclut les créneaux commençant avant.
+
+    Les plages et les intervalles occupés étant triés, un seul parcours suffit : le coût est
+    linéaire en nombre de créneaux produits et d'intervalles occupés.
+    """
+    duree = timedelta(minutes=duree_min)
+    indice = 0
+    jour = date_debut
+    while jour <= date_fin:
+        for ouverture, fermeture in horaires.get(jour.weekday(), ()):
+            curseur = datetime.combine(jour, ouverture)
+            fin_plage = datetime.combine(jour, fermeture)
+            if apres is not None and curseur < apres:
+                curseur = apres
+            while indice < len(occupes) and occupes[indice][1] <= curseur:
+                indice += 1
+            suivant = indice
+            while curseur + duree <= fin_plage:
+                if suivant < len(occupes) and occupes[suivant][0] < curseur + duree:
+                    # Le créneau chevauche un intervalle occupé : reprise à la fin de celui-ci
+                    curseur = max(curseur, occupes[suivant][1])
+                    suivant += 1
+                    continue
+                yield curseur, curseur + duree
+                curseur += duree
+        jour += timedelta(days=1)
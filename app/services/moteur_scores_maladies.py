@@ -0,0 +1,159 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.base_de_donnees.modeles import MaladieEnDB
+
+logger = logging.getLogger(__name__)
+
+MODES_SCORE = ("pondere", "tfidf", "bayesien")
+
+# Probabilité a priori relative selon la colonne 'prevalence' des maladies
+PRIORS_PREVALENCE = {
+    "tres commun": 4.0,
+    "commun": 2.0,
+    "peu commun": 1.0,
+    "rare": 0.5,
+    "tres rare": 0.25,
+}
+PRIOR_PREVALENCE_INCONNUE = 1.0
+# Majoration du prior par niveau de gravité (1 à 5) : à vraisemblance égale, la maladie
+# la plus grave est proposée en premier (principe de précaution du triage).
+MAJORATION_GRAVITE = 0.15
+# Lissage additif des vraisemblances du mode bayésien
+ALPHA_LISSAGE = 0.1
+
+
+def _cle_prevalence(prevalence: Optional[str]) -> str:
+    return (prevalence or "").strip().lower().replace("è", "e").replace("é", "e")
+
+
+class MoteurScoresMaladies:
+    """
+    Score les maladies pour une liste de symptômes à l'aide d'une matrice creuse
+    maladies x termes (CSR) dont les valeurs sont les poids des liens (force_lien).
+    Un score se calcule en un produit matrice-vecteur, puis seuls les k meilleurs
+    candidats sont triés (argpartition).
+
+    Modes :
+    - 'pondere'  : part du poids total de la maladie couverte par la requête (0-100) ;
+    - 'tfidf'    : similarité cosinus entre la requête et la maladie, termes pondérés par
+                   leur rareté parmi les maladies (0-100) ;
+    - 'bayesien' : probabilité a posteriori (0-100) d'un modèle bayésien naïf dont le prior
+                   dépend de la prévalence et de la gravité de la maladie.
+    """
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._maladies: List[MaladieEnDB] = []
+        self._index_termes: Dict[str, int] = {}
+        self._matrice = sparse.csr_matrix((0, 0), dtype=np.float32)
+
+    def construire(self, maladies: Dict[int, MaladieEnDB], poids_termes: Dict[int, Dict[str, float]], version: Optional[int] = None):
+        """Construit la matrice et les structures dérivées de chaque mode à partir des poids de l'index."""
+        self._maladies = list(maladies.values())
+        self._index_termes = {}
+        lignes, colonnes, valeurs = [], [], []
+        for ligne, maladie in enumerate(self._maladies):
+            for terme, poids in poids_termes.get(maladie.id, {}).items():
+                colonne = self._index_termes.setdefault(terme, len(self._index_termes))
+                lignes.append(ligne)
+                colonnes.append(colonne)
+                valeurs.append(poids)
+        forme = (len(self._maladies), len(self._index_termes))
+        self._matrice = sparse.csr_matrix(
+            (np.asarray(valeurs, dtype=np.float32), (lignes, colonnes)), shape=forme
+        )
+        self._preparer_modes()
+        self.version = version
+        logger.info(f"Matrice de scores construite : {forme[0]} maladies x {forme[1]} termes, {self._matrice.nnz} liens.")
+
+    def _preparer_modes(self):
+        matrice = self._matrice
+        nb_maladies, nb_termes = matrice.shape
+        if nb_maladies == 0 or nb_termes == 0:
+            return
+
+        # Présence (0/1) de chaque terme, pour compter les symptômes communs
+        self._presence = matrice.copy()
+        self._presence.data = np.ones_like(self._presence.data)
+
+        # Pondéré : poids total de chaque maladie
+        self._sommes_lignes = np.asarray(matrice.sum(axis=1)).ravel()
+
+        # TF-IDF : idf lissé par terme, lignes normalisées (norme L2)
+        frequence_documents = np.bincount(matrice.indices, minlength=nb_termes).astype(np.float32)
+        self._idf = (np.log((1.0 + nb_maladies) / (1.0 + frequence_documents)) + 1.0).astype(np.float32)
+        tfidf = sparse.csr_matrix(matrice.multiply(self._idf.reshape(1, -1)))
+        normes = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        normes[normes == 0] = 1.0
+        self._tfidf = sparse.csr_matrix(sparse.diags(1.0 / normes) @ tfidf)
+
+        # Bayésien : log P(terme | maladie) = log((w + a) / (W + a.V)) ; le vecteur de la requête
+        # ajoute log(a / (W + a.V)) par terme demandé, corrigé là où la maladie possède le terme.
+        denominateurs = self._sommes_lignes + ALPHA_LISSAGE * max(nb_termes, 1)
+        self._log_base = np.log(ALPHA_LISSAGE / denominateurs)
+        gain = matrice.copy()
+        gain.data = np.log((gain.data + ALPHA_LISSAGE) / ALPHA_LISSAGE)
+        self._log_gain = gain
+        priors = np.array([
+            PRIORS_PREVALENCE.get(_cle_prevalence(m.prevalence), PRIOR_PREVALENCE_INCONNUE)
+            * (1.0 + MAJORATION_GRAVITE * ((m.gravite or 1) - 1))
+            for m in self._maladies
+        ], dtype=np.float64)
+        self._log_priors = np.log(priors / priors.sum()) if len(priors) else priors
+
+    def _vecteur_requete(self, termes: Iterable[str]) -> Tuple[np.ndarray, List[int]]:
+        colonnes = sorted({self._index_termes[t] for t in termes if t in self._index_termes})
+        vecteur = np.zeros(self._matrice.shape[1], dtype=np.float32)
+        vecteur[colonnes] = 1.0
+        return vecteur, colonnes
+
+    def scorer(self, termes: Iterable[str], mode: str = "pondere", top_k: Optional[int] = None) -> List[Tuple[MaladieEnDB, float]]:
+        """
+        Retourne les maladies partageant au moins un terme avec la requête, triées par score
+        décroissant (au plus 'top_k'), avec leur score sur 0-100.
+        """
+        if mode not in MODES_SCORE:
+            raise ValueError(f"Mode de score inconnu '{mode}'. Modes disponibles : {', '.join(MODES_SCORE)}.")
+        if not self._maladies:
+            return []
+        vecteur, colonnes = self._vecteur_requete(termes)
+        if not colonnes:
+            return []
+
+        nb_communs = self._presence @ vecteur
+        candidats = np.flatnonzero(nb_communs > 0)
+        if candidats.size == 0:
+            return []
+
+        if mode == "pondere":
+            sommes = self._sommes_lignes[candidats]
+            scores = np.divide(
+                (self._matrice @ vecteur)[candidats], sommes, out=np.zeros_like(sommes), where=sommes > 0
+            ) * 100.0
+        elif mode == "tfidf":
+            requete = vecteur * self._idf
+            scores = (self._tfidf @ requete)[candidats] / float(np.linalg.norm(requete)) * 100.0
+        else:
+            log_posterieurs = self._log_priors + len(colonnes) * self._log_base + self._log_gain @ vecteur
+            log_posterieurs -= log_posterieurs.max()
+            probabilites = np.exp(log_posterieurs)
+            scores = probabilites[candidats] / probabilites.sum() * 100.0
+
+        if top_k is not None and 0 < top_k < candidats.size:
+            meilleurs = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            meilleurs = np.arange(candidats.size)
+        meilleurs = meilleurs[np.argsort(-scores[meilleurs], kind="stable")]
+        return [(self._maladies[candidats[i]], float(scores[i])) for i in meilleurs]
+
+    def obtenir_statistiques(self) -> Dict[str, float]:
+        nb_maladies, nb_termes = self._matrice.shape
+        return {
+            "maladies": nb_maladies,
+            "termes": nb_termes,
+            "liens": int(self._matrice.nnz),
+            "densite": round(self._matrice.nnz / (nb_maladies * nb_termes), 6) if nb_maladies and nb_termes else 0.0,
+        }
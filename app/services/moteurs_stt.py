@@ -0,0 +1,177 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+
+import speech_recognition as sr
+
+logger = logging.getLogger(__name__)
+
+
+class FluxSTT(ABC):
+    """
+    Transcription incrémentale d'un énoncé : l'audio PCM 16 bits mono arrive chunk par chunk.
+    Non thread-safe : les appels d'un même flux doivent être sérialisés.
+    """
+    @abstractmethod
+    def accepter(self, pcm: bytes) -> Optional[str]:
+        """Ajoute un chunk ; retourne la transcription partielle de l'énoncé, ou None si le moteur n'en produit pas."""
+
+    @abstractmethod
+    def terminer(self) -> Optional[str]:
+        """Termine l'énoncé ; retourne le texte final ("" si rien n'a été compris, None en cas d'erreur)."""
+
+
+class MoteurSTT(ABC):
+    """
+    Interface des moteurs de reconnaissance vocale utilisés par GestionnaireVocal.
+
+    Toutes les méthodes sont bloquantes et sont appelées depuis l'ExecuteurVocal.
+    L'audio est toujours du PCM 16 bits mono ; 'frequence' est sa fréquence d'échantillonnage.
+    """
+    nom = ""
+    # Vrai si creer_flux produit des transcriptions partielles pendant l'énoncé
+    streaming = False
+
+    def charger(self):
+        """Chargement à chaud (modèle, connexions) au démarrage, pour que le premier énoncé ne le paie pas."""
+        pass
+
+    @abstractmethod
+    def transcrire(self, pcm: bytes, frequence: int, language_code: str) -> Optional[str]:
+        """Transcrit un énoncé complet ("" si rien n'a été compris, None en cas d'erreur)."""
+
+    def creer_flux(self, frequence: int, language_code: str) -> FluxSTT:
+        return FluxSTTAccumule(self, frequence, language_code)
+
+
+class FluxSTTAccumule(FluxSTT):
+    """Flux des moteurs sans reconnaissance incrémentale : l'énoncé est transcrit en une fois à la fin."""
+    def __init__(self, moteur: MoteurSTT, frequence: int, language_code: str):
+        self.moteur = moteur
+        self.frequence = frequence
+        self.language_code = language_code
+        self._chunks: List[bytes] = []
+
+    def accepter(self, pcm: bytes) -> Optional[str]:
+        self._chunks.append(pcm)
+        return None
+
+    def terminer(self) -> Optional[str]:
+        pcm = b"".join(self._chunks)
+        self._chunks = []
+        return self.moteur.transcrire(pcm, self.frequence, self.language_code)
+
+
+class MoteurSTTGoogle(MoteurSTT):
+    """Service Google Web Speech (gratuit) via SpeechRecognition : réseau et quotas à chaque énoncé."""
+    nom = "google"
+
+    def __init__(self, delai_s: Optional[float] = None, **_):
+        self.recognizer = sr.Recognizer()
+        # Délai des requêtes au service : le thread de l'ExecuteurVocal est libéré au plus tard avec la tâche
+        self.recognizer.operation_timeout = delai_s
+
+    def transcrire(self, pcm: bytes, frequence: int, language_code: str) -> Optional[str]:
+        audio_data = sr.AudioData(pcm, frequence, 2)
+        logger.debug(f"Audio data size for recognition: {len(audio_data.frame_data)} bytes")
+        try:
+            texte_transcrit = self.recognizer.recognize_google(audio_data, language=language_code)
+            logger.debug(f"Résultat brut de recognize_google: '{texte_transcrit}'")
+
+            if not texte_transcrit:
+                logger.warning("Aucun texte n'a pu être transcrit.")
+                return "" # Retourne une chaîne vide si aucun texte n'a été transcrit
+
+            logger.info(f"Transcription terminée. Texte: '{texte_transcrit}'")
+            return texte_transcrit
+        except sr.UnknownValueError:
+            logger.warning("SpeechRecognition n'a pas pu comprendre l'audio.")
+            return "" # Retourne une chaîne vide si la parole n'est pas comprise
+        except sr.RequestError as e:
+            logger.error(f"Impossible de demander des résultats à SpeechRecognition (service indisponible ou limite atteinte): {e}", exc_info=True)
+            return None # Retourne None en cas d'erreur de requête de service
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors de la transcription audio: {e}", exc_info=True)
+            return None # Retourne None en cas d'erreurs inattendues
+
+
+class FluxSTTVosk(FluxSTT):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._segments: List[str] = []
+
+    def _texte(self, *fin: str) -> str:
+        return " ".join(segment for segment in (*self._segments, *fin) if segment)
+
+    def accepter(self, pcm: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(pcm):
+            # Pause détectée par Kaldi : le segment est définitif
+            self._segments.append(json.loads(self.recognizer.Result()).get("text", ""))
+            return self._texte()
+        return self._texte(json.loads(self.recognizer.PartialResult()).get("partial", ""))
+
+    def terminer(self) -> Optional[str]:
+        return self._texte(json.loads(self.recognizer.FinalResult()).get("text", ""))
+
+
+class MoteurSTTVosk(MoteurSTT):
+    """
+    Reconnaissance hors ligne sur CPU avec Vosk (Kaldi), dépendance optionnelle : pip install vosk.
+    Le modèle (téléchargé depuis https://alphacephei.com/vosk/models) fixe la langue : 'language_code'
+    est ignoré. Le modèle est partagé entre threads ; chaque énoncé a son propre KaldiRecognizer,
+    qui libère le GIL pendant le décodage : le débit croît avec le nombre de workers vocaux.
+    """
+    nom = "vosk"
+    streaming = True
+
+    def __init__(self, chemin_modele: str, **_):
+        self.chemin_modele = chemin_modele
+        self._modele = None
+        self._kaldi_recognizer = None
+
+    def charger(self):
+        if self._modele is not None:
+            return
+        try:
+            from vosk import Model, KaldiRecognizer, SetLogLevel
+        except ImportError as e:
+            raise RuntimeError("Le moteur STT 'vosk' nécessite le paquet 'vosk' (pip install vosk).") from e
+        SetLogLevel(-1)
+        self._modele = Model(self.chemin_modele)
+        self._kaldi_recognizer = KaldiRecognizer
+        logger.info(f"Modèle Vosk chargé depuis {self.chemin_modele}.")
+
+    def _creer_recognizer(self, frequence: int):
+        self.charger()
+        return self._kaldi_recognizer(self._modele, frequence)
+
+    def transcrire(self, pcm: bytes, frequence: int, language_code: str) -> Optional[str]:
+        try:
+            recognizer = self._creer_recognizer(frequence)
+            recognizer.AcceptWaveform(pcm)
+            texte_transcrit = json.loads(recognizer.FinalResult()).get("text", "")
+        except Exception as e:
+            logger.error(f"Erreur lors de la transcription Vosk: {e}", exc_info=True)
+            return None
+        if not texte_transcrit:
+            logger.warning("Vosk n'a reconnu aucun mot dans l'audio.")
+        else:
+            logger.info(f"Transcription terminée. Texte: '{texte_transcrit}'")
+        return texte_transcrit
+
+    def creer_flux(self, frequence: int, language_code: str) -> FluxSTT:
+        return FluxSTTVosk(self._creer_recognizer(frequence))
+
+
+MOTEURS_STT: Dict[str, Type[MoteurSTT]] = {
+    MoteurSTTGoogle.nom: MoteurSTTGoogle,
+    MoteurSTTVosk.nom: MoteurSTTVosk,
+}
+
+
+def creer_moteur_stt(nom: str, **options) -> MoteurSTT:
+    """Instancie le moteur 'nom' ; les options non utilisées par le moteur sont ignorées."""
+    if nom not in MOTEURS_STT:
+        raise ValueError(f"Moteur STT inconnu : '{nom}' (disponibles : {', '.join(MOTEURS_STT)}).")
+    return MOTEURS_STT[nom](**options)
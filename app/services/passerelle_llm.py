@@ -0,0 +1,363 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, List, Tuple
+
+from google.api_core import exceptions as erreurs_google
+
+logger = logging.getLogger(__name__)
+
+# Erreurs passagères de l'API (quota, surcharge, panne) : l'appel est réessayé et compte pour le disjoncteur.
+# Les autres erreurs (requête invalide, contenu bloqué...) sont propagées telles quelles.
+ERREURS_TRANSITOIRES: Tuple[type, ...] = (
+    erreurs_google.ResourceExhausted,
+    erreurs_google.TooManyRequests,
+    erreurs_google.ServiceUnavailable,
+    erreurs_google.InternalServerError,
+    erreurs_google.DeadlineExceeded,
+    ConnectionError,
+)
+
+# Nombre de latences conservées par méthode pour le calcul des percentiles
+TAILLE_ECHANTILLON_LATENCES = 1000
+
+
+class PasserelleLLMIndisponibleError(Exception):
+    """Levée sans appel au LLM : disjoncteur ouvert ou file d'attente du modèle pleine."""
+    pass
+
+
+class BudgetReessais:
+    """
+    Budget global de réessais (seau à jetons) : chaque premier appel dépose 'ratio' jeton,
+    chaque réessai en consomme un, et 'minimum_par_s' jetons sont ajoutés chaque seconde
+    pour les périodes de faible trafic. Borne les réessais à ~'ratio' des appels, si bien
+    qu'une panne du LLM ne multiplie pas la charge par le nombre de tentatives.
+    """
+    def __init__(self, ratio: float, minimum_par_s: float, plafond: float):
+        self.ratio = ratio
+        self.minimum_par_s = minimum_par_s
+        self.plafond = plafond
+        self._jetons = plafond
+        self._derniere_maj = time.monotonic()
+        self._reessais = 0
+        self._refus = 0
+
+    def _recharger(self):
+        maintenant = time.monotonic()
+        self._jetons = min(self.plafond, self._jetons + (maintenant - self._derniere_maj) * self.minimum_par_s)
+        self._derniere_maj = maintenant
+
+    def deposer(self):
+        self._recharger()
+        self._jetons = min(self.plafond, self._jetons + self.ratio)
+
+    def retirer(self) -> bool:
+        """Consomme un jeton pour un réessai ; False si le budget est épuisé."""
+        self._recharger()
+        if self._jetons < 1.0:
+            self._refus += 1
+            return False
+        self._jetons -= 1.0
+        self._reessais += 1
+        return True
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        self._recharger()
+        return {"jetons": round(self._jetons, 2), "plafond": self.plafond, "reessais": self._reessais, "reessais_refuses": self._refus}
+
+
+class Disjoncteur:
+    """
+    Disjoncteur sur le taux d'erreurs passagères d'un modèle :
+      - fermé : les appels passent ; il s'ouvre si, sur les 'fenetre_s' dernières secondes,
+        au moins 'nb_appels_min' appels ont eu lieu et la part d'échecs atteint 'seuil_taux_erreur' ;
+      - ouvert : les appels sont refusés pendant 'duree_ouverture_s' ;
+      - semi-ouvert : un seul appel d'essai passe ; son succès referme le disjoncteur, son échec le rouvre.
+    """
+    FERME = "ferme"
+    OUVERT = "ouvert"
+    SEMI_OUVERT = "semi_ouvert"
+
+    def __init__(self, seuil_taux_erreur: float, nb_appels_min: int, fenetre_s: float, duree_ouverture_s: float):
+        self.seuil_taux_erreur = seuil_taux_erreur
+        self.nb_appels_min = nb_appels_min
+        self.fenetre_s = fenetre_s
+        self.duree_ouverture_s = duree_ouverture_s
+        self.etat = self.FERME
+        self._resultats: Deque[Tuple[float, bool]] = deque()  # (instant, succès) des appels de la fenêtre
+        self._ouvert_jusqu_a = 0.0
+        self._essai_en_cours = False
+        self._nb_ouvertures = 0
+        self._nb_refus = 0
+
+    def autoriser(self) -> bool:
+        if self.etat == self.OUVERT:
+            if time.monotonic() < self._ouvert_jusqu_a:
+                self._nb_refus += 1
+                return False
+            self.etat = self.SEMI_OUVERT
+            self._essai_en_cours = False
+        if self.etat == self.SEMI_OUVERT:
+            if self._essai_en_cours:
+                self._nb_refus += 1
+                return False
+            self._essai_en_cours = True
+        return True
+
+    def _ouvrir(self):
+        self.etat = self.OUVERT
+        self._ouvert_jusqu_a = time.monotonic() + self.duree_ouverture_s
+        self._resultats.clear()
+        self._nb_ouvertures += 1
+
+    def enregistrer(self, succes: bool):
+        """Résultat d'un appel autorisé (succès = le service a répondu, même par une erreur de la requête)."""
+        if self.etat == self.OUVERT:
+            # Appel lancé avant l'ouverture
+            return
+        if self.etat == self.SEMI_OUVERT:
+            self._essai_en_cours = False
+            if succes:
+                self.etat = self.FERME
+                logger.info("Disjoncteur LLM refermé après un appel d'essai réussi.")
+            else:
+                self._ouvrir()
+            return
+        maintenant = time.monotonic()
+        self._resultats.append((maintenant, succes))
+        while self._resultats and self._resultats[0][0] < maintenant - self.fenetre_s:
+            self._resultats.popleft()
+        nb_echecs = sum(not resultat for _, resultat in self._resultats)
+        if len(self._resultats) >= self.nb_appels_min and nb_echecs / len(self._resultats) >= self.seuil_taux_erreur:
+            logger.error(f"Disjoncteur LLM ouvert pour {self.duree_ouverture_s} s ({nb_echecs}/{len(self._resultats)} échecs sur {self.fenetre_s} s).")
+            self._ouvrir()
+
+    def abandonner(self):
+        """Appel autorisé puis annulé avant son résultat : libère l'appel d'essai éventuel."""
+        if self.etat == self.SEMI_OUVERT:
+            self._essai_en_cours = False
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        nb = len(self._resultats)
+        return {
+            "etat": self.etat,
+            "taux_erreur_fenetre": round(sum(not resultat for _, resultat in self._resultats) / nb, 4) if nb else 0.0,
+            "appels_fenetre": nb,
+            "ouvertures": self._nb_ouvertures,
+            "refus": self._nb_refus,
+        }
+
+
+class _VoieModele:
+    """Modèle Gemini et ses bornes : concurrence, file d'attente, délai, disjoncteur."""
+    def __init__(self, modele: Any, limite_concurrence: int, delai_s: float, disjoncteur: Disjoncteur):
+        self.modele = modele
+        self.limite_concurrence = limite_concurrence
+        self.delai_s = delai_s
+        self.disjoncteur = disjoncteur
+        self.semaphore = asyncio.Semaphore(limite_concurrence)
+        self.en_attente = 0
+        self.en_attente_max = 0
+        self.en_cours = 0
+        self.refus_file = 0
+
+
+def _percentile(valeurs_triees: List[float], p: float) -> float:
+    return valeurs_triees[min(len(valeurs_triees) - 1, int(len(valeurs_triees) * p))]
+
+
+class PasserelleLLM:
+    """
+    Point de passage unique des appels generate_content_async de IntegrateurLLM, par modèle :
+      - au plus 'limite_concurrence' appels en cours, au plus 'taille_file_max' appels en attente
+        (au-delà, PasserelleLLMIndisponibleError, sans attendre) ;
+      - un délai total par appel (attente d'une place et réessais compris), asyncio.TimeoutError au-delà ;
+      - réessai des erreurs passagères (ERREURS_TRANSITOIRES) avec un délai exponentiel aléatoire
+        (« full jitter »), dans la limite de 'nb_tentatives' et du budget global de réessais ;
+      - un disjoncteur par modèle, ouvert sur le taux d'erreurs passagères.
+    Les métriques exposent la profondeur de file par modèle et les percentiles de latence par méthode.
+    La passerelle est propre à la boucle d'événements de l'application (non thread-safe).
+    """
+    def __init__(self, taille_file_max: int, nb_tentatives: int, delai_base_reessai_s: float, delai_max_reessai_s: float, budget_reessais: BudgetReessais):
+        self.taille_file_max = taille_file_max
+        self.nb_tentatives = max(1, nb_tentatives)
+        self.delai_base_reessai_s = delai_base_reessai_s
+        self.delai_max_reessai_s = delai_max_reessai_s
+        self.budget_reessais = budget_reessais
+        self._voies: Dict[str, _VoieModele] = {}
+        self._par_methode: Dict[str, Dict[str, Any]] = {}
+
+    def ajouter_modele(self, nom: str, modele: Any, limite_concurrence: int, delai_s: float, disjoncteur: Disjoncteur):
+        self._voies[nom] = _VoieModele(modele, max(1, limite_concurrence), delai_s, disjoncteur)
+        logger.info(f"PasserelleLLM : modèle '{nom}' ({limite_concurrence} appels simultanés, délai {delai_s} s).")
+
+    def _compteurs(self, methode: str) -> Dict[str, Any]:
+        return self._par_methode.setdefault(methode, {
+            "appels": 0, "succes": 0, "erreurs": 0, "refus": 0, "expirations": 0, "reessais": 0,
+            "latences_ms": deque(maxlen=TAILLE_ECHANTILLON_LATENCES),
+        })
+
+    async def _entrer(self, voie: _VoieModele, methode: str):
+        """Attend une place de la voie (file bornée)."""
+        if voie.en_attente >= self.taille_file_max:
+            voie.refus_file += 1
+            self._compteurs(methode)["refus"] += 1
+            raise PasserelleLLMIndisponibleError(f"File d'attente du LLM pleine ({self.taille_file_max} appels en attente).")
+        voie.en_attente += 1
+        voie.en_attente_max = max(voie.en_attente_max, voie.en_attente)
+        try:
+            await voie.semaphore.acquire()
+        finally:
+            voie.en_attente -= 1
+        voie.en_cours += 1
+
+    def _sortir(self, voie: _VoieModele):
+        voie.en_cours -= 1
+        voie.semaphore.release()
+
+    async def _tentative(self, voie: _VoieModele, methode: str, contenu: Any, options: Dict[str, Any]) -> Any:
+        await self._entrer(voie, methode)
+        try:
+            return await voie.modele.generate_content_async(contenu, **options)
+        finally:
+            self._sortir(voie)
+
+    async def _appeler(self, nom_modele: str, methode: str, appel) -> Any:
+        """
+        Exécute la coroutine appel(voie) avec disjoncteur, réessais et délai total, et retourne son
+        résultat. La latence mesurée va du premier essai au résultat (premier fragment pour un flux).
+        """
+        voie = self._voies[nom_modele]
+        compteurs = self._compteurs(methode)
+        compteurs["appels"] += 1
+        self.budget_reessais.deposer()
+        debut = time.monotonic()
+        echeance = debut + voie.delai_s
+        tentative = 0
+        while True:
+            if not voie.disjoncteur.autoriser():
+                compteurs["refus"] += 1
+                raise PasserelleLLMIndisponibleError(f"Disjoncteur du modèle '{nom_modele}' ouvert.")
+            resultat_enregistre = False
+            try:
+                resultat = await asyncio.wait_for(appel(voie), timeout=max(0.0, echeance - time.monotonic()))
+                voie.disjoncteur.enregistrer(True)
+                resultat_enregistre = True
+                compteurs["succes"] += 1
+                compteurs["latences_ms"].append((time.monotonic() - debut) * 1000)
+                return resultat
+            except asyncio.TimeoutError:
+                voie.disjoncteur.enregistrer(False)
+                resultat_enregistre = True
+                compteurs["expirations"] += 1
+                logger.warning(f"Appel LLM '{methode}' ({nom_modele}) abandonné après {voie.delai_s} s.")
+                raise
+            except ERREURS_TRANSITOIRES as e:
+                voie.disjoncteur.enregistrer(False)
+                resultat_enregistre = True
+                tentative += 1
+                attente = random.uniform(0, min(self.delai_max_reessai_s, self.delai_base_reessai_s * 2 ** (tentative - 1)))
+                if (
+                    tentative >= self.nb_tentatives
+                    or time.monotonic() + attente >= echeance
+                    or not self.budget_reessais.retirer()
+                ):
+                    compteurs["erreurs"] += 1
+                    raise
+                compteurs["reessais"] += 1
+                logger.warning(f"Erreur passagère du LLM pour '{methode}' ({nom_modele}), réessai {tentative} dans {attente:.2f} s: {e!r}")
+                await asyncio.sleep(attente)
+            except PasserelleLLMIndisponibleError:
+                # File pleine : aucun appel n'a eu lieu
+                voie.disjoncteur.abandonner()
+                resultat_enregistre = True
+                raise
+            except Exception:
+                # Le service a répondu (requête invalide, contenu bloqué...) : pas un échec de disponibilité
+                voie.disjoncteur.enregistrer(True)
+                resultat_enregistre = True
+                compteurs["erreurs"] += 1
+                raise
+            finally:
+                if not resultat_enregistre:
+                    # Annulation de l'appelant
+                    voie.disjoncteur.abandonner()
+
+    async def generer(self, nom_modele: str, methode: str, contenu: Any, **options) -> Any:
+        """generate_content_async(contenu, **options) du modèle 'nom_modele' ; 'methode' sert aux métriques."""
+        async def appel(voie: _VoieModele) -> Any:
+            return await self._tentative(voie, methode, contenu, options)
+        return await self._appeler(nom_modele, methode, appel)
+
+    async def generer_flux(self, nom_modele: str, methode: str, contenu: Any, **options) -> AsyncGenerator[Any, None]:
+        """
+        Version en flux (stream=True) : produit les fragments de la réponse. La place du modèle
+        est tenue jusqu'à la fin du flux ; l'appel n'est réessayé qu'avant le premier fragment,
+        et le délai total du modèle s'applique au flux entier.
+        """
+        voie = self._voies[nom_modele]
+        echeance = time.monotonic() + voie.delai_s
+
+        async def ouvrir(voie: _VoieModele) -> Tuple[Any, Any]:
+            await self._entrer(voie, methode)
+            try:
+                reponse = await voie.modele.generate_content_async(contenu, stream=True, **options)
+                fragments = reponse.__aiter__()
+                return fragments, await fragments.__anext__()
+            except StopAsyncIteration:
+                return None, None
+            except BaseException:
+                self._sortir(voie)
+                raise
+
+        fragments, premier = await self._appeler(nom_modele, methode, ouvrir)
+        if fragments is None:
+            self._sortir(voie)
+            return
+        try:
+            yield premier
+            while True:
+                try:
+                    fragment = await asyncio.wait_for(fragments.__anext__(), timeout=max(0.0, echeance - time.monotonic()))
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    self._compteurs(methode)["expirations"] += 1
+                    logger.warning(f"Flux LLM '{methode}' ({nom_modele}) interrompu après {voie.delai_s} s.")
+                    raise
+                yield fragment
+        finally:
+            self._sortir(voie)
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        modeles = {
+            nom: {
+                "limite_concurrence": voie.limite_concurrence,
+                "en_cours": voie.en_cours,
+                "en_attente": voie.en_attente,
+                "en_attente_max": voie.en_attente_max,
+                "refus_file": voie.refus_file,
+                "delai_s": voie.delai_s,
+                "disjoncteur": voie.disjoncteur.obtenir_statistiques(),
+            }
+            for nom, voie in self._voies.items()
+        }
+        par_methode = {}
+        for methode, compteurs in self._par_methode.items():
+            latences = sorted(compteurs["latences_ms"])
+            par_methode[methode] = {
+                **{cle: valeur for cle, valeur in compteurs.items() if cle != "latences_ms"},
+                "latence_p50_ms": round(_percentile(latences, 0.50), 1) if latences else 0.0,
+                "latence_p95_ms": round(_percentile(latences, 0.95), 1) if latences else 0.0,
+                "latence_p99_ms": round(_percentile(latences, 0.99), 1) if latences else 0.0,
+            }
+        return {
+            "taille_file_max": self.taille_file_max,
+            "nb_tentatives": self.nb_tentatives,
+            "budget_reessais": self.budget_reessais.obtenir_statistiques(),
+            "modeles": modeles,
+            "par_methode": par_methode,
+        }
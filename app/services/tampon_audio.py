@@ -0,0 +1,59 @@
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class TamponAudio:
+    """
+    Tampon des chunks audio d'une session de téléassistance.
+
+    Les chunks sont conservés tels quels dans une liste et assemblés une seule fois, au
+    moment du traitement (coût linéaire, là où 'bytes += chunk' recopiait tout le tampon
+    à chaque chunk). Au-delà de 'taille_max_octets', les chunks suivants sont refusés :
+    un flux WebM/Ogg ne peut pas perdre son début (en-tête du conteneur), le tampon est
+    donc borné par troncature de la fin plutôt que circulaire.
+    """
+    def __init__(self, taille_max_octets: int):
+        self.taille_max_octets = taille_max_octets
+        self._chunks: List[bytes] = []
+        self._nb_octets = 0
+        self.nb_octets_max = 0  # Pic d'occupation depuis l'ouverture de la session
+        self.nb_chunks_recus = 0
+        self.nb_octets_recus = 0
+        self.nb_chunks_refuses = 0
+
+    def __len__(self) -> int:
+        return self._nb_octets
+
+    def __bool__(self) -> bool:
+        return self._nb_octets > 0
+
+    def ajouter(self, chunk: bytes) -> bool:
+        """Ajoute un chunk ; retourne False s'il est refusé parce que le tampon est plein."""
+        self.nb_chunks_recus += 1
+        self.nb_octets_recus += len(chunk)
+        if self._nb_octets + len(chunk) > self.taille_max_octets:
+            self.nb_chunks_refuses += 1
+            return False
+        self._chunks.append(chunk)
+        self._nb_octets += len(chunk)
+        self.nb_octets_max = max(self.nb_octets_max, self._nb_octets)
+        return True
+
+    def vider(self) -> bytes:
+        """Retourne l'audio accumulé (une seule copie) et réinitialise le tampon."""
+        audio = b"".join(self._chunks)
+        self._chunks = []
+        self._nb_octets = 0
+        return audio
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        return {
+            "octets_en_tampon": self._nb_octets,
+            "chunks_en_tampon": len(self._chunks),
+            "octets_max": self.nb_octets_max,
+            "chunks_recus": self.nb_chunks_recus,
+            "octets_recus": self.nb_octets_recus,
+            "chunks_refuses": self.nb_chunks_refuses,
+        }
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from app.base_de_donnees import acces_async
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+
+
+class ConnexionFactice:
+    ouvertes = 0
+
+    def __init__(self):
+        ConnexionFactice.ouvertes += 1
+
+    def close(self):
+        ConnexionFactice.ouvertes -= 1
+
+
+@pytest.fixture(autouse=True)
+def connexion_factice(monkeypatch):
+    monkeypatch.setattr(acces_async, "get_db_connection", ConnexionFactice)
+
+
+def lire(conn, valeur):
+    assert isinstance(conn, ConnexionFactice)
+    return valeur
+
+
+def echouer(conn):
+    raise ValueError("requête invalide")
+
+
+def test_requete_executee_avec_une_connexion_restituee():
+    async def scenario():
+        acces = AccesDonneesAsync(nb_workers=2)
+        resultats = await asyncio.gather(*(acces.executer_transaction(lire, valeur) for valeur in range(4)))
+        with pytest.raises(ValueError):
+            await acces.executer_transaction(echouer)
+        statistiques = acces.obtenir_statistiques()
+        acces.fermer()
+        return resultats, statistiques
+
+    resultats, statistiques = asyncio.run(scenario())
+    assert resultats == [0, 1, 2, 3]
+    assert ConnexionFactice.ouvertes == 0
+    assert statistiques["par_type"]["lire"]["termines"] == 4
+    assert statistiques["total_erreurs"] == 1
@@ -0,0 +1,42 @@
+import os
+
+from app.services.cache_audio_tts import CacheAudioTTS
+
+
+def ecrire(cache: CacheAudioTTS, cle: str, taille: int = 100):
+    with open(cache.chemin(cle), "wb") as fichier:
+        fichier.write(b"\0" * taille)
+    cache.enregistrer(cle)
+
+
+def test_eviction_lru_au_dela_de_la_taille_maximale(tmp_path):
+    cache = CacheAudioTTS(str(tmp_path), taille_max_octets=250)
+    for cle in ("a", "b"):
+        ecrire(cache, cle)
+    assert cache.obtenir("a") is not None  # "b" devient le moins récemment utilisé
+    ecrire(cache, "c")
+    assert cache.obtenir("b") is None
+    assert not os.path.exists(cache.chemin("b"))
+    assert os.path.exists(cache.chemin("a")) and os.path.exists(cache.chemin("c"))
+    assert cache.obtenir_statistiques()["evictions"] == 1
+
+
+def test_fichiers_remis_recemment_proteges_de_l_eviction(tmp_path):
+    cache = CacheAudioTTS(str(tmp_path), taille_max_octets=250, duree_protection_s=60)
+    for cle in ("segment_0", "segment_1", "segment_2"):
+        ecrire(cache, cle)
+    # Les trois segments d'une même réponse sont conservés malgré le dépassement
+    assert all(os.path.exists(cache.chemin(cle)) for cle in ("segment_0", "segment_1", "segment_2"))
+    statistiques = cache.obtenir_statistiques()
+    assert statistiques["octets"] == 300
+    assert statistiques["evictions"] == 0
+    assert statistiques["evictions_differees"] >= 1
+
+
+def test_fichiers_indexes_au_demarrage_evincables(tmp_path):
+    for nom in ("ancienne_reponse.mp3", "tts_x.mp3"):
+        (tmp_path / nom).write_bytes(b"\0" * 100)
+    (tmp_path / "tts_y.mp3.1234.part").write_bytes(b"\0")
+    cache = CacheAudioTTS(str(tmp_path), taille_max_octets=150, duree_protection_s=60)
+    assert not (tmp_path / "tts_y.mp3.1234.part").exists()
+    assert cache.obtenir_statistiques()["fichiers"] == 1
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.services.cache_nlu import CacheNLU, memes_mots, normaliser_texte_nlu, variante_orthographique
+
+REMERCIEMENT = {"intention": "remerciement", "entites": {}}
+
+
+def cache_quasi_doublons(seuil: float = 0.85) -> CacheNLU:
+    return CacheNLU(capacite=10, ttl_s=60, intentions=["remerciement", "salutation"], seuil_similarite=seuil)
+
+
+def test_niveau_exact_ignore_casse_accents_et_ponctuation():
+    cache = CacheNLU(capacite=10, ttl_s=60, intentions=["remerciement"])
+    cache.enregistrer("Merci beaucoup, docteur !", REMERCIEMENT)
+    assert cache.obtenir("merci   beaucoup docteur") == REMERCIEMENT
+    assert cache.obtenir_statistiques()["succes_exacts"] == 1
+
+
+def test_intention_non_cachable_jamais_enregistree():
+    cache = CacheNLU(capacite=10, ttl_s=60, intentions=["remerciement"])
+    cache.enregistrer("j'ai de la fièvre", {"intention": "symptomes", "entites": {"symptomes": ["Fièvre"]}})
+    assert cache.obtenir("j'ai de la fièvre") is None
+    assert cache.obtenir_statistiques()["non_cachables"] == 1
+
+
+def test_symptome_ajoute_a_une_formule_de_politesse_n_est_pas_servi():
+    cache = cache_quasi_doublons()
+    cache.enregistrer("merci beaucoup pour vos conseils docteur, bonne journée", REMERCIEMENT)
+    assert cache.obtenir("merci beaucoup pour vos conseils docteur, j'ai mal, bonne journée") is None
+
+
+def test_negation_n_est_pas_servie_par_la_forme_positive():
+    cache = cache_quasi_doublons()
+    cache.enregistrer("je me sens vraiment en pleine forme aujourd'hui docteur, merci", REMERCIEMENT)
+    assert cache.obtenir("je ne me sens vraiment pas en pleine forme aujourd'hui docteur, merci") is None
+
+
+def test_faute_de_frappe_servie_par_le_niveau_quasi_doublon():
+    cache = cache_quasi_doublons()
+    cache.enregistrer("Bonjour docteur, comment allez-vous ?", {"intention": "salutation", "entites": {}})
+    assert cache.obtenir("bonjuor docteur comment allez vous")["intention"] == "salutation"
+    assert cache.obtenir_statistiques()["succes_proches"] == 1
+
+
+def test_variante_orthographique():
+    assert variante_orthographique("bonjour", "bonjuor")  # transposition
+    assert variante_orthographique("docteur", "docteurs")  # insertion
+    assert variante_orthographique("merci", "mercu")  # substitution
+    assert not variante_orthographique("pas", "par")  # mot trop court
+    assert not variante_orthographique("bonjour", "bonsoir")
+
+
+def test_memes_mots_ignore_ordre_et_repetitions():
+    assert memes_mots(normaliser_texte_nlu("merci merci docteur"), normaliser_texte_nlu("docteur, merci"))
+    assert not memes_mots(normaliser_texte_nlu("merci docteur"), normaliser_texte_nlu("merci docteur j'ai mal"))
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql.connector import Error
+
+from app.base_de_donnees import connexion as module_connexion
+from app.base_de_donnees.connexion import PoolConnexions, PoolEpuiseError
+
+
+class ConnexionMySQLFactice:
+    def __init__(self, **config):
+        self.fermee = False
+        self.nb_rollbacks = 0
+
+    def is_connected(self) -> bool:
+        return not self.fermee
+
+    def rollback(self):
+        self.nb_rollbacks += 1
+
+    def close(self):
+        self.fermee = True
+
+
+@pytest.fixture
+def pool(monkeypatch) -> PoolConnexions:
+    monkeypatch.setattr(module_connexion.mysql.connector, "connect", ConnexionMySQLFactice)
+    return PoolConnexions({}, taille=1, debordement_max=1, delai_attente_s=0.01, recyclage_s=0)
+
+
+def test_connexion_restituee_inutilisable(pool):
+    conn = pool.emprunter()
+    reelle = conn._connexion
+    conn.close()
+    conn.close()  # sans effet
+    with pytest.raises(Error):
+        conn.rollback()
+    with pytest.raises(Error):
+        conn.cursor()
+    assert reelle.nb_rollbacks == 1
+    assert pool.obtenir_statistiques()["inactives"] == 1
+
+
+def test_connexion_restituee_apres_fermeture_du_pool_est_fermee(pool):
+    inactive, empruntee = pool.emprunter(), pool.emprunter()
+    reelle_inactive, reelle_empruntee = inactive._connexion, empruntee._connexion
+    inactive.close()
+    pool.fermer()
+    assert reelle_inactive.fermee and not reelle_empruntee.fermee
+
+    empruntee.close()
+    assert reelle_empruntee.fermee
+    statistiques = pool.obtenir_statistiques()
+    assert statistiques["ouvertes"] == 0 and statistiques["inactives"] == 0
+    with pytest.raises(PoolEpuiseError):
+        pool.emprunter()
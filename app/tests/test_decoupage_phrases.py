@@ -0,0 +1,40 @@
+from app.utilitaires.decoupage_phrases import DecoupeurPhrases
+
+
+def decouper(fragments, longueur_min: int = 0) -> list:
+    decoupeur = DecoupeurPhrases(longueur_min)
+    phrases = [phrase for fragment in fragments for phrase in decoupeur.ajouter(fragment)]
+    reste = decoupeur.terminer()
+    return phrases + ([reste] if reste else [])
+
+
+def test_phrases_completes_des_leur_fin():
+    decoupeur = DecoupeurPhrases()
+    assert decoupeur.ajouter("Bonjour. Comment ") == ["Bonjour."]
+    assert decoupeur.ajouter("allez-vous ? Je ") == ["Comment allez-vous ?"]
+    assert decoupeur.terminer() == "Je"
+    assert decoupeur.terminer() is None
+
+
+def test_fin_de_phrase_a_cheval_sur_deux_fragments():
+    assert decouper(["Buvez de l'eau", ".", " Reposez-vous", "!", "\n", "Consultez"]) == [
+        "Buvez de l'eau.", "Reposez-vous!", "Consultez"
+    ]
+
+
+def test_abreviations_et_nombres_ne_coupent_pas():
+    assert decouper(["Le Dr. Kouassi vous recevra. Prenez 2.5 mg par jour. Fin"]) == [
+        "Le Dr. Kouassi vous recevra.", "Prenez 2.5 mg par jour.", "Fin"
+    ]
+
+
+def test_guillemets_et_points_de_suspension():
+    assert decouper(["Il a dit « reposez-vous. » Ensuite… on verra."]) == [
+        "Il a dit « reposez-vous. »", "Ensuite…", "on verra."
+    ]
+
+
+def test_phrases_courtes_regroupees_avec_la_suivante():
+    assert decouper(["Bonjour ! Oui. Je vais vous poser quelques questions. Merci."], longueur_min=20) == [
+        "Bonjour ! Oui. Je vais vous poser quelques questions.", "Merci."
+    ]
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.detecteur_activite_vocale import DetecteurActiviteVocale
+
+FREQUENCE = 16000
+
+
+def signal(duree_ms: int, niveau_db: float, graine: int = 0) -> bytes:
+    """Bruit blanc PCM 16 bits d'énergie 'niveau_db' dBFS."""
+    nb = FREQUENCE * duree_ms // 1000
+    echantillons = np.random.default_rng(graine).standard_normal(nb) * 32768.0 * 10 ** (niveau_db / 20)
+    return np.clip(echantillons, -32768, 32767).astype("<i2").tobytes()
+
+
+def chunks(pcm: bytes, duree_ms: int = 100):
+    taille = FREQUENCE * duree_ms // 1000 * 2
+    return [pcm[debut:debut + taille] for debut in range(0, len(pcm), taille)]
+
+
+def test_fin_d_enonce_sur_silence():
+    vad = DetecteurActiviteVocale(FREQUENCE)
+    fins = [vad.traiter(chunk) for chunk in chunks(signal(1000, -70) + signal(600, -15, 1) + signal(1000, -70, 2))]
+    assert fins.count(True) == 1
+
+
+def test_bruit_stationnaire_au_dessus_du_seuil_devient_le_bruit_de_fond():
+    vad = DetecteurActiviteVocale(FREQUENCE, seuil_db=-45)
+    bruit = signal(3000, -30)
+    for chunk in chunks(bruit):
+        vad.traiter(chunk)
+    assert not vad.parole_en_cours
+    assert vad.obtenir_statistiques()["bruit_fond_db"] == pytest.approx(-30, abs=1.5)
+
+    flux = signal(600, -5, 1) + signal(1000, -30, 2)
+    assert [vad.traiter(chunk) for chunk in chunks(flux)].count(True) == 1
@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import functools
+import time
+
+import pytest
+
+from app.utilitaires.executeur_borne import ExecuteurBorne, ExecuteurSatureError
+
+
+def attente(duree_s: float):
+    return functools.partial(time.sleep, duree_s)
+
+
+def test_appel_annule_en_file_libere_sa_place():
+    async def scenario():
+        executeur = ExecuteurBorne(nb_workers=1, prefixe_threads="test")
+        en_cours = asyncio.create_task(executeur.executer("a", attente(0.2)))
+        await asyncio.sleep(0.05)
+        en_file = asyncio.create_task(executeur.executer("a", attente(0.2)))
+        await asyncio.sleep(0.05)
+        assert executeur.obtenir_statistiques()["en_file"] == 1
+
+        en_file.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await en_file
+        await en_cours
+        statistiques = executeur.obtenir_statistiques()
+        executeur.fermer(attendre=True)
+        return statistiques
+
+    statistiques = asyncio.run(scenario())
+    assert statistiques["en_file"] == 0
+    assert statistiques["en_cours"] == 0
+    assert statistiques["total_termines"] == 1
+
+
+def test_delai_depasse_en_file_libere_sa_place():
+    async def scenario():
+        executeur = ExecuteurBorne(nb_workers=1, prefixe_threads="test")
+        premier = asyncio.create_task(executeur.executer("a", attente(0.3), delai_s=0.1))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(executeur.executer("a", attente(0.3), delai_s=0.1))
+        resultats = await asyncio.gather(premier, second, return_exceptions=True)
+        await asyncio.sleep(0.3)  # le thread termine l'appel bloquant du premier
+        statistiques = executeur.obtenir_statistiques()
+        executeur.fermer(attendre=False)
+        return resultats, statistiques
+
+    resultats, statistiques = asyncio.run(scenario())
+    assert all(isinstance(resultat, asyncio.TimeoutError) for resultat in resultats)
+    assert statistiques["en_file"] == 0
+    assert statistiques["par_type"]["a"]["expirations"] == 2
+    assert statistiques["par_type"]["a"]["termines"] == 1
+
+
+def test_file_pleine_refuse_sans_soumettre():
+    class SatureError(ExecuteurSatureError):
+        pass
+
+    async def scenario():
+        executeur = ExecuteurBorne(nb_workers=1, prefixe_threads="test", taille_file_max=1, erreur_saturation=SatureError)
+        taches = [asyncio.create_task(executeur.executer("a", attente(0.1))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(SatureError):
+            await executeur.executer("a", attente(0.1))
+        await asyncio.gather(*taches)
+        statistiques = executeur.obtenir_statistiques()
+        executeur.fermer(attendre=True)
+        return statistiques
+
+    statistiques = asyncio.run(scenario())
+    assert statistiques["par_type"]["a"]["refus"] == 1
+    assert statistiques["total_termines"] == 2
+
+
+def test_erreur_comptee_et_contexte_propage():
+    variable = contextvars.ContextVar("variable", default=None)
+
+    def echouer():
+        raise ValueError(variable.get())
+
+    async def scenario():
+        executeur = ExecuteurBorne(nb_workers=1, prefixe_threads="test")
+        variable.set("requête 42")
+        with pytest.raises(ValueError, match="requête 42"):
+            await executeur.executer("b", echouer)
+        statistiques = executeur.obtenir_statistiques()
+        executeur.fermer(attendre=True)
+        return statistiques
+
+    assert asyncio.run(scenario())["total_erreurs"] == 1
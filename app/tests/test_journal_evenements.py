@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from app.services.journal_evenements import JournalEvenementsDiffere
+
+
+class AccesDonneesFactice:
+    """Écrit les lots en mémoire ; échoue tant que 'en_panne' est vrai."""
+    def __init__(self):
+        self.en_panne = False
+        self.ecrits = []
+
+    async def executer_transaction(self, fonction, lot):
+        if self.en_panne:
+            raise ConnectionError("base indisponible")
+        self.ecrits.extend(lot)
+
+
+def journal(acces: AccesDonneesFactice, chemin_debordement: str, delai_rejeu_s: float = 60.0) -> JournalEvenementsDiffere:
+    return JournalEvenementsDiffere(
+        acces, taille_file=100, taille_lot=10, delai_flush_s=0.01, delai_attente_s=0.01,
+        chemin_debordement=chemin_debordement, delai_rejeu_s=delai_rejeu_s
+    )
+
+
+def test_donnees_non_serialisables_ne_font_pas_echouer_la_publication(tmp_path):
+    async def scenario():
+        acces = AccesDonneesFactice()
+        instance = journal(acces, str(tmp_path / "debordement.jsonl"))
+        await instance.demarrer()
+        await instance.publier("s1", "systeme", "connexion", donnees_structurees={"objet": object()})
+        await instance.arreter()
+        return acces.ecrits
+
+    ecrits = asyncio.run(scenario())
+    assert [(e["message"], e["donnees_structurees"]) for e in ecrits] == [("connexion", None)]
+
+
+def test_echec_du_deversement_n_arrete_pas_la_tache_d_ecriture(tmp_path):
+    # Le répertoire du fichier de débordement est un fichier : tout déversement échoue
+    (tmp_path / "pas_un_repertoire").write_text("")
+    chemin = str(tmp_path / "pas_un_repertoire" / "debordement.jsonl")
+
+    async def scenario():
+        acces = AccesDonneesFactice()
+        instance = journal(acces, chemin)
+        await instance.demarrer()
+        acces.en_panne = True
+        await instance.publier("s1", "systeme", "perdu")
+        await asyncio.sleep(0.05)
+        acces.en_panne = False
+        await instance.publier("s1", "systeme", "ecrit")
+        await asyncio.sleep(0.05)
+        tache_active = not instance._tache_flush.done()
+        await instance.arreter()
+        return acces.ecrits, instance.obtenir_statistiques(), tache_active
+
+    ecrits, statistiques, tache_active = asyncio.run(scenario())
+    assert tache_active
+    assert [e["message"] for e in ecrits] == ["ecrit"]
+    assert statistiques["total_perdus"] == 1
+
+
+def test_debordement_rejoue_periodiquement(tmp_path):
+    chemin = tmp_path / "debordement.jsonl"
+
+    async def scenario():
+        acces = AccesDonneesFactice()
+        instance = journal(acces, str(chemin), delai_rejeu_s=0.05)
+        await instance.demarrer()
+        acces.en_panne = True
+        await instance.publier("s1", "systeme", "pendant la panne")
+        await asyncio.sleep(0.03)
+        deverse = chemin.exists()
+        acces.en_panne = False
+        await asyncio.sleep(0.15)
+        await instance.arreter()
+        return deverse, acces.ecrits, instance.obtenir_statistiques()
+
+    deverse, ecrits, statistiques = asyncio.run(scenario())
+    assert deverse
+    assert [e["message"] for e in ecrits] == ["pendant la panne"]
+    assert statistiques["total_rejoues"] == 1
+    assert not chemin.exists()
@@ -0,0 +1,69 @@
+from datetime import date, datetime, time
+
+from app.services.moteur_disponibilites import fusionner_intervalles, generer_creneaux, parser_horaires
+
+LUNDI = date(2026, 10, 19)
+MARDI = date(2026, 10, 20)
+
+
+def dt(jour: date, heure: str) -> datetime:
+    heures, minutes = map(int, heure.split(":"))
+    return datetime.combine(jour, time(heures, minutes))
+
+
+def debuts(creneaux) -> list:
+    return [debut.strftime("%a %H:%M") for debut, _ in creneaux]
+
+
+def test_parser_horaires():
+    horaires = parser_horaires({"Lundi": ["14:00-17:00", "9h-12h30", "11:00-13:00"], "mardi": "25:00-26:00", "jour": "09:00-10:00"})
+    assert LUNDI.weekday() == 0
+    assert horaires == {0: [(time(9, 0), time(13, 0)), (time(14, 0), time(17, 0))]}
+    assert parser_horaires(None)[6] == [(time(9, 0), time(17, 0))]
+
+
+def test_fusionner_intervalles_chevauchants_contigus_et_inclus():
+    intervalles = [
+        (dt(LUNDI, "11:00"), dt(LUNDI, "11:30")),
+        (dt(LUNDI, "09:00"), dt(LUNDI, "10:00")),
+        (dt(LUNDI, "09:30"), dt(LUNDI, "10:30")),  # chevauche
+        (dt(LUNDI, "10:30"), dt(LUNDI, "10:45")),  # contigu
+        (dt(LUNDI, "09:10"), dt(LUNDI, "09:20")),  # inclus
+    ]
+    assert fusionner_intervalles(intervalles) == [
+        (dt(LUNDI, "09:00"), dt(LUNDI, "10:45")),
+        (dt(LUNDI, "11:00"), dt(LUNDI, "11:30")),
+    ]
+
+
+def test_creneaux_evitent_les_intervalles_occupes():
+    horaires = parser_horaires({"lundi": ["09:00-12:00"]})
+    occupes = fusionner_intervalles([
+        (dt(LUNDI, "09:30"), dt(LUNDI, "10:00")),
+        (dt(LUNDI, "09:45"), dt(LUNDI, "10:15")),
+        (dt(LUNDI, "11:00"), dt(LUNDI, "11:20")),
+    ])
+    creneaux = list(generer_creneaux(horaires, occupes, LUNDI, MARDI, 30))
+    # 10:15-11:00 ne contient qu'un créneau ; 11:20-12:00 un seul aussi (11:50 dépasserait la plage)
+    assert debuts(creneaux) == ["Mon 09:00", "Mon 10:15", "Mon 11:20"]
+    assert all(fin - debut == creneaux[0][1] - creneaux[0][0] for debut, fin in creneaux)
+
+
+def test_intervalle_occupe_a_cheval_sur_minuit():
+    horaires = parser_horaires({"lundi": ["21:00-23:30"], "mardi": ["00:00-02:00"]})
+    occupes = [(dt(LUNDI, "22:30"), dt(MARDI, "01:00"))]
+    creneaux = list(generer_creneaux(horaires, occupes, LUNDI, MARDI, 30))
+    assert debuts(creneaux) == ["Mon 21:00", "Mon 21:30", "Mon 22:00", "Tue 01:00", "Tue 01:30"]
+
+
+def test_apres_exclut_les_creneaux_anterieurs():
+    horaires = parser_horaires({"lundi": ["09:00-12:00"], "mardi": ["09:00-10:00"]})
+    occupes = [(dt(LUNDI, "10:30"), dt(LUNDI, "11:00"))]
+    creneaux = list(generer_creneaux(horaires, occupes, LUNDI, MARDI, 30, apres=dt(LUNDI, "10:10")))
+    # Les créneaux se suivent à partir de 'apres', puis de la fin de l'intervalle occupé
+    assert debuts(creneaux) == ["Mon 11:00", "Mon 11:30", "Tue 09:00", "Tue 09:30"]
+
+
+def test_apres_au_dela_de_la_plage():
+    horaires = parser_horaires({"lundi": ["09:00-12:00"]})
+    assert list(generer_creneaux(horaires, [], LUNDI, LUNDI, 30, apres=dt(LUNDI, "11:45"))) == []
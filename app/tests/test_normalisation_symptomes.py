@@ -0,0 +1,67 @@
+import pytest
+
+from app.utilitaires.normalisation_symptomes import (
+    SYNONYMES_SYMPTOMES, NormaliseurSymptomes, cle_texte, replier_unicode
+)
+
+
+@pytest.fixture(scope="module")
+def normaliseur() -> NormaliseurSymptomes:
+    return NormaliseurSymptomes.depuis_csv()
+
+
+def test_repli_unicode_et_cle():
+    assert replier_unicode("Fièvre") == "fievre"
+    assert replier_unicode("Œdème") == "oedeme"
+    assert cle_texte("Perte d’appétit") == cle_texte("perte d'appetit")
+    assert cle_texte("Maux de tête") == cle_texte("mal de tete")
+
+
+@pytest.mark.parametrize("terme, canonique", [
+    ("fièvre", "Fièvre"),
+    ("FIEVRES", "Fièvre"),
+    ("température élevée", "Fièvre"),
+    ("céphalées", "Maux de tête"),
+    ("mal de tête", "Maux de tête"),
+    ("courbatures", "Douleurs musculaires"),
+    ("mal de dos", "Douleur lombaire"),
+    ("rhinorrhée", "Écoulement nasal"),
+    ("hématurie", "Urines sanglantes"),
+    ("Selles liquides", "Selles liquides"),
+])
+def test_formes_canoniques(normaliseur, terme, canonique):
+    assert normaliseur.canonique(terme) == canonique
+    assert normaliseur.normaliser(terme) == canonique
+
+
+@pytest.mark.parametrize("mot_cle, symptome_voisin", [
+    ("nausées", "Vomissements"),
+    ("frissons", "Fièvre"),
+    ("diabète", "Besoin fréquent d’uriner"),
+    ("allergie", "Écoulement nasal"),
+    ("gorge", "Toux"),
+    ("effort", "Douleur à la marche"),
+])
+def test_mots_cles_associes_ne_sont_pas_des_synonymes(normaliseur, mot_cle, symptome_voisin):
+    assert normaliseur.canonique(mot_cle) is None
+    assert normaliseur.normaliser(mot_cle) == mot_cle
+    assert normaliseur.cle(mot_cle) != normaliseur.cle(symptome_voisin)
+    assert symptome_voisin in normaliseur.symptomes_evoques(mot_cle)
+
+
+def test_synonymes_designent_des_symptomes_du_csv(normaliseur):
+    for nom, synonymes in SYNONYMES_SYMPTOMES.items():
+        assert normaliseur.canonique(nom) == nom
+        for synonyme in synonymes:
+            assert normaliseur.canonique(synonyme) == nom, synonyme
+
+
+def test_normaliser_liste_sans_doublons(normaliseur):
+    assert normaliseur.normaliser_liste(["fièvre", "Température élevée", "nausées", "  toux  ", "", "Toux"]) == [
+        "Fièvre", "nausées", "Toux"
+    ]
+
+
+def test_nom_canonique_prioritaire_sur_un_synonyme():
+    normaliseur = NormaliseurSymptomes({"Fatigue": ["épuisement"], "Épuisement": []})
+    assert normaliseur.canonique("épuisement") == "Épuisement"
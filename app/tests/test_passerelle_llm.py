@@ -0,0 +1,151 @@
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("google.api_core")
+
+from google.api_core import exceptions as erreurs_google
+
+from app.services import passerelle_llm
+from app.services.passerelle_llm import BudgetReessais, Disjoncteur, PasserelleLLM, PasserelleLLMIndisponibleError
+
+
+class Horloge:
+    def __init__(self):
+        self.maintenant = 1000.0
+
+    def monotonic(self) -> float:
+        return self.maintenant
+
+
+@pytest.fixture
+def horloge(monkeypatch) -> Horloge:
+    horloge = Horloge()
+    monkeypatch.setattr(passerelle_llm, "time", types.SimpleNamespace(monotonic=horloge.monotonic))
+    return horloge
+
+
+def test_disjoncteur_ferme_ouvert_semi_ouvert_ferme(horloge):
+    disjoncteur = Disjoncteur(seuil_taux_erreur=0.5, nb_appels_min=4, fenetre_s=10, duree_ouverture_s=30)
+    for succes in (True, False, False):
+        assert disjoncteur.autoriser()
+        disjoncteur.enregistrer(succes)
+    assert disjoncteur.etat == Disjoncteur.FERME  # moins de nb_appels_min appels dans la fenêtre
+
+    disjoncteur.enregistrer(False)
+    assert disjoncteur.etat == Disjoncteur.OUVERT
+    assert not disjoncteur.autoriser()
+
+    horloge.maintenant += 30
+    assert disjoncteur.autoriser()  # appel d'essai
+    assert disjoncteur.etat == Disjoncteur.SEMI_OUVERT
+    assert not disjoncteur.autoriser()  # un seul essai à la fois
+    disjoncteur.enregistrer(True)
+    assert disjoncteur.etat == Disjoncteur.FERME
+    assert disjoncteur.obtenir_statistiques()["ouvertures"] == 1
+
+
+def test_disjoncteur_essai_en_echec_rouvre(horloge):
+    disjoncteur = Disjoncteur(seuil_taux_erreur=0.5, nb_appels_min=2, fenetre_s=10, duree_ouverture_s=30)
+    disjoncteur.enregistrer(False)
+    disjoncteur.enregistrer(False)
+    assert disjoncteur.etat == Disjoncteur.OUVERT
+
+    horloge.maintenant += 31
+    assert disjoncteur.autoriser()
+    disjoncteur.enregistrer(False)
+    assert disjoncteur.etat == Disjoncteur.OUVERT
+    horloge.maintenant += 29
+    assert not disjoncteur.autoriser()
+
+
+def test_disjoncteur_essai_abandonne_libere_la_place(horloge):
+    disjoncteur = Disjoncteur(seuil_taux_erreur=0.5, nb_appels_min=1, fenetre_s=10, duree_ouverture_s=30)
+    disjoncteur.enregistrer(False)
+    horloge.maintenant += 30
+    assert disjoncteur.autoriser()
+    disjoncteur.abandonner()
+    assert disjoncteur.autoriser()
+
+
+def test_disjoncteur_ignore_les_resultats_hors_fenetre_et_pendant_l_ouverture(horloge):
+    disjoncteur = Disjoncteur(seuil_taux_erreur=0.5, nb_appels_min=2, fenetre_s=10, duree_ouverture_s=30)
+    disjoncteur.enregistrer(False)
+    horloge.maintenant += 11
+    disjoncteur.enregistrer(True)
+    disjoncteur.enregistrer(True)
+    assert disjoncteur.etat == Disjoncteur.FERME
+
+    disjoncteur.enregistrer(False)
+    disjoncteur.enregistrer(False)
+    assert disjoncteur.etat == Disjoncteur.OUVERT
+    disjoncteur.enregistrer(True)  # appel lancé avant l'ouverture
+    assert disjoncteur.etat == Disjoncteur.OUVERT
+
+
+def test_budget_reessais(horloge):
+    budget = BudgetReessais(ratio=0.5, minimum_par_s=0.1, plafond=2)
+    assert budget.retirer() and budget.retirer()
+    assert not budget.retirer()  # épuisé
+
+    budget.deposer()
+    budget.deposer()
+    assert budget.retirer()
+    assert not budget.retirer()
+
+    horloge.maintenant += 10  # recharge de minimum_par_s jeton par seconde
+    assert budget.retirer()
+    horloge.maintenant += 1000
+    statistiques = budget.obtenir_statistiques()
+    assert statistiques["jetons"] == 2  # plafonné
+    assert statistiques["reessais"] == 4 and statistiques["reessais_refuses"] == 2
+
+
+class ModeleFactice:
+    def __init__(self, erreurs):
+        self.erreurs = list(erreurs)
+        self.nb_appels = 0
+
+    async def generate_content_async(self, contenu, **options):
+        self.nb_appels += 1
+        if self.erreurs:
+            raise self.erreurs.pop(0)
+        return f"réponse à {contenu}"
+
+
+def passerelle(modele: ModeleFactice, nb_tentatives: int = 3, budget: float = 10) -> PasserelleLLM:
+    resultat = PasserelleLLM(
+        taille_file_max=4, nb_tentatives=nb_tentatives, delai_base_reessai_s=0.001, delai_max_reessai_s=0.01,
+        budget_reessais=BudgetReessais(ratio=0.1, minimum_par_s=0, plafond=budget)
+    )
+    disjoncteur = Disjoncteur(seuil_taux_erreur=0.5, nb_appels_min=3, fenetre_s=60, duree_ouverture_s=60)
+    resultat.ajouter_modele("chat", modele, limite_concurrence=1, delai_s=5, disjoncteur=disjoncteur)
+    return resultat
+
+
+def test_passerelle_reessaie_les_erreurs_passageres():
+    modele = ModeleFactice([erreurs_google.ServiceUnavailable("surcharge")])
+    assert asyncio.run(passerelle(modele).generer("chat", "test", "bonjour")) == "réponse à bonjour"
+    assert modele.nb_appels == 2
+
+
+def test_passerelle_ne_reessaie_pas_une_requete_invalide():
+    modele = ModeleFactice([erreurs_google.InvalidArgument("requête invalide")])
+    with pytest.raises(erreurs_google.InvalidArgument):
+        asyncio.run(passerelle(modele).generer("chat", "test", "bonjour"))
+    assert modele.nb_appels == 1
+
+
+def test_passerelle_refuse_sans_appel_quand_le_disjoncteur_est_ouvert():
+    modele = ModeleFactice([erreurs_google.ServiceUnavailable("panne")] * 3)
+    instance = passerelle(modele, nb_tentatives=3)
+
+    async def scenario():
+        with pytest.raises(erreurs_google.ServiceUnavailable):
+            await instance.generer("chat", "test", "bonjour")
+        with pytest.raises(PasserelleLLMIndisponibleError):
+            await instance.generer("chat", "test", "bonjour")
+
+    asyncio.run(scenario())
+    assert modele.nb_appels == 3
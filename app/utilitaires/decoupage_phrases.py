@@ -0,0 +1,50 @@
+import re
+from typing import List, Optional
+
+# Fin de phrase : ponctuation forte (guillemets ou parenthèses fermants compris, précédés ou non
+# d'une espace comme « ceci. ») suivie d'un blanc, ou saut de ligne
+_FIN_PHRASE = re.compile(r"[.!?…]+(?:[ \u00a0\u202f]?[\"»)\]])*\s+|\n+")
+
+# Mots suivis d'un point qui ne terminent pas une phrase ("Dr. Kouassi", "M. Yao")
+ABREVIATIONS = frozenset({"dr", "pr", "m", "mme", "mlle", "me", "st", "ste", "etc", "cf", "ex", "env", "n", "no", "vol", "p"})
+
+
+class DecoupeurPhrases:
+    """
+    Découpe en phrases complètes un texte reçu fragment par fragment (réponse du LLM en flux).
+    Une phrase de moins de 'longueur_min' caractères est regroupée avec la suivante, pour ne
+    pas lancer une synthèse vocale par interjection ("Bonjour !").
+    """
+    def __init__(self, longueur_min: int = 0):
+        self.longueur_min = longueur_min
+        self._tampon = ""
+        self._debut = 0  # début, dans le tampon, de la phrase en cours
+
+    def _est_abreviation(self, fin_mot: int) -> bool:
+        mot = re.search(r"(\w+)$", self._tampon[self._debut:fin_mot])
+        return mot is not None and mot.group(1).lower() in ABREVIATIONS
+
+    def ajouter(self, fragment: str) -> List[str]:
+        """Ajoute un fragment et retourne les phrases qu'il complète (éventuellement aucune)."""
+        phrases = []
+        recherche = max(self._debut, len(self._tampon) - 1)  # une fin de phrase peut chevaucher deux fragments
+        self._tampon += fragment
+        for fin in _FIN_PHRASE.finditer(self._tampon, recherche):
+            if fin.start() < self._debut:
+                continue
+            if fin.group().startswith(".") and self._est_abreviation(fin.start()):
+                continue
+            phrase = self._tampon[self._debut:fin.end()].strip()
+            if len(phrase) >= self.longueur_min:
+                phrases.append(phrase)
+                self._debut = fin.end()
+        if self._debut:
+            self._tampon = self._tampon[self._debut:]
+            self._debut = 0
+        return phrases
+
+    def terminer(self) -> Optional[str]:
+        """Dernière phrase (sans ponctuation finale ou trop courte), à la fin du flux."""
+        reste = self._tampon[self._debut:].strip()
+        self._tampon, self._debut = "", 0
+        return reste or None
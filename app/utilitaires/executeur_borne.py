@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+
+class ExecuteurSatureError(Exception):
+    """Levée lorsque la file d'attente d'un ExecuteurBorne a atteint sa taille maximale."""
+    pass
+
+
+class ExecuteurBorne:
+    """
+    Pool de threads de taille fixe, mesuré, pour exécuter des appels bloquants depuis la
+    boucle d'événements (AccesDonneesAsync, ExecuteurVocal).
+
+    - au plus 'nb_workers' appels s'exécutent en même temps ;
+    - si 'taille_file_max' est donné, au plus autant d'appels attendent un thread : au-delà,
+      'erreur_saturation' est levée sans rien soumettre ;
+    - un appel peut recevoir un délai (asyncio.TimeoutError pour l'appelant). Le thread ne peut
+      pas être interrompu : il reste occupé jusqu'à la fin de l'appel bloquant ;
+    - un appel abandonné (délai, appelant annulé) qui attendait encore un thread quitte la file
+      et n'est jamais exécuté ;
+    - le contexte (contextvars) de l'appelant est propagé au thread ;
+    - profondeur de file, occupation, attente et durée sont comptées par type d'appel.
+    """
+    def __init__(
+        self,
+        nb_workers: int,
+        prefixe_threads: str,
+        taille_file_max: Optional[int] = None,
+        erreur_saturation: Type[ExecuteurSatureError] = ExecuteurSatureError
+    ):
+        self.nb_workers = nb_workers
+        self.taille_file_max = taille_file_max
+        self._erreur_saturation = erreur_saturation
+        self._executeur = ThreadPoolExecutor(max_workers=nb_workers, thread_name_prefix=prefixe_threads)
+        self._verrou = threading.Lock()
+        self._nb_en_file = 0
+        self._nb_en_cours = 0
+        self._par_type: Dict[str, Dict[str, float]] = {}
+
+    def _compteurs(self, type_appel: str) -> Dict[str, float]:
+        return self._par_type.setdefault(type_appel, {
+            "termines": 0, "erreurs": 0, "expirations": 0, "refus": 0, "cumul_duree_ms": 0.0, "cumul_attente_ms": 0.0,
+        })
+
+    def _executer_mesure(self, type_appel: str, soumis_a: float, appel: Callable[[], Any]) -> Any:
+        """Exécuté dans un thread du pool : mesure l'attente en file et la durée d'exécution."""
+        debut = time.perf_counter()
+        with self._verrou:
+            self._nb_en_file -= 1
+            self._nb_en_cours += 1
+            self._compteurs(type_appel)["cumul_attente_ms"] += (debut - soumis_a) * 1000
+        erreur = False
+        try:
+            return appel()
+        except Exception:
+            erreur = True
+            raise
+        finally:
+            with self._verrou:
+                self._nb_en_cours -= 1
+                compteurs = self._compteurs(type_appel)
+                compteurs["termines"] += 1
+                compteurs["erreurs"] += erreur
+                compteurs["cumul_duree_ms"] += (time.perf_counter() - debut) * 1000
+
+    async def executer(self, type_appel: str, appel: Callable[[], Any], delai_s: Optional[float] = None) -> Any:
+        """Exécute appel() dans le pool et attend son résultat, au plus 'delai_s' secondes si donné."""
+        with self._verrou:
+            if self.taille_file_max is not None and self._nb_en_file >= self.taille_file_max:
+                self._compteurs(type_appel)["refus"] += 1
+                raise self._erreur_saturation(f"File d'attente pleine ({self.taille_file_max} appels en attente d'un thread).")
+            self._nb_en_file += 1
+        contexte = contextvars.copy_context()
+        futur = self._executeur.submit(
+            functools.partial(contexte.run, self._executer_mesure, type_appel, time.perf_counter(), appel)
+        )
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(futur), timeout=delai_s)
+        except asyncio.TimeoutError:
+            with self._verrou:
+                self._compteurs(type_appel)["expirations"] += 1
+            logger.warning(f"Appel '{type_appel}' abandonné après {delai_s} s.")
+            raise
+        finally:
+            # Délai dépassé ou appelant annulé : un appel qui attendait encore un thread ne sera
+            # jamais exécuté, il quitte la file. cancel() est sans effet (False) sur un appel
+            # démarré, qui a déjà quitté la file dans _executer_mesure.
+            with self._verrou:
+                if futur.cancel():
+                    self._nb_en_file -= 1
+
+    def fermer(self, attendre: bool):
+        """Arrête le pool ; sans 'attendre', les appels en file sont annulés et ceux en cours abandonnés."""
+        self._executeur.shutdown(wait=attendre, cancel_futures=not attendre)
+
+    def obtenir_statistiques(self) -> Dict[str, Any]:
+        """Retourne la profondeur de file, l'occupation, et les durées globales et par type d'appel."""
+        with self._verrou:
+            par_type = {}
+            for type_appel, compteurs in self._par_type.items():
+                termines = compteurs["termines"]
+                par_type[type_appel] = {
+                    "termines": int(termines),
+                    "erreurs": int(compteurs["erreurs"]),
+                    "expirations": int(compteurs["expirations"]),
+                    "refus": int(compteurs["refus"]),
+                    "duree_moyenne_ms": round(compteurs["cumul_duree_ms"] / termines, 3) if termines else 0.0,
+                    "attente_moyenne_ms": round(compteurs["cumul_attente_ms"] / termines, 3) if termines else 0.0,
+                }
+            total_termines = sum(compteurs["termines"] for compteurs in self._par_type.values())
+            cumul_duree_ms = sum(compteurs["cumul_duree_ms"] for compteurs in self._par_type.values())
+            return {
+                "nb_workers": self.nb_workers,
+                "taille_file_max": self.taille_file_max,
+                "en_file": self._nb_en_file,
+                "en_cours": self._nb_en_cours,
+                "total_termines": int(total_termines),
+                "total_erreurs": int(sum(compteurs["erreurs"] for compteurs in self._par_type.values())),
+                "duree_moyenne_ms": round(cumul_duree_ms / total_termines, 3) if total_termines else 0.0,
+                "par_type": par_type,
+            }
@@ -0,0 +1,55 @@
+import math
+from typing import List, Optional, Tuple
+
+RAYON_TERRE_KM = 6371.0
+
+
+def parser_coordonnees_gps(coordonnees: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse une chaîne "latitude,longitude" ; retourne None si elle est absente, invalide ou hors limites."""
+    if not coordonnees:
+        return None
+    try:
+        latitude, longitude = map(float, coordonnees.split(','))
+    except ValueError:
+        return None
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        return None
+    return latitude, longitude
+
+
+def distance_haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance sur le grand cercle entre deux points GPS, en kilomètres."""
+    lat1_rad, lat2_rad = math.radians(lat1), math.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    return 2 * RAYON_TERRE_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def boite_englobante(latitude: float, longitude: float, rayon_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Boîte (en degrés) contenant le disque de rayon 'rayon_km' autour du point :
+    (latitude_min, latitude_max, plages de longitude).
+
+    Les bornes de longitude sont celles des méridiens tangents au cercle (et non un simple
+    écart constant en degrés). Si le disque contient un pôle, toutes les longitudes sont
+    retenues ; s'il franchit l'antiméridien, la plage est scindée en deux.
+    """
+    angle = rayon_km / RAYON_TERRE_KM
+    lat_rad = math.radians(latitude)
+    latitude_min = math.degrees(lat_rad - angle)
+    latitude_max = math.degrees(lat_rad + angle)
+    if latitude_min <= -90.0 or latitude_max >= 90.0:
+        return max(latitude_min, -90.0), min(latitude_max, 90.0), [(-180.0, 180.0)]
+
+    rapport = math.sin(angle) / math.cos(lat_rad)
+    if rapport >= 1.0:
+        return latitude_min, latitude_max, [(-180.0, 180.0)]
+    ecart_longitude = math.degrees(math.asin(rapport))
+    longitude_min = longitude - ecart_longitude
+    longitude_max = longitude + ecart_longitude
+    if longitude_min < -180.0:
+        return latitude_min, latitude_max, [(longitude_min + 360.0, 180.0), (-180.0, longitude_max)]
+    if longitude_max > 180.0:
+        return latitude_min, latitude_max, [(longitude_min, 180.0), (-180.0, longitude_max - 360.0)]
+    return latitude_min, latitude_max, [(longitude_min, longitude_max)]
@@ -0,0 +1,238 @@
+import csv
+import logging
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fichier source des symptômes canoniques et de leurs mots-clés associés (colonne 'mots_cles_associes')
+CHEMIN_SYMPTOMES_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "donnees_sources", "symptomes_courants.csv"
+)
+
+# Mots vides ignorés dans les clés ("perte d'appétit" -> "pert appetit")
+MOTS_VIDES = frozenset({
+    "a", "au", "aux", "avec", "d", "de", "des", "du", "en", "et", "l", "la", "le", "les",
+    "ou", "par", "sur", "un", "une",
+})
+
+# Pluriels irréguliers fréquents dans les descriptions de symptômes
+FORMES_IRREGULIERES = {"maux": "mal", "yeux": "oeil", "oeils": "oeil"}
+
+# Suffixes retirés par le racinisateur léger, du plus long au plus court
+SUFFIXES = (
+    "issements", "issement", "ements", "ement", "ations", "ation", "atrices", "atrice",
+    "ateurs", "ateur", "euses", "euse", "iques", "ique", "ables", "able", "ives", "ive",
+    "ifs", "if", "eux", "ees", "ee", "es", "e", "s", "x",
+)
+
+# Synonymes stricts des symptômes canoniques : seuls ces termes sont ramenés au nom canonique.
+# Les 'mots_cles_associes' du CSV mêlent synonymes et symptômes voisins (nausées, frissons,
+# diabète, allergie...) : ils ne servent qu'à repérer les symptômes évoqués (symptomes_evoques).
+SYNONYMES_SYMPTOMES: Dict[str, Tuple[str, ...]] = {
+    "Fièvre": ("température élevée", "hyperthermie"),
+    "Toux": ("toux sèche", "toux grasse"),
+    "Vomissements": ("vomir",),
+    "Maux de tête": ("céphalée", "mal de tête", "mal à la tête"),
+    "Fatigue": ("épuisement", "lassitude", "manque d’énergie"),
+    "Douleurs musculaires": ("courbatures", "myalgie"),
+    "Douleurs abdominales": ("mal de ventre", "mal au ventre", "douleur au ventre"),
+    "Démangeaisons": ("prurit",),
+    "Jaunisse": ("ictère", "peau jaune", "yeux jaunes"),
+    "Essoufflement": ("dyspnée", "souffle court", "manque d’air", "respiration courte"),
+    "Tachycardie": ("rythme cardiaque élevé",),
+    "Sueurs nocturnes": ("transpiration nocturne",),
+    "Raideur de la nuque": ("nuque raide", "cou rigide"),
+    "Photophobie": ("sensibilité à la lumière",),
+    "Perte d’appétit": ("manque d’appétit", "manque de faim", "inappétence"),
+    "Douleurs thoraciques": ("douleur à la poitrine", "mal à la poitrine"),
+    "Perte de poids": ("amaigrissement",),
+    "Confusion": ("désorientation",),
+    "Douleurs articulaires": ("arthralgie", "articulations douloureuses"),
+    "Gonflement des membres": ("œdème", "membres gonflés", "jambes gonflées"),
+    "Troubles visuels": ("vision trouble", "baisse de vue"),
+    "Yeux rouges": ("œil rouge", "œil injecté de sang"),
+    "Larmoiement excessif": ("yeux qui pleurent", "pleurs involontaires"),
+    "Rougeurs cutanées": ("érythème", "plaques rouges"),
+    "Perte de connaissance": ("évanouissement", "syncope"),
+    "Selles sanglantes": ("rectorragie", "sang dans les selles"),
+    "Tension musculaire": ("contractures",),
+    "Troubles du sommeil": ("insomnie",),
+    "Transpiration excessive": ("hyperhidrose", "sueurs abondantes"),
+    "Douleur oculaire": ("œil douloureux", "mal aux yeux"),
+    "Engourdissement": ("fourmillements", "paresthésie"),
+    "Palpitations": ("coeur qui tape",),
+    "Douleur lombaire": ("mal de dos", "mal au dos", "lombalgie"),
+    "Douleur cervicale": ("mal au cou", "cervicalgie"),
+    "Douleur à la mâchoire": ("mâchoire douloureuse",),
+    "Douleur à la déglutition": ("odynophagie", "mal de gorge", "gorge douloureuse"),
+    "Douleur à l’effort": ("douleur à l’exercice",),
+    "Douleur généralisée": ("mal partout",),
+    "Douleur mammaire": ("mastodynie", "sein douloureux"),
+    "Douleur testiculaire": ("testicule douloureux",),
+    "Douleur à l’oreille": ("otalgie", "mal à l’oreille", "oreille douloureuse"),
+    "Écoulement nasal": ("nez qui coule", "rhinorrhée"),
+    "Éternuements fréquents": ("éternuements",),
+    "Perte d’odorat": ("anosmie",),
+    "Perte de goût": ("agueusie",),
+    "Sensation de gorge sèche": ("gorge sèche",),
+    "Sensation de gorge serrée": ("gorge serrée",),
+    "Sensation de brûlure gastrique": ("brûlure d’estomac", "pyrosis"),
+    "Ballonnements": ("ventre gonflé",),
+    "Flatulences excessives": ("flatulences",),
+    "Constipation": ("selles dures",),
+    "Selles liquides": ("selles aqueuses",),
+    "Selles décolorées": ("selles claires",),
+    "Selles noires": ("méléna",),
+    "Selles malodorantes": ("selles fétides",),
+    "Douleur à la miction": ("miction douloureuse", "dysurie"),
+    "Urines sanglantes": ("hématurie", "sang dans les urines"),
+    "Urines troubles": ("urines opaques",),
+    "Besoin fréquent d’uriner": ("pollakiurie", "miction fréquente"),
+    "Rétention urinaire": ("blocage urinaire",),
+    "Douleur menstruelle": ("dysménorrhée", "règles douloureuses", "crampes menstruelles"),
+    "Règles abondantes": ("ménorragie",),
+    "Règles irrégulières": ("cycle irrégulier",),
+    "Douleur pendant les rapports": ("dyspareunie",),
+    "Écoulement vaginal anormal": ("leucorrhée", "pertes vaginales"),
+    "Douleur à l’éjaculation": ("éjaculation douloureuse",),
+}
+
+_SEPARATEURS = re.compile(r"[^a-z0-9]+")
+
+
+def replier_unicode(texte: str) -> str:
+    """Minuscules sans accents ni ligatures : 'Fièvre' -> 'fievre', 'Œdème' -> 'oedeme'."""
+    texte = texte.replace("œ", "oe").replace("Œ", "oe").replace("æ", "ae").replace("Æ", "ae")
+    decompose = unicodedata.normalize("NFKD", texte.casefold())
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def raciniser(mot: str) -> str:
+    """Racinisation légère du français (pluriels, féminins et suffixes dérivationnels courants)."""
+    mot = FORMES_IRREGULIERES.get(mot, mot)
+    if len(mot) <= 3:
+        return mot
+    for suffixe in SUFFIXES:
+        if mot.endswith(suffixe) and len(mot) - len(suffixe) >= 3:
+            return mot[:-len(suffixe)]
+    return mot
+
+
+@lru_cache(maxsize=8192)
+def cle_texte(texte: str) -> str:
+    """Clé de comparaison d'un texte : repli Unicode, découpage, suppression des mots vides, racinisation."""
+    mots = _SEPARATEURS.split(replier_unicode(texte))
+    return " ".join(raciniser(mot) for mot in mots if mot and mot not in MOTS_VIDES)
+
+
+class NormaliseurSymptomes:
+    """
+    Ramène un libellé de symptôme à son nom canonique.
+
+    La table de correspondance (clé normalisée -> nom canonique) est compilée une seule fois
+    à partir des noms canoniques et de leurs synonymes stricts ; un nom canonique est toujours
+    prioritaire sur un synonyme de même clé, puis le premier synonyme rencontré l'emporte.
+    Les mots-clés associés (symptômes voisins, organes, causes) ne sont jamais ramenés à un
+    nom canonique : ils indiquent seulement les symptômes qu'un terme peut évoquer.
+    """
+    def __init__(self, symptomes: Dict[str, Iterable[str]], mots_cles: Optional[Dict[str, Iterable[str]]] = None):
+        self._canoniques: Dict[str, str] = {}
+        for nom in symptomes:
+            self._canoniques.setdefault(cle_texte(nom), nom)
+        self._table: Dict[str, str] = dict(self._canoniques)
+        for nom, synonymes in symptomes.items():
+            for synonyme in synonymes:
+                cle = cle_texte(synonyme)
+                if cle and cle not in self._table:
+                    self._table[cle] = nom
+        # clé d'un mot-clé associé -> noms canoniques qu'il évoque
+        self._evocations: Dict[str, List[str]] = {}
+        for nom, termes in (mots_cles or {}).items():
+            for terme in termes:
+                cle = cle_texte(terme)
+                if cle and cle not in self._table and nom not in self._evocations.setdefault(cle, []):
+                    self._evocations[cle].append(nom)
+        logger.info(
+            f"Normaliseur de symptômes compilé : {len(self._canoniques)} noms canoniques, "
+            f"{len(self._table)} clés, {len(self._evocations)} mots-clés associés."
+        )
+
+    @classmethod
+    def depuis_csv(cls, chemin_csv: str = CHEMIN_SYMPTOMES_CSV) -> "NormaliseurSymptomes":
+        """
+        Construit le normaliseur à partir des noms de symptomes_courants.csv (nom_fr), des
+        synonymes de SYNONYMES_SYMPTOMES et des mots-clés associés du CSV (mots_cles_associes).
+        """
+        symptomes: Dict[str, List[str]] = {}
+        mots_cles: Dict[str, List[str]] = {}
+        try:
+            with open(chemin_csv, mode="r", encoding="utf-8") as fichier_csv:
+                for ligne in csv.DictReader(fichier_csv):
+                    nom = (ligne.get("nom_fr") or "").strip()
+                    if not nom:
+                        continue
+                    symptomes.setdefault(nom, list(SYNONYMES_SYMPTOMES.get(nom, ())))
+                    termes = [s.strip() for s in (ligne.get("mots_cles_associes") or "").split(",") if s.strip()]
+                    mots_cles.setdefault(nom, []).extend(termes)
+        except FileNotFoundError:
+            logger.error(f"Fichier des symptômes '{chemin_csv}' introuvable : normalisation sans synonymes.")
+        return cls(symptomes, mots_cles)
+
+    def cle(self, terme: str) -> str:
+        """Clé d'index : celle du nom canonique si le terme est connu, sinon celle du terme lui-même."""
+        cle = cle_texte(terme)
+        canonique = self._table.get(cle)
+        return cle_texte(canonique) if canonique is not None else cle
+
+    def canonique(self, terme: str) -> Optional[str]:
+        """Nom canonique du symptôme, ou None si le terme n'est pas reconnu."""
+        return self._table.get(cle_texte(terme))
+
+    def symptomes_evoques(self, terme: str) -> List[str]:
+        """
+        Noms canoniques que le terme désigne ou évoque : [nom canonique] si le terme est reconnu,
+        sinon les symptômes dont il est un mot-clé associé ("nausées" -> ["Vomissements"]).
+        Sert à élargir une recherche, jamais à fusionner des symptômes.
+        """
+        cle = cle_texte(terme)
+        canonique = self._table.get(cle)
+        if canonique is not None:
+            return [canonique]
+        return list(self._evocations.get(cle, ()))
+
+    def normaliser(self, terme: str) -> str:
+        """Nom canonique si le terme est reconnu, sinon le terme d'origine débarrassé des espaces superflus."""
+        return self._table.get(cle_texte(terme)) or " ".join(terme.split())
+
+    def normaliser_liste(self, termes: Iterable[str]) -> List[str]:
+        """Normalise une liste de symptômes en supprimant les doublons (l'ordre d'apparition est conservé)."""
+        resultat: List[str] = []
+        vus = set()
+        for terme in termes:
+            if not isinstance(terme, str) or not terme.strip():
+                continue
+            nom = self.normaliser(terme)
+            cle = self.cle(nom)
+            if cle not in vus:
+                vus.add(cle)
+                resultat.append(nom)
+        return resultat
+
+
+_normaliseur_instance: Optional[NormaliseurSymptomes] = None
+_verrou_normaliseur = threading.Lock()
+
+
+def obtenir_normaliseur() -> NormaliseurSymptomes:
+    """Normaliseur partagé, compilé au premier appel."""
+    global _normaliseur_instance
+    if _normaliseur_instance is None:
+        with _verrou_normaliseur:
+            if _normaliseur_instance is None:
+                _normaliseur_instance = NormaliseurSymptomes.depuis_csv()
+    return _normaliseur_instance
@@ -5,17 +5,28 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import asyncio
 import os
 
-from app.base_de_donnees.connexion import init_db
+from app.base_de_donnees.connexion import init_db, fermer_pool_connexions
 from app.configuration.parametres import parametres
+from app.configuration.intergiciels import comptage_requetes_sql
+from app.services.integrateur_llm import MESSAGES_REPLI
+from app.api.v1.teleassistance import MESSAGE_FIN_APPEL
 
 # Importation des fonctions d'initialisation depuis injection.py
 from app.dependances.injection import (
+    init_acces_donnees_async_instance,
+    get_acces_donnees_async,
+    init_journal_evenements_instance,
+    get_journal_evenements,
     init_integrateur_llm_instance,
     init_gestionnaire_connaissances_instance,
     init_gestionnaire_contexte_instance,
+    init_executeur_vocal_instance,
+    get_executeur_vocal,
     init_gestionnaire_vocal_instance,
+    get_gestionnaire_vocal,
     init_moteur_diagnostic_instance,
     init_gestionnaire_patient_instance,
     init_gestionnaire_medecin_instance,
@@ -73,6 +84,9 @@ app.add_middleware(
     allow_headers=["*", "Authorization"],
 )
 
+# Comptage des requêtes SQL par requête HTTP (en-tête X-Requetes-SQL, /api/v1/core/metriques/requetes_sql)
+app.middleware("http")(comptage_requetes_sql)
+
 # Créer les répertoires "static", "uploads" et "audio_reponses" si non existants.
 if not os.path.exists("static"):
     os.makedirs("static")
@@ -91,20 +105,35 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 async def startup_event():
     logger.info("Démarrage de l'application : Initialisation des services...")
     # Initialisation des services dans un ordre qui respecte les dépendances
+    await init_acces_donnees_async_instance()
+    await init_journal_evenements_instance()
     await init_integrateur_llm_instance()
     await init_gestionnaire_connaissances_instance()
     await init_gestionnaire_contexte_instance()
+    await init_executeur_vocal_instance()
     await init_gestionnaire_vocal_instance()
     await init_moteur_diagnostic_instance() 
     await init_gestionnaire_patient_instance() 
+    await init_gestionnaire_geolocalisation_instance() 
     await init_gestionnaire_medecin_instance() 
     await init_gestionnaire_structure_medicale_instance() 
     await init_gestionnaire_rendezvous_instance() 
     await init_gestionnaire_telemedecine_instance() 
-    await init_gestionnaire_geolocalisation_instance() 
     logger.info("Tous les services ont été initialisés.")
+    # Synthèse en tâche de fond des réponses fixes, servies ensuite depuis le cache audio
+    app.state.prechauffage_audio = asyncio.create_task(get_gestionnaire_vocal().prechauffer_cache_audio([*MESSAGES_REPLI, MESSAGE_FIN_APPEL]))
 # --- FIN DE LA FONCTION D'INITIALISATION ---
 
+# --- FONCTION D'ARRÊT ---
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Arrêt de l'application : Libération des ressources...")
+    await get_journal_evenements().arreter()
+    get_acces_donnees_async().fermer()
+    get_executeur_vocal().fermer()
+    fermer_pool_connexions()
+# --- FIN DE LA FONCTION D'ARRÊT ---
+
 # --- DÉFINITION DES ROUTES HTML ---
 
 # Route racine pour servir le tableau de bord (dashboard.html) directement
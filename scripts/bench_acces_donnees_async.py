@@ -0,0 +1,96 @@
+# scripts/bench_acces_donnees_async.py
+"""
+Mesure la latence de la boucle d'événements (lag) pendant que des requêtes "lentes"
+sont exécutées en parallèle, selon deux modes :
+  - direct    : la fonction bloquante est appelée dans la coroutine (comportement historique)
+  - executeur : la fonction passe par AccesDonneesAsync (pool de threads borné)
+
+Aucune base de données n'est nécessaire : la connexion est simulée et la requête
+est remplacée par un time.sleep() de durée configurable.
+
+Usage : python scripts/bench_acces_donnees_async.py [--requetes 200] [--duree-ms 20] [--workers 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.base_de_donnees import acces_async
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+
+
+class _ConnexionSimulee:
+    def close(self):
+        pass
+
+
+def _requete_lente(conn, duree_s: float):
+    time.sleep(duree_s)
+    return 1
+
+
+async def _sonde_lag(arret: asyncio.Event, intervalle_s: float, mesures: list):
+    """Se réveille toutes les 'intervalle_s' secondes et note le retard constaté."""
+    boucle = asyncio.get_running_loop()
+    while not arret.is_set():
+        attendu = boucle.time() + intervalle_s
+        await asyncio.sleep(intervalle_s)
+        mesures.append(max(0.0, (boucle.time() - attendu) * 1000))
+
+
+async def _executer(mode: str, nb_requetes: int, duree_s: float, nb_workers: int) -> dict:
+    acces = AccesDonneesAsync(nb_workers=nb_workers)
+    arret = asyncio.Event()
+    mesures = []
+    sonde = asyncio.create_task(_sonde_lag(arret, 0.005, mesures))
+
+    async def requete_directe():
+        return _requete_lente(_ConnexionSimulee(), duree_s)
+
+    async def requete_executeur():
+        return await acces.executer_transaction(_requete_lente, duree_s)
+
+    fabrique = requete_directe if mode == "direct" else requete_executeur
+    debut = time.perf_counter()
+    await asyncio.gather(*(fabrique() for _ in range(nb_requetes)))
+    duree_totale = time.perf_counter() - debut
+    arret.set()
+    await sonde
+    acces.fermer()
+
+    mesures = mesures or [0.0]
+    mesures_triees = sorted(mesures)
+    return {
+        "mode": mode,
+        "duree_totale_s": round(duree_totale, 3),
+        "lag_moyen_ms": round(statistics.mean(mesures), 2),
+        "lag_p99_ms": round(mesures_triees[min(len(mesures_triees) - 1, int(len(mesures_triees) * 0.99))], 2),
+        "lag_max_ms": round(max(mesures), 2),
+    }
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--requetes", type=int, default=200)
+    analyseur.add_argument("--duree-ms", type=float, default=20.0)
+    analyseur.add_argument("--workers", type=int, default=10)
+    args = analyseur.parse_args()
+
+    # Remplace l'emprunt de connexion au pool par une connexion simulée.
+    acces_async.get_db_connection = lambda: _ConnexionSimulee()
+
+    for mode in ("direct", "executeur"):
+        resultat = asyncio.run(_executer(mode, args.requetes, args.duree_ms / 1000, args.workers))
+        print(
+            f"{resultat['mode']:>10} | total {resultat['duree_totale_s']:>7} s | "
+            f"lag moyen {resultat['lag_moyen_ms']:>8} ms | p99 {resultat['lag_p99_ms']:>8} ms | "
+            f"max {resultat['lag_max_ms']:>8} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
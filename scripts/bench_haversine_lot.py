@@ -0,0 +1,81 @@
+# scripts/bench_haversine_lot.py
+"""
+Benchmark de la recherche de proximité par lot (plusieurs origines) : noyau de Haversine
+vectorisé NumPy sur le tableau des coordonnées, comparé à la boucle historique
+(math.sin/cos ligne par ligne, une origine après l'autre).
+
+Usage : python scripts/bench_haversine_lot.py [--prestataires 10000] [--origines 200] [--k 10] [--rayon-km 25]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.index_spatial import IndexSpatial
+from app.utilitaires.geographie import distance_haversine_km
+
+CENTRE = (5.35, -4.01)  # Abidjan
+ETENDUE_DEGRES = 1.5
+
+
+def position_aleatoire(aleatoire):
+    return (
+        CENTRE[0] + aleatoire.uniform(-ETENDUE_DEGRES, ETENDUE_DEGRES),
+        CENTRE[1] + aleatoire.uniform(-ETENDUE_DEGRES, ETENDUE_DEGRES),
+    )
+
+
+def boucle_par_ligne(prestataires, origines, k, rayon_km):
+    """Recherche historique : toutes les lignes pour chaque origine, puis tri."""
+    resultats = []
+    for latitude, longitude in origines:
+        proches = []
+        for identifiant, (lat, lon) in prestataires.items():
+            distance = distance_haversine_km(latitude, longitude, lat, lon)
+            if distance <= rayon_km:
+                proches.append((distance, identifiant))
+        proches.sort()
+        resultats.append([(identifiant, distance) for distance, identifiant in proches[:k]])
+    return resultats
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--prestataires", type=int, default=10000)
+    analyseur.add_argument("--origines", type=int, default=200)
+    analyseur.add_argument("--k", type=int, default=10)
+    analyseur.add_argument("--rayon-km", type=float, default=25.0)
+    analyseur.add_argument("--graine", type=int, default=42)
+    args = analyseur.parse_args()
+
+    aleatoire = random.Random(args.graine)
+    prestataires = {i: position_aleatoire(aleatoire) for i in range(1, args.prestataires + 1)}
+    origines = [position_aleatoire(aleatoire) for _ in range(args.origines)]
+
+    index = IndexSpatial("bench")
+    index.construire({i: (lat, lon, i) for i, (lat, lon) in prestataires.items()})
+    index.rechercher_plus_proches_lot(origines[:1], args.k, args.rayon_km)  # construction du tableau en cache
+
+    debut = time.perf_counter()
+    attendus = boucle_par_ligne(prestataires, origines, args.k, args.rayon_km)
+    duree_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    obtenus = index.rechercher_plus_proches_lot(origines, args.k, args.rayon_km)
+    duree_lot = time.perf_counter() - debut
+
+    for attendu, obtenu in zip(attendus, obtenus):
+        assert [i for i, _ in attendu] == [i for i, _ in obtenu], "Résultats divergents entre le lot et la boucle"
+
+    paires = args.prestataires * args.origines
+    print(f"{args.origines} origines x {args.prestataires} prestataires ({paires:,} distances), top-{args.k}")
+    print(f"  boucle par ligne : {duree_boucle * 1000:10.1f} ms | {paires / duree_boucle:14,.0f} distances/s")
+    print(f"  lot vectorisé    : {duree_lot * 1000:10.1f} ms | {paires / duree_lot:14,.0f} distances/s")
+    print(f"  accélération     : x{duree_boucle / duree_lot:.1f}")
+
+
+if __name__ == "__main__":
+    main()
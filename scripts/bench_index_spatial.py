@@ -0,0 +1,102 @@
+# scripts/bench_index_spatial.py
+"""
+Benchmark de l'index spatial des médecins / structures sur des positions synthétiques
+(par défaut 10 000 points répartis autour d'Abidjan).
+
+Mesure la latence des recherches par rayon et des k plus proches voisins, comparée au
+parcours linéaire historique (haversine sur toutes les lignes), puis le coût des mises
+à jour (zone tampon et reconstructions).
+
+Usage : python scripts/bench_index_spatial.py [--points 10000] [--requetes 1000] [--rayon-km 10] [--k 10]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.index_spatial import IndexSpatial
+from app.utilitaires.geographie import distance_haversine_km
+
+CENTRE = (5.35, -4.01)  # Abidjan
+ETENDUE_DEGRES = 1.5
+
+
+def position_aleatoire(aleatoire):
+    return (
+        CENTRE[0] + aleatoire.uniform(-ETENDUE_DEGRES, ETENDUE_DEGRES),
+        CENTRE[1] + aleatoire.uniform(-ETENDUE_DEGRES, ETENDUE_DEGRES),
+    )
+
+
+def parcours_lineaire(points, latitude, longitude, rayon_km):
+    resultats = []
+    for identifiant, (lat, lon) in points.items():
+        distance = distance_haversine_km(latitude, longitude, lat, lon)
+        if distance <= rayon_km:
+            resultats.append((identifiant, distance))
+    resultats.sort(key=lambda r: r[1])
+    return resultats
+
+
+def chronometrer(fonction, requetes) -> dict:
+    durees = []
+    for latitude, longitude in requetes:
+        debut = time.perf_counter()
+        fonction(latitude, longitude)
+        durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return {
+        "moyenne_ms": statistics.mean(durees),
+        "p95_ms": durees[min(len(durees) - 1, int(len(durees) * 0.95))],
+    }
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--points", type=int, default=10000)
+    analyseur.add_argument("--requetes", type=int, default=1000)
+    analyseur.add_argument("--rayon-km", type=float, default=10.0)
+    analyseur.add_argument("--k", type=int, default=10)
+    analyseur.add_argument("--graine", type=int, default=42)
+    args = analyseur.parse_args()
+
+    aleatoire = random.Random(args.graine)
+    points = {i: position_aleatoire(aleatoire) for i in range(1, args.points + 1)}
+    requetes = [position_aleatoire(aleatoire) for _ in range(args.requetes)]
+
+    index = IndexSpatial("bench")
+    debut = time.perf_counter()
+    index.construire({i: (lat, lon, i) for i, (lat, lon) in points.items()})
+    print(f"Construction : {(time.perf_counter() - debut) * 1000:.1f} ms pour {len(index)} points")
+
+    # Vérification : mêmes résultats que le parcours linéaire
+    for latitude, longitude in requetes[:20]:
+        attendus = [i for i, _ in parcours_lineaire(points, latitude, longitude, args.rayon_km)]
+        obtenus = [i for i, _ in index.rechercher_rayon(latitude, longitude, args.rayon_km)]
+        assert sorted(attendus) == sorted(obtenus), "Résultats divergents entre l'index et le parcours linéaire"
+
+    lignes = [
+        ("parcours linéaire", chronometrer(lambda la, lo: parcours_lineaire(points, la, lo, args.rayon_km), requetes[:100])),
+        ("rayon (index)", chronometrer(lambda la, lo: index.rechercher_rayon(la, lo, args.rayon_km), requetes)),
+        (f"{args.k} plus proches", chronometrer(lambda la, lo: index.rechercher_plus_proches(la, lo, args.k, args.rayon_km), requetes)),
+    ]
+    for nom, mesure in lignes:
+        print(f"{nom:>18} | moyenne {mesure['moyenne_ms']:8.3f} ms | p95 {mesure['p95_ms']:8.3f} ms")
+
+    debut = time.perf_counter()
+    for _ in range(args.requetes):
+        identifiant = aleatoire.randint(1, args.points)
+        latitude, longitude = position_aleatoire(aleatoire)
+        index.indexer(identifiant, latitude, longitude, identifiant)
+    duree_ms = (time.perf_counter() - debut) * 1000
+    print(f"{args.requetes} déplacements : {duree_ms:.1f} ms - {index.obtenir_statistiques()}")
+    mesure = chronometrer(lambda la, lo: index.rechercher_rayon(la, lo, args.rayon_km), requetes)
+    print(f"{'rayon (tampon)':>18} | moyenne {mesure['moyenne_ms']:8.3f} ms | p95 {mesure['p95_ms']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
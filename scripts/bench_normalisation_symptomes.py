@@ -0,0 +1,66 @@
+# scripts/bench_normalisation_symptomes.py
+"""
+Microbenchmark du normaliseur de symptômes : nombre de normalisations par seconde,
+à froid (cache des clés vidé avant chaque passe) et à chaud (clés déjà calculées).
+
+Le jeu de termes est construit à partir de symptomes_courants.csv (noms canoniques,
+synonymes, variantes sans accents et en majuscules).
+
+Usage : python scripts/bench_normalisation_symptomes.py [--passes 20]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utilitaires.normalisation_symptomes import (
+    CHEMIN_SYMPTOMES_CSV, NormaliseurSymptomes, cle_texte, replier_unicode
+)
+
+
+def charger_termes() -> list:
+    termes = []
+    with open(CHEMIN_SYMPTOMES_CSV, mode='r', encoding='utf-8') as fichier_csv:
+        for ligne in csv.DictReader(fichier_csv):
+            nom = ligne.get("nom_fr") or ""
+            synonymes = [s.strip() for s in (ligne.get("mots_cles_associes") or "").split(",") if s.strip()]
+            for terme in [nom] + synonymes:
+                termes.extend([terme, terme.upper(), replier_unicode(terme), terme + "s"])
+    return termes
+
+
+def mesurer(normaliseur: NormaliseurSymptomes, termes: list, passes: int, vider_cache: bool) -> float:
+    total = 0
+    duree = 0.0
+    for _ in range(passes):
+        if vider_cache:
+            cle_texte.cache_clear()
+        debut = time.perf_counter()
+        for terme in termes:
+            normaliseur.normaliser(terme)
+        duree += time.perf_counter() - debut
+        total += len(termes)
+    return total / duree
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--passes", type=int, default=20)
+    args = analyseur.parse_args()
+
+    debut = time.perf_counter()
+    normaliseur = NormaliseurSymptomes.depuis_csv()
+    duree_compilation_ms = (time.perf_counter() - debut) * 1000
+    termes = charger_termes()
+
+    print(f"Compilation de la table : {duree_compilation_ms:.1f} ms")
+    print(f"Termes par passe        : {len(termes)}")
+    print(f"À froid                 : {mesurer(normaliseur, termes, args.passes, vider_cache=True):,.0f} normalisations/s")
+    print(f"À chaud                 : {mesurer(normaliseur, termes, args.passes, vider_cache=False):,.0f} normalisations/s")
+
+
+if __name__ == "__main__":
+    main()
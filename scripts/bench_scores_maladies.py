@@ -0,0 +1,101 @@
+# scripts/bench_scores_maladies.py
+"""
+Benchmark du moteur de scores maladies x symptômes sur une base synthétique
+(par défaut 10 000 maladies x 5 000 symptômes, 8 à 25 symptômes par maladie).
+
+Pour chaque mode ('pondere', 'tfidf', 'bayesien'), mesure la latence d'une requête
+(produit matrice creuse x vecteur + sélection top-k), comparée à la boucle Python
+historique (intersection d'ensembles maladie par maladie).
+
+Usage : python scripts/bench_scores_maladies.py [--maladies 10000] [--symptomes 5000] [--requetes 500] [--top-k 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.base_de_donnees.modeles import MaladieEnDB
+from app.services.moteur_scores_maladies import MODES_SCORE, MoteurScoresMaladies
+
+PREVALENCES = ["très commun", "commun", "commun", "rare"]
+
+
+def generer_base(nb_maladies: int, nb_symptomes: int, graine: int):
+    aleatoire = random.Random(graine)
+    termes = [f"symptome_{i}" for i in range(nb_symptomes)]
+    maladies, poids_termes = {}, {}
+    for maladie_id in range(1, nb_maladies + 1):
+        symptomes = aleatoire.sample(termes, aleatoire.randint(8, 25))
+        maladies[maladie_id] = MaladieEnDB(
+            id=maladie_id,
+            nom_fr=f"maladie_{maladie_id}",
+            gravite=aleatoire.randint(1, 5),
+            prevalence=aleatoire.choice(PREVALENCES),
+            symptomes_courants_mots_cles=symptomes,
+        )
+        poids_termes[maladie_id] = {s: round(aleatoire.uniform(0.1, 1.0), 2) for s in symptomes}
+    requetes = [aleatoire.sample(termes, aleatoire.randint(2, 6)) for _ in range(1000)]
+    return maladies, poids_termes, requetes
+
+
+def boucle_python(maladies, requete):
+    """Calcul historique : parcours de toutes les maladies et intersection d'ensembles."""
+    requete = set(requete)
+    resultats = []
+    for maladie in maladies.values():
+        symptomes = set(maladie.symptomes_courants_mots_cles)
+        communs = symptomes & requete
+        if communs:
+            resultats.append((maladie, len(communs) / len(symptomes) * 100))
+    resultats.sort(key=lambda r: r[1], reverse=True)
+    return resultats
+
+
+def chronometrer(fonction, requetes) -> dict:
+    durees = []
+    for requete in requetes:
+        debut = time.perf_counter()
+        fonction(requete)
+        durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return {
+        "moyenne_ms": statistics.mean(durees),
+        "p95_ms": durees[min(len(durees) - 1, int(len(durees) * 0.95))],
+        "requetes_par_s": len(durees) / (sum(durees) / 1000),
+    }
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--maladies", type=int, default=10000)
+    analyseur.add_argument("--symptomes", type=int, default=5000)
+    analyseur.add_argument("--requetes", type=int, default=500)
+    analyseur.add_argument("--top-k", type=int, default=20)
+    analyseur.add_argument("--graine", type=int, default=42)
+    args = analyseur.parse_args()
+
+    maladies, poids_termes, requetes = generer_base(args.maladies, args.symptomes, args.graine)
+    requetes = requetes[:args.requetes]
+
+    moteur = MoteurScoresMaladies()
+    debut = time.perf_counter()
+    moteur.construire(maladies, poids_termes)
+    print(f"Construction : {(time.perf_counter() - debut) * 1000:.1f} ms - {moteur.obtenir_statistiques()}")
+
+    lignes = [("boucle Python", chronometrer(lambda r: boucle_python(maladies, r), requetes))]
+    for mode in MODES_SCORE:
+        lignes.append((mode, chronometrer(lambda r, m=mode: moteur.scorer(r, m, args.top_k), requetes)))
+
+    for nom, mesure in lignes:
+        print(
+            f"{nom:>14} | moyenne {mesure['moyenne_ms']:8.3f} ms | p95 {mesure['p95_ms']:8.3f} ms | "
+            f"{mesure['requetes_par_s']:10,.0f} requêtes/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# scripts/bench_stt_rtf.py
+"""
+Mesure le facteur temps réel (RTF = durée de traitement / durée de l'audio) d'un moteur STT
+sur CPU, à partir de fichiers audio de test (tout format lu par ffmpeg) :
+  - chargement : durée du chargement à chaud du moteur (modèle)
+  - lot        : chaque fichier transcrit en une fois (MoteurSTT.transcrire)
+  - flux       : chaque fichier transmis par chunks de --chunk-ms (MoteurSTT.creer_flux), comme en téléassistance
+  - débit      : tous les fichiers transcrits en parallèle sur N threads, pour N dans --workers
+                 (secondes d'audio traitées par seconde : doit croître avec le nombre de cœurs)
+
+Un RTF < 1 signifie que le moteur transcrit plus vite que le temps réel.
+
+Usage : python scripts/bench_stt_rtf.py audio1.wav [audio2.webm ...] [--moteur vosk]
+        [--modele modeles/vosk-model-small-fr-0.22] [--chunk-ms 200] [--workers 1,2,4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydub import AudioSegment
+
+from app.services.moteurs_stt import MOTEURS_STT, creer_moteur_stt
+
+FREQUENCE = 16000
+
+
+def charger_pcm(chemin: str) -> bytes:
+    return AudioSegment.from_file(chemin).set_frame_rate(FREQUENCE).set_channels(1).set_sample_width(2).raw_data
+
+
+def duree_audio_s(pcm: bytes) -> float:
+    return len(pcm) / (2 * FREQUENCE)
+
+
+def transcrire_flux(moteur, pcm: bytes, octets_par_chunk: int, language_code: str):
+    flux = moteur.creer_flux(FREQUENCE, language_code)
+    for debut in range(0, len(pcm), octets_par_chunk):
+        flux.accepter(pcm[debut:debut + octets_par_chunk])
+    return flux.terminer()
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("fichiers", nargs="+")
+    analyseur.add_argument("--moteur", choices=sorted(MOTEURS_STT), default="vosk")
+    analyseur.add_argument("--modele", default="modeles/vosk-model-small-fr-0.22")
+    analyseur.add_argument("--langue", default="fr-FR")
+    analyseur.add_argument("--chunk-ms", type=int, default=200)
+    analyseur.add_argument("--workers", default="1,2,4")
+    args = analyseur.parse_args()
+
+    moteur = creer_moteur_stt(args.moteur, chemin_modele=args.modele, delai_s=60)
+    debut = time.perf_counter()
+    moteur.charger()
+    print(f"{'chargement':>10} | {(time.perf_counter() - debut) * 1000:9.1f} ms | moteur '{moteur.nom}'")
+
+    audios = [(os.path.basename(chemin), charger_pcm(chemin)) for chemin in args.fichiers]
+    duree_totale = sum(duree_audio_s(pcm) for _, pcm in audios)
+    octets_par_chunk = int(FREQUENCE * args.chunk_ms / 1000) * 2
+
+    for nom, pcm in audios:
+        debut = time.perf_counter()
+        texte = moteur.transcrire(pcm, FREQUENCE, args.langue)
+        rtf_lot = (time.perf_counter() - debut) / duree_audio_s(pcm)
+        debut = time.perf_counter()
+        transcrire_flux(moteur, pcm, octets_par_chunk, args.langue)
+        rtf_flux = (time.perf_counter() - debut) / duree_audio_s(pcm)
+        print(f"{nom[:10]:>10} | {duree_audio_s(pcm):7.1f} s audio | RTF lot {rtf_lot:6.3f} | RTF flux {rtf_flux:6.3f} | '{(texte or '')[:60]}'")
+
+    for nb_workers in (int(n) for n in args.workers.split(",")):
+        with ThreadPoolExecutor(max_workers=nb_workers) as executeur:
+            debut = time.perf_counter()
+            list(executeur.map(lambda audio: moteur.transcrire(audio[1], FREQUENCE, args.langue), audios * nb_workers))
+            duree = time.perf_counter() - debut
+        print(f"{nb_workers:>3} worker(s) | {duree_totale * nb_workers / duree:7.2f} s d'audio par seconde | RTF agrégé {duree / (duree_totale * nb_workers):6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# scripts/bench_tampon_audio.py
+"""
+Compare l'accumulation des chunks audio d'un long appel de téléassistance :
+  - concatenation : 'tampon += chunk' (comportement historique, recopie tout le tampon à chaque chunk)
+  - tampon        : TamponAudio (liste de chunks assemblée une seule fois au traitement)
+
+Simule des chunks de --taille-chunk octets toutes les 100 ms, avec un traitement (vidage du
+tampon) toutes les --secondes-par-enonce secondes, et affiche la durée totale, le volume
+d'octets recopiés et le pic de mémoire (tracemalloc).
+
+Usage : python scripts/bench_tampon_audio.py [--minutes 10] [--taille-chunk 1600] [--secondes-par-enonce 60]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.tampon_audio import TamponAudio
+
+
+def concatenation(nb_chunks: int, chunk: bytes, chunks_par_enonce: int) -> int:
+    tampon = b""
+    octets_copies = 0
+    for i in range(1, nb_chunks + 1):
+        tampon += chunk
+        octets_copies += len(tampon)
+        if i % chunks_par_enonce == 0:
+            tampon = b""
+    return octets_copies
+
+
+def tampon_audio(nb_chunks: int, chunk: bytes, chunks_par_enonce: int) -> int:
+    tampon = TamponAudio(taille_max_octets=64 * 1024 * 1024)
+    octets_copies = 0
+    for i in range(1, nb_chunks + 1):
+        tampon.ajouter(chunk)
+        if i % chunks_par_enonce == 0:
+            octets_copies += len(tampon.vider())
+    return octets_copies
+
+
+def mesurer(fonction, *args) -> dict:
+    tracemalloc.start()
+    debut = time.perf_counter()
+    octets_copies = fonction(*args)
+    duree_ms = (time.perf_counter() - debut) * 1000
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"duree_ms": duree_ms, "octets_copies": octets_copies, "pic_ko": pic / 1024}
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--minutes", type=float, default=10.0)
+    analyseur.add_argument("--taille-chunk", type=int, default=1600)
+    analyseur.add_argument("--secondes-par-enonce", type=float, default=60.0)
+    args = analyseur.parse_args()
+
+    nb_chunks = int(args.minutes * 60 * 10)
+    chunks_par_enonce = max(1, int(args.secondes_par_enonce * 10))
+    chunk = os.urandom(args.taille_chunk)
+
+    for nom, fonction in (("concatenation", concatenation), ("tampon", tampon_audio)):
+        mesure = mesurer(fonction, nb_chunks, chunk, chunks_par_enonce)
+        print(
+            f"{nom:>14} | {mesure['duree_ms']:9.1f} ms | {mesure['octets_copies'] / 1e6:10.1f} Mo recopiés | "
+            f"pic mémoire {mesure['pic_ko']:9.1f} Ko"
+        )
+
+
+if __name__ == "__main__":
+    main()
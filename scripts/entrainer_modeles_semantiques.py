@@ -0,0 +1,135 @@
+# scripts/entrainer_modeles_semantiques.py
+"""
+Entraîne le classifieur local d'intentions (bayésien naïf) à partir de l'historique logs_conversation.
+
+  1. lit les --limite derniers messages des utilisateurs ;
+  2. étiquette chaque message : intention déjà présente dans donnees_structurees, sinon étiquette
+     du corpus existant (--corpus), sinon, avec --etiqueter-llm, analyse NLU de Gemini (le LLM
+     sert de professeur ; cache et classification locale désactivés pour cet appel) ;
+  3. enregistre le corpus étiqueté (JSONL, réutilisé aux exécutions suivantes et par
+     scripts/evaluer_classifieur_intentions.py) ;
+  4. entraîne le modèle sur la partie entraînement du corpus (un message sur
+     PART_EVALUATION, choisi par hachage du texte, est réservé à l'évaluation) et l'écrit
+     dans --modele (NLU_LOCAL_MODEL_PATH par défaut).
+
+Usage : python scripts/entrainer_modeles_semantiques.py [--limite 20000] [--etiqueter-llm]
+        [--corpus modeles/corpus_intentions.jsonl] [--modele modeles/classifieur_intentions.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import zlib
+from collections import Counter
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.base_de_donnees import crud
+from app.base_de_donnees.connexion import get_db_connection, close_db_connection
+from app.configuration.parametres import parametres
+from app.services.cache_nlu import normaliser_texte_nlu
+from app.services.classifieur_intentions import ClassifieurNaifBayes
+
+logger = logging.getLogger(__name__)
+
+CHEMIN_CORPUS = "modeles/corpus_intentions.jsonl"
+# Un message sur PART_EVALUATION est réservé à l'évaluation
+PART_EVALUATION = 5
+
+
+def est_exemple_evaluation(texte: str) -> bool:
+    """Partition stable entraînement / évaluation, par hachage du texte normalisé."""
+    return zlib.crc32(normaliser_texte_nlu(texte).encode("utf-8")) % PART_EVALUATION == 0
+
+
+def lire_corpus(chemin: str) -> Dict[str, Tuple[str, str]]:
+    """Corpus étiqueté : texte normalisé -> (message, intention)."""
+    corpus: Dict[str, Tuple[str, str]] = {}
+    if os.path.exists(chemin):
+        with open(chemin, encoding="utf-8") as fichier:
+            for ligne in fichier:
+                if ligne.strip():
+                    exemple = json.loads(ligne)
+                    corpus[normaliser_texte_nlu(exemple["message"])] = (exemple["message"], exemple["intention"])
+    return corpus
+
+
+def ecrire_corpus(chemin: str, corpus: Dict[str, Tuple[str, str]]):
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        for message, intention in corpus.values():
+            fichier.write(json.dumps({"message": message, "intention": intention}, ensure_ascii=False) + "\n")
+
+
+def lire_messages(limite: int) -> List[dict]:
+    conn = get_db_connection()
+    try:
+        return crud.lire_messages_utilisateur_logs_conversation(conn, limite)
+    finally:
+        close_db_connection(conn)
+
+
+async def etiqueter_avec_llm(messages: List[str]) -> Dict[str, str]:
+    from app.services.integrateur_llm import IntegrateurLLM
+    professeur = IntegrateurLLM()
+    etiquettes = {}
+    for i, message in enumerate(messages, 1):
+        resultat = await professeur.comprendre_intention_et_extraire_entites(message)
+        etiquettes[message] = resultat.get("intention", "autre_conversation")
+        if i % 50 == 0:
+            print(f"  {i}/{len(messages)} messages étiquetés par le LLM")
+    return etiquettes
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--limite", type=int, default=20000)
+    analyseur.add_argument("--corpus", default=CHEMIN_CORPUS)
+    analyseur.add_argument("--modele", default=parametres.NLU_LOCAL_MODEL_PATH)
+    analyseur.add_argument("--etiqueter-llm", action="store_true")
+    args = analyseur.parse_args()
+
+    corpus = lire_corpus(args.corpus)
+    a_etiqueter = []
+    for ligne in lire_messages(args.limite):
+        message = (ligne["message"] or "").strip()
+        cle = normaliser_texte_nlu(message)
+        if not cle:
+            continue
+        intention = (ligne["donnees_structurees"] or {}).get("intention")
+        if intention:
+            corpus[cle] = (message, intention)
+        elif cle not in corpus:
+            a_etiqueter.append(message)
+    a_etiqueter = list(dict.fromkeys(a_etiqueter))
+
+    if a_etiqueter and args.etiqueter_llm:
+        print(f"Étiquetage de {len(a_etiqueter)} messages par le LLM...")
+        for message, intention in asyncio.run(etiqueter_avec_llm(a_etiqueter)).items():
+            corpus[normaliser_texte_nlu(message)] = (message, intention)
+    elif a_etiqueter:
+        print(f"{len(a_etiqueter)} messages sans étiquette ignorés (--etiqueter-llm pour les faire étiqueter).")
+
+    ecrire_corpus(args.corpus, corpus)
+    entrainement = [(message, intention) for message, intention in corpus.values() if not est_exemple_evaluation(message)]
+    if not entrainement:
+        print("Corpus vide : aucun modèle entraîné.")
+        return
+    modele = ClassifieurNaifBayes.entrainer(entrainement)
+    modele.sauvegarder(args.modele)
+
+    print(f"Corpus : {len(corpus)} messages ({args.corpus}), dont {len(entrainement)} pour l'entraînement.")
+    for intention, nb in Counter(intention for _, intention in entrainement).most_common():
+        print(f"  {intention:>24} : {nb}")
+    print(f"Modèle écrit dans {args.modele}.")
+
+
+if __name__ == "__main__":
+    main()
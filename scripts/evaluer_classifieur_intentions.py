@@ -0,0 +1,86 @@
+# scripts/evaluer_classifieur_intentions.py
+"""
+Évaluation hors ligne du classifieur local d'intentions sur la partie évaluation du corpus
+étiqueté par scripts/entrainer_modeles_semantiques.py (étiquettes de référence = LLM).
+
+Pour les règles seules puis pour chaque seuil de confiance de --seuils, affiche :
+  - appels évités : part des messages répondus localement (sans appel NLU au LLM) ;
+  - précision     : part des réponses locales identiques à l'étiquette du LLM ;
+  - exactitude    : part des messages correctement classés au total (réponse locale, sinon LLM) ;
+  - escalades manquées : réponses locales données à un message dont l'intention de référence
+    n'est pas une intention rapide (symptômes, maladies...) ;
+  - durée moyenne et p99 d'une classification locale.
+
+Usage : python scripts/evaluer_classifieur_intentions.py [--corpus modeles/corpus_intentions.jsonl]
+        [--modele modeles/classifieur_intentions.json] [--seuils 0.8,0.9,0.95,0.99]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.configuration.parametres import parametres
+from app.services.classifieur_intentions import ClassifieurIntentionsLocal, ClassifieurNaifBayes
+from scripts.entrainer_modeles_semantiques import CHEMIN_CORPUS, est_exemple_evaluation, lire_corpus
+
+
+def evaluer(classifieur: ClassifieurIntentionsLocal, exemples) -> dict:
+    nb_locaux = nb_justes = nb_manquees = 0
+    durees_ms = []
+    for message, reference in exemples:
+        debut = time.perf_counter()
+        intention, _, _ = classifieur.classer_detail(message)
+        durees_ms.append((time.perf_counter() - debut) * 1000)
+        if intention is None:
+            continue
+        nb_locaux += 1
+        nb_justes += intention == reference
+        nb_manquees += reference not in classifieur.intentions_rapides
+    durees_ms.sort()
+    total = len(exemples)
+    return {
+        "appels_evites": nb_locaux / total,
+        "precision": nb_justes / nb_locaux if nb_locaux else 0.0,
+        "exactitude": (total - nb_locaux + nb_justes) / total,
+        "escalades_manquees": nb_manquees,
+        "duree_moyenne_ms": sum(durees_ms) / total,
+        "duree_p99_ms": durees_ms[min(total - 1, int(total * 0.99))],
+    }
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--corpus", default=CHEMIN_CORPUS)
+    analyseur.add_argument("--modele", default=parametres.NLU_LOCAL_MODEL_PATH)
+    analyseur.add_argument("--seuils", default="0.8,0.9,0.95,0.99")
+    analyseur.add_argument("--intentions", default=parametres.NLU_LOCAL_INTENTS)
+    args = analyseur.parse_args()
+
+    exemples = [(message, intention) for message, intention in lire_corpus(args.corpus).values() if est_exemple_evaluation(message)]
+    if not exemples:
+        print(f"Aucun exemple d'évaluation dans {args.corpus}.")
+        return
+    intentions = [intention.strip() for intention in args.intentions.split(",") if intention.strip()]
+    modele = ClassifieurNaifBayes.charger(args.modele) if os.path.exists(args.modele) else None
+    print(f"{len(exemples)} messages d'évaluation, intentions rapides : {', '.join(intentions)}")
+
+    configurations = [("règles", ClassifieurIntentionsLocal(None, 1.0, intentions))]
+    if modele is None:
+        print(f"Modèle {args.modele} absent : évaluation des règles seules.")
+    else:
+        configurations += [
+            (f"seuil {seuil}", ClassifieurIntentionsLocal(modele, float(seuil), intentions)) for seuil in args.seuils.split(",")
+        ]
+    for nom, classifieur in configurations:
+        mesure = evaluer(classifieur, exemples)
+        print(
+            f"{nom:>12} | appels évités {mesure['appels_evites']:6.1%} | précision {mesure['precision']:6.1%} | "
+            f"exactitude {mesure['exactitude']:6.1%} | escalades manquées {mesure['escalades_manquees']:4d} | "
+            f"{mesure['duree_moyenne_ms']:.3f} ms (p99 {mesure['duree_p99_ms']:.3f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
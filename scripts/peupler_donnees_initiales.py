@@ -17,6 +17,7 @@ from app.base_de_donnees.connexion import get_db_connection, close_db_connection
 from app.base_de_donnees import crud
 from app.base_de_donnees.modeles import MaladieCreer, SymptomeCreer, MaladieSymptomeLienCreer
 from app.utilitaires.journalisation import configurer_logger
+from app.utilitaires.normalisation_symptomes import obtenir_normaliseur
 from app.configuration.parametres import parametres
 
 # Configure the logger for this script
@@ -72,7 +73,7 @@ def peupler_maladies_depuis_csv(chemin_fichier_csv: str) -> int:
     try:
         creer_pool_connexions()
         conn = get_db_connection()
-        if conn.is_connected():
+        if conn:
             logger.info(f"\n--- Début du peuplement de la table 'maladies' depuis '{chemin_fichier_csv}' ---")
             for i, maladie_data in enumerate(maladies_a_inserer):
                 try:
@@ -135,7 +136,7 @@ def peupler_symptomes_depuis_csv(chemin_fichier_csv: str) -> int:
     try:
         creer_pool_connexions()
         conn = get_db_connection()
-        if conn.is_connected():
+        if conn:
             logger.info(f"\n--- Début du peuplement de la table 'symptomes' depuis '{chemin_fichier_csv}' ---")
             for i, symptome_data in enumerate(symptomes_a_inserer):
                 try:
@@ -172,15 +173,18 @@ def peupler_liens_maladies_symptomes_initiaux() -> int:
     try:
         creer_pool_connexions()
         conn = get_db_connection()
-        if conn.is_connected():
+        if conn:
             logger.info("\n--- Début du peuplement des liens Maladie-Symptôme depuis les CSV ---")
 
             # Récupérer tous les IDs des maladies et symptômes déjà insérés
             maladies_db = crud.lire_toutes_maladies(conn, limite=5000) # Augmenter la limite si nécessaire
             symptomes_db = crud.lire_tous_symptomes(conn, limite=5000) # Augmenter la limite si nécessaire
 
+            # Les symptômes sont appariés par clé normalisée : "Fièvre", "fievre" ou un synonyme
+            # déclaré dans symptomes_courants.csv désignent le même symptôme.
+            normaliseur = obtenir_normaliseur()
             maladie_map = {m.nom_fr: m.id for m in maladies_db}
-            symptome_map = {s.nom_fr: s.id for s in symptomes_db}
+            symptome_map = {normaliseur.cle(s.nom_fr): s.id for s in symptomes_db}
 
             # Itérer sur les maladies pour créer les liens dynamiquement
             for maladie in maladies_db:
@@ -189,7 +193,7 @@ def peupler_liens_maladies_symptomes_initiaux() -> int:
                         # Nettoyer le mot-clé (supprimer les espaces en trop)
                         nom_symptome_nettoye = mot_cle_symptome.strip()
                         
-                        symptome_id = symptome_map.get(nom_symptome_nettoye)
+                        symptome_id = symptome_map.get(normaliseur.cle(nom_symptome_nettoye))
 
                         if symptome_id is None:
                             logger.warning(f"Symptôme '{nom_symptome_nettoye}' (mentionné dans les mots-clés de '{maladie.nom_fr}') non trouvé dans la base de données. Lien ignoré.")
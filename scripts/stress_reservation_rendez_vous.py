@@ -0,0 +1,115 @@
+# scripts/stress_reservation_rendez_vous.py
+"""
+Test de charge de la réservation de rendez-vous sur une base MySQL réelle (paramètres DB_* de .env).
+
+1. Conflit : --reservations demandes simultanées pour le MÊME créneau d'un médecin.
+   Avec crud.reserver_rendez_vous, exactement une doit réussir ; le mode historique
+   (vérification puis insertion sur deux requêtes) est lancé en comparaison (--avec-historique).
+2. Débit : --reservations demandes simultanées sur des créneaux DISTINCTS, réparties entre
+   les médecins donnés : toutes doivent réussir, le débit (réservations/s) est affiché.
+
+Les rendez-vous sont créés dans un jour lointain (--jour) puis supprimés en fin de test.
+Le patient et les médecins doivent exister.
+
+Usage : python scripts/stress_reservation_rendez_vous.py --patient-id 1 --medecins 1,2,3 [--reservations 300] [--workers 10]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.base_de_donnees import crud
+from app.base_de_donnees.acces_async import AccesDonneesAsync
+from app.base_de_donnees.connexion import fermer_pool_connexions
+from app.base_de_donnees.modeles import RendezVousCreer
+
+
+def reserver_historique(conn, rdv: RendezVousCreer):
+    """Ancien chemin : vérification puis insertion, sans verrou."""
+    fin = rdv.date_heure + timedelta(minutes=rdv.duree_minutes)
+    if crud.lire_rendez_vous_par_medecin_entre(conn, rdv.medecin_id, rdv.date_heure, fin):
+        return None
+    return crud.creer_rendez_vous(conn, rdv)
+
+
+async def lancer(acces: AccesDonneesAsync, fonction, demandes) -> tuple:
+    debut = time.perf_counter()
+    resultats = await asyncio.gather(
+        *(acces.executer_transaction(fonction, rdv) for rdv in demandes), return_exceptions=True
+    )
+    duree_s = time.perf_counter() - debut
+    reussis = [r for r in resultats if r is not None and not isinstance(r, Exception)]
+    erreurs = [r for r in resultats if isinstance(r, Exception)]
+    return reussis, erreurs, duree_s
+
+
+async def executer(args) -> bool:
+    acces = AccesDonneesAsync(nb_workers=args.workers)
+    medecins = [int(m) for m in args.medecins.split(",")]
+    jour = datetime.strptime(args.jour, "%Y-%m-%d")
+    crees = []
+    succes = True
+    try:
+        scenarios = [("atomique", crud.reserver_rendez_vous)]
+        if args.avec_historique:
+            scenarios.append(("historique", reserver_historique))
+        for decalage, (nom, fonction) in enumerate(scenarios):
+            creneau = jour + timedelta(hours=8 + decalage)
+            demandes = [
+                RendezVousCreer(patient_id=args.patient_id, medecin_id=medecins[0], date_heure=creneau, duree_minutes=30, motif="stress")
+                for _ in range(args.reservations)
+            ]
+            reussis, erreurs, duree_s = await lancer(acces, fonction, demandes)
+            crees.extend(reussis)
+            print(f"conflit {nom:>10} | {len(reussis)} réussie(s) sur {len(demandes)} | {len(erreurs)} erreur(s) | {duree_s:.2f} s")
+            if nom == "atomique" and len(reussis) != 1:
+                succes = False
+
+        # Créneaux distincts : un créneau de 10 minutes par demande, médecins en alternance
+        demandes = [
+            RendezVousCreer(
+                patient_id=args.patient_id,
+                medecin_id=medecins[i % len(medecins)],
+                date_heure=jour + timedelta(days=1, minutes=10 * (i // len(medecins))),
+                duree_minutes=10,
+                motif="stress"
+            )
+            for i in range(args.reservations)
+        ]
+        reussis, erreurs, duree_s = await lancer(acces, crud.reserver_rendez_vous, demandes)
+        crees.extend(reussis)
+        print(
+            f"{'sans conflit':>18} | {len(reussis)} réussie(s) sur {len(demandes)} | {len(erreurs)} erreur(s) | "
+            f"{duree_s:.2f} s | {len(reussis) / duree_s:,.0f} réservations/s"
+        )
+        if len(reussis) != len(demandes):
+            succes = False
+    finally:
+        for rdv in crees:
+            await acces.supprimer_rendez_vous(rdv.id)
+        acces.fermer()
+        fermer_pool_connexions()
+    return succes
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    analyseur.add_argument("--patient-id", type=int, required=True)
+    analyseur.add_argument("--medecins", required=True, help="IDs de médecins séparés par des virgules")
+    analyseur.add_argument("--reservations", type=int, default=300)
+    analyseur.add_argument("--workers", type=int, default=10)
+    analyseur.add_argument("--jour", default="2099-01-05", help="Jour (AAAA-MM-JJ) utilisé pour les rendez-vous de test")
+    analyseur.add_argument("--avec-historique", action="store_true", help="Rejoue aussi le conflit avec l'ancien chemin non atomique")
+    args = analyseur.parse_args()
+
+    succes = asyncio.run(executer(args))
+    print("OK : une seule réservation par créneau." if succes else "ÉCHEC : voir les résultats ci-dessus.")
+    sys.exit(0 if succes else 1)
+
+
+if __name__ == "__main__":
+    main()